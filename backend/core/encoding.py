@@ -0,0 +1,55 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, List
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError: # Fall back to the stdlib encoder
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    """Encodes types the JSON encoders don't handle natively."""
+    if isinstance(value, Decimal):
+        return str(value) # Keep money exact, as Pydantic does
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serializes to JSON bytes using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(Response):
+    """JSON response for data that is already trusted (rows read from our own store).
+
+    Skips FastAPI's response_model validation and re-serialization; routes keep their
+    response_model for the OpenAPI schema, and input is still validated on writes
+    (TransactionCreate / TransactionUpdate).
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def prepare_transaction_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Matches the wire format of the Transaction model without validating each row.
+
+    PostgREST returns numeric amounts as JSON numbers, while the Transaction model
+    serializes its Decimal amount as a string; convert in place so both paths agree.
+    The import fingerprint is a storage key, not part of the model, and is dropped.
+    """
+    for row in rows:
+        row.pop('fingerprint', None)
+        amount = row.get('amount')
+        if amount is not None and not isinstance(amount, str):
+            row['amount'] = str(amount)
+    return rows
@@ -0,0 +1,37 @@
+import logging
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+# Listener signature: (kind, rows), where kind is "inserted" or "updated" and rows are
+# the full transaction rows as stored
+TransactionListener = Callable[[str, List[Dict[str, Any]]], None]
+
+
+class TransactionEvents:
+    """In-process notifications of transaction writes made through the repository.
+
+    Lets derived in-memory state (analytics snapshots and the like) follow imports and
+    edits without polling the database. Listeners run synchronously on the writer's
+    task, so they should only record the change and do heavier work later.
+    """
+
+    def __init__(self):
+        self._listeners: List[TransactionListener] = []
+
+    def subscribe(self, listener: TransactionListener) -> Callable[[], None]:
+        """Registers a listener and returns a function that removes it."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def publish(self, kind: str, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        for listener in list(self._listeners):
+            try:
+                listener(kind, rows)
+            except Exception as e: # A broken listener must not fail the write
+                logger.exception("Transaction listener %r failed: %s", listener, e)
+
+
+transaction_events = TransactionEvents()
@@ -0,0 +1,62 @@
+import json
+import logging
+import os
+import sys
+from datetime import datetime, timezone
+
+# Minimum level logged (DEBUG also logs a line per import stage)
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+# "text" for key=value lines, "json" for one JSON object per line
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "text").lower()
+
+# Attributes every LogRecord has; anything else was passed with `extra=`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+
+def _extra_fields(record: logging.LogRecord) -> dict:
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, including any `extra=` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            **_extra_fields(record),
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class KeyValueFormatter(logging.Formatter):
+    """Readable lines with `extra=` fields appended as key=value pairs."""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = _extra_fields(record)
+        if fields:
+            first, newline, rest = line.partition("\n") # Keep tracebacks below the fields
+            line = first + " " + " ".join(f"{key}={value}" for key, value in fields.items()) + newline + rest
+        return line
+
+
+def configure_logging(level: str = LOG_LEVEL, format: str = LOG_FORMAT) -> None:
+    """Sends the application's logs to stderr in the configured format.
+
+    Only this codebase's loggers (core, routes, services) are configured; uvicorn keeps
+    its own. Calling this again replaces the handler rather than adding another.
+    """
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JsonFormatter() if format == "json" else KeyValueFormatter())
+    for name in ("core", "routes", "services", "main"):
+        logger = logging.getLogger(name)
+        logger.handlers = [handler]
+        logger.setLevel(level)
@@ -0,0 +1,405 @@
+import asyncio
+import bisect
+import copy
+import heapq
+import itertools
+import re
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from models.financials import TransactionFilterParams
+from core.pagination import TransactionCursor
+from core.events import TransactionEvents, transaction_events
+
+# Column defaults of the transactions table, applied to inserted rows
+TRANSACTION_DEFAULTS = {
+    'category_id': None,
+    'reconciled': False,
+    'tags': None,
+    'notes': None,
+    'fitid': None,
+    'fingerprint': None,
+    'transaction_type': None,
+}
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def _words(text: Optional[str]) -> Set[str]:
+    return set(_WORD_RE.findall(text.lower())) if text else set()
+
+
+def _iso(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, date) else value
+
+
+class InMemoryRepository:
+    """Drop-in stand-in for SupabaseRepository that keeps every table in process memory.
+
+    Behaves like the database the app is written against: (account_id, fitid) and
+    (account_id, fingerprint) deduplicate upserts, transactions are listed newest first
+    with the same filters and keyset cursor, rollups are the per (account, category,
+    month) totals the migration 0004 triggers maintain, search ranks description and
+    notes matches like migration 0007 (from an inverted index of their words, kept up
+    to date on every write), and writes are published to `events`. Rows come back shaped like PostgREST's JSON (ISO dates, numeric amounts).
+
+    Meant for benchmarks and local runs without Supabase; `latency` (seconds) is slept
+    on every call to simulate the network round trip.
+    """
+
+    def __init__(
+        self,
+        categories: Optional[List[Dict[str, Any]]] = None,
+        latency: float = 0.0,
+        events: TransactionEvents = transaction_events,
+    ):
+        self.latency = latency
+        self.events = events # Notified of every transaction write
+        self.requests = 0 # Calls made, i.e. round trips a real database would have served
+        self.accounts: Dict[int, Dict[str, Any]] = {}
+        self.transactions: Dict[int, Dict[str, Any]] = {}
+        self.categories: List[Dict[str, Any]] = [dict(category) for category in categories or []]
+        self.rules: Dict[int, Dict[str, Any]] = {}
+        self.budgets: Dict[int, Dict[str, Any]] = {}
+        self.goals: Dict[int, Dict[str, Any]] = {}
+        self.imported_files: Dict[str, Dict[str, Any]] = {}
+        self.statement_ranges: List[Dict[str, Any]] = []
+        self._ids = {table: itertools.count(1) for table in ('accounts', 'transactions', 'rules', 'budgets', 'goals', 'ranges')}
+        self._account_names: Dict[str, int] = {}
+        self._dedup_keys: Dict[Tuple[int, str, str], int] = {} # (account_id, column, value) -> transaction id
+        self._order: List[Tuple[str, int]] = [] # (date, id) of every transaction, ascending, like the keyset index
+        self._order_sorted = True
+        self._postings: Dict[str, Set[int]] = {} # Word in a description or notes -> transaction ids
+        self._vocabulary: List[str] = [] # Sorted words of _postings, for prefix lookups
+        self._row_words: Dict[int, Set[str]] = {}
+
+    async def _call(self) -> None:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        else:
+            await asyncio.sleep(0) # Still yield, as a real request would
+
+    async def aclose(self) -> None:
+        pass
+
+    # --- Accounts ---
+
+    async def get_account_id_by_name(self, name: str) -> Optional[int]:
+        await self._call()
+        return self._account_names.get(name)
+
+    async def create_account(self, account: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        await self._call()
+        return self._insert_account(account)
+
+    def _insert_account(self, account: Dict[str, Any]) -> Dict[str, Any]:
+        if account['name'] in self._account_names: # accounts.name is unique
+            raise ValueError(f"duplicate key value violates unique constraint: account '{account['name']}'")
+        row = {'id': next(self._ids['accounts']), 'type': None, **account}
+        self.accounts[row['id']] = row
+        self._account_names[row['name']] = row['id']
+        return dict(row)
+
+    async def get_account_ids_by_names(self, names: List[str]) -> Dict[str, int]:
+        await self._call()
+        return {name: self._account_names[name] for name in names if name in self._account_names}
+
+    async def create_accounts(self, accounts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not accounts:
+            return []
+        await self._call()
+        return [self._insert_account(account) for account in accounts]
+
+    # --- Transactions ---
+
+    async def upsert_transactions(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Inserts rows, skipping any whose fitid (or, without one, fingerprint) exists for the account."""
+        await self._call()
+        inserted = []
+        for row in rows:
+            key = self._dedup_key(row)
+            if key is not None and key in self._dedup_keys:
+                continue
+            stored = {**TRANSACTION_DEFAULTS, **{column: _iso(value) for column, value in row.items()}}
+            stored['id'] = next(self._ids['transactions'])
+            if isinstance(stored['amount'], (Decimal, str)):
+                stored['amount'] = float(stored['amount'])
+            self.transactions[stored['id']] = stored
+            self._index_words(stored)
+            self._order.append((stored['date'], stored['id']))
+            self._order_sorted = False
+            if key is not None:
+                self._dedup_keys[key] = stored['id']
+            inserted.append(copy.deepcopy(stored))
+        self.events.publish("inserted", inserted)
+        return inserted
+
+    @staticmethod
+    def _dedup_key(row: Dict[str, Any]) -> Optional[Tuple[int, str, str]]:
+        if row.get('fitid'):
+            return (row['account_id'], 'fitid', row['fitid'])
+        if row.get('fingerprint'):
+            return (row['account_id'], 'fingerprint', row['fingerprint'])
+        return None # NULLs never conflict
+
+    async def list_transactions(
+        self,
+        filters: TransactionFilterParams,
+        limit: int,
+        offset: int = 0,
+        cursor: Optional[TransactionCursor] = None,
+        columns: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Returns one page of transactions, newest first (see SupabaseRepository.list_transactions)."""
+        await self._call()
+        if not self._order_sorted:
+            self._order.sort()
+            self._order_sorted = True
+        # Walk the (date, id) index newest first, starting just past the cursor
+        end = bisect.bisect_left(self._order, (cursor[0].isoformat(), cursor[1])) if cursor is not None else len(self._order)
+        skip = 0 if cursor is not None else offset
+        page = []
+        for position in range(end - 1, -1, -1):
+            row = self.transactions[self._order[position][1]]
+            if not self._matches(row, filters):
+                continue
+            if skip:
+                skip -= 1
+                continue
+            page.append(row)
+            if len(page) == limit:
+                break
+        if columns:
+            return [{column: copy.deepcopy(row.get(column)) for column in columns} for row in page]
+        return copy.deepcopy(page)
+
+    @staticmethod
+    def _matches(row: Dict[str, Any], filters: TransactionFilterParams) -> bool:
+        return (
+            (filters.start_date is None or row['date'] >= filters.start_date.isoformat())
+            and (filters.end_date is None or row['date'] <= filters.end_date.isoformat())
+            and (filters.account_id is None or row['account_id'] == filters.account_id)
+            and (filters.category_id is None or row['category_id'] == filters.category_id)
+            and (filters.reconciled is None or row['reconciled'] == filters.reconciled)
+            and (not filters.tags or set(filters.tags) <= set(row['tags'] or ()))
+        )
+
+    def _matching(self, filters: TransactionFilterParams) -> List[Dict[str, Any]]:
+        return [row for row in self.transactions.values() if self._matches(row, filters)]
+
+    # --- Search ---
+
+    def _index_words(self, row: Dict[str, Any]) -> None:
+        """Brings the inverted index up to date with a row's description and notes."""
+        words = _words(row.get('description')) | _words(row.get('notes'))
+        previous = self._row_words.get(row['id'], set())
+        for word in previous - words:
+            self._postings[word].discard(row['id'])
+        for word in words - previous:
+            postings = self._postings.get(word)
+            if postings is None:
+                postings = self._postings[word] = set()
+                bisect.insort(self._vocabulary, word)
+            postings.add(row['id'])
+        self._row_words[row['id']] = words
+
+    def _prefix_matches(self, prefix: str) -> Set[int]:
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        matches: Set[int] = set()
+        for word in itertools.islice(self._vocabulary, start, None):
+            if not word.startswith(prefix):
+                break
+            matches |= self._postings[word]
+        return matches
+
+    async def search_transactions(
+        self,
+        query: str,
+        filters: TransactionFilterParams,
+        limit: int,
+        offset: int = 0,
+        columns: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Transactions whose description or notes contain every word of `query` (or a word
+        starting with it), ranked by whole-word matches and then newest first."""
+        await self._call()
+        terms = _words(query)
+        if not terms:
+            return []
+        candidates: Optional[Set[int]] = None
+        for term in sorted(terms, key=lambda term: len(self._postings.get(term, ())) or len(self._vocabulary)):
+            matches = self._prefix_matches(term)
+            candidates = matches if candidates is None else candidates & matches
+            if not candidates:
+                return []
+        ranked = heapq.nlargest(offset + limit, (
+            (len(terms & self._row_words[transaction_id]), self.transactions[transaction_id]['date'], transaction_id)
+            for transaction_id in candidates if self._matches(self.transactions[transaction_id], filters)
+        ))
+        page = [self.transactions[transaction_id] for _, _, transaction_id in ranked[offset:offset + limit]]
+        if columns:
+            return [{column: copy.deepcopy(row.get(column)) for column in columns} for row in page]
+        return copy.deepcopy(page)
+
+    def _update(self, rows: List[Dict[str, Any]], values: Dict[str, Any]) -> List[Dict[str, Any]]:
+        updated = []
+        reindex = 'description' in values or 'notes' in values
+        for row in rows:
+            row.update({column: _iso(value) for column, value in values.items()})
+            if reindex:
+                self._index_words(row)
+            updated.append(copy.deepcopy(row))
+        self.events.publish("updated", updated)
+        return updated
+
+    async def update_transaction(self, transaction_id: int, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        await self._call()
+        row = self.transactions.get(transaction_id)
+        if row is None:
+            return None
+        return self._update([row], values)[0]
+
+    async def update_transactions(self, transaction_ids: List[int], values: Dict[str, Any]) -> List[Dict[str, Any]]:
+        await self._call()
+        ids = set(transaction_ids)
+        return self._update([row for row_id, row in self.transactions.items() if row_id in ids], values)
+
+    async def update_matching_transactions(
+        self, filters: TransactionFilterParams, values: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        await self._call()
+        return self._update(self._matching(filters), values)
+
+    # --- Categories ---
+
+    async def list_categories(self) -> List[Dict[str, Any]]:
+        await self._call()
+        return sorted((dict(category) for category in self.categories), key=lambda category: category['name'])
+
+    # --- Dashboard rollups ---
+
+    async def list_rollups(
+        self,
+        account_id: Optional[int] = None,
+        start_month: Optional[date] = None,
+        end_month: Optional[date] = None,
+    ) -> List[Dict[str, Any]]:
+        """Per (account, category, month) totals, computed from the stored transactions."""
+        await self._call()
+        groups: Dict[Tuple[int, Optional[int], str], Dict[str, Any]] = {}
+        for row in self.transactions.values():
+            if account_id is not None and row['account_id'] != account_id:
+                continue
+            month = row['date'][:8] + "01"
+            if (start_month and month < start_month.isoformat()) or (end_month and month > end_month.isoformat()):
+                continue
+            key = (row['account_id'], row['category_id'], month)
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = {
+                    'account_id': key[0], 'category_id': key[1], 'month': month,
+                    'income': Decimal(0), 'spending': Decimal(0), 'transaction_count': 0, 'unreconciled_count': 0,
+                }
+            amount = Decimal(str(row['amount']))
+            group['income'] += max(amount, 0)
+            group['spending'] += max(-amount, 0)
+            group['transaction_count'] += 1
+            group['unreconciled_count'] += 0 if row['reconciled'] else 1
+        rows = [
+            {**group, 'income': float(group['income']), 'spending': float(group['spending'])}
+            for group in groups.values()
+        ]
+        rows.sort(key=lambda row: (row['month'], row['account_id'], row['category_id'] is None, row['category_id'] or 0))
+        return rows
+
+    # --- Categorization rules ---
+
+    async def list_rules(self) -> List[Dict[str, Any]]:
+        await self._call()
+        return [dict(rule) for _, rule in sorted(self.rules.items())]
+
+    async def create_rule(self, rule: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        await self._call()
+        row = {'match_type': 'substring', 'priority': 0, 'enabled': True, **rule, 'id': next(self._ids['rules'])}
+        self.rules[row['id']] = row
+        return dict(row)
+
+    async def delete_rule(self, rule_id: int) -> bool:
+        await self._call()
+        return self.rules.pop(rule_id, None) is not None
+
+    # --- Budgets and goals ---
+
+    async def list_budgets(self) -> List[Dict[str, Any]]:
+        await self._call()
+        return [dict(budget) for _, budget in sorted(self.budgets.items())]
+
+    async def create_budget(self, budget: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        await self._call()
+        row = {'period': 'monthly', **budget, 'id': next(self._ids['budgets'])}
+        self.budgets[row['id']] = row
+        return dict(row)
+
+    async def update_budget(self, budget_id: int, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        await self._call()
+        if budget_id not in self.budgets:
+            return None
+        self.budgets[budget_id].update(values)
+        return dict(self.budgets[budget_id])
+
+    async def delete_budget(self, budget_id: int) -> bool:
+        await self._call()
+        return self.budgets.pop(budget_id, None) is not None
+
+    async def list_goals(self) -> List[Dict[str, Any]]:
+        await self._call()
+        return [dict(goal) for _, goal in sorted(self.goals.items())]
+
+    async def create_goal(self, goal: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        await self._call()
+        row = {'current_amount': 0, 'deadline': None, 'account_id': None, **goal, 'id': next(self._ids['goals'])}
+        self.goals[row['id']] = row
+        return dict(row)
+
+    async def update_goal(self, goal_id: int, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        await self._call()
+        if goal_id not in self.goals:
+            return None
+        self.goals[goal_id].update(values)
+        return dict(self.goals[goal_id])
+
+    async def delete_goal(self, goal_id: int) -> bool:
+        await self._call()
+        return self.goals.pop(goal_id, None) is not None
+
+    # --- Import ledger ---
+
+    async def get_imported_file(self, sha256: str) -> Optional[Dict[str, Any]]:
+        await self._call()
+        row = self.imported_files.get(sha256)
+        return dict(row) if row else None
+
+    async def record_imported_file(self, row: Dict[str, Any]) -> None:
+        await self._call()
+        self.imported_files.setdefault(row['sha256'], {'imported_at': datetime.now(timezone.utc).isoformat(), **row})
+
+    async def list_statement_ranges(self, account_ids: List[int]) -> List[Dict[str, Any]]:
+        if not account_ids:
+            return []
+        await self._call()
+        ids = set(account_ids)
+        return [
+            {'account_id': row['account_id'], 'start_date': row['start_date'], 'end_date': row['end_date']}
+            for row in self.statement_ranges if row['account_id'] in ids
+        ]
+
+    async def add_statement_ranges(self, ranges: List[Dict[str, Any]]) -> None:
+        if ranges:
+            await self._call()
+            for row in ranges:
+                self.statement_ranges.append({
+                    **{column: _iso(value) for column, value in row.items()},
+                    'id': next(self._ids['ranges']),
+                })
@@ -0,0 +1,28 @@
+import base64
+import json
+from datetime import date
+from typing import Any, Dict, Tuple
+
+# Keyset cursor for the transactions listing, which is ordered by (date DESC, id DESC).
+# The cursor holds the sort key of the last row on a page; the next page starts strictly
+# after it, so fetching page N costs the same as fetching page 1.
+TransactionCursor = Tuple[date, int]
+
+
+def encode_cursor(row: Dict[str, Any]) -> str:
+    """Builds an opaque cursor pointing just past `row`."""
+    row_date = row['date']
+    if isinstance(row_date, date):
+        row_date = row_date.isoformat()
+    payload = json.dumps([row_date, row['id']], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> TransactionCursor:
+    """Parses a cursor produced by `encode_cursor`. Raises ValueError if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        row_date, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return date.fromisoformat(row_date), int(row_id)
+    except Exception:
+        raise ValueError("Invalid pagination cursor.")
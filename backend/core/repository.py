@@ -0,0 +1,406 @@
+import asyncio
+import os
+from datetime import date
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Protocol
+
+from models.financials import TransactionFilterParams
+from core.pagination import TransactionCursor
+from core.events import TransactionEvents, transaction_events
+
+if TYPE_CHECKING: # postgrest (and httpx) load with the first client, not with the app
+    from postgrest import AsyncPostgrestClient
+
+# Where data is stored: "supabase", or "sqlite" for an embedded database file at
+# SQLITE_PATH (see core/sqlite_repository.py)
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "supabase").lower()
+
+# Maximum number of Supabase requests in flight at once from this worker
+MAX_CONCURRENT_REQUESTS = int(os.environ.get("SUPABASE_MAX_CONCURRENCY", 10))
+
+# Unique constraint used for server-side deduplication of imported transactions
+# (see migrations/0001_transactions_account_fitid_unique.sql)
+TRANSACTION_CONFLICT_COLUMNS = "account_id,fitid"
+# Constraint used instead for rows without a fitid (migrations/0006_transaction_fingerprints.sql)
+FINGERPRINT_CONFLICT_COLUMNS = "account_id,fingerprint"
+
+# Account names per lookup request, keeping the URL short
+ACCOUNT_LOOKUP_CHUNK_SIZE = 100
+
+# Rollup rows fetched per request (Supabase's default response cap)
+ROLLUP_PAGE_SIZE = 1000
+
+
+def _array_literal(values: List[str]) -> str:
+    """Postgres array literal with every element quoted, so commas and braces in tags are safe."""
+    quoted = ('"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"' for value in values)
+    return "{" + ",".join(quoted) + "}"
+
+
+class Repository(Protocol):
+    """The data access interface the routes and services are written against.
+
+    Implemented by SupabaseRepository, SQLiteRepository (core/sqlite_repository.py) and
+    InMemoryRepository (core/memory_repository.py); get_repository() returns the one
+    selected by STORAGE_BACKEND. Rows are dicts shaped like PostgREST's JSON, and every
+    transaction insert or update is published to `events`.
+    """
+
+    events: TransactionEvents
+
+    async def aclose(self) -> None: ...
+
+    async def get_account_id_by_name(self, name: str) -> Optional[int]: ...
+    async def create_account(self, account: Dict[str, Any]) -> Optional[Dict[str, Any]]: ...
+    async def get_account_ids_by_names(self, names: List[str]) -> Dict[str, int]: ...
+    async def create_accounts(self, accounts: List[Dict[str, Any]]) -> List[Dict[str, Any]]: ...
+
+    async def upsert_transactions(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]: ...
+    async def list_transactions(
+        self,
+        filters: TransactionFilterParams,
+        limit: int,
+        offset: int = 0,
+        cursor: Optional[TransactionCursor] = None,
+        columns: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]: ...
+    async def search_transactions(
+        self,
+        query: str,
+        filters: TransactionFilterParams,
+        limit: int,
+        offset: int = 0,
+        columns: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]: ...
+    async def update_transaction(self, transaction_id: int, values: Dict[str, Any]) -> Optional[Dict[str, Any]]: ...
+    async def update_transactions(self, transaction_ids: List[int], values: Dict[str, Any]) -> List[Dict[str, Any]]: ...
+    async def update_matching_transactions(
+        self, filters: TransactionFilterParams, values: Dict[str, Any]
+    ) -> List[Dict[str, Any]]: ...
+
+    async def list_categories(self) -> List[Dict[str, Any]]: ...
+    async def list_rollups(
+        self,
+        account_id: Optional[int] = None,
+        start_month: Optional[date] = None,
+        end_month: Optional[date] = None,
+    ) -> List[Dict[str, Any]]: ...
+
+    async def list_rules(self) -> List[Dict[str, Any]]: ...
+    async def create_rule(self, rule: Dict[str, Any]) -> Optional[Dict[str, Any]]: ...
+    async def delete_rule(self, rule_id: int) -> bool: ...
+
+    async def list_budgets(self) -> List[Dict[str, Any]]: ...
+    async def create_budget(self, budget: Dict[str, Any]) -> Optional[Dict[str, Any]]: ...
+    async def update_budget(self, budget_id: int, values: Dict[str, Any]) -> Optional[Dict[str, Any]]: ...
+    async def delete_budget(self, budget_id: int) -> bool: ...
+    async def list_goals(self) -> List[Dict[str, Any]]: ...
+    async def create_goal(self, goal: Dict[str, Any]) -> Optional[Dict[str, Any]]: ...
+    async def update_goal(self, goal_id: int, values: Dict[str, Any]) -> Optional[Dict[str, Any]]: ...
+    async def delete_goal(self, goal_id: int) -> bool: ...
+
+    async def get_imported_file(self, sha256: str) -> Optional[Dict[str, Any]]: ...
+    async def record_imported_file(self, row: Dict[str, Any]) -> None: ...
+    async def list_statement_ranges(self, account_ids: List[int]) -> List[Dict[str, Any]]: ...
+    async def add_statement_ranges(self, ranges: List[Dict[str, Any]]) -> None: ...
+
+
+class SupabaseRepository:
+    """Async data access for the accounts, transactions and categories tables.
+
+    All queries go through one pooled HTTP client and a semaphore that caps how many
+    requests this worker has in flight, so a large import cannot starve other requests.
+    """
+
+    def __init__(
+        self,
+        client: "AsyncPostgrestClient",
+        max_concurrency: int = MAX_CONCURRENT_REQUESTS,
+        events: TransactionEvents = transaction_events,
+    ):
+        self.client = client
+        self.events = events # Notified of every transaction write
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _execute(self, query) -> List[Dict[str, Any]]:
+        async with self._semaphore:
+            response = await query.execute()
+        return response.data or []
+
+    async def aclose(self) -> None:
+        """Closes the underlying HTTP connections."""
+        await self.client.aclose()
+
+    # --- Accounts ---
+
+    async def get_account_id_by_name(self, name: str) -> Optional[int]:
+        rows = await self._execute(self.client.table("accounts").select("id").eq("name", name).limit(1))
+        return rows[0]['id'] if rows else None
+
+    async def create_account(self, account: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        rows = await self._execute(self.client.table("accounts").insert(account))
+        return rows[0] if rows else None
+
+    async def get_account_ids_by_names(self, names: List[str]) -> Dict[str, int]:
+        """Looks up many accounts at once. Names without an account are left out."""
+        ids: Dict[str, int] = {}
+        for start in range(0, len(names), ACCOUNT_LOOKUP_CHUNK_SIZE):
+            chunk = names[start:start + ACCOUNT_LOOKUP_CHUNK_SIZE]
+            rows = await self._execute(self.client.table("accounts").select("id,name").in_("name", chunk))
+            for row in rows:
+                ids.setdefault(row['name'], row['id'])
+        return ids
+
+    async def create_accounts(self, accounts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Creates several accounts in one request, returning the created rows."""
+        if not accounts:
+            return []
+        return await self._execute(self.client.table("accounts").insert(accounts))
+
+    # --- Transactions ---
+
+    async def upsert_transactions(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Inserts rows, ignoring any that conflict on (account_id, fitid). Returns the inserted rows.
+
+        Rows without a fitid are matched on (account_id, fingerprint) instead, in a
+        second request when a batch mixes both kinds.
+        """
+        with_fitid = [row for row in rows if row.get('fitid')]
+        without_fitid = [row for row in rows if not row.get('fitid')]
+        inserted: List[Dict[str, Any]] = []
+        for group, conflict_columns in ((with_fitid, TRANSACTION_CONFLICT_COLUMNS), (without_fitid, FINGERPRINT_CONFLICT_COLUMNS)):
+            if group:
+                query = self.client.table("transactions")\
+                                   .upsert(group, on_conflict=conflict_columns, ignore_duplicates=True)
+                inserted += await self._execute(query)
+        self.events.publish("inserted", inserted)
+        return inserted
+
+    async def list_transactions(
+        self,
+        filters: TransactionFilterParams,
+        limit: int,
+        offset: int = 0,
+        cursor: Optional[TransactionCursor] = None,
+        columns: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Returns one page of transactions, newest first.
+
+        Pass `cursor` (the (date, id) of the last row already seen) for keyset pagination,
+        which uses the (date, id) index instead of skipping `offset` rows. `columns`
+        limits which fields are returned.
+        """
+        query = self.client.table("transactions").select(",".join(columns) if columns else "*")
+        query = self._apply_filters(query, filters)
+
+        if cursor is not None:
+            cursor_date, cursor_id = cursor
+            # Rows strictly after the cursor in (date DESC, id DESC) order. The redundant
+            # date <= cursor bound lets the planner start the index scan at the cursor.
+            query = query.lte('date', cursor_date.isoformat())
+            query = query.or_(f"date.lt.{cursor_date.isoformat()},and(date.eq.{cursor_date.isoformat()},id.lt.{cursor_id})")
+            query = query.limit(limit)
+        else:
+            query = query.range(offset, offset + limit - 1) # Supabase range is inclusive
+        query = query.order('date', desc=True).order('id', desc=True)
+        return await self._execute(query)
+
+    async def search_transactions(
+        self,
+        query: str,
+        filters: TransactionFilterParams,
+        limit: int,
+        offset: int = 0,
+        columns: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Returns one page of transactions whose description or notes match `query`, most relevant first.
+
+        Runs the search_transactions() function (see migrations/0007_transaction_search.sql),
+        which matches whole words with full-text search and word fragments with trigrams.
+        """
+        params = {
+            'search_query': query,
+            'filter_start_date': filters.start_date.isoformat() if filters.start_date else None,
+            'filter_end_date': filters.end_date.isoformat() if filters.end_date else None,
+            'filter_account_id': filters.account_id,
+            'filter_category_id': filters.category_id,
+            'filter_reconciled': filters.reconciled,
+            'filter_tags': filters.tags or None,
+            'result_limit': limit,
+            'result_offset': offset,
+        }
+        request = self.client.rpc("search_transactions", params)
+        if columns:
+            request = request.select(",".join(columns))
+        return await self._execute(request)
+
+    async def update_transaction(self, transaction_id: int, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Updates a transaction, returning the updated row or None if it does not exist."""
+        rows = await self._execute(self.client.table("transactions").update(values).eq('id', transaction_id))
+        self.events.publish("updated", rows)
+        return rows[0] if rows else None
+
+    async def update_transactions(self, transaction_ids: List[int], values: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Applies the same update to several transactions in one statement. Returns the updated rows."""
+        query = self.client.table("transactions").update(values).in_('id', transaction_ids)
+        rows = await self._execute(query)
+        self.events.publish("updated", rows)
+        return rows
+
+    async def update_matching_transactions(
+        self, filters: TransactionFilterParams, values: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """Updates every transaction matching `filters` in one statement. Returns the updated rows."""
+        query = self._apply_filters(self.client.table("transactions").update(values), filters)
+        rows = await self._execute(query)
+        self.events.publish("updated", rows)
+        return rows
+
+    @staticmethod
+    def _apply_filters(query, filters: TransactionFilterParams):
+        if filters.start_date:
+            query = query.gte('date', filters.start_date.isoformat())
+        if filters.end_date:
+            query = query.lte('date', filters.end_date.isoformat())
+        if filters.account_id is not None:
+            query = query.eq('account_id', filters.account_id)
+        if filters.category_id is not None:
+            query = query.eq('category_id', filters.category_id)
+        if filters.reconciled is not None:
+            query = query.eq('reconciled', filters.reconciled)
+        if filters.tags:
+            query = query.filter('tags', 'cs', _array_literal(filters.tags))
+        return query
+
+    # --- Categories ---
+
+    async def list_categories(self) -> List[Dict[str, Any]]:
+        return await self._execute(self.client.table("categories").select("*").order("name"))
+
+    # --- Dashboard rollups ---
+
+    async def list_rollups(
+        self,
+        account_id: Optional[int] = None,
+        start_month: Optional[date] = None,
+        end_month: Optional[date] = None,
+    ) -> List[Dict[str, Any]]:
+        """Returns (account, category, month) totals, maintained by triggers on transactions
+        (see migrations/0004_transaction_rollups.sql)."""
+        rows: List[Dict[str, Any]] = []
+        while True: # Page through, as Supabase caps each response at 1000 rows
+            query = self.client.table("transaction_rollups").select("*")
+            if account_id is not None:
+                query = query.eq('account_id', account_id)
+            if start_month:
+                query = query.gte('month', start_month.isoformat())
+            if end_month:
+                query = query.lte('month', end_month.isoformat())
+            query = query.order('month').order('account_id').order('category_id')
+            page = await self._execute(query.range(len(rows), len(rows) + ROLLUP_PAGE_SIZE - 1))
+            rows.extend(page)
+            if len(page) < ROLLUP_PAGE_SIZE:
+                return rows
+
+    # --- Categorization rules ---
+
+    async def list_rules(self) -> List[Dict[str, Any]]:
+        return await self._execute(self.client.table("categorization_rules").select("*").order("id"))
+
+    async def create_rule(self, rule: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        rows = await self._execute(self.client.table("categorization_rules").insert(rule))
+        return rows[0] if rows else None
+
+    async def delete_rule(self, rule_id: int) -> bool:
+        """Deletes a rule, returning False if it does not exist."""
+        rows = await self._execute(self.client.table("categorization_rules").delete().eq('id', rule_id))
+        return bool(rows)
+
+    # --- Budgets and goals ---
+
+    async def list_budgets(self) -> List[Dict[str, Any]]:
+        return await self._execute(self.client.table("budgets").select("*").order("id"))
+
+    async def create_budget(self, budget: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        rows = await self._execute(self.client.table("budgets").insert(budget))
+        return rows[0] if rows else None
+
+    async def update_budget(self, budget_id: int, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Updates a budget, returning the updated row or None if it does not exist."""
+        rows = await self._execute(self.client.table("budgets").update(values).eq('id', budget_id))
+        return rows[0] if rows else None
+
+    async def delete_budget(self, budget_id: int) -> bool:
+        """Deletes a budget, returning False if it does not exist."""
+        rows = await self._execute(self.client.table("budgets").delete().eq('id', budget_id))
+        return bool(rows)
+
+    async def list_goals(self) -> List[Dict[str, Any]]:
+        return await self._execute(self.client.table("goals").select("*").order("id"))
+
+    async def create_goal(self, goal: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        rows = await self._execute(self.client.table("goals").insert(goal))
+        return rows[0] if rows else None
+
+    async def update_goal(self, goal_id: int, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Updates a goal, returning the updated row or None if it does not exist."""
+        rows = await self._execute(self.client.table("goals").update(values).eq('id', goal_id))
+        return rows[0] if rows else None
+
+    async def delete_goal(self, goal_id: int) -> bool:
+        """Deletes a goal, returning False if it does not exist."""
+        rows = await self._execute(self.client.table("goals").delete().eq('id', goal_id))
+        return bool(rows)
+
+    # --- Import ledger ---
+
+    async def get_imported_file(self, sha256: str) -> Optional[Dict[str, Any]]:
+        rows = await self._execute(self.client.table("imported_files").select("*").eq("sha256", sha256).limit(1))
+        return rows[0] if rows else None
+
+    async def record_imported_file(self, row: Dict[str, Any]) -> None:
+        await self._execute(
+            self.client.table("imported_files").upsert(row, on_conflict="sha256", ignore_duplicates=True)
+        )
+
+    async def list_statement_ranges(self, account_ids: List[int]) -> List[Dict[str, Any]]:
+        if not account_ids:
+            return []
+        return await self._execute(
+            self.client.table("imported_statement_ranges")
+            .select("account_id,start_date,end_date")
+            .in_("account_id", account_ids)
+        )
+
+    async def add_statement_ranges(self, ranges: List[Dict[str, Any]]) -> None:
+        if ranges:
+            await self._execute(self.client.table("imported_statement_ranges").insert(ranges))
+
+
+_repository: Optional[Repository] = None
+
+
+def create_repository(backend: str = STORAGE_BACKEND) -> Repository:
+    """Creates the repository for a STORAGE_BACKEND value."""
+    if backend == "sqlite":
+        from core.sqlite_repository import SQLiteRepository
+        return SQLiteRepository()
+    if backend == "supabase":
+        from core.supabase_client import create_async_postgrest_client
+        return SupabaseRepository(create_async_postgrest_client())
+    raise ValueError(f"Unknown STORAGE_BACKEND {backend!r}; expected 'supabase' or 'sqlite'")
+
+
+def get_repository() -> Repository:
+    """FastAPI dependency returning the shared repository (created on first use)."""
+    global _repository
+    if _repository is None:
+        _repository = create_repository()
+    return _repository
+
+
+async def close_repository() -> None:
+    """Releases the shared repository's connections (called on application shutdown)."""
+    global _repository
+    if _repository is not None:
+        await _repository.aclose()
+        _repository = None
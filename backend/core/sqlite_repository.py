@@ -0,0 +1,594 @@
+import asyncio
+import heapq
+import json
+import os
+import re
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+from decimal import ROUND_HALF_UP, Decimal
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, TypeVar, Union
+
+from models.financials import TransactionFilterParams
+from core.pagination import TransactionCursor
+from core.events import TransactionEvents, transaction_events
+
+# Database file used when STORAGE_BACKEND=sqlite
+SQLITE_PATH = Path(os.environ.get("SQLITE_PATH", Path(__file__).resolve().parent.parent / "data" / "reckless_spender.sqlite3"))
+
+# Bumped when SCHEMA changes; stored in PRAGMA user_version
+SCHEMA_VERSION = 1
+
+# The tables of migrations/0001-0008 in SQLite terms. Dates are ISO text, tags a JSON
+# array, booleans 0/1, and money is integer cents, so sums stay exact as with
+# DECIMAL(10,2). Rollups and the search index are kept up to date by triggers, like the
+# Postgres ones. A new database starts with the default categories.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS accounts (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    type TEXT CHECK (type IN ('checking', 'savings', 'credit'))
+);
+
+CREATE TABLE IF NOT EXISTS categories (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    is_custom INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS categories_name_idx ON categories (name);
+
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY,
+    account_id INTEGER,
+    date TEXT NOT NULL,
+    description TEXT,
+    amount INTEGER NOT NULL,
+    category_id INTEGER,
+    reconciled INTEGER NOT NULL DEFAULT 0,
+    tags TEXT,
+    notes TEXT,
+    fitid TEXT,
+    fingerprint TEXT,
+    transaction_type TEXT
+);
+-- Keyset pagination, per account and across accounts (scanned backwards for DESC)
+CREATE INDEX IF NOT EXISTS transactions_account_date_id_idx ON transactions (account_id, date, id);
+CREATE INDEX IF NOT EXISTS transactions_date_id_idx ON transactions (date, id);
+-- Import deduplication; NULLs never conflict
+CREATE UNIQUE INDEX IF NOT EXISTS transactions_account_id_fitid_key ON transactions (account_id, fitid);
+CREATE UNIQUE INDEX IF NOT EXISTS transactions_account_id_fingerprint_key ON transactions (account_id, fingerprint);
+
+CREATE TABLE IF NOT EXISTS transaction_rollups (
+    account_id INTEGER NOT NULL,
+    category_id INTEGER,
+    month TEXT NOT NULL,
+    income INTEGER NOT NULL DEFAULT 0,
+    spending INTEGER NOT NULL DEFAULT 0,
+    transaction_count INTEGER NOT NULL DEFAULT 0,
+    unreconciled_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE UNIQUE INDEX IF NOT EXISTS transaction_rollups_key
+    ON transaction_rollups (account_id, ifnull(category_id, -1), month);
+CREATE INDEX IF NOT EXISTS transaction_rollups_month_idx ON transaction_rollups (month);
+
+CREATE TRIGGER IF NOT EXISTS transactions_rollup_insert AFTER INSERT ON transactions
+WHEN NEW.account_id IS NOT NULL BEGIN
+    INSERT INTO transaction_rollups (account_id, category_id, month, income, spending, transaction_count, unreconciled_count)
+    VALUES (NEW.account_id, NEW.category_id, substr(NEW.date, 1, 8) || '01',
+            max(NEW.amount, 0), max(-NEW.amount, 0), 1, NOT NEW.reconciled)
+    ON CONFLICT (account_id, ifnull(category_id, -1), month) DO UPDATE SET
+        income = income + excluded.income,
+        spending = spending + excluded.spending,
+        transaction_count = transaction_count + 1,
+        unreconciled_count = unreconciled_count + excluded.unreconciled_count;
+END;
+
+CREATE TRIGGER IF NOT EXISTS transactions_rollup_delete AFTER DELETE ON transactions
+WHEN OLD.account_id IS NOT NULL BEGIN
+    UPDATE transaction_rollups SET
+        income = income - max(OLD.amount, 0),
+        spending = spending - max(-OLD.amount, 0),
+        transaction_count = transaction_count - 1,
+        unreconciled_count = unreconciled_count - (NOT OLD.reconciled)
+    WHERE account_id = OLD.account_id AND ifnull(category_id, -1) = ifnull(OLD.category_id, -1)
+      AND month = substr(OLD.date, 1, 8) || '01';
+    DELETE FROM transaction_rollups WHERE transaction_count = 0;
+END;
+
+-- Only updates of rolled-up columns move totals
+CREATE TRIGGER IF NOT EXISTS transactions_rollup_update
+AFTER UPDATE OF account_id, date, amount, category_id, reconciled ON transactions BEGIN
+    UPDATE transaction_rollups SET
+        income = income - max(OLD.amount, 0),
+        spending = spending - max(-OLD.amount, 0),
+        transaction_count = transaction_count - 1,
+        unreconciled_count = unreconciled_count - (NOT OLD.reconciled)
+    WHERE OLD.account_id IS NOT NULL AND account_id = OLD.account_id
+      AND ifnull(category_id, -1) = ifnull(OLD.category_id, -1) AND month = substr(OLD.date, 1, 8) || '01';
+    INSERT INTO transaction_rollups (account_id, category_id, month, income, spending, transaction_count, unreconciled_count)
+    SELECT NEW.account_id, NEW.category_id, substr(NEW.date, 1, 8) || '01',
+           max(NEW.amount, 0), max(-NEW.amount, 0), 1, NOT NEW.reconciled
+    WHERE NEW.account_id IS NOT NULL
+    ON CONFLICT (account_id, ifnull(category_id, -1), month) DO UPDATE SET
+        income = income + excluded.income,
+        spending = spending + excluded.spending,
+        transaction_count = transaction_count + 1,
+        unreconciled_count = unreconciled_count + excluded.unreconciled_count;
+    DELETE FROM transaction_rollups WHERE transaction_count = 0;
+END;
+
+-- Words of description and notes, for search_transactions (rowid = transaction id)
+CREATE VIRTUAL TABLE IF NOT EXISTS transaction_search USING fts5 (
+    description, notes, content='transactions', content_rowid='id', tokenize='unicode61'
+);
+
+CREATE TRIGGER IF NOT EXISTS transactions_search_insert AFTER INSERT ON transactions BEGIN
+    INSERT INTO transaction_search (rowid, description, notes) VALUES (NEW.id, NEW.description, NEW.notes);
+END;
+
+CREATE TRIGGER IF NOT EXISTS transactions_search_delete AFTER DELETE ON transactions BEGIN
+    INSERT INTO transaction_search (transaction_search, rowid, description, notes)
+    VALUES ('delete', OLD.id, OLD.description, OLD.notes);
+END;
+
+CREATE TRIGGER IF NOT EXISTS transactions_search_update AFTER UPDATE OF description, notes ON transactions BEGIN
+    INSERT INTO transaction_search (transaction_search, rowid, description, notes)
+    VALUES ('delete', OLD.id, OLD.description, OLD.notes);
+    INSERT INTO transaction_search (rowid, description, notes) VALUES (NEW.id, NEW.description, NEW.notes);
+END;
+
+CREATE TABLE IF NOT EXISTS categorization_rules (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    match_type TEXT NOT NULL DEFAULT 'substring' CHECK (match_type IN ('substring', 'regex')),
+    pattern TEXT,
+    min_amount INTEGER,
+    max_amount INTEGER,
+    account_id INTEGER,
+    category_id INTEGER NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    enabled INTEGER NOT NULL DEFAULT 1
+);
+
+CREATE TABLE IF NOT EXISTS budgets (
+    id INTEGER PRIMARY KEY,
+    category_id INTEGER NOT NULL,
+    amount INTEGER NOT NULL CHECK (amount > 0),
+    period TEXT NOT NULL DEFAULT 'monthly' CHECK (period IN ('monthly', 'yearly')),
+    UNIQUE (category_id, period)
+);
+
+CREATE TABLE IF NOT EXISTS goals (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    target_amount INTEGER NOT NULL CHECK (target_amount > 0),
+    current_amount INTEGER NOT NULL DEFAULT 0,
+    deadline TEXT,
+    account_id INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS imported_files (
+    sha256 TEXT PRIMARY KEY,
+    format TEXT NOT NULL,
+    transaction_count INTEGER NOT NULL DEFAULT 0,
+    imported_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS imported_statement_ranges (
+    id INTEGER PRIMARY KEY,
+    account_id INTEGER NOT NULL,
+    start_date TEXT NOT NULL,
+    end_date TEXT NOT NULL CHECK (end_date > start_date),
+    imported_at TEXT
+);
+CREATE INDEX IF NOT EXISTS imported_statement_ranges_account_idx
+    ON imported_statement_ranges (account_id, start_date);
+"""
+
+# Categories a new database starts with (custom ones are added by the user)
+DEFAULT_CATEGORIES = (
+    "Groceries", "Dining", "Utilities", "Rent", "Transport", "Shopping", "Entertainment",
+    "Health", "Travel", "Income", "Transfers", "Other",
+)
+
+TRANSACTION_COLUMNS = (
+    'id', 'account_id', 'date', 'description', 'amount', 'category_id', 'reconciled',
+    'tags', 'notes', 'fitid', 'fingerprint', 'transaction_type',
+)
+
+# Columns stored as 0/1, JSON text or cents, converted back on the way out
+BOOLEAN_COLUMNS = frozenset({'reconciled', 'is_custom', 'enabled'})
+JSON_COLUMNS = frozenset({'tags'})
+MONEY_COLUMNS = frozenset({'amount', 'min_amount', 'max_amount', 'target_amount', 'current_amount', 'income', 'spending'})
+
+_WORD_RE = re.compile(r"\w+")
+
+T = TypeVar("T")
+
+
+def _words(text: Optional[str]) -> Set[str]:
+    return set(_WORD_RE.findall(text.lower())) if text else set()
+
+
+def _encode(column: str, value: Any) -> Any:
+    if value is None:
+        return None
+    if column in JSON_COLUMNS:
+        return json.dumps(list(value))
+    if column in BOOLEAN_COLUMNS:
+        return int(bool(value))
+    if column in MONEY_COLUMNS:
+        return int((Decimal(str(value)) * 100).quantize(Decimal(1), ROUND_HALF_UP))
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _decode(row: sqlite3.Row) -> Dict[str, Any]:
+    decoded = dict(row)
+    for column, value in decoded.items():
+        if value is None:
+            continue
+        if column in BOOLEAN_COLUMNS:
+            decoded[column] = bool(value)
+        elif column in JSON_COLUMNS:
+            decoded[column] = json.loads(value)
+        elif column in MONEY_COLUMNS:
+            decoded[column] = value / 100 # A JSON number, as PostgREST returns numerics
+    return decoded
+
+
+class SQLiteRepository:
+    """SupabaseRepository's interface over an embedded SQLite database file.
+
+    For single-user deployments, tests and offline benchmarks: queries run in-process
+    against indexes on (account_id, date, id) and (date, id) for paging, unique indexes
+    on (account_id, fitid) and (account_id, fingerprint) for import deduplication, and
+    an FTS5 index for search. Triggers maintain the rollups as migration 0004 does.
+    Rows come back shaped like PostgREST's JSON, and transaction writes are published
+    to `events`. A new database is seeded with `categories`, or DEFAULT_CATEGORIES if
+    none are given; categories given for an existing database are added if missing.
+
+    The database runs in WAL mode, so other processes can read while this one writes.
+    Statements run one at a time on a dedicated thread, keeping a large import or bulk
+    update from blocking the event loop.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path] = SQLITE_PATH,
+        events: TransactionEvents = transaction_events,
+        categories: Optional[List[Dict[str, Any]]] = None,
+    ):
+        self.path = str(path)
+        self.events = events # Notified of every transaction write
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL") # Durable across app crashes; WAL makes this safe
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            self._conn.executescript(SCHEMA + f"PRAGMA user_version={SCHEMA_VERSION};")
+            if categories is None:
+                categories = [{'name': name} for name in DEFAULT_CATEGORIES]
+        if categories:
+            with self._transaction():
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO categories (id, name, is_custom) VALUES (?, ?, ?)",
+                    [(c.get('id'), c['name'], int(bool(c.get('is_custom')))) for c in categories],
+                )
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+
+    async def _run(self, function: Callable[..., T], *args: Any) -> T:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        """BEGIN ... COMMIT around a block (ROLLBACK on error); statements outside one autocommit."""
+        self._conn.execute("BEGIN")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def _query(self, sql: str, params: Iterable[Any] = ()) -> List[Dict[str, Any]]:
+        return [_decode(row) for row in self._conn.execute(sql, tuple(params))]
+
+    async def aclose(self) -> None:
+        """Waits for running statements, then closes the database."""
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+        self._conn.close()
+
+    # --- Generic table access ---
+
+    def _insert(self, table: str, row: Dict[str, Any], ignore: bool = False) -> Optional[Dict[str, Any]]:
+        columns = list(row)
+        sql = (
+            f"INSERT {'OR IGNORE ' if ignore else ''}INTO {table} ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' * len(columns))}) RETURNING *"
+        )
+        rows = self._query(sql, (_encode(column, row[column]) for column in columns))
+        return rows[0] if rows else None
+
+    def _update(self, table: str, where: str, params: List[Any], values: Dict[str, Any]) -> List[Dict[str, Any]]:
+        if not values:
+            return self._query(f"SELECT * FROM {table} WHERE {where}", params)
+        assignments = ", ".join(f"{column} = ?" for column in values)
+        return self._query(
+            f"UPDATE {table} SET {assignments} WHERE {where} RETURNING *",
+            [*(_encode(column, value) for column, value in values.items()), *params],
+        )
+
+    def _delete(self, table: str, row_id: int) -> bool:
+        return self._conn.execute(f"DELETE FROM {table} WHERE id = ?", (row_id,)).rowcount > 0
+
+    async def _insert_one(self, table: str, row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return await self._run(self._insert, table, row)
+
+    async def _update_one(self, table: str, row_id: int, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        rows = await self._run(self._update, table, "id = ?", [row_id], values)
+        return rows[0] if rows else None
+
+    # --- Accounts ---
+
+    async def get_account_id_by_name(self, name: str) -> Optional[int]:
+        rows = await self._run(self._query, "SELECT id FROM accounts WHERE name = ?", (name,))
+        return rows[0]['id'] if rows else None
+
+    async def create_account(self, account: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return await self._insert_one("accounts", account)
+
+    async def get_account_ids_by_names(self, names: List[str]) -> Dict[str, int]:
+        """Looks up many accounts at once. Names without an account are left out."""
+        rows = await self._run(
+            self._query, "SELECT id, name FROM accounts WHERE name IN (SELECT value FROM json_each(?))", (json.dumps(names),),
+        )
+        return {row['name']: row['id'] for row in rows}
+
+    async def create_accounts(self, accounts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Creates several accounts in one transaction, returning the created rows."""
+        if not accounts:
+            return []
+
+        def insert() -> List[Dict[str, Any]]:
+            with self._transaction():
+                return [self._insert("accounts", account) for account in accounts]
+        return await self._run(insert)
+
+    # --- Transactions ---
+
+    async def upsert_transactions(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Inserts rows, ignoring any that conflict on (account_id, fitid) or, without a
+        fitid, (account_id, fingerprint). Returns the inserted rows."""
+        def insert() -> List[Dict[str, Any]]:
+            with self._transaction():
+                inserted = (self._insert("transactions", row, ignore=True) for row in rows)
+                return [row for row in inserted if row is not None]
+        inserted = await self._run(insert) if rows else []
+        self.events.publish("inserted", inserted)
+        return inserted
+
+    @staticmethod
+    def _where(filters: TransactionFilterParams, prefix: str = "") -> Tuple[List[str], List[Any]]:
+        clauses: List[str] = []
+        params: List[Any] = []
+        if filters.start_date:
+            clauses.append(f"{prefix}date >= ?")
+            params.append(filters.start_date.isoformat())
+        if filters.end_date:
+            clauses.append(f"{prefix}date <= ?")
+            params.append(filters.end_date.isoformat())
+        if filters.account_id is not None:
+            clauses.append(f"{prefix}account_id = ?")
+            params.append(filters.account_id)
+        if filters.category_id is not None:
+            clauses.append(f"{prefix}category_id = ?")
+            params.append(filters.category_id)
+        if filters.reconciled is not None:
+            clauses.append(f"{prefix}reconciled = ?")
+            params.append(int(filters.reconciled))
+        for tag in filters.tags or ():
+            clauses.append(f"EXISTS (SELECT 1 FROM json_each({prefix}tags) WHERE value = ?)")
+            params.append(tag)
+        return clauses, params
+
+    @staticmethod
+    def _select_list(columns: Optional[List[str]], prefix: str = "") -> str:
+        if not columns:
+            return f"{prefix}*"
+        unknown = set(columns) - set(TRANSACTION_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown transaction columns: {', '.join(sorted(unknown))}")
+        return ", ".join(prefix + column for column in columns)
+
+    async def list_transactions(
+        self,
+        filters: TransactionFilterParams,
+        limit: int,
+        offset: int = 0,
+        cursor: Optional[TransactionCursor] = None,
+        columns: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Returns one page of transactions, newest first (see SupabaseRepository.list_transactions)."""
+        clauses, params = self._where(filters)
+        if cursor is not None:
+            clauses.append("(date, id) < (?, ?)") # Row-value comparison; seeks the index to the cursor
+            params += [cursor[0].isoformat(), cursor[1]]
+            offset = 0
+        sql = f"SELECT {self._select_list(columns)} FROM transactions"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY date DESC, id DESC LIMIT ? OFFSET ?"
+        return await self._run(self._query, sql, [*params, limit, offset])
+
+    async def search_transactions(
+        self,
+        query: str,
+        filters: TransactionFilterParams,
+        limit: int,
+        offset: int = 0,
+        columns: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Transactions whose description or notes contain every word of `query` (or a word
+        starting with it), ranked by whole-word matches and then newest first."""
+        terms = _words(query)
+        if not terms:
+            return []
+        match = " AND ".join('"' + term.replace('"', '""') + '"*' for term in sorted(terms))
+        clauses, params = self._where(filters, prefix="t.")
+
+        def search() -> List[Dict[str, Any]]:
+            candidates = self._conn.execute(
+                "SELECT t.id, t.date, t.description, t.notes FROM transaction_search s JOIN transactions t ON t.id = s.rowid "
+                "WHERE transaction_search MATCH ?" + "".join(" AND " + clause for clause in clauses),
+                [match, *params],
+            )
+            ranked = heapq.nlargest(offset + limit, (
+                (len(terms & (_words(description) | _words(notes))), day, transaction_id)
+                for transaction_id, day, description, notes in candidates
+            ))
+            ids = [transaction_id for _, _, transaction_id in ranked[offset:offset + limit]]
+            if not ids:
+                return []
+            rows = {
+                row['id']: row for row in self._query(
+                    f"SELECT {self._select_list(sorted(set(columns) | {'id'}) if columns else None)} FROM transactions "
+                    "WHERE id IN (SELECT value FROM json_each(?))",
+                    (json.dumps(ids),),
+                )
+            }
+            page = [rows[transaction_id] for transaction_id in ids]
+            if columns:
+                return [{column: row[column] for column in columns} for row in page]
+            return page
+        return await self._run(search)
+
+    async def update_transaction(self, transaction_id: int, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Updates a transaction, returning the updated row or None if it does not exist."""
+        rows = await self._run(self._update, "transactions", "id = ?", [transaction_id], values)
+        self.events.publish("updated", rows)
+        return rows[0] if rows else None
+
+    async def update_transactions(self, transaction_ids: List[int], values: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Applies the same update to several transactions in one statement. Returns the updated rows."""
+        rows = await self._run(
+            self._update, "transactions", "id IN (SELECT value FROM json_each(?))", [json.dumps(transaction_ids)], values,
+        )
+        self.events.publish("updated", rows)
+        return rows
+
+    async def update_matching_transactions(
+        self, filters: TransactionFilterParams, values: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """Updates every transaction matching `filters` in one statement. Returns the updated rows."""
+        clauses, params = self._where(filters)
+        rows = await self._run(self._update, "transactions", " AND ".join(clauses) or "1", params, values)
+        self.events.publish("updated", rows)
+        return rows
+
+    # --- Categories ---
+
+    async def list_categories(self) -> List[Dict[str, Any]]:
+        return await self._run(self._query, "SELECT * FROM categories ORDER BY name")
+
+    # --- Dashboard rollups ---
+
+    async def list_rollups(
+        self,
+        account_id: Optional[int] = None,
+        start_month: Optional[date] = None,
+        end_month: Optional[date] = None,
+    ) -> List[Dict[str, Any]]:
+        """Returns (account, category, month) totals, maintained by triggers on transactions."""
+        clauses, params = [], []
+        if account_id is not None:
+            clauses.append("account_id = ?")
+            params.append(account_id)
+        if start_month:
+            clauses.append("month >= ?")
+            params.append(start_month.isoformat())
+        if end_month:
+            clauses.append("month <= ?")
+            params.append(end_month.isoformat())
+        sql = "SELECT * FROM transaction_rollups"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY month, account_id, category_id IS NULL, category_id"
+        return await self._run(self._query, sql, params)
+
+    # --- Categorization rules ---
+
+    async def list_rules(self) -> List[Dict[str, Any]]:
+        return await self._run(self._query, "SELECT * FROM categorization_rules ORDER BY id")
+
+    async def create_rule(self, rule: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return await self._insert_one("categorization_rules", rule)
+
+    async def delete_rule(self, rule_id: int) -> bool:
+        """Deletes a rule, returning False if it does not exist."""
+        return await self._run(self._delete, "categorization_rules", rule_id)
+
+    # --- Budgets and goals ---
+
+    async def list_budgets(self) -> List[Dict[str, Any]]:
+        return await self._run(self._query, "SELECT * FROM budgets ORDER BY id")
+
+    async def create_budget(self, budget: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return await self._insert_one("budgets", budget)
+
+    async def update_budget(self, budget_id: int, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Updates a budget, returning the updated row or None if it does not exist."""
+        return await self._update_one("budgets", budget_id, values)
+
+    async def delete_budget(self, budget_id: int) -> bool:
+        """Deletes a budget, returning False if it does not exist."""
+        return await self._run(self._delete, "budgets", budget_id)
+
+    async def list_goals(self) -> List[Dict[str, Any]]:
+        return await self._run(self._query, "SELECT * FROM goals ORDER BY id")
+
+    async def create_goal(self, goal: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return await self._insert_one("goals", goal)
+
+    async def update_goal(self, goal_id: int, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Updates a goal, returning the updated row or None if it does not exist."""
+        return await self._update_one("goals", goal_id, values)
+
+    async def delete_goal(self, goal_id: int) -> bool:
+        """Deletes a goal, returning False if it does not exist."""
+        return await self._run(self._delete, "goals", goal_id)
+
+    # --- Import ledger ---
+
+    async def get_imported_file(self, sha256: str) -> Optional[Dict[str, Any]]:
+        rows = await self._run(self._query, "SELECT * FROM imported_files WHERE sha256 = ?", (sha256,))
+        return rows[0] if rows else None
+
+    async def record_imported_file(self, row: Dict[str, Any]) -> None:
+        await self._run(self._insert, "imported_files", {'imported_at': datetime.now(timezone.utc), **row}, True)
+
+    async def list_statement_ranges(self, account_ids: List[int]) -> List[Dict[str, Any]]:
+        if not account_ids:
+            return []
+        return await self._run(
+            self._query,
+            "SELECT account_id, start_date, end_date FROM imported_statement_ranges "
+            "WHERE account_id IN (SELECT value FROM json_each(?))",
+            (json.dumps(account_ids),),
+        )
+
+    async def add_statement_ranges(self, ranges: List[Dict[str, Any]]) -> None:
+        if not ranges:
+            return
+
+        def insert() -> None:
+            with self._transaction():
+                for row in ranges:
+                    self._insert("imported_statement_ranges", {'imported_at': datetime.now(timezone.utc), **row})
+        await self._run(insert)
@@ -1,27 +1,83 @@
+import logging
 import os
-from supabase import create_client, Client
-from dotenv import load_dotenv
-
-# Load environment variables from .env file
-load_dotenv()
-
-# Get Supabase URL and Key from environment variables
-supabase_url: str = os.environ.get("SUPABASE_URL")
-supabase_key: str = os.environ.get("SUPABASE_KEY")
-
-# Check if environment variables are set
-if not supabase_url or not supabase_key:
-    raise EnvironmentError("SUPABASE_URL and SUPABASE_KEY must be set in the .env file")
-
-# Initialize Supabase client
-try:
-    supabase: Client = create_client(supabase_url, supabase_key)
-    # Removed print statement for production
-    # print("Supabase client initialized successfully.") 
-except Exception as e:
-    print(f"Error initializing Supabase client: {e}") # Print error if initialization fails
-    raise
-
-def get_supabase_client() -> Client:
-    """Returns the initialized Supabase client."""
-    return supabase 
\ No newline at end of file
+from typing import Optional, Tuple
+
+from httpx import AsyncClient, Limits, Timeout
+from postgrest import AsyncPostgrestClient
+from postgrest.constants import DEFAULT_POSTGREST_CLIENT_HEADERS
+
+logger = logging.getLogger(__name__)
+
+# This module is only imported when the first client is needed (see
+# core.repository.get_repository), and credentials are only checked then, so the app
+# starts and serves routes that need no database without them.
+
+# HTTP pool settings for the async client (all overridable via environment variables)
+HTTP_MAX_CONNECTIONS = int(os.environ.get("SUPABASE_HTTP_MAX_CONNECTIONS", 20))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("SUPABASE_HTTP_MAX_KEEPALIVE", 10))
+HTTP_KEEPALIVE_EXPIRY = float(os.environ.get("SUPABASE_HTTP_KEEPALIVE_EXPIRY", 30))
+HTTP_TIMEOUT = float(os.environ.get("SUPABASE_HTTP_TIMEOUT", 10))
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("SUPABASE_HTTP_CONNECT_TIMEOUT", 5))
+
+_supabase = None # Synchronous client, created by the first get_supabase_client() call
+
+
+def get_supabase_credentials() -> Tuple[str, str]:
+    """Returns SUPABASE_URL and SUPABASE_KEY, raising EnvironmentError if either is unset."""
+    supabase_url: Optional[str] = os.environ.get("SUPABASE_URL")
+    supabase_key: Optional[str] = os.environ.get("SUPABASE_KEY")
+    if not supabase_url or not supabase_key:
+        raise EnvironmentError("SUPABASE_URL and SUPABASE_KEY must be set in the .env file")
+    return supabase_url, supabase_key
+
+
+def get_supabase_client():
+    """Returns the (synchronous) Supabase client, creating it on first use."""
+    global _supabase
+    if _supabase is None:
+        from supabase import create_client # Heavy, and only needed by this client
+        supabase_url, supabase_key = get_supabase_credentials()
+        try:
+            _supabase = create_client(supabase_url, supabase_key)
+        except Exception as e:
+            logger.error("Error initializing Supabase client: %s", e)
+            raise
+    return _supabase
+
+
+class PooledPostgrestClient(AsyncPostgrestClient):
+    """Async PostgREST client whose HTTP session uses explicit pool limits and keep-alive."""
+
+    def __init__(self, base_url: str, *, headers: dict, timeout: Timeout, limits: Limits):
+        self._limits = limits
+        super().__init__(base_url, headers=headers, timeout=timeout)
+
+    def create_session(self, base_url, headers, timeout, verify=True) -> AsyncClient:
+        return AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            verify=verify,
+            follow_redirects=True,
+            http2=True,
+            limits=self._limits,
+        )
+
+
+def create_async_postgrest_client() -> PooledPostgrestClient:
+    """Creates an async PostgREST client for the Supabase REST API with a shared connection pool."""
+    supabase_url, supabase_key = get_supabase_credentials()
+    return PooledPostgrestClient(
+        f"{supabase_url}/rest/v1",
+        headers={
+            **DEFAULT_POSTGREST_CLIENT_HEADERS,
+            "apiKey": supabase_key,
+            "Authorization": f"Bearer {supabase_key}",
+        },
+        timeout=Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+        limits=Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+    )
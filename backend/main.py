@@ -1,12 +1,44 @@
+from contextlib import asynccontextmanager
+
+from dotenv import load_dotenv
+
+load_dotenv() # Before any module reads its settings from the environment
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from routes import upload, transactions, categories # Import routers
+from routes import upload, transactions, categories, rules, budgets, goals, dashboard, metrics # Import routers
+from core.logs import configure_logging
+from core.metrics import MetricsMiddleware
+from core.repository import close_repository
+from services.change_feed import get_change_feed, stop_change_feed
+from services.import_jobs import start_import_queue, stop_import_queue
+from services.categorization import stop_rule_jobs
+
+configure_logging()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Start background import workers (and resume jobs left over from a restart).
+    # Database clients are not created here but by the first request that needs one.
+    await start_import_queue()
+    get_change_feed() # Record changes from now on, for clients that connect later
+    try:
+        yield
+    finally:
+        await stop_import_queue()
+        await stop_rule_jobs()
+        stop_change_feed()
+        # Close pooled Supabase connections (or the SQLite database)
+        await close_repository()
+
 
 app = FastAPI(
     title="Reckless Spender API",
     description="Backend API for the Reckless Spender personal finance application",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -16,12 +48,21 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"], # Let the browser read the pagination cursor
 )
 
+# Record request latencies per route for GET /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(upload.router)
 app.include_router(transactions.router)
 app.include_router(categories.router)
+app.include_router(rules.router)
+app.include_router(budgets.router)
+app.include_router(goals.router)
+app.include_router(dashboard.router)
+app.include_router(metrics.router)
 
 @app.get("/")
 async def root():
@@ -0,0 +1,8 @@
+-- Lets imports deduplicate server-side with
+-- INSERT ... ON CONFLICT (account_id, fitid) DO NOTHING
+-- instead of downloading every existing fitid for the account first.
+ALTER TABLE transactions ADD COLUMN IF NOT EXISTS transaction_type TEXT;
+ALTER TABLE transactions ADD COLUMN IF NOT EXISTS fitid TEXT;
+
+CREATE UNIQUE INDEX IF NOT EXISTS transactions_account_id_fitid_key
+    ON transactions (account_id, fitid);
@@ -0,0 +1,7 @@
+-- Supports keyset pagination of GET /transactions, which orders by (date DESC, id DESC)
+-- and optionally filters by account.
+CREATE INDEX IF NOT EXISTS transactions_date_id_idx
+    ON transactions (date DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS transactions_account_date_id_idx
+    ON transactions (account_id, date DESC, id DESC);
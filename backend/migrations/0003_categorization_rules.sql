@@ -0,0 +1,15 @@
+-- User-defined auto-categorization rules (e.g. "Amazon -> Shopping"), applied when
+-- transactions are imported and by POST /rules/apply. Higher priority wins; ties go to
+-- the older rule.
+CREATE TABLE IF NOT EXISTS categorization_rules (
+    id SERIAL PRIMARY KEY,
+    name TEXT,
+    match_type TEXT NOT NULL DEFAULT 'substring' CHECK (match_type IN ('substring', 'regex')),
+    pattern TEXT, -- Matched case-insensitively against the description; NULL matches any
+    min_amount DECIMAL(10,2),
+    max_amount DECIMAL(10,2),
+    account_id INTEGER REFERENCES accounts(id) ON DELETE CASCADE,
+    category_id INTEGER NOT NULL REFERENCES categories(id) ON DELETE CASCADE,
+    priority INTEGER NOT NULL DEFAULT 0,
+    enabled BOOLEAN NOT NULL DEFAULT TRUE
+);
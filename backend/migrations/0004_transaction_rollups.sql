@@ -0,0 +1,104 @@
+-- Per (account, category, month) totals that back the /dashboard endpoints, so dashboard
+-- queries read a few hundred rollup rows instead of scanning transactions.
+--
+-- The rollups are maintained by statement-level triggers on transactions: each import
+-- batch, PUT /transactions/{id}, bulk update or rule re-apply adjusts the affected rollup
+-- rows by the difference between the old and new rows, in the same database transaction.
+-- Requires PostgreSQL 15+ (NULLS NOT DISTINCT), which Supabase provides.
+CREATE TABLE IF NOT EXISTS transaction_rollups (
+    account_id INTEGER NOT NULL,
+    category_id INTEGER, -- NULL for uncategorized transactions
+    month DATE NOT NULL, -- First day of the month
+    income DECIMAL(14,2) NOT NULL DEFAULT 0, -- Sum of positive amounts
+    spending DECIMAL(14,2) NOT NULL DEFAULT 0, -- Sum of negative amounts, as a positive number
+    transaction_count INTEGER NOT NULL DEFAULT 0,
+    unreconciled_count INTEGER NOT NULL DEFAULT 0,
+    CONSTRAINT transaction_rollups_key UNIQUE NULLS NOT DISTINCT (account_id, category_id, month)
+);
+
+CREATE INDEX IF NOT EXISTS transaction_rollups_month_idx ON transaction_rollups (month);
+
+-- Adds the rows in `added` to the rollups and subtracts the rows in `removed`.
+-- Both are JSON arrays of transaction rows; only groups whose totals change are written.
+CREATE OR REPLACE FUNCTION apply_transaction_rollups(added JSONB, removed JSONB) RETURNS VOID
+LANGUAGE sql AS $$
+    WITH deltas AS (
+        SELECT t.account_id, t.category_id, t.date, t.amount, t.reconciled, 1 AS sign
+        FROM jsonb_to_recordset(COALESCE(added, '[]'::jsonb))
+            AS t(account_id INTEGER, category_id INTEGER, date DATE, amount DECIMAL, reconciled BOOLEAN)
+        UNION ALL
+        SELECT t.account_id, t.category_id, t.date, t.amount, t.reconciled, -1 AS sign
+        FROM jsonb_to_recordset(COALESCE(removed, '[]'::jsonb))
+            AS t(account_id INTEGER, category_id INTEGER, date DATE, amount DECIMAL, reconciled BOOLEAN)
+    ), grouped AS (
+        SELECT account_id, category_id, date_trunc('month', date)::date AS month,
+               SUM(sign * GREATEST(amount, 0)) AS income,
+               SUM(sign * GREATEST(-amount, 0)) AS spending,
+               SUM(sign) AS transaction_count,
+               SUM(CASE WHEN COALESCE(reconciled, FALSE) THEN 0 ELSE sign END) AS unreconciled_count
+        FROM deltas
+        WHERE account_id IS NOT NULL
+        GROUP BY 1, 2, 3
+    )
+    INSERT INTO transaction_rollups AS r
+        (account_id, category_id, month, income, spending, transaction_count, unreconciled_count)
+    SELECT account_id, category_id, month, income, spending, transaction_count, unreconciled_count
+    FROM grouped
+    WHERE income <> 0 OR spending <> 0 OR transaction_count <> 0 OR unreconciled_count <> 0
+    ON CONFLICT ON CONSTRAINT transaction_rollups_key DO UPDATE SET
+        income = r.income + EXCLUDED.income,
+        spending = r.spending + EXCLUDED.spending,
+        transaction_count = r.transaction_count + EXCLUDED.transaction_count,
+        unreconciled_count = r.unreconciled_count + EXCLUDED.unreconciled_count;
+$$;
+
+CREATE OR REPLACE FUNCTION transactions_rollup_trigger() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM apply_transaction_rollups((SELECT jsonb_agg(t) FROM new_rows t), NULL);
+    ELSIF TG_OP = 'UPDATE' THEN
+        PERFORM apply_transaction_rollups((SELECT jsonb_agg(t) FROM new_rows t), (SELECT jsonb_agg(t) FROM old_rows t));
+    ELSE
+        PERFORM apply_transaction_rollups(NULL, (SELECT jsonb_agg(t) FROM old_rows t));
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS transactions_rollup_insert ON transactions;
+CREATE TRIGGER transactions_rollup_insert
+    AFTER INSERT ON transactions
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION transactions_rollup_trigger();
+
+-- Transition tables can't be combined with a column list, so every update fires this;
+-- updates that leave the rolled-up columns alone net out to no writes.
+DROP TRIGGER IF EXISTS transactions_rollup_update ON transactions;
+CREATE TRIGGER transactions_rollup_update
+    AFTER UPDATE ON transactions
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION transactions_rollup_trigger();
+
+DROP TRIGGER IF EXISTS transactions_rollup_delete ON transactions;
+CREATE TRIGGER transactions_rollup_delete
+    AFTER DELETE ON transactions
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION transactions_rollup_trigger();
+
+-- Recomputes every rollup from scratch (initial backfill, or repair after manual edits
+-- made with triggers disabled).
+CREATE OR REPLACE FUNCTION rebuild_transaction_rollups() RETURNS VOID
+LANGUAGE sql AS $$
+    DELETE FROM transaction_rollups;
+    INSERT INTO transaction_rollups
+        (account_id, category_id, month, income, spending, transaction_count, unreconciled_count)
+    SELECT account_id, category_id, date_trunc('month', date)::date,
+           SUM(GREATEST(amount, 0)), SUM(GREATEST(-amount, 0)), COUNT(*),
+           COUNT(*) FILTER (WHERE NOT COALESCE(reconciled, FALSE))
+    FROM transactions
+    WHERE account_id IS NOT NULL
+    GROUP BY 1, 2, 3;
+$$;
+
+SELECT rebuild_transaction_rollups();
@@ -0,0 +1,25 @@
+-- Ledger of what has already been imported, so re-uploads can be skipped cheaply.
+--
+-- imported_files: one row per successfully imported file, keyed by the SHA-256 of its
+-- bytes; an identical upload is recognised before it is parsed.
+CREATE TABLE IF NOT EXISTS imported_files (
+    sha256 TEXT PRIMARY KEY,
+    format TEXT NOT NULL,
+    transaction_count INTEGER NOT NULL DEFAULT 0,
+    imported_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- imported_statement_ranges: the <BANKTRANLIST> period of every imported OFX statement,
+-- per account. start_date is inclusive and end_date exclusive: transactions posted on
+-- the statement's last day may not have been on it yet, so that day is never treated
+-- as fully imported.
+CREATE TABLE IF NOT EXISTS imported_statement_ranges (
+    id BIGSERIAL PRIMARY KEY,
+    account_id INTEGER NOT NULL REFERENCES accounts(id) ON DELETE CASCADE,
+    start_date DATE NOT NULL,
+    end_date DATE NOT NULL CHECK (end_date > start_date),
+    imported_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS imported_statement_ranges_account_idx
+    ON imported_statement_ranges (account_id, start_date);
@@ -0,0 +1,13 @@
+-- Fallback deduplication for transactions without a FITID (CSV/QIF exports, and banks
+-- that omit it). Imports fill in `fingerprint`, a hash of (account, date, amount,
+-- normalized description, ordinal among identical transactions in the same import),
+-- and insert such rows with
+-- INSERT ... ON CONFLICT (account_id, fingerprint) DO NOTHING.
+-- Rows that have a FITID keep a NULL fingerprint, so they never conflict here.
+--
+-- Transactions imported before this migration have no fingerprint; re-importing their
+-- statements once adds fingerprinted copies, which GET /transactions/duplicates lists.
+ALTER TABLE transactions ADD COLUMN IF NOT EXISTS fingerprint TEXT;
+
+CREATE UNIQUE INDEX IF NOT EXISTS transactions_account_id_fingerprint_key
+    ON transactions (account_id, fingerprint);
@@ -0,0 +1,59 @@
+-- Search over transaction descriptions and notes for GET /transactions?q=, and tag
+-- filtering for GET /transactions?tags=.
+--
+-- Whole words are matched with full-text search and partial words (typing "ube" for
+-- Uber, or a reference number fragment) with trigrams; both use GIN expression indexes,
+-- so no column is added to the table. Results are ranked by text rank plus trigram
+-- similarity to the description, then newest first.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- The text that is searched; the indexes and search_transactions() must all use it
+CREATE OR REPLACE FUNCTION transaction_search_text(description TEXT, notes TEXT) RETURNS TEXT
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT lower(coalesce(description, '') || ' ' || coalesce(notes, ''));
+$$;
+
+CREATE INDEX IF NOT EXISTS transactions_search_fts_idx
+    ON transactions USING GIN (to_tsvector('simple', transaction_search_text(description, notes)));
+
+CREATE INDEX IF NOT EXISTS transactions_search_trgm_idx
+    ON transactions USING GIN (transaction_search_text(description, notes) gin_trgm_ops);
+
+-- tags @> ARRAY[...] (PostgREST `cs`) for the tag filter
+CREATE INDEX IF NOT EXISTS transactions_tags_idx
+    ON transactions USING GIN (tags);
+
+-- One page of matching transactions, most relevant first. Filter arguments left NULL
+-- do not filter. Called through PostgREST as POST /rpc/search_transactions.
+CREATE OR REPLACE FUNCTION search_transactions(
+    search_query TEXT,
+    filter_start_date DATE DEFAULT NULL,
+    filter_end_date DATE DEFAULT NULL,
+    filter_account_id INTEGER DEFAULT NULL,
+    filter_category_id INTEGER DEFAULT NULL,
+    filter_reconciled BOOLEAN DEFAULT NULL,
+    filter_tags TEXT[] DEFAULT NULL,
+    result_limit INTEGER DEFAULT 100,
+    result_offset INTEGER DEFAULT 0
+) RETURNS SETOF transactions
+LANGUAGE sql STABLE AS $$
+    WITH query AS (
+        SELECT websearch_to_tsquery('simple', search_query) AS words,
+               -- ILIKE pattern with the user's wildcard characters escaped
+               '%' || replace(replace(replace(lower(search_query), '\', '\\'), '%', '\%'), '_', '\_') || '%' AS pattern
+    )
+    SELECT t.*
+    FROM transactions t, query q
+    WHERE (to_tsvector('simple', transaction_search_text(t.description, t.notes)) @@ q.words
+           OR transaction_search_text(t.description, t.notes) ILIKE q.pattern)
+      AND (filter_start_date IS NULL OR t.date >= filter_start_date)
+      AND (filter_end_date IS NULL OR t.date <= filter_end_date)
+      AND (filter_account_id IS NULL OR t.account_id = filter_account_id)
+      AND (filter_category_id IS NULL OR t.category_id = filter_category_id)
+      AND (filter_reconciled IS NULL OR t.reconciled = filter_reconciled)
+      AND (filter_tags IS NULL OR t.tags @> filter_tags)
+    ORDER BY ts_rank(to_tsvector('simple', transaction_search_text(t.description, t.notes)), q.words)
+             + similarity(lower(coalesce(t.description, '')), lower(search_query)) DESC,
+             t.date DESC, t.id DESC
+    LIMIT result_limit OFFSET result_offset;
+$$;
@@ -0,0 +1,24 @@
+-- Spending budgets per category and savings goals, for GET /dashboard/budgets and
+-- GET /dashboard/goals.
+--
+-- A budget limits the net spending (spending minus refunds) of one category over each
+-- calendar month or year. Progress is not stored: the API keeps running totals in
+-- memory and adjusts them as transactions are imported and recategorized.
+CREATE TABLE IF NOT EXISTS budgets (
+    id SERIAL PRIMARY KEY,
+    category_id INTEGER NOT NULL REFERENCES categories(id) ON DELETE CASCADE,
+    amount DECIMAL(10,2) NOT NULL CHECK (amount > 0),
+    period TEXT NOT NULL DEFAULT 'monthly' CHECK (period IN ('monthly', 'yearly')),
+    CONSTRAINT budgets_category_period_key UNIQUE (category_id, period)
+);
+
+-- A savings target. Progress is `current_amount`, or the balance of `account_id` when
+-- the goal is tracked against an account.
+CREATE TABLE IF NOT EXISTS goals (
+    id SERIAL PRIMARY KEY,
+    name TEXT NOT NULL,
+    target_amount DECIMAL(12,2) NOT NULL CHECK (target_amount > 0),
+    current_amount DECIMAL(12,2) NOT NULL DEFAULT 0,
+    deadline DATE,
+    account_id INTEGER REFERENCES accounts(id) ON DELETE SET NULL
+);
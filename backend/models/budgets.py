@@ -0,0 +1,75 @@
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Optional
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+
+class BudgetPeriod(str, Enum):
+    monthly = "monthly"
+    yearly = "yearly"
+
+class BudgetBase(BaseModel):
+    category_id: int
+    amount: Decimal = Field(gt=0) # Limit on net spending per period
+    period: BudgetPeriod = BudgetPeriod.monthly
+
+class BudgetCreate(BudgetBase):
+    pass
+
+class BudgetUpdate(BaseModel):
+    amount: Optional[Decimal] = Field(None, gt=0)
+    period: Optional[BudgetPeriod] = None
+
+class Budget(BudgetBase):
+    id: int
+    model_config = ConfigDict(from_attributes=True)
+
+class BudgetProgress(Budget):
+    category_name: Optional[str] = None
+    period_start: date
+    period_end: date
+    spent: Decimal # Net spending in the category this period (refunds reduce it)
+    remaining: Decimal # Negative once over budget
+    fraction_spent: float # spent / amount; 1.0 or more is over budget
+
+class BudgetAlert(BaseModel):
+    """A budget crossing one of its alert thresholds, e.g. 80% of Dining spent."""
+    budget_id: int
+    category_id: int
+    period_start: date
+    threshold: float
+    spent: Decimal
+    amount: Decimal
+    created_at: datetime
+
+class BudgetOverview(BaseModel):
+    """Response of GET /dashboard/budgets."""
+    budgets: List[BudgetProgress] # Most spent (relative to the budget) first
+    alerts: List[BudgetAlert] # Thresholds crossed in the current periods, newest first
+
+class GoalBase(BaseModel):
+    name: str
+    target_amount: Decimal = Field(gt=0)
+    current_amount: Decimal = Decimal(0) # Ignored for progress when account_id is set
+    deadline: Optional[date] = None
+    account_id: Optional[int] = None # Track the goal against this account's balance
+
+class GoalCreate(GoalBase):
+    pass
+
+class GoalUpdate(BaseModel):
+    name: Optional[str] = None
+    target_amount: Optional[Decimal] = Field(None, gt=0)
+    current_amount: Optional[Decimal] = None
+    deadline: Optional[date] = None
+    account_id: Optional[int] = None
+
+class Goal(GoalBase):
+    id: int
+    model_config = ConfigDict(from_attributes=True)
+
+class GoalProgress(Goal):
+    saved: Decimal # current_amount, or the account balance
+    remaining: Decimal
+    fraction_saved: float
+    monthly_needed: Optional[Decimal] = None # To reach the target by the deadline, from this month on
@@ -0,0 +1,72 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import date
+from decimal import Decimal
+
+class MonthTotals(BaseModel):
+    month: date # First day of the month
+    income: Decimal = Decimal(0)
+    spending: Decimal = Decimal(0) # Positive number
+    net: Decimal = Decimal(0)
+    transaction_count: int = 0
+
+class AccountSummary(BaseModel):
+    account_id: int
+    balance: Decimal # Net of all imported transactions
+    transaction_count: int
+    unreconciled_count: int
+
+class DashboardSummary(BaseModel):
+    """Response of GET /dashboard/summary."""
+    balance: Decimal
+    transaction_count: int
+    unreconciled_count: int
+    accounts: List[AccountSummary]
+    month: MonthTotals # Totals for the requested (default: current) month
+
+class CategorySpending(BaseModel):
+    category_id: Optional[int] = None # None for uncategorized transactions
+    category_name: Optional[str] = None
+    spending: Decimal
+    income: Decimal
+    transaction_count: int
+
+class SpendingBreakdown(BaseModel):
+    """Response of GET /dashboard/spending."""
+    start_month: date
+    end_month: date
+    total_spending: Decimal
+    total_income: Decimal
+    by_category: List[CategorySpending] # Largest spending first
+    by_month: List[MonthTotals] # Every month in the range, oldest first
+
+class DailySpending(BaseModel):
+    date: date
+    spending: Decimal
+    rolling_average: Decimal # Average daily spending over the trailing window
+
+class SpendingTrend(BaseModel):
+    """Response of GET /dashboard/trends."""
+    window_days: int
+    points: List[DailySpending]
+
+class CategoryDistribution(BaseModel):
+    category_id: Optional[int] = None
+    category_name: Optional[str] = None
+    transaction_count: int
+    median: Decimal # Typical size of one spending transaction
+    p90: Decimal
+    p99: Decimal
+
+class UnusualTransaction(BaseModel):
+    id: int
+    date: date
+    amount: Decimal
+    category_id: Optional[int] = None
+    category_name: Optional[str] = None
+    typical_max: Decimal # The category's 95th percentile spend
+
+class SpendingInsights(BaseModel):
+    """Response of GET /dashboard/insights."""
+    categories: List[CategoryDistribution] # Most transactions first
+    unusual: List[UnusualTransaction] # Most unusual first
@@ -24,6 +24,7 @@ class TransactionBase(BaseModel):
 
 class TransactionCreate(TransactionBase):
     account_id: int
+    fingerprint: Optional[str] = None # Content key used to deduplicate imports without a fitid (write-only)
     category_id: Optional[int] = None
     reconciled: Optional[bool] = False
     tags: Optional[List[str]] = None
@@ -44,6 +45,7 @@ class TransactionFilterParams(BaseModel):
     account_id: Optional[int] = None
     category_id: Optional[int] = None
     reconciled: Optional[bool] = None
+    tags: Optional[List[str]] = None # Transactions carrying all of these tags
     # Future: Add pagination (skip, limit), sorting (sort_by, order)
 
 class TransactionUpdate(BaseModel):
@@ -51,4 +53,40 @@ class TransactionUpdate(BaseModel):
     reconciled: Optional[bool] = None
     tags: Optional[List[str]] = None
     notes: Optional[str] = None
-    # Ensure amount/date/account_id etc. are not updatable via this model 
\ No newline at end of file
+    # Ensure amount/date/account_id etc. are not updatable via this model 
+
+class TransactionBulkItem(TransactionUpdate):
+    id: int # Transaction to update; the remaining fields are the update itself
+
+class TransactionBulkUpdate(BaseModel):
+    # Either per-transaction updates...
+    items: Optional[List[TransactionBulkItem]] = None
+    # ...or one update applied to every transaction matching a filter
+    filter: Optional[TransactionFilterParams] = None
+    update: Optional[TransactionUpdate] = None
+
+class TransactionBulkItemResult(BaseModel):
+    id: int
+    status: str # 'updated', 'not_found', 'invalid' or 'failed'
+    error: Optional[str] = None
+
+class TransactionBulkResult(BaseModel):
+    updated: int
+    results: List[TransactionBulkItemResult]
+
+class SuspectedDuplicate(BaseModel):
+    """Two transactions that look like the same one imported twice (older first)."""
+    account_id: int
+    amount: Decimal
+    transaction_ids: List[int]
+    dates: List[date]
+    descriptions: List[Optional[str]]
+    days_apart: int
+    similarity: float # Of the normalized descriptions; 1.0 means identical
+
+class CategorySuggestion(BaseModel):
+    """A category suggested for an uncategorized transaction from its description."""
+    transaction_id: int
+    description: Optional[str] = None
+    category_id: int
+    confidence: float # Probability of the category (0-1)
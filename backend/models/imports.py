@@ -0,0 +1,90 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import datetime
+from enum import Enum
+
+class ImportSummary(BaseModel):
+    """Counts reported after an import run (OFX today, other formats later)."""
+    accounts_processed: int = 0
+    accounts_created: int = 0
+    transactions_parsed: int = 0
+    transactions_inserted: int = 0
+    duplicates_skipped: int = 0
+    invalid_transactions: int = 0
+    transactions_categorized: int = 0 # Given a category by a categorization rule
+    transactions_failed: int = 0 # Rows in batches that could not be written after retries
+    batches_written: int = 0
+    batches_failed: int = 0
+    files_processed: int = 0 # Statement files read (batch uploads; 1 for a single upload)
+    files_failed: int = 0 # Statement files that could not be parsed
+    transactions_already_imported: int = 0 # Posted within statement periods imported before
+    already_imported: bool = False # The whole file had been imported before; nothing was read
+    errors: List[str] = []
+
+class ImportJobStatus(str, Enum):
+    queued = "queued"
+    running = "running"
+    completed = "completed"
+    failed = "failed"
+
+class ImportJob(BaseModel):
+    """A background import of an uploaded file or batch, as returned by GET /upload/jobs/{id}."""
+    id: str
+    filename: str
+    status: ImportJobStatus
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    transactions_parsed: int = 0
+    duplicates_skipped: int = 0
+    transactions_inserted: int = 0
+    invalid_transactions: int = 0
+    transactions_failed: int = 0
+    files_processed: int = 0
+    files_failed: int = 0
+    rows_sent: int = 0 # Rows handed to the database so far (live while the job runs)
+    rows_inserted: int = 0 # Of those, rows that were new
+    rows_per_second: Optional[float] = None # Throughput over the running time of the job
+    files_per_second: Optional[float] = None
+    transactions_already_imported: int = 0
+    already_imported: bool = False
+    errors: List[str] = []
+
+class ImportFormat(str, Enum):
+    ofx = "ofx"
+    csv = "csv"
+    qif = "qif"
+
+class CsvColumnMapping(BaseModel):
+    """Which CSV columns hold which transaction fields, by header name.
+
+    Columns left unset are guessed from common bank export headers ("Date",
+    "Transaction Date", "Amount", "Debit"/"Credit", "Description", "Payee", ...).
+    """
+    date: Optional[str] = None
+    amount: Optional[str] = None # Signed amount; or use debit and credit instead
+    debit: Optional[str] = None # Money out, as a positive number
+    credit: Optional[str] = None # Money in
+    description: Optional[List[str]] = None # Joined with " - " when several are given
+    fitid: Optional[str] = None # Bank reference that uniquely identifies a transaction
+    transaction_type: Optional[str] = None
+    date_format: Optional[str] = None # strptime format, e.g. "%d/%m/%Y"; inferred if omitted
+    decimal_comma: Optional[bool] = None # Amounts like "1.234,56"; inferred if omitted
+    skip_rows: int = Field(0, ge=0) # Lines before the header row
+
+class ImportOptions(BaseModel):
+    """How to read a spooled upload; stored with its job so a resumed import reads it the same way."""
+    format: ImportFormat = ImportFormat.ofx
+    account_name: Optional[str] = None # CSV and QIF files don't name their account
+    account_type: Optional[str] = None
+    csv: Optional[CsvColumnMapping] = None
+    date_format: Optional[str] = None # QIF only; inferred if omitted
+    content_sha256: Optional[str] = None # Set when the upload is spooled
+    force: bool = False # Import even if the import ledger says the file is already in
+
+class ImportJobAccepted(BaseModel):
+    """Response to an upload: the job was queued and can be polled."""
+    job_id: str
+    filename: str
+    status: ImportJobStatus
+    message: str
@@ -0,0 +1,46 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Optional
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+
+from models.financials import TransactionFilterParams
+from models.imports import ImportJobStatus
+
+class RuleMatchType(str, Enum):
+    substring = "substring"
+    regex = "regex"
+
+class CategorizationRuleBase(BaseModel):
+    name: Optional[str] = None
+    match_type: RuleMatchType = RuleMatchType.substring
+    pattern: Optional[str] = None # Matched case-insensitively against the description; None matches any
+    min_amount: Optional[Decimal] = None # Inclusive bounds on the signed amount
+    max_amount: Optional[Decimal] = None
+    account_id: Optional[int] = None # Only apply to this account
+    category_id: int
+    priority: int = 0 # Higher wins when several rules match
+    enabled: bool = True
+
+class CategorizationRuleCreate(CategorizationRuleBase):
+    pass
+
+class CategorizationRule(CategorizationRuleBase):
+    id: int
+    model_config = ConfigDict(from_attributes=True)
+
+class RuleApplyRequest(BaseModel):
+    """Body of POST /rules/apply: which transactions to re-categorize."""
+    filter: TransactionFilterParams = TransactionFilterParams()
+    overwrite: bool = False # Also re-categorize transactions that already have a category
+
+class RuleApplyJob(BaseModel):
+    """A background re-application of the rules, as returned by GET /rules/apply/{id}."""
+    id: str
+    status: ImportJobStatus
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    transactions_scanned: int = 0
+    transactions_matched: int = 0
+    transactions_updated: int = 0
+    error: Optional[str] = None
@@ -0,0 +1,129 @@
+import logging
+from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List
+
+from models.budgets import Budget, BudgetCreate, BudgetUpdate
+from core.repository import Repository, get_repository
+from services.budgets import BudgetEngine, get_budget_engine
+from services.category_cache import CategoryCache, get_category_cache
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/budgets",
+    tags=["Budgets"],
+)
+
+@router.get("/", response_model=List[Budget])
+async def get_budgets(repository: Repository = Depends(get_repository)):
+    """Lists all budgets. GET /dashboard/budgets adds their progress."""
+    try:
+        return await repository.list_budgets()
+    except Exception as e:
+        logger.exception("Error fetching budgets: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred while fetching budgets: {e}"
+        )
+
+@router.post("/", status_code=status.HTTP_201_CREATED, response_model=Budget)
+async def create_budget(
+    budget: BudgetCreate,
+    repository: Repository = Depends(get_repository),
+    categories: CategoryCache = Depends(get_category_cache),
+    engine: BudgetEngine = Depends(get_budget_engine)
+):
+    """Sets a monthly or yearly spending limit for a category (one per category and period)."""
+    try:
+        if not await categories.exists(budget.category_id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Category with id {budget.category_id} does not exist."
+            )
+        existing = await repository.list_budgets()
+        if any(row['category_id'] == budget.category_id and row['period'] == budget.period for row in existing):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Category {budget.category_id} already has a {budget.period.value} budget."
+            )
+        created = await repository.create_budget(budget.model_dump(mode="json"))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error creating budget: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred while creating the budget: {e}"
+        )
+    if not created:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="The budget could not be created."
+        )
+    await engine.reload_budgets()
+    return created
+
+@router.put("/{budget_id}", response_model=Budget)
+async def update_budget(
+    budget_id: int,
+    update: BudgetUpdate,
+    repository: Repository = Depends(get_repository),
+    engine: BudgetEngine = Depends(get_budget_engine)
+):
+    """Changes a budget's amount or period (still one per category and period)."""
+    values = update.model_dump(mode="json", exclude_unset=True)
+    if not values:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No update data provided."
+        )
+    try:
+        if update.period is not None:
+            existing = await repository.list_budgets()
+            current = next((row for row in existing if row['id'] == budget_id), None)
+            if current and any(
+                row['id'] != budget_id and row['category_id'] == current['category_id'] and row['period'] == update.period
+                for row in existing
+            ):
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"Category {current['category_id']} already has a {update.period.value} budget."
+                )
+        updated = await repository.update_budget(budget_id, values)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error updating budget %s: %s", budget_id, e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred while updating the budget: {e}"
+        )
+    if not updated:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Budget with id {budget_id} not found."
+        )
+    await engine.reload_budgets()
+    return updated
+
+@router.delete("/{budget_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_budget(
+    budget_id: int,
+    repository: Repository = Depends(get_repository),
+    engine: BudgetEngine = Depends(get_budget_engine)
+):
+    """Deletes a budget."""
+    try:
+        deleted = await repository.delete_budget(budget_id)
+    except Exception as e:
+        logger.exception("Error deleting budget %s: %s", budget_id, e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred while deleting the budget: {e}"
+        )
+    if not deleted:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Budget with id {budget_id} not found."
+        )
+    await engine.reload_budgets()
@@ -1,38 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
-
-# Add path for imports if necessary (usually handled by running from root)
-import sys
-from pathlib import Path
-BACKEND_DIR = Path(__file__).resolve().parent.parent
-if str(BACKEND_DIR) not in sys.path:
-    sys.path.append(str(BACKEND_DIR))
+import logging
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from typing import List, Optional
 
 from models.categories import Category # Import the model
-from core.supabase_client import get_supabase_client
-from supabase import Client
+from services.category_cache import CategoryCache, get_category_cache
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(
     prefix="/categories",
     tags=["Categories"],
 )
 
+# Clients may reuse the list for a short while, then must revalidate with If-None-Match
+CATEGORIES_CACHE_CONTROL = "private, max-age=60"
+
 @router.get("/", response_model=List[Category])
-def get_categories(supabase: Client = Depends(get_supabase_client)):
-    """Fetches a list of all available categories."""
+async def get_categories(
+    if_none_match: Optional[str] = Header(None),
+    cache: CategoryCache = Depends(get_category_cache)
+):
+    """Fetches a list of all available categories.
+
+    Served from the in-process category cache. Responses carry an ETag; a request
+    whose `If-None-Match` matches it gets an empty 304.
+    """
     try:
-        response = supabase.table("categories").select("*").order("name").execute()
-        # Error handling is via exceptions in supabase-py v2
-        return response.data
+        snapshot = await cache.get()
     except Exception as e:
-        print(f"Error fetching categories: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error fetching categories")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An error occurred while fetching categories: {e}"
         )
 
+    headers = {"ETag": snapshot.etag, "Cache-Control": CATEGORIES_CACHE_CONTROL}
+    if if_none_match and snapshot.etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
 # TODO: Add POST /categories endpoint (for creating custom categories)
 # TODO: Add PUT /categories/{id} endpoint?
-# TODO: Add DELETE /categories/{id} endpoint? 
\ No newline at end of file
+# TODO: Add DELETE /categories/{id} endpoint?
+# (Each of these must invalidate the injected CategoryCache after writing.)
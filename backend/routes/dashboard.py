@@ -0,0 +1,199 @@
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import List, Optional
+from datetime import date
+from decimal import Decimal
+
+from models.dashboard import (
+    CategoryDistribution,
+    DailySpending,
+    DashboardSummary,
+    SpendingBreakdown,
+    SpendingInsights,
+    SpendingTrend,
+    UnusualTransaction,
+)
+from models.budgets import BudgetOverview, GoalProgress
+from core.repository import Repository, get_repository
+from services.budgets import BudgetEngine, account_balances, build_budget_progress, build_goal_progress, get_budget_engine
+from services.category_cache import CategoryCache, get_category_cache
+from services.dashboard import add_months, build_spending, build_summary, spending_range
+from services.analytics import (
+    AnalyticsStore,
+    UNCATEGORIZED,
+    category_percentiles,
+    daily_spending,
+    day_date,
+    day_number,
+    get_analytics_store,
+    rolling_sum,
+    unusual_transactions,
+)
+
+logger = logging.getLogger(__name__)
+
+# Longest range GET /dashboard/spending accepts
+MAX_SPENDING_MONTHS = 120
+
+CENT = Decimal("0.01")
+
+def cents(value) -> Decimal:
+    return (Decimal(str(value)) / 100).quantize(CENT)
+
+def category_or_none(code: int) -> Optional[int]:
+    return None if code == UNCATEGORIZED else code
+
+router = APIRouter(
+    prefix="/dashboard",
+    tags=["Dashboard"],
+)
+
+@router.get("/summary", response_model=DashboardSummary)
+async def get_summary(
+    month: Optional[date] = Query(None, description="Any day in the month to total (default: current month)"),
+    account_id: Optional[int] = Query(None, description="Limit to one account"),
+    repository: Repository = Depends(get_repository)
+):
+    """Balances, unreconciled counts and the month's income and spending.
+
+    Served from the (account, category, month) rollups, so the cost does not grow with
+    the number of transactions.
+    """
+    try:
+        rollups = await repository.list_rollups(account_id=account_id)
+    except Exception as e:
+        logger.exception("Error fetching dashboard summary")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred while fetching the dashboard summary: {e}"
+        )
+    return build_summary(rollups, month or date.today())
+
+@router.get("/spending", response_model=SpendingBreakdown)
+async def get_spending(
+    start_date: Optional[date] = Query(None, description="First month to include (any day in it)"),
+    end_date: Optional[date] = Query(None, description="Last month to include (default: current month)"),
+    account_id: Optional[int] = Query(None, description="Limit to one account"),
+    repository: Repository = Depends(get_repository),
+    categories: CategoryCache = Depends(get_category_cache)
+):
+    """Spending by category and income vs. spending per month, from the rollups."""
+    start_month, end_month = spending_range(start_date, end_date, date.today())
+    if start_month > end_month:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start_date must not be after end_date."
+        )
+    if add_months(start_month, MAX_SPENDING_MONTHS) <= end_month:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"The range may cover at most {MAX_SPENDING_MONTHS} months."
+        )
+    try:
+        rollups = await repository.list_rollups(account_id=account_id, start_month=start_month, end_month=end_month)
+        snapshot = await categories.get()
+    except Exception as e:
+        logger.exception("Error fetching spending breakdown")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred while fetching the spending breakdown: {e}"
+        )
+    names = {category_id: row['name'] for category_id, row in snapshot.by_id.items()}
+    return build_spending(rollups, start_month, end_month, names)
+
+@router.get("/trends", response_model=SpendingTrend)
+async def get_trends(
+    days: int = Query(90, description="Number of days to return", ge=1, le=1095),
+    window_days: int = Query(30, description="Length of the rolling average window", ge=1, le=365),
+    end_date: Optional[date] = Query(None, description="Last day to return (default: today)"),
+    account_id: Optional[int] = Query(None, description="Limit to one account"),
+    store: AnalyticsStore = Depends(get_analytics_store)
+):
+    """Daily spending with a trailing rolling average, computed on the columnar snapshot."""
+    end_day = day_number(end_date or date.today())
+    # Start the series early enough that the first returned day has a full window
+    first_day = end_day - days - window_days + 2
+    columns = await store.columns(account_id)
+    series = daily_spending(columns, first_day, end_day)
+    averages = rolling_sum(series, window_days) / window_days
+    return SpendingTrend(
+        window_days=window_days,
+        points=[
+            DailySpending(date=day_date(first_day + i), spending=cents(series[i]), rolling_average=cents(round(averages[i])))
+            for i in range(window_days - 1, len(series))
+        ],
+    )
+
+@router.get("/insights", response_model=SpendingInsights)
+async def get_insights(
+    account_id: Optional[int] = Query(None, description="Limit to one account"),
+    limit: int = Query(20, description="Maximum number of unusual transactions", ge=1, le=100),
+    store: AnalyticsStore = Depends(get_analytics_store),
+    categories: CategoryCache = Depends(get_category_cache)
+):
+    """Typical transaction sizes per category, and transactions far above them."""
+    columns = await store.columns(account_id)
+    names = {category_id: row['name'] for category_id, row in (await categories.get()).by_id.items()}
+
+    distributions = [
+        CategoryDistribution(
+            category_id=category_or_none(code),
+            category_name=names.get(code),
+            transaction_count=stats['count'],
+            median=cents(stats['percentiles'][0]),
+            p90=cents(stats['percentiles'][1]),
+            p99=cents(stats['percentiles'][2]),
+        )
+        for code, stats in category_percentiles(columns, [50, 90, 99]).items()
+    ]
+    distributions.sort(key=lambda d: -d.transaction_count)
+    unusual = [
+        UnusualTransaction(
+            id=item['id'],
+            date=day_date(item['day']),
+            amount=cents(item['amount_cents']),
+            category_id=category_or_none(item['category_id']),
+            category_name=names.get(item['category_id']),
+            typical_max=cents(item['threshold_cents']),
+        )
+        for item in unusual_transactions(columns, limit=limit)
+    ]
+    return SpendingInsights(categories=distributions, unusual=unusual)
+
+@router.get("/budgets", response_model=BudgetOverview)
+async def get_budget_progress(
+    engine: BudgetEngine = Depends(get_budget_engine),
+    categories: CategoryCache = Depends(get_category_cache)
+):
+    """Spending against each budget in its current month or year, and recent threshold alerts.
+
+    Served from running per (category, month) totals that follow every import and
+    recategorization, so the cost grows with the number of budgets, not transactions.
+    """
+    try:
+        budgets = await engine.budgets()
+        snapshot = await categories.get()
+    except Exception as e:
+        logger.exception("Error fetching budget progress")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred while fetching budget progress: {e}"
+        )
+    names = {category_id: row['name'] for category_id, row in snapshot.by_id.items()}
+    return BudgetOverview(budgets=build_budget_progress(engine, budgets, names), alerts=engine.recent_alerts())
+
+@router.get("/goals", response_model=List[GoalProgress])
+async def get_goal_progress(repository: Repository = Depends(get_repository)):
+    """Progress toward each savings goal; goals linked to an account follow its balance (from the rollups)."""
+    try:
+        goals = await repository.list_goals()
+        tracked = any(goal.get('account_id') is not None for goal in goals)
+        balances = account_balances(await repository.list_rollups()) if tracked else {}
+    except Exception as e:
+        logger.exception("Error fetching goal progress")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred while fetching goal progress: {e}"
+        )
+    today = date.today()
+    return [build_goal_progress(goal, balances, today) for goal in goals]
@@ -0,0 +1,84 @@
+import logging
+from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List
+
+from models.budgets import Goal, GoalCreate, GoalUpdate
+from core.repository import Repository, get_repository
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/goals",
+    tags=["Goals"],
+)
+
+@router.get("/", response_model=List[Goal])
+async def get_goals(repository: Repository = Depends(get_repository)):
+    """Lists all savings goals. GET /dashboard/goals adds their progress."""
+    try:
+        return await repository.list_goals()
+    except Exception as e:
+        logger.exception("Error fetching goals: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred while fetching goals: {e}"
+        )
+
+@router.post("/", status_code=status.HTTP_201_CREATED, response_model=Goal)
+async def create_goal(goal: GoalCreate, repository: Repository = Depends(get_repository)):
+    """Sets a savings target, tracked by `current_amount` or by an account's balance."""
+    try:
+        created = await repository.create_goal(goal.model_dump(mode="json"))
+    except Exception as e:
+        logger.exception("Error creating goal: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred while creating the goal: {e}"
+        )
+    if not created:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="The goal could not be created."
+        )
+    return created
+
+@router.put("/{goal_id}", response_model=Goal)
+async def update_goal(goal_id: int, update: GoalUpdate, repository: Repository = Depends(get_repository)):
+    """Changes a goal; only the fields sent are updated."""
+    values = update.model_dump(mode="json", exclude_unset=True)
+    if not values:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No update data provided."
+        )
+    try:
+        updated = await repository.update_goal(goal_id, values)
+    except Exception as e:
+        logger.exception("Error updating goal %s: %s", goal_id, e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred while updating the goal: {e}"
+        )
+    if not updated:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Goal with id {goal_id} not found."
+        )
+    return updated
+
+@router.delete("/{goal_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_goal(goal_id: int, repository: Repository = Depends(get_repository)):
+    """Deletes a goal."""
+    try:
+        deleted = await repository.delete_goal(goal_id)
+    except Exception as e:
+        logger.exception("Error deleting goal %s: %s", goal_id, e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred while deleting the goal: {e}"
+        )
+    if not deleted:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Goal with id {goal_id} not found."
+        )
@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Response
+
+from core.metrics import PROMETHEUS_CONTENT_TYPE, registry
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Request latencies and import stage timings in the Prometheus text format."""
+    return Response(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
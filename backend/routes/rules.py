@@ -0,0 +1,99 @@
+import logging
+from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List
+import re
+
+from models.rules import CategorizationRule, CategorizationRuleCreate, RuleApplyJob, RuleApplyRequest, RuleMatchType
+from core.repository import Repository, get_repository
+from services.category_cache import CategoryCache, get_category_cache
+from services.categorization import RuleApplyJobs, get_rule_jobs
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/rules",
+    tags=["Rules"],
+)
+
+@router.get("/", response_model=List[CategorizationRule])
+async def get_rules(repository: Repository = Depends(get_repository)):
+    """Lists all categorization rules."""
+    try:
+        return await repository.list_rules()
+    except Exception as e:
+        logger.exception("Error fetching rules: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred while fetching rules: {e}"
+        )
+
+@router.post("/", status_code=status.HTTP_201_CREATED, response_model=CategorizationRule)
+async def create_rule(
+    rule: CategorizationRuleCreate,
+    repository: Repository = Depends(get_repository),
+    categories: CategoryCache = Depends(get_category_cache)
+):
+    """Creates a rule. It applies to future imports; use POST /rules/apply for existing transactions."""
+    if rule.match_type == RuleMatchType.regex and rule.pattern:
+        try:
+            re.compile(rule.pattern)
+        except re.error as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid regular expression: {e}"
+            )
+    if rule.min_amount is not None and rule.max_amount is not None and rule.min_amount > rule.max_amount:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="min_amount must not be greater than max_amount."
+        )
+    try:
+        if not await categories.exists(rule.category_id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Category with id {rule.category_id} does not exist."
+            )
+        created = await repository.create_rule(rule.model_dump(mode="json"))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error creating rule: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred while creating the rule: {e}"
+        )
+    if not created:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="The rule could not be created."
+        )
+    return created
+
+@router.delete("/{rule_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_rule(rule_id: int, repository: Repository = Depends(get_repository)):
+    """Deletes a rule. Transactions it already categorized keep their category."""
+    if not await repository.delete_rule(rule_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Rule with id {rule_id} not found."
+        )
+
+@router.post("/apply", status_code=status.HTTP_202_ACCEPTED, response_model=RuleApplyJob)
+async def apply_rules(request: RuleApplyRequest, jobs: RuleApplyJobs = Depends(get_rule_jobs)):
+    """Re-applies the rules to existing transactions in the background.
+
+    Only uncategorized transactions are changed unless `overwrite` is set. Poll
+    GET /rules/apply/{job_id} for progress.
+    """
+    return jobs.start(request.filter, overwrite=request.overwrite)
+
+@router.get("/apply/{job_id}", response_model=RuleApplyJob)
+async def get_apply_job(job_id: str, jobs: RuleApplyJobs = Depends(get_rule_jobs)):
+    """Returns the progress of a re-apply job."""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Rule apply job {job_id} not found."
+        )
+    return job
@@ -1,26 +1,68 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from typing import List, Optional
+import asyncio
+import logging
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import Response, StreamingResponse
+from typing import List, Optional, Tuple
 from decimal import Decimal
 from datetime import date
 
-# Use Path for relative imports if needed, though direct should work
-import sys
-from pathlib import Path
-BACKEND_DIR = Path(__file__).resolve().parent.parent
-if str(BACKEND_DIR) not in sys.path:
-    sys.path.append(str(BACKEND_DIR))
+from models.financials import ( # Import models and Update model
+    CategorySuggestion, SuspectedDuplicate, Transaction, TransactionBulkItemResult, TransactionBulkResult, TransactionBulkUpdate,
+    TransactionFilterParams, TransactionUpdate,
+)
+from core.repository import Repository, get_repository # Async data access layer
+from core.pagination import decode_cursor, encode_cursor
+from core.encoding import FastJSONResponse, dumps, prepare_transaction_rows
+from services.category_cache import CategoryCache, get_category_cache
+from services.change_feed import ChangeFeed, get_change_feed, stream_changes
+from services.bulk_update import MAX_BULK_ITEMS, apply_bulk_updates
+from services.dedup import DUPLICATE_MIN_SIMILARITY, DUPLICATE_WINDOW_DAYS, DuplicateScanner
+from services.query_cache import TransactionQueryCache, cache_key, get_transaction_cache
+from services.suggestions import SUGGESTION_MIN_CONFIDENCE, SuggestionEngine, get_suggestion_engine
+from services.export import (
+    DEFAULT_EXPORT_COLUMNS,
+    EXPORT_ENCODERS,
+    EXPORT_MEDIA_TYPES,
+    iter_transaction_chunks,
+    parquet_available,
+)
+
+logger = logging.getLogger(__name__)
+
+# Response header carrying the cursor for the next page (absent on the last page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Fields always returned by a projection, since the cursor is built from them
+REQUIRED_PROJECTION_FIELDS = ("id", "date")
 
-from models.financials import Transaction, TransactionFilterParams, TransactionUpdate # Import models and Update model
-from core.supabase_client import get_supabase_client # Import Supabase client getter
-from supabase import Client # Import Client type hint
+# Longest accepted `q=` search
+MAX_SEARCH_LENGTH = 200
+
+# Browsers keep pages but revalidate them with If-None-Match on every use
+TRANSACTIONS_CACHE_CONTROL = "private, no-cache"
 
 router = APIRouter(
     prefix="/transactions",
     tags=["Transactions"],
 )
 
+def parse_fields(fields: str) -> Tuple[str, ...]:
+    """Validates a comma-separated `fields=` projection against the Transaction model."""
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in Transaction.model_fields]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown transaction field(s): {', '.join(unknown)}. "
+                   f"Valid fields: {', '.join(Transaction.model_fields)}."
+        )
+    projected = list(REQUIRED_PROJECTION_FIELDS)
+    projected += [f for f in requested if f not in projected]
+    return tuple(projected)
+
 @router.get("/", response_model=List[Transaction]) # Return a list of Transaction models
-def get_transactions(
+async def get_transactions(
     # Use Depends for Pydantic query model validation
     # params: TransactionFilterParams = Depends(),
     # --- OR Define query params directly for simplicity now ---
@@ -29,64 +71,288 @@ def get_transactions(
     account_id: Optional[int] = Query(None, description="Filter by account ID"),
     category_id: Optional[int] = Query(None, description="Filter by category ID"),
     reconciled: Optional[bool] = Query(None, description="Filter by reconciled status"),
+    tags: Optional[List[str]] = Query(None, description="Only transactions carrying all of these tags (repeat the parameter)"),
+    q: Optional[str] = Query(None, min_length=1, max_length=MAX_SEARCH_LENGTH, description="Search descriptions and notes; results are ranked by relevance"),
     limit: int = Query(100, description="Maximum number of transactions to return", ge=1, le=1000),
-    offset: int = Query(0, description="Number of transactions to skip (for pagination)", ge=0),
+    offset: int = Query(0, description="Number of transactions to skip (prefer `cursor` for deep pages)", ge=0),
+    cursor: Optional[str] = Query(None, description=f"Opaque cursor from the {NEXT_CURSOR_HEADER} header of the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated list of fields to return (id and date are always included)"),
     # --- End direct query params ---
-    supabase: Client = Depends(get_supabase_client) # Dependency inject the client
+    if_none_match: Optional[str] = Header(None),
+    repository: Repository = Depends(get_repository), # Dependency inject the repository
+    cache: TransactionQueryCache = Depends(get_transaction_cache)
 ):
-    """Fetches a list of transactions with optional filtering and pagination."""
+    """Fetches a list of transactions with optional filtering and pagination.
+
+    Pages are ordered by (date, id), newest first. When a page is full, the
+    `X-Next-Cursor` response header holds the cursor for the following page.
+    With `q`, matches are ordered by relevance instead and paged with `offset`.
+
+    Rows come from our own store, so they are encoded directly instead of being
+    re-validated against `response_model` (which only documents the schema here).
+    Encoded pages are cached until a write touches their account and dates, and
+    carry an ETag; a request whose `If-None-Match` matches it gets an empty 304.
+    """
+    if cursor is not None and offset:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Use either `cursor` or `offset`, not both."
+        )
+    if cursor is not None and q is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Search results are ranked by relevance; page them with `offset` instead of `cursor`."
+        )
+    try:
+        cursor_key = decode_cursor(cursor) if cursor is not None else None
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    projected_fields = parse_fields(fields) if fields else None
+
     try:
-        query = supabase.table("transactions").select("*") # Select all columns for now
-
-        # Apply filters based on query parameters
-        if start_date:
-            query = query.gte('date', start_date.isoformat())
-        if end_date:
-            query = query.lte('date', end_date.isoformat())
-        if account_id is not None:
-            query = query.eq('account_id', account_id)
-        if category_id is not None:
-            query = query.eq('category_id', category_id)
-        if reconciled is not None:
-            query = query.eq('reconciled', reconciled)
-
-        # Apply pagination
-        query = query.range(offset, offset + limit - 1) # Supabase range is inclusive
-        
-        # Apply sorting (e.g., newest first by default)
-        query = query.order('date', desc=True).order('id', desc=True)
-
-        # Execute the query
-        response = query.execute()
-
-        # Check for errors (handled by exceptions in v2)
-        # if response.error:
-        #     raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(response.error))
-
-        # Pydantic will automatically validate the response data against List[Transaction]
-        # Convert Decimal strings back if needed (Pydantic V2 usually handles this)
-        # transactions_data = response.data
-        # for t in transactions_data:
-        #     if isinstance(t.get('amount'), str):
-        #         t['amount'] = Decimal(t['amount'])
-        
-        return response.data
+        filters = TransactionFilterParams(
+            start_date=start_date,
+            end_date=end_date,
+            account_id=account_id,
+            category_id=category_id,
+            reconciled=reconciled,
+            tags=tags,
+        )
+        columns = list(projected_fields) if projected_fields else None
+        key = cache_key(filters, q, limit, offset, cursor_key, columns)
+        page = cache.get(key)
+        if page is None:
+            writes = cache.writes
+            if q is not None:
+                rows = await repository.search_transactions(q, filters, limit=limit, offset=offset, columns=columns)
+                headers = {}
+            else:
+                rows = await repository.list_transactions(filters, limit=limit, offset=offset, cursor=cursor_key, columns=columns)
+                headers = {NEXT_CURSOR_HEADER: encode_cursor(rows[-1])} if len(rows) == limit else {}
+            page = cache.put(key, dumps(prepare_transaction_rows(rows)), headers, filters, cursor_key, writes)
 
     except Exception as e:
         # Log the error for debugging
-        print(f"Error fetching transactions: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error fetching transactions")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An error occurred while fetching transactions: {e}"
         )
 
+    headers = {**page.headers, 'ETag': page.etag, 'Cache-Control': TRANSACTIONS_CACHE_CONTROL}
+    if if_none_match and page.etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=page.body, media_type="application/json", headers=headers)
+
+@router.get("/export")
+async def export_transactions(
+    format: str = Query("ndjson", description="Export format: ndjson, csv or parquet"),
+    start_date: Optional[date] = Query(None, description="Filter by start date (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="Filter by end date (YYYY-MM-DD)"),
+    account_id: Optional[int] = Query(None, description="Filter by account ID"),
+    category_id: Optional[int] = Query(None, description="Filter by category ID"),
+    reconciled: Optional[bool] = Query(None, description="Filter by reconciled status"),
+    tags: Optional[List[str]] = Query(None, description="Only transactions carrying all of these tags (repeat the parameter)"),
+    fields: Optional[str] = Query(None, description="Comma-separated list of fields to export"),
+    repository: Repository = Depends(get_repository)
+):
+    """Streams every matching transaction as NDJSON, CSV or Parquet.
+
+    Rows are fetched in cursor-paginated chunks and encoded as they arrive, so memory
+    use stays constant no matter how many transactions match.
+    """
+    if format not in EXPORT_ENCODERS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported export format '{format}'. Use one of: {', '.join(EXPORT_ENCODERS)}."
+        )
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Parquet export requires the optional 'pyarrow' package."
+        )
+    columns = list(parse_fields(fields)) if fields else DEFAULT_EXPORT_COLUMNS
+
+    filters = TransactionFilterParams(
+        start_date=start_date,
+        end_date=end_date,
+        account_id=account_id,
+        category_id=category_id,
+        reconciled=reconciled,
+        tags=tags,
+    )
+    chunks = iter_transaction_chunks(repository, filters, columns=columns)
+    return StreamingResponse(
+        EXPORT_ENCODERS[format](chunks, columns),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="transactions.{format}"'},
+    )
+
+# Columns read to look for duplicates
+DUPLICATE_SCAN_COLUMNS = ["id", "account_id", "date", "amount", "description"]
+
+@router.get("/duplicates", response_model=List[SuspectedDuplicate])
+async def get_suspected_duplicates(
+    account_id: Optional[int] = Query(None, description="Only look within this account"),
+    start_date: Optional[date] = Query(None, description="Filter by start date (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="Filter by end date (YYYY-MM-DD)"),
+    days: int = Query(DUPLICATE_WINDOW_DAYS, description="Maximum days between the two dates", ge=0, le=31),
+    min_similarity: float = Query(DUPLICATE_MIN_SIMILARITY, description="Minimum description similarity (0-1)", ge=0, le=1),
+    limit: int = Query(100, description="Maximum number of pairs to return", ge=1, le=1000),
+    repository: Repository = Depends(get_repository)
+):
+    """Lists pairs of transactions that look like the same transaction imported twice.
+
+    Pairs have the same account and amount, dates within `days` of each other and
+    similar descriptions; typically a statement re-imported after the bank changed
+    its FITIDs. Most similar pairs come first.
+    """
+    filters = TransactionFilterParams(start_date=start_date, end_date=end_date, account_id=account_id)
+    try:
+        # Chunks arrive newest first; the scanner keeps only the rows of one window
+        scanner = DuplicateScanner(days, min_similarity)
+        async for chunk in iter_transaction_chunks(repository, filters, columns=DUPLICATE_SCAN_COLUMNS):
+            await asyncio.to_thread(scanner.add, chunk)
+        pairs = scanner.results()
+    except Exception as e:
+        logger.exception("Error looking for duplicate transactions")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred while looking for duplicate transactions: {e}"
+        )
+    return pairs[:limit]
+
+# Columns read to find transactions to suggest categories for
+SUGGESTION_SCAN_COLUMNS = ["id", "description", "category_id"]
+
+@router.get("/suggestions", response_model=List[CategorySuggestion])
+async def get_category_suggestions(
+    account_id: Optional[int] = Query(None, description="Filter by account ID"),
+    start_date: Optional[date] = Query(None, description="Filter by start date (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="Filter by end date (YYYY-MM-DD)"),
+    min_confidence: float = Query(SUGGESTION_MIN_CONFIDENCE, description="Minimum probability of a suggestion (0-1)", ge=0, le=1),
+    limit: int = Query(100, description="Maximum number of suggestions to return", ge=1, le=1000),
+    repository: Repository = Depends(get_repository),
+    engine: SuggestionEngine = Depends(get_suggestion_engine)
+):
+    """Suggests categories for unreconciled transactions that have none, newest first.
+
+    Suggestions come from a model trained on the descriptions of already categorized
+    transactions, which learns from every category assigned since. Transactions it is
+    not confident about are left out.
+    """
+    filters = TransactionFilterParams(start_date=start_date, end_date=end_date, account_id=account_id, reconciled=False)
+    suggestions: List[CategorySuggestion] = []
+    try:
+        model = await engine.ready()
+        async for chunk in iter_transaction_chunks(repository, filters, columns=SUGGESTION_SCAN_COLUMNS):
+            rows = [row for row in chunk if row.get('category_id') is None]
+            # The whole chunk is scored in one call
+            for row, suggestion in zip(rows, model.suggest([row['description'] for row in rows], min_confidence)):
+                if suggestion is not None:
+                    suggestions.append(CategorySuggestion(transaction_id=row['id'], description=row['description'], **suggestion._asdict()))
+            if len(suggestions) >= limit:
+                break
+    except Exception as e:
+        logger.exception("Error suggesting categories")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred while suggesting categories: {e}"
+        )
+    return suggestions[:limit]
+
+@router.get("/changes")
+async def get_transaction_changes(
+    since: Optional[str] = Query(None, description="Resume after this event id (the Last-Event-ID header takes precedence)"),
+    account_id: Optional[int] = Query(None, description="Only send changes to this account"),
+    last_event_id: Optional[str] = Header(None),
+    feed: ChangeFeed = Depends(get_change_feed)
+):
+    """Streams inserted and updated transactions as server-sent events.
+
+    Each event carries the changed rows, so an open page can patch itself instead of
+    re-fetching. EventSource resends the last event id when it reconnects, and the
+    changes made meanwhile are replayed; if they are no longer available a `reset`
+    event tells the client to reload.
+    """
+    return StreamingResponse(
+        stream_changes(feed, last_event_id or since, account_id),
+        media_type="text/event-stream",
+        headers={'Cache-Control': "no-cache", 'X-Accel-Buffering': "no"}, # No proxy buffering
+    )
+
+@router.patch("/bulk", response_model=TransactionBulkResult)
+async def bulk_update_transactions(
+    bulk: TransactionBulkUpdate,
+    repository: Repository = Depends(get_repository),
+    categories: CategoryCache = Depends(get_category_cache)
+):
+    """Updates many transactions in a few grouped statements.
+
+    Send either `items` (a list of `{id, ...TransactionUpdate fields}`) or a `filter`
+    plus a single `update`, e.g. to mark every transaction in a date range reconciled.
+    The response reports a status for each transaction touched.
+    """
+    if (bulk.items is None) == (bulk.filter is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide either `items`, or `filter` together with `update`."
+        )
+
+    if bulk.items is not None:
+        if len(bulk.items) > MAX_BULK_ITEMS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"At most {MAX_BULK_ITEMS} items can be updated per request."
+            )
+        try:
+            return await apply_bulk_updates(repository, categories, bulk.items)
+        except Exception as e:
+            logger.exception("Error bulk updating transactions")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"An error occurred while updating transactions: {e}"
+            )
+
+    update_dict = bulk.update.model_dump(exclude_unset=True) if bulk.update else {}
+    if not update_dict:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No update data provided."
+        )
+    if not any(value is not None and value != [] for value in bulk.filter.model_dump().values()):
+        # Guard against updating every transaction by accident (an empty tag list filters nothing)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The filter must set at least one field."
+        )
+    category_id = update_dict.get('category_id')
+    try:
+        if category_id is not None and not await categories.exists(category_id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Category with id {category_id} does not exist."
+            )
+        rows = await repository.update_matching_transactions(bulk.filter, update_dict)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error bulk updating transactions")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred while updating transactions: {e}"
+        )
+    return TransactionBulkResult(
+        updated=len(rows),
+        results=[TransactionBulkItemResult(id=row['id'], status="updated") for row in rows],
+    )
+
 @router.put("/{transaction_id}", response_model=Transaction)
-def update_transaction(
+async def update_transaction(
     transaction_id: int,
     update_data: TransactionUpdate, # Use the new Pydantic model for the request body
-    supabase: Client = Depends(get_supabase_client)
+    repository: Repository = Depends(get_repository),
+    categories: CategoryCache = Depends(get_category_cache)
 ):
     """Updates specific fields of a transaction by its ID."""
     
@@ -101,21 +367,24 @@ def update_transaction(
             detail="No update data provided."
         )
 
-    # TODO: Add validation?
-    # - Check if category_id exists in the categories table?
-    # - Validate tags format?
+    # TODO: Validate tags format?
 
     try:
+        # Checked against the category cache, so this costs no extra round trip
+        category_id = update_dict.get('category_id')
+        if category_id is not None and not await categories.exists(category_id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Category with id {category_id} does not exist."
+            )
+
         # Perform the update operation in Supabase
-        response = supabase.table("transactions")\
-                           .update(update_dict)\
-                           .eq('id', transaction_id)\
-                           .execute()
+        updated = await repository.update_transaction(transaction_id, update_dict)
 
         # Check if the update was successful and if any row was updated
-        if response.data:
-            # Return the updated transaction data (first element in the data list)
-            return response.data[0]
+        if updated:
+            # update_data was validated on the way in; the stored row is trusted on the way out
+            return FastJSONResponse(content=prepare_transaction_rows([updated])[0])
         else:
             # Handle cases where the transaction_id doesn't exist
             raise HTTPException(
@@ -128,9 +397,7 @@ def update_transaction(
         raise http_exc
     except Exception as e:
         # Log the error for debugging
-        print(f"Error updating transaction {transaction_id}: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error updating transaction %s", transaction_id)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An error occurred while updating transaction {transaction_id}: {e}"
@@ -1,78 +1,173 @@
-from fastapi import APIRouter, File, UploadFile, HTTPException, status
-from typing import Dict, List
-
-# Import the OFX parsing service
-import sys
-from pathlib import Path
-
-# Add backend directory to sys.path if needed (though usually handled by FastAPI structure/running from root)
-# This ensures services can be found if running script directly, but might not be needed for standard FastAPI run
-BACKEND_DIR = Path(__file__).resolve().parent.parent
-if str(BACKEND_DIR) not in sys.path:
-    sys.path.append(str(BACKEND_DIR))
-
-try:
-    from services.ofx_parser import parse_ofx
-except ImportError as e:
-    print(f"Error importing services: {e}. Check PYTHONPATH or structure.")
-    # Handle case where service cannot be imported - maybe raise config error?
-    # For now, allow router creation but endpoint will fail if service missing.
-    parse_ofx = None 
+import logging
+from fastapi import APIRouter, Depends, File, Form, UploadFile, HTTPException, status
+from pydantic import ValidationError
+from typing import List, Optional
+
+from models.imports import CsvColumnMapping, ImportFormat, ImportJob, ImportJobAccepted, ImportOptions
+from services.import_jobs import BATCH_UPLOAD_EXTENSIONS, MAX_BATCH_FILES, ImportJobQueue, QueueFullError, get_import_queue
+
+logger = logging.getLogger(__name__)
+
+# Seconds a client should wait before retrying when the import queue is full
+QUEUE_FULL_RETRY_AFTER = 30
 
 router = APIRouter(
     prefix="/upload",
     tags=["Upload"],
 )
 
-@router.post("/ofx", status_code=status.HTTP_201_CREATED)
-async def upload_ofx_file(file: UploadFile = File(...)):
-    """Receives an OFX file, parses it, and stores the data."""
-    
-    if not parse_ofx:
-         raise HTTPException(
+async def _queue_upload(file: UploadFile, queue: ImportJobQueue, options: ImportOptions, label: str) -> ImportJobAccepted:
+    try:
+        # The upload is streamed to disk; parsing and writing happen in a background worker
+        job = await queue.submit(file, options)
+        return ImportJobAccepted(
+            job_id=job.id,
+            filename=job.filename,
+            status=job.status,
+            message=f"{label} file queued for import.",
+        )
+
+    except QueueFullError as e:
+        # Backpressure: ask the client to retry later instead of piling up work
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(QUEUE_FULL_RETRY_AFTER)},
+        )
+    except Exception as e:
+        # Handle errors while receiving the file
+        # Log the error for debugging purposes
+        logger.exception("Error queueing file %s", file.filename)
+
+        raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="OFX parsing service not available due to import error."
+            detail=f"An error occurred while receiving the file: {e}"
         )
+    finally:
+        # Ensure the file is closed
+        await file.close()
 
-    # Basic validation: Check file extension and content type
-    if not file.filename.lower().endswith('.ofx'):
+def _check_extension(file: UploadFile, extensions: tuple, label: str) -> None:
+    if not file.filename.lower().endswith(extensions):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid file type. Only .ofx files are accepted."
+            detail=f"Invalid file type. Only {label} files are accepted."
         )
+
+@router.post("/ofx", status_code=status.HTTP_202_ACCEPTED, response_model=ImportJobAccepted)
+async def upload_ofx_file(
+    file: UploadFile = File(...),
+    force: bool = Form(False, description="Import in full even if the file was imported before"),
+    queue: ImportJobQueue = Depends(get_import_queue),
+):
+    """Receives an OFX file and queues it for import. Poll GET /upload/jobs/{job_id} for progress.
+
+    A file identical to one imported before, or whose statements cover only periods
+    already imported, completes without being parsed (`already_imported`).
+    """
+
+    # Basic validation: Check file extension and content type
+    _check_extension(file, ('.ofx',), ".ofx")
     # You might want more robust content type validation depending on client behavior
     # print(f"Received file: {file.filename}, content type: {file.content_type}")
+    return await _queue_upload(file, queue, ImportOptions(format=ImportFormat.ofx, force=force), "OFX")
 
+@router.post("/csv", status_code=status.HTTP_202_ACCEPTED, response_model=ImportJobAccepted)
+async def upload_csv_file(
+    file: UploadFile = File(...),
+    account_name: str = Form(..., description="Account the transactions belong to (created if it doesn't exist)"),
+    account_type: Optional[str] = Form(None, description="checking, savings or credit"),
+    mapping: Optional[str] = Form(None, description="CsvColumnMapping as JSON; columns are guessed from the header if omitted"),
+    force: bool = Form(False, description="Import in full even if the file was imported before"),
+    queue: ImportJobQueue = Depends(get_import_queue),
+):
+    """Receives a CSV bank export and queues it for import. Poll GET /upload/jobs/{job_id} for progress.
+
+    The encoding, delimiter, date format and decimal separator are inferred from the
+    file unless the mapping sets them.
+    """
+    _check_extension(file, ('.csv', '.txt'), ".csv")
+    try:
+        column_mapping = CsvColumnMapping.model_validate_json(mapping) if mapping else None
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid column mapping: {e}"
+        )
+    options = ImportOptions(format=ImportFormat.csv, account_name=account_name, account_type=account_type, csv=column_mapping, force=force)
+    return await _queue_upload(file, queue, options, "CSV")
+
+@router.post("/qif", status_code=status.HTTP_202_ACCEPTED, response_model=ImportJobAccepted)
+async def upload_qif_file(
+    file: UploadFile = File(...),
+    account_name: Optional[str] = Form(None, description="Account for files without !Account blocks"),
+    account_type: Optional[str] = Form(None, description="checking, savings or credit"),
+    date_format: Optional[str] = Form(None, description="strptime format of the D lines; inferred if omitted"),
+    force: bool = Form(False, description="Import in full even if the file was imported before"),
+    queue: ImportJobQueue = Depends(get_import_queue),
+):
+    """Receives a QIF file and queues it for import. Poll GET /upload/jobs/{job_id} for progress."""
+    _check_extension(file, ('.qif',), ".qif")
+    options = ImportOptions(format=ImportFormat.qif, account_name=account_name, account_type=account_type, date_format=date_format, force=force)
+    return await _queue_upload(file, queue, options, "QIF")
+
+@router.post("/batch", status_code=status.HTTP_202_ACCEPTED, response_model=ImportJobAccepted)
+async def upload_ofx_batch(
+    files: List[UploadFile] = File(...),
+    queue: ImportJobQueue = Depends(get_import_queue),
+):
+    """Receives several OFX/QFX files and/or zip archives of them and queues them as one import job.
+
+    The files are parsed in parallel, their accounts resolved together and each account's
+    transactions written concurrently. Poll GET /upload/jobs/{job_id} for progress.
+    """
     try:
-        # Read file content as bytes
-        contents = await file.read()
-        
-        # Call the parsing service
-        # Assuming parse_ofx handles potential errors internally and might raise them
-        # We pass None for the client, so it uses the default initialized one
-        created_accounts, collected_transactions = await parse_ofx(contents, supabase_client=None)
-        
-        return {
-            "filename": file.filename,
-            "message": "OFX file processed successfully.",
-            "accounts_processed": len(created_accounts),
-            "transactions_collected": len(collected_transactions)
-        }
-
-    except HTTPException as http_exc:
-        # Re-raise HTTPExceptions directly
-        raise http_exc
+        if len(files) > MAX_BATCH_FILES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"A batch may contain at most {MAX_BATCH_FILES} files."
+            )
+        invalid = [file.filename for file in files if not file.filename.lower().endswith(BATCH_UPLOAD_EXTENSIONS)]
+        if invalid:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid file type for {', '.join(invalid)}. Only .ofx, .qfx and .zip files are accepted."
+            )
+
+        job = await queue.submit_batch(files)
+        return ImportJobAccepted(
+            job_id=job.id,
+            filename=job.filename,
+            status=job.status,
+            message=f"{len(files)} file(s) queued for import.",
+        )
+
+    except HTTPException:
+        raise
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(QUEUE_FULL_RETRY_AFTER)},
+        )
     except Exception as e:
-        # Handle errors during file reading or parsing
-        # Log the error for debugging purposes
-        print(f"Error processing file {file.filename}: {e}") 
-        import traceback
-        traceback.print_exc()
-        
+        logger.exception("Error queueing batch of %s files", len(files))
+
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"An error occurred while processing the file: {e}"
+            detail=f"An error occurred while receiving the files: {e}"
         )
     finally:
-        # Ensure the file is closed
-        await file.close() 
\ No newline at end of file
+        for file in files:
+            await file.close()
+
+@router.get("/jobs/{job_id}", response_model=ImportJob)
+async def get_import_job(job_id: str, queue: ImportJobQueue = Depends(get_import_queue)):
+    """Returns the status and counts of an import job."""
+    job = queue.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Import job {job_id} not found."
+        )
+    return job
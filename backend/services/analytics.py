@@ -0,0 +1,304 @@
+import asyncio
+import logging
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+from fastapi import Depends
+
+from core.events import TransactionEvents, transaction_events
+from core.repository import Repository, get_repository
+from models.financials import TransactionFilterParams
+from services.export import iter_transaction_chunks
+
+logger = logging.getLogger(__name__)
+
+# Columns kept in the snapshot
+ANALYTICS_COLUMNS = ["id", "account_id", "date", "amount", "category_id"]
+
+# Category code used for uncategorized transactions
+UNCATEGORIZED = -1
+
+EPOCH = date(1970, 1, 1)
+
+# Largest key range grouped with bincount rather than np.unique
+DENSE_KEY_RANGE = 1 << 16
+
+# Bits for a spend in cents when packed into a sort key with its category (up to ~$10bn)
+AMOUNT_BITS = 40
+
+
+def day_number(day: date) -> int:
+    return (day - EPOCH).days
+
+
+def day_date(number: int) -> date:
+    return EPOCH + timedelta(days=int(number))
+
+
+class TransactionColumns:
+    """Columnar copy of a set of transactions, sorted by id.
+
+    Amounts are integer cents, dates are int32 day numbers since 1970-01-01 and
+    categories are their ids (UNCATEGORIZED for none), so every query is plain NumPy
+    arithmetic with no Decimal or date objects involved.
+    """
+
+    __slots__ = ("ids", "days", "amounts", "categories")
+
+    def __init__(self, ids: np.ndarray, days: np.ndarray, amounts: np.ndarray, categories: np.ndarray):
+        self.ids = ids
+        self.days = days
+        self.amounts = amounts
+        self.categories = categories
+
+    @classmethod
+    def empty(cls) -> "TransactionColumns":
+        return cls(np.empty(0, np.int64), np.empty(0, np.int32), np.empty(0, np.int64), np.empty(0, np.int32))
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Dict[str, Any]]) -> "TransactionColumns":
+        """Builds columns from repository rows. If an id repeats, its last row wins."""
+        count = len(rows)
+        ids = np.fromiter((row['id'] for row in rows), np.int64, count)
+        days = np.array([row['date'] for row in rows], dtype="datetime64[D]").astype(np.int32)
+        # Amounts are DECIMAL(10,2), so float cents round back to the exact value
+        amounts = np.rint(np.fromiter((float(row['amount']) for row in rows), np.float64, count) * 100).astype(np.int64)
+        categories = np.fromiter(
+            (UNCATEGORIZED if row.get('category_id') is None else row['category_id'] for row in rows), np.int32, count
+        )
+        # Sort by id, keeping the last occurrence of each id
+        _, last = np.unique(ids[::-1], return_index=True)
+        keep = count - 1 - last
+        return cls(ids[keep], days[keep], amounts[keep], categories[keep])
+
+    @classmethod
+    def concat(cls, parts: Iterable["TransactionColumns"]) -> "TransactionColumns":
+        parts = [part for part in parts if len(part)]
+        if not parts:
+            return cls.empty()
+        columns = cls(*(np.concatenate([getattr(part, name) for part in parts]) for name in cls.__slots__))
+        return columns._sorted()
+
+    def _sorted(self) -> "TransactionColumns":
+        if len(self.ids) > 1 and np.any(self.ids[1:] < self.ids[:-1]):
+            order = np.argsort(self.ids, kind="stable")
+            return TransactionColumns(*(getattr(self, name)[order] for name in self.__slots__))
+        return self
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def merge(self, rows: Sequence[Dict[str, Any]]) -> "TransactionColumns":
+        """Returns these columns with `rows` applied: existing ids are updated, new ids added."""
+        incoming = TransactionColumns.from_rows(rows)
+        if not len(self):
+            return incoming
+        positions = np.searchsorted(self.ids, incoming.ids)
+        existing = positions < len(self.ids)
+        existing[existing] = self.ids[positions[existing]] == incoming.ids[existing]
+        for name in self.__slots__[1:]:
+            getattr(self, name)[positions[existing]] = getattr(incoming, name)[existing]
+        added = ~existing
+        if not added.any():
+            return self
+        new = TransactionColumns(*(getattr(incoming, name)[added] for name in self.__slots__))
+        return TransactionColumns.concat([self, new])
+
+
+# --- Vectorized queries ---
+
+def month_numbers(days: np.ndarray) -> np.ndarray:
+    """Months since January 1970 for an array of day numbers."""
+    return days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+
+
+def month_date(number: int) -> date:
+    return date(1970 + int(number) // 12, int(number) % 12 + 1, 1)
+
+
+def group_totals(columns: TransactionColumns, by: str) -> List[Dict[str, Any]]:
+    """Income, spending (positive) and count per category, month or weekday, in key order."""
+    if by == "category":
+        keys = columns.categories
+    elif by == "month":
+        keys = month_numbers(columns.days)
+    elif by == "weekday":
+        keys = (columns.days + 3) % 7 # 1970-01-01 was a Thursday; Monday = 0
+    else:
+        raise ValueError(f"Unknown grouping '{by}'")
+    if not len(columns):
+        return []
+    low, high = int(keys.min()), int(keys.max())
+    if high - low < DENSE_KEY_RANGE:
+        # Small key range (categories, months): bin directly, no sort needed
+        inverse, size = keys - low, high - low + 1
+    else:
+        unique, inverse = np.unique(keys, return_inverse=True)
+        size = len(unique)
+    amounts = columns.amounts
+    income = np.bincount(inverse, weights=np.where(amounts > 0, amounts, 0), minlength=size)
+    spending = np.bincount(inverse, weights=np.where(amounts < 0, -amounts, 0), minlength=size)
+    counts = np.bincount(inverse, minlength=size)
+    present = np.flatnonzero(counts)
+    bin_keys = present + low if high - low < DENSE_KEY_RANGE else unique[present]
+    return [
+        {'key': int(key), 'income_cents': int(income[i]), 'spending_cents': int(spending[i]), 'count': int(counts[i])}
+        for key, i in zip(bin_keys, present)
+    ]
+
+
+def daily_spending(columns: TransactionColumns, start_day: int, end_day: int) -> np.ndarray:
+    """Spending in cents for each day from start_day to end_day inclusive."""
+    length = end_day - start_day + 1
+    mask = (columns.amounts < 0) & (columns.days >= start_day) & (columns.days <= end_day)
+    return np.bincount(columns.days[mask] - start_day, weights=-columns.amounts[mask], minlength=length)[:length]
+
+
+def rolling_sum(series: np.ndarray, window: int) -> np.ndarray:
+    """Trailing sum over `window` elements (shorter at the start of the series)."""
+    totals = np.cumsum(series, dtype=np.float64)
+    totals[window:] = totals[window:] - totals[:-window]
+    return totals
+
+
+def category_percentiles(columns: TransactionColumns, quantiles: Sequence[float]) -> Dict[int, Dict[str, Any]]:
+    """Percentiles (in cents) of spending transaction sizes per category."""
+    mask = columns.amounts < 0
+    categories = columns.categories[mask]
+    spend = -columns.amounts[mask]
+    if not len(spend):
+        return {}
+    # Sort by (category, amount) as one int64 key, which is much cheaper than lexsort
+    low = int(categories.min())
+    packed = np.sort(((categories.astype(np.int64) - low) << AMOUNT_BITS) | spend)
+    categories, spend = (packed >> AMOUNT_BITS) + low, packed & ((1 << AMOUNT_BITS) - 1)
+    starts = np.flatnonzero(np.r_[True, categories[1:] != categories[:-1]])
+    ends = np.r_[starts[1:], len(spend)]
+    result = {}
+    for start, end in zip(starts, ends):
+        values = spend[start:end]
+        result[int(categories[start])] = {
+            'count': int(end - start),
+            'percentiles': np.percentile(values, quantiles).tolist(),
+        }
+    return result
+
+
+def unusual_transactions(
+    columns: TransactionColumns,
+    quantile: float = 95,
+    min_count: int = 10,
+    limit: int = 20,
+) -> List[Dict[str, Any]]:
+    """Spending transactions above their category's `quantile`, largest relative to it first.
+
+    Categories with fewer than `min_count` spending transactions are skipped, since
+    their percentiles mean little.
+    """
+    stats = category_percentiles(columns, [quantile])
+    thresholded = {category: s['percentiles'][0] for category, s in stats.items() if s['count'] >= min_count}
+    if not thresholded:
+        return []
+    known = np.array(sorted(thresholded), dtype=np.int32)
+    limits = np.array([thresholded[category] for category in known.tolist()])
+    positions = np.clip(np.searchsorted(known, columns.categories), 0, len(known) - 1)
+    has_threshold = known[positions] == columns.categories
+    spend = -columns.amounts
+    flagged = np.flatnonzero(has_threshold & (columns.amounts < 0) & (spend > limits[positions]))
+    ratio = spend[flagged] / limits[positions[flagged]]
+    top = flagged[np.argsort(-ratio, kind="stable")[:limit]]
+    return [
+        {
+            'id': int(columns.ids[i]),
+            'day': int(columns.days[i]),
+            'amount_cents': int(columns.amounts[i]),
+            'category_id': int(columns.categories[i]),
+            'threshold_cents': float(limits[positions[i]]),
+        }
+        for i in top
+    ]
+
+
+class AnalyticsStore:
+    """Per-account columnar snapshots of all transactions, kept current incrementally.
+
+    The snapshot is loaded on first use. After that, rows inserted or updated through
+    the repository (imports, edits, bulk updates, rule re-apply) are picked up from
+    TransactionEvents and merged into the arrays before the next query, so nothing is
+    re-read from Supabase.
+    """
+
+    def __init__(self, repository: Repository, events: TransactionEvents = transaction_events):
+        self.repository = repository
+        self._accounts: Dict[int, TransactionColumns] = {}
+        self._combined: Optional[TransactionColumns] = None
+        self._pending: List[Dict[str, Any]] = []
+        self._loaded = False
+        self._loading = False
+        self._lock = asyncio.Lock()
+        self._unsubscribe = events.subscribe(self._on_change)
+
+    def _on_change(self, kind: str, rows: List[Dict[str, Any]]) -> None:
+        if self._loaded or self._loading: # Before loading, the load itself will see these rows
+            self._pending.extend(row for row in rows if row.get('account_id') is not None and row.get('date'))
+
+    async def _load(self) -> None:
+        self._loading = True
+        try:
+            parts: Dict[int, List[TransactionColumns]] = {}
+            async for rows in iter_transaction_chunks(self.repository, TransactionFilterParams(), columns=ANALYTICS_COLUMNS):
+                by_account: Dict[int, List[Dict[str, Any]]] = {}
+                for row in rows:
+                    by_account.setdefault(row['account_id'], []).append(row)
+                for account_id, account_rows in by_account.items():
+                    parts.setdefault(account_id, []).append(TransactionColumns.from_rows(account_rows))
+            self._accounts = {account_id: TransactionColumns.concat(chunks) for account_id, chunks in parts.items()}
+            self._combined = None
+            self._loaded = True
+            logger.info(
+                "Loaded analytics snapshot: %s transactions in %s accounts.",
+                sum(map(len, self._accounts.values())), len(self._accounts),
+            )
+        finally:
+            self._loading = False
+
+    def _apply_pending(self) -> None:
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        by_account: Dict[int, List[Dict[str, Any]]] = {}
+        for row in pending:
+            by_account.setdefault(row['account_id'], []).append(row)
+        for account_id, rows in by_account.items():
+            self._accounts[account_id] = self._accounts.get(account_id, TransactionColumns.empty()).merge(rows)
+        self._combined = None
+
+    async def columns(self, account_id: Optional[int] = None) -> TransactionColumns:
+        """Returns the up-to-date snapshot for one account, or all accounts combined."""
+        if not self._loaded:
+            async with self._lock:
+                if not self._loaded:
+                    await self._load()
+        self._apply_pending()
+        if account_id is not None:
+            return self._accounts.get(account_id) or TransactionColumns.empty()
+        if self._combined is None:
+            self._combined = TransactionColumns.concat(self._accounts.values())
+        return self._combined
+
+    def close(self) -> None:
+        self._unsubscribe()
+
+
+_store: Optional[AnalyticsStore] = None
+
+
+def get_analytics_store(repository: Repository = Depends(get_repository)) -> AnalyticsStore:
+    """FastAPI dependency returning the shared analytics snapshot for the repository in use."""
+    global _store
+    if _store is None or _store.repository is not repository:
+        if _store is not None:
+            _store.close()
+        _store = AnalyticsStore(repository, repository.events)
+    return _store
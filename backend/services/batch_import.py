@@ -0,0 +1,330 @@
+import asyncio
+import hashlib
+import logging
+import os
+import time
+import zipfile
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from core.metrics import span
+from core.repository import Repository, get_repository
+from models.financials import AccountCreate
+from models.imports import ImportSummary
+from services.categorization import load_rule_set
+from services.dedup import FingerprintAssigner
+from services.import_jobs import MAX_BATCH_FILES, STATEMENT_EXTENSIONS
+from services.import_ledger import ImportLedger
+from services.ingest import INSERT_BATCH_SIZE, MAX_REPORTED_ERRORS, VALID_ACCOUNT_TYPES
+from services.ofx_parser import build_account_name, record_to_transaction, statement_dates
+from services.ofx_stream import OfxAccountInfo, OfxStatementInfo, OfxTransactionRecord, iter_ofx_records
+from services.persistence import BatchProgress, TransactionBatchWriter, transaction_to_row
+
+logger = logging.getLogger(__name__)
+
+# Worker processes used to parse statement files (OFX parsing is CPU-bound)
+IMPORT_PARSE_PROCESSES = int(os.environ.get("IMPORT_PARSE_PROCESSES", os.cpu_count() or 1))
+# Chunk size used when hashing statements for the import ledger
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Largest total uncompressed size of the statements in one zip archive (zip bomb guard)
+MAX_ZIP_UNCOMPRESSED_BYTES = int(os.environ.get("MAX_ZIP_UNCOMPRESSED_BYTES", 1024 * 1024 * 1024))
+
+
+class BatchSource(NamedTuple):
+    """One statement in a batch: a spooled file, or a member of a spooled zip archive."""
+    path: str
+    member: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        return f"{Path(self.path).name}:{self.member}" if self.member else Path(self.path).name
+
+
+class ParsedFile(NamedTuple):
+    """What a parse worker sends back for one statement (must stay picklable)."""
+    name: str
+    accounts: List[Tuple[OfxAccountInfo, List[Dict[str, Any]]]] # Rows lack account_id until resolved
+    parsed: int
+    invalid: int
+    errors: List[str]
+    statements: List[OfxStatementInfo] # Periods for the import ledger
+
+
+@contextmanager
+def _open_source(source: BatchSource) -> Iterator[IO[bytes]]:
+    if source.member:
+        with zipfile.ZipFile(source.path) as archive, archive.open(source.member) as stream:
+            yield stream
+    else:
+        with open(source.path, 'rb') as stream:
+            yield stream
+
+
+def source_sha256(source: BatchSource) -> str:
+    """SHA-256 of a statement's bytes (uncompressed, for a zip member): its import ledger key."""
+    digest = hashlib.sha256()
+    with _open_source(source) as stream:
+        while chunk := stream.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parse_statement_file(source: BatchSource) -> ParsedFile:
+    """Parses one statement into insert-ready rows. Runs in a worker process."""
+    by_account: Dict[OfxAccountInfo, List[Dict[str, Any]]] = {}
+    statements: List[OfxStatementInfo] = []
+    parsed = invalid = 0
+    errors: List[str] = []
+    with _open_source(source) as stream:
+        for record in iter_ofx_records(stream):
+            if isinstance(record, OfxStatementInfo):
+                statements.append(record)
+                continue
+            if not isinstance(record, OfxTransactionRecord):
+                continue
+            parsed += 1
+            try:
+                row = transaction_to_row(record_to_transaction(record, 0))
+            except ValueError as e:
+                invalid += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append(f"{source.name}: skipped transaction {record.fields.get('FITID', '?')}: {e}")
+                continue
+            del row['account_id']
+            by_account.setdefault(record.account, []).append(row)
+    return ParsedFile(source.name, list(by_account.items()), parsed, invalid, errors, statements)
+
+
+def list_batch_sources(batch_dir: Path, max_files: int = MAX_BATCH_FILES) -> List[BatchSource]:
+    """Lists the statements in a spooled batch, expanding zip archives into their members.
+
+    Raises ValueError if the batch holds too many statements, or an archive is corrupt
+    or too large once uncompressed.
+    """
+    sources: List[BatchSource] = []
+    for path in sorted(batch_dir.iterdir()):
+        name = path.name.lower()
+        if name.endswith('.zip'):
+            if not zipfile.is_zipfile(path):
+                raise ValueError(f"'{path.name}' is not a valid zip archive.")
+            with zipfile.ZipFile(path) as archive:
+                members = [
+                    info for info in archive.infolist()
+                    if not info.is_dir() and info.filename.lower().endswith(STATEMENT_EXTENSIONS)
+                ]
+                if sum(info.file_size for info in members) > MAX_ZIP_UNCOMPRESSED_BYTES:
+                    raise ValueError(f"Archive '{path.name}' is too large once uncompressed.")
+                sources.extend(BatchSource(str(path), info.filename) for info in members)
+        elif name.endswith(STATEMENT_EXTENSIONS):
+            sources.append(BatchSource(str(path)))
+        if len(sources) > max_files:
+            raise ValueError(f"A batch may contain at most {max_files} statement files.")
+    return sources
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_parse_executor() -> ProcessPoolExecutor:
+    """Process pool shared by batch imports (created on first use)."""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=IMPORT_PARSE_PROCESSES)
+    return _executor
+
+
+def stop_parse_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def _resolve_accounts(
+    repository: Repository,
+    accounts: Dict[str, OfxAccountInfo],
+    summary: ImportSummary,
+) -> Dict[str, int]:
+    """Looks up every account in the batch with one query and creates the missing ones in one insert."""
+    names = list(accounts)
+    with span("account_resolution", rows=len(names)):
+        account_ids = await repository.get_account_ids_by_names(names)
+    missing = []
+    for name in names:
+        if name in account_ids:
+            continue
+        raw_type = accounts[name].account_type.lower().strip() if accounts[name].account_type else None
+        missing.append(AccountCreate(name=name, type=raw_type if raw_type in VALID_ACCOUNT_TYPES else None).model_dump())
+    if missing:
+        logger.info("Creating %s new accounts.", len(missing))
+        for row in await repository.create_accounts(missing):
+            account_ids.setdefault(row['name'], row['id'])
+            summary.accounts_created += 1
+    for name in names:
+        if name not in account_ids:
+            _add_error(summary, f"Could not create account '{name}'")
+    return account_ids
+
+
+def _add_error(summary: ImportSummary, message: str) -> None:
+    if len(summary.errors) < MAX_REPORTED_ERRORS:
+        summary.errors.append(message)
+
+
+async def run_batch_import(
+    batch_dir: Path,
+    on_progress: Callable[[BatchProgress], None],
+    repository: Optional[Repository] = None,
+    executor: Optional[Executor] = None,
+    batch_size: int = INSERT_BATCH_SIZE,
+    skip_imported: bool = True,
+) -> ImportSummary:
+    """Imports every statement in a spooled batch directory.
+
+    Statements whose content hash is in the import ledger are skipped unparsed. The
+    rest are parsed in parallel in `executor` (the shared process pool by default), all
+    account names are then resolved in a single query, transactions posted in statement
+    periods imported before are dropped, and each account's rows are written by their
+    own TransactionBatchWriter, concurrently with the other accounts. A file that fails
+    to parse is reported and does not stop the rest of the batch. Once every batch was
+    written, the files and their statement periods are recorded in the ledger, as a
+    single-file import does. With `skip_imported=False` the ledger is not consulted.
+    """
+    repository = repository or get_repository()
+    executor = executor or get_parse_executor()
+    ledger = ImportLedger(repository)
+    started = time.perf_counter()
+    summary = ImportSummary()
+
+    sources = list_batch_sources(batch_dir)
+    with span("read", step="hash", files=len(sources)):
+        digests = await asyncio.gather(
+            *(asyncio.to_thread(source_sha256, source) for source in sources), return_exceptions=True,
+        )
+    digests = [digest if isinstance(digest, str) else None for digest in digests] # Unreadable: left for the parser to report
+
+    async def already_imported(digest: Optional[str]) -> bool:
+        return skip_imported and digest is not None and await ledger.is_imported(digest)
+
+    skipped = await asyncio.gather(*(already_imported(digest) for digest in digests))
+    if any(skipped):
+        logger.info("Skipping %s of %s statements in the batch that were already imported.", sum(skipped), len(sources))
+        summary.files_processed += sum(skipped)
+        summary.already_imported = all(skipped)
+    pending = [(source, digest) for source, digest, skip in zip(sources, digests, skipped) if not skip]
+
+    loop = asyncio.get_running_loop()
+    with span("parse", files=len(pending)) as parse_span:
+        results = await asyncio.gather(
+            *(loop.run_in_executor(executor, parse_statement_file, source) for source, _ in pending),
+            return_exceptions=True,
+        )
+        parse_span.rows = sum(result.parsed for result in results if not isinstance(result, BaseException))
+
+    parsed_files: List[ParsedFile] = []
+    parsed_digests: List[Optional[str]] = []
+    accounts: Dict[str, OfxAccountInfo] = {}
+    for (source, digest), result in zip(pending, results):
+        if isinstance(result, BaseException):
+            summary.files_failed += 1
+            _add_error(summary, f"{source.name}: could not be parsed: {result}")
+            continue
+        parsed_files.append(result)
+        parsed_digests.append(digest)
+        summary.files_processed += 1
+        summary.transactions_parsed += result.parsed
+        summary.invalid_transactions += result.invalid
+        for message in result.errors:
+            _add_error(summary, message)
+        for account, _ in result.accounts:
+            accounts.setdefault(build_account_name(account), account)
+    parsed_at = time.perf_counter()
+    summary.accounts_processed = len(accounts)
+
+    account_ids = await _resolve_accounts(repository, accounts, summary) if accounts else {}
+    rules = await load_rule_set(repository)
+    known_ids = sorted(set(account_ids.values()))
+    covered_by_id = await ledger.covered_dates(known_ids) if skip_imported and known_ids else {}
+
+    # Fingerprint each file on its own, as a single-file import would, so a FITID-less
+    # transaction on two overlapping statements gets the same fingerprint from both;
+    # then merge per-account rows across files
+    rows_by_account: Dict[int, List[Dict[str, Any]]] = {}
+    for result in parsed_files:
+        fingerprints = FingerprintAssigner()
+        for account, rows in result.accounts:
+            account_id = account_ids.get(build_account_name(account))
+            if account_id is None:
+                continue
+            covered = covered_by_id.get(account_id)
+            if covered:
+                kept = [row for row in rows if date.fromisoformat(row['date']) not in covered]
+                summary.transactions_already_imported += len(rows) - len(kept)
+                summary.transactions_parsed -= len(rows) - len(kept)
+                rows = kept
+            for row in rows:
+                row['account_id'] = account_id
+                fingerprints.assign(row)
+            rows_by_account.setdefault(account_id, []).extend(rows)
+
+    writers: List[TransactionBatchWriter] = []
+
+    def report(_: BatchProgress) -> None:
+        total = BatchProgress()
+        for writer in writers:
+            for field in ('batches_written', 'batches_failed', 'rows_sent', 'rows_inserted',
+                          'rows_duplicate', 'rows_failed', 'retries'):
+                setattr(total, field, getattr(total, field) + getattr(writer.progress, field))
+            total.last_error = writer.progress.last_error or total.last_error
+        on_progress(total)
+
+    async def write_account(account_id: int, rows: List[Dict[str, Any]]) -> None:
+        writer = TransactionBatchWriter(repository, batch_size=batch_size, on_progress=report)
+        writers.append(writer)
+        for row in rows:
+            if rules:
+                row['category_id'] = rules.match(row['description'], Decimal(row['amount']), account_id)
+                if row['category_id'] is not None:
+                    summary.transactions_categorized += 1
+            await writer.add_row(row)
+        await writer.flush()
+
+    await asyncio.gather(*(write_account(account_id, rows) for account_id, rows in rows_by_account.items()))
+
+    for writer in writers:
+        progress = writer.progress
+        summary.transactions_inserted += progress.rows_inserted
+        summary.duplicates_skipped += progress.rows_duplicate
+        summary.transactions_failed += progress.rows_failed
+        summary.batches_written += progress.batches_written
+        summary.batches_failed += progress.batches_failed
+        if progress.last_error:
+            _add_error(summary, f"{progress.batches_failed} batch(es) failed to write: {progress.last_error}")
+
+    if not summary.batches_failed:
+        ranges = []
+        for result in parsed_files:
+            for statement in result.statements:
+                period = statement_dates(statement)
+                account_id = account_ids.get(build_account_name(statement.account))
+                if period and account_id is not None:
+                    ranges.append((account_id, period))
+        await ledger.record_ranges(ranges)
+        await asyncio.gather(*(
+            ledger.record_file(digest, "ofx", result.parsed)
+            for result, digest in zip(parsed_files, parsed_digests) if digest is not None
+        ))
+
+    elapsed = max(time.perf_counter() - started, 1e-6)
+    logger.info(
+        "Batch import finished: %s files (%s failed), %s transactions in %.2fs (parsing %.2fs); "
+        "%.1f files/s, %.0f rows/s.",
+        summary.files_processed, summary.files_failed, summary.transactions_parsed, elapsed, parsed_at - started,
+        summary.files_processed / elapsed, summary.transactions_parsed / elapsed,
+    )
+    return summary
@@ -0,0 +1,299 @@
+import asyncio
+import logging
+import os
+from collections import deque
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from fastapi import Depends
+
+from core.events import TransactionEvents, transaction_events
+from core.repository import Repository, get_repository
+from models.budgets import BudgetAlert, BudgetPeriod, BudgetProgress, GoalProgress
+from models.financials import TransactionFilterParams
+from services.dashboard import add_months, month_start
+from services.export import iter_transaction_chunks
+
+logger = logging.getLogger(__name__)
+
+# Fractions of a budget at which an alert is raised when spending crosses them
+BUDGET_ALERT_THRESHOLDS = tuple(sorted(
+    float(value) for value in os.environ.get("BUDGET_ALERT_THRESHOLDS", "0.8,1.0").split(",") if value.strip()
+))
+
+# Alerts kept for GET /dashboard/budgets
+MAX_RECENT_ALERTS = 100
+
+# Columns read to build the running totals
+BUDGET_COLUMNS = ["id", "date", "amount", "category_id"]
+
+AlertListener = Callable[[BudgetAlert], None]
+
+CENT = Decimal("0.01")
+
+
+def _day(value: Any) -> date:
+    return value if isinstance(value, date) else date.fromisoformat(value[:10])
+
+
+def _cents(value: Any) -> int:
+    return int((Decimal(str(value)) * 100).to_integral_value())
+
+
+def _money(cents: int) -> Decimal:
+    return (Decimal(cents) / 100).quantize(CENT)
+
+
+def budget_period(period: str, today: date) -> Tuple[date, date]:
+    """First and last day of the monthly or yearly period containing `today`."""
+    if period == BudgetPeriod.yearly:
+        return date(today.year, 1, 1), date(today.year, 12, 31)
+    start = month_start(today)
+    return start, date.fromordinal(add_months(start, 1).toordinal() - 1)
+
+
+class BudgetEngine:
+    """Running net spending per (category, month) for the current year, kept by delta.
+
+    Totals are built on first use, or on the first write seen, from this year's
+    transactions. After that, rows inserted or updated through the repository (imports,
+    recategorization, bulk updates, rule re-apply) are picked up from TransactionEvents
+    and applied as the difference from the row's previous state, so budget progress
+    costs a lookup per budget instead of a scan. A budget whose spending crosses one of
+    BUDGET_ALERT_THRESHOLDS raises a BudgetAlert, which is logged, kept for the
+    dashboard and passed to subscribers.
+
+    Writes seen before the totals and budgets are loaded are caught up in a background
+    task once they are: the load already counts those rows, so inserted ones are taken
+    back out to find the spending they crossed from. (An update's previous state is
+    unknown by then, so it raises no alert.)
+    """
+
+    def __init__(
+        self,
+        repository: Repository,
+        events: TransactionEvents = transaction_events,
+        today: Callable[[], date] = date.today,
+    ):
+        self.repository = repository
+        self.today = today
+        self.alerts: Deque[BudgetAlert] = deque(maxlen=MAX_RECENT_ALERTS)
+        self._budgets: Optional[List[Dict[str, Any]]] = None
+        self._year: Optional[int] = None # Year the totals cover; None until loaded
+        self._totals: Dict[Tuple[Optional[int], date], int] = {} # (category_id, month) -> net spending in cents
+        self._rows: Dict[int, Tuple[Optional[int], date, int]] = {} # transaction id -> (category_id, month, spent cents)
+        self._missed: List[Tuple[str, List[Dict[str, Any]]]] = [] # Writes seen before loading, as (kind, rows)
+        self._catch_up_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self._listeners: List[AlertListener] = []
+        self._unsubscribe = events.subscribe(self._on_change)
+
+    def subscribe(self, listener: AlertListener) -> Callable[[], None]:
+        """Registers a listener for budget alerts and returns a function that removes it."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    async def reload_budgets(self) -> None:
+        """Re-reads the budgets; call after creating, changing or deleting one."""
+        try:
+            budgets = await self.repository.list_budgets()
+        except Exception as e: # The write succeeded; read them again on next use
+            logger.exception("Could not reload budgets: %s", e)
+            self._budgets = None
+            return
+        self._budgets = budgets
+
+    def _on_change(self, kind: str, rows: List[Dict[str, Any]]) -> None:
+        if self._year == self.today().year and self._budgets is not None and not self._missed:
+            self._apply(rows)
+            return
+        self._missed.append((kind, rows))
+        if self._catch_up_task is None or self._catch_up_task.done():
+            try:
+                self._catch_up_task = asyncio.get_running_loop().create_task(self._catch_up())
+            except RuntimeError: # No event loop (a synchronous caller); the next load sees the rows
+                self._missed.clear()
+
+    async def _catch_up(self) -> None:
+        """Loads what is missing, then applies the writes seen meanwhile, alerting on inserts."""
+        try:
+            await self.budgets()
+        except Exception as e:
+            logger.exception("Could not load budget totals: %s", e)
+            self._missed.clear()
+            return
+        missed, self._missed = self._missed, []
+        self._apply([row for _, rows in missed for row in rows], alert=False) # Rows the load did not see
+        inserted = [self._rows[row['id']] for kind, rows in missed if kind == "inserted" for row in rows if row.get('id') in self._rows]
+        for category_id, month, cents in inserted:
+            self._move(category_id, month, -cents)
+        before = self._spent_by_budget()
+        for state in inserted:
+            self._move(*state)
+        self._raise_alerts(before, self._spent_by_budget())
+
+    async def _load(self, year: int) -> None:
+        self._totals, self._rows = {}, {}
+        filters = TransactionFilterParams(start_date=date(year, 1, 1), end_date=date(year, 12, 31))
+        async for rows in iter_transaction_chunks(self.repository, filters, columns=BUDGET_COLUMNS):
+            self._apply(rows, year=year, alert=False)
+        self._year = year
+        logger.info("Loaded budget totals: %s transactions in %s.", len(self._rows), year)
+
+    def _move(self, category_id: Optional[int], month: date, cents: int) -> None:
+        key = (category_id, month)
+        total = self._totals.get(key, 0) + cents
+        if total:
+            self._totals[key] = total
+        else:
+            self._totals.pop(key, None)
+
+    def _apply(self, rows: List[Dict[str, Any]], year: Optional[int] = None, alert: bool = True) -> None:
+        year = year or self._year
+        before = self._spent_by_budget() if alert and self._budgets else None
+        for row in rows:
+            if row.get('id') is None or not row.get('date') or row.get('amount') is None:
+                continue
+            day = _day(row['date'])
+            if day.year != year:
+                continue
+            state = (row.get('category_id'), month_start(day), -_cents(row['amount']))
+            previous = self._rows.get(row['id'])
+            if previous == state:
+                continue
+            if previous is not None:
+                self._move(previous[0], previous[1], -previous[2])
+            self._move(*state)
+            self._rows[row['id']] = state
+        if before is not None:
+            self._raise_alerts(before, self._spent_by_budget())
+
+    def spent(self, category_id: int, start: date, end: date) -> int:
+        """Net spending in cents for a category over whole months from `start` to `end`."""
+        month, total = month_start(start), 0
+        while month <= end:
+            total += self._totals.get((category_id, month), 0)
+            month = add_months(month, 1)
+        return total
+
+    def _spent_by_budget(self) -> Dict[int, int]:
+        today = self.today()
+        return {budget['id']: self.spent(budget['category_id'], *budget_period(budget['period'], today)) for budget in self._budgets}
+
+    def _raise_alerts(self, before: Dict[int, int], after: Dict[int, int]) -> None:
+        today = self.today()
+        for budget in self._budgets:
+            limit = _cents(budget['amount'])
+            old, new = before.get(budget['id'], 0), after.get(budget['id'], 0)
+            for threshold in BUDGET_ALERT_THRESHOLDS:
+                if old < threshold * limit <= new:
+                    self._emit(BudgetAlert(
+                        budget_id=budget['id'],
+                        category_id=budget['category_id'],
+                        period_start=budget_period(budget['period'], today)[0],
+                        threshold=threshold,
+                        spent=_money(new),
+                        amount=Decimal(str(budget['amount'])),
+                        created_at=datetime.now(timezone.utc),
+                    ))
+
+    def _emit(self, alert: BudgetAlert) -> None:
+        logger.info(
+            "Budget alert: %.0f%% of budget %s (category %s) spent.",
+            alert.threshold * 100, alert.budget_id, alert.category_id,
+            extra={'budget_id': alert.budget_id, 'category_id': alert.category_id, 'spent': str(alert.spent)},
+        )
+        self.alerts.append(alert)
+        for listener in list(self._listeners):
+            try:
+                listener(alert)
+            except Exception as e: # A broken listener must not fail the write
+                logger.exception("Budget alert listener %r failed: %s", listener, e)
+
+    async def budgets(self) -> List[Dict[str, Any]]:
+        """Returns the budgets, with totals up to date for the current year."""
+        year = self.today().year
+        if self._budgets is None or self._year != year:
+            async with self._lock:
+                if self._year != year:
+                    await self._load(year)
+                if self._budgets is None:
+                    self._budgets = await self.repository.list_budgets()
+        return self._budgets
+
+    def recent_alerts(self) -> List[BudgetAlert]:
+        """Alerts raised for the budgets' current periods, newest first."""
+        today = self.today()
+        current = {budget['id']: budget_period(budget['period'], today)[0] for budget in self._budgets or []}
+        return [alert for alert in reversed(self.alerts) if current.get(alert.budget_id) == alert.period_start]
+
+    def close(self) -> None:
+        self._unsubscribe()
+        if self._catch_up_task is not None:
+            self._catch_up_task.cancel()
+
+
+
+def build_budget_progress(engine: BudgetEngine, budgets: List[Dict[str, Any]], category_names: Dict[int, str]) -> List[BudgetProgress]:
+    """Progress of each budget in its current period, most spent relative to the budget first."""
+    today = engine.today()
+    progress = []
+    for budget in budgets:
+        start, end = budget_period(budget['period'], today)
+        amount = Decimal(str(budget['amount']))
+        spent = _money(engine.spent(budget['category_id'], start, end))
+        progress.append(BudgetProgress(
+            **budget,
+            category_name=category_names.get(budget['category_id']),
+            period_start=start,
+            period_end=end,
+            spent=spent,
+            remaining=amount - spent,
+            fraction_spent=float(spent / amount),
+        ))
+    progress.sort(key=lambda item: -item.fraction_spent)
+    return progress
+
+
+def account_balances(rollups: List[Dict[str, Any]]) -> Dict[int, Decimal]:
+    balances: Dict[int, Decimal] = {}
+    for row in rollups:
+        balances[row['account_id']] = balances.get(row['account_id'], Decimal(0)) + Decimal(str(row['income'])) - Decimal(str(row['spending']))
+    return balances
+
+
+def build_goal_progress(goal: Dict[str, Any], balances: Dict[int, Decimal], today: date) -> GoalProgress:
+    """Progress toward a goal, and the monthly saving that would meet its deadline."""
+    target = Decimal(str(goal['target_amount']))
+    if goal.get('account_id') is not None:
+        saved = balances.get(goal['account_id'], Decimal(0))
+    else:
+        saved = Decimal(str(goal.get('current_amount') or 0))
+    remaining = max(target - saved, Decimal(0))
+    monthly_needed = None
+    deadline = goal.get('deadline') and _day(goal['deadline'])
+    if deadline and remaining:
+        # Months left, counting the current one, and at least one for a passed deadline
+        months = max((deadline.year - today.year) * 12 + deadline.month - today.month + 1, 1)
+        monthly_needed = (remaining / months).quantize(CENT)
+    return GoalProgress(
+        **goal,
+        saved=saved,
+        remaining=remaining,
+        fraction_saved=float(saved / target),
+        monthly_needed=monthly_needed,
+    )
+
+
+_engine: Optional[BudgetEngine] = None
+
+
+def get_budget_engine(repository: Repository = Depends(get_repository)) -> BudgetEngine:
+    """FastAPI dependency returning the shared budget engine for the repository in use."""
+    global _engine
+    if _engine is None or _engine.repository is not repository:
+        if _engine is not None:
+            _engine.close()
+        _engine = BudgetEngine(repository, repository.events)
+    return _engine
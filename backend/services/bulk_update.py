@@ -0,0 +1,81 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Tuple
+
+from core.repository import Repository
+from models.financials import TransactionBulkItem, TransactionBulkItemResult, TransactionBulkResult
+from services.category_cache import CategoryCache
+
+logger = logging.getLogger(__name__)
+
+# Ids per UPDATE ... WHERE id IN (...) statement, keeping the request URL short
+BULK_UPDATE_CHUNK_SIZE = 200
+
+# Most items accepted by one PATCH /transactions/bulk request
+MAX_BULK_ITEMS = 1000
+
+
+def _group_key(values: Dict[str, Any]) -> Tuple:
+    """Hashable form of an update, so items sharing the same change can be grouped."""
+    return tuple(sorted((k, tuple(v) if isinstance(v, list) else v) for k, v in values.items()))
+
+
+async def apply_bulk_updates(
+    repository: Repository,
+    categories: CategoryCache,
+    items: List[TransactionBulkItem],
+) -> TransactionBulkResult:
+    """Applies per-transaction updates, one statement per distinct update (and chunk of ids).
+
+    Reconciliation sessions mostly send the same few changes (e.g. reconciled=true),
+    so hundreds of items usually collapse into a handful of round trips. Every item
+    gets its own result; a failing statement only fails the items it covered.
+    """
+    results: Dict[int, TransactionBulkItemResult] = {}
+    groups: Dict[Tuple, Tuple[Dict[str, Any], List[int]]] = {}
+    order: List[int] = []
+    seen = set()
+
+    for item in items:
+        if item.id in seen:
+            continue # Duplicate ids: the first occurrence wins
+        seen.add(item.id)
+        order.append(item.id)
+        values = item.model_dump(exclude_unset=True, exclude={'id'})
+        if not values:
+            results[item.id] = TransactionBulkItemResult(id=item.id, status="invalid", error="No update data provided.")
+            continue
+        category_id = values.get('category_id')
+        if category_id is not None and not await categories.exists(category_id):
+            results[item.id] = TransactionBulkItemResult(
+                id=item.id, status="invalid", error=f"Category with id {category_id} does not exist."
+            )
+            continue
+        groups.setdefault(_group_key(values), (values, []))[1].append(item.id)
+
+    statements = [
+        (values, ids[start:start + BULK_UPDATE_CHUNK_SIZE])
+        for values, ids in groups.values()
+        for start in range(0, len(ids), BULK_UPDATE_CHUNK_SIZE)
+    ]
+    outcomes = await asyncio.gather(
+        *(repository.update_transactions(ids, values) for values, ids in statements),
+        return_exceptions=True,
+    )
+
+    for (values, ids), outcome in zip(statements, outcomes):
+        if isinstance(outcome, Exception):
+            logger.error("Error bulk updating %s transactions: %s", len(ids), outcome)
+            for transaction_id in ids:
+                results[transaction_id] = TransactionBulkItemResult(id=transaction_id, status="failed", error=str(outcome))
+            continue
+        updated_ids = {row['id'] for row in outcome}
+        for transaction_id in ids:
+            status = "updated" if transaction_id in updated_ids else "not_found"
+            results[transaction_id] = TransactionBulkItemResult(id=transaction_id, status=status)
+
+    ordered = [results[transaction_id] for transaction_id in order]
+    return TransactionBulkResult(
+        updated=sum(1 for result in ordered if result.status == "updated"),
+        results=ordered,
+    )
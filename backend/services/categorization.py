@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set
+
+from fastapi import Depends
+
+from core.repository import Repository, get_repository
+from models.financials import TransactionFilterParams
+from models.imports import ImportJobStatus
+from models.rules import CategorizationRule, RuleApplyJob
+from services.bulk_update import BULK_UPDATE_CHUNK_SIZE
+from services.export import iter_transaction_chunks
+from services.rules import RuleSet
+
+logger = logging.getLogger(__name__)
+
+# Columns needed to evaluate rules against stored transactions
+REAPPLY_COLUMNS = ["id", "date", "account_id", "description", "amount", "category_id"]
+
+# Finished re-apply jobs kept for GET /rules/apply/{id}
+MAX_TRACKED_JOBS = 50
+
+
+async def compile_rules(repository: Repository) -> RuleSet:
+    rows = await repository.list_rules()
+    return RuleSet(CategorizationRule.model_validate(row) for row in rows)
+
+
+async def load_rule_set(repository: Repository) -> RuleSet:
+    """Compiles the rules for an import. If they can't be loaded the import still runs, uncategorized."""
+    try:
+        return await compile_rules(repository)
+    except Exception as e:
+        logger.warning("Could not load categorization rules, importing without them: %s", e)
+        return RuleSet([])
+
+
+async def reapply_rules(
+    repository: Repository,
+    rule_set: RuleSet,
+    filters: TransactionFilterParams,
+    overwrite: bool,
+    progress: RuleApplyJob,
+) -> None:
+    """Runs the rules over stored transactions, chunk by chunk, updating `progress` as it goes.
+
+    Matches in a chunk are grouped by category, so each chunk costs one UPDATE per
+    category that changed rather than one per transaction.
+    """
+    async for rows in iter_transaction_chunks(repository, filters, columns=REAPPLY_COLUMNS):
+        changes: Dict[int, List[int]] = {}
+        for row in rows:
+            progress.transactions_scanned += 1
+            current = row.get('category_id')
+            if current is not None and not overwrite:
+                continue
+            category_id = rule_set.match(row.get('description'), row['amount'], row.get('account_id'))
+            if category_id is None:
+                continue
+            progress.transactions_matched += 1
+            if category_id != current:
+                changes.setdefault(category_id, []).append(row['id'])
+
+        updates = [
+            repository.update_transactions(ids[start:start + BULK_UPDATE_CHUNK_SIZE], {'category_id': category_id})
+            for category_id, ids in changes.items()
+            for start in range(0, len(ids), BULK_UPDATE_CHUNK_SIZE)
+        ]
+        for updated in await asyncio.gather(*updates):
+            progress.transactions_updated += len(updated)
+
+
+class RuleApplyJobs:
+    """Runs "re-apply rules" jobs in the background and keeps their progress in memory.
+
+    Re-applying is idempotent, so a job lost to a restart can simply be started again;
+    unlike imports there is nothing to persist.
+    """
+
+    def __init__(self, repository: Repository, max_tracked: int = MAX_TRACKED_JOBS):
+        self.repository = repository
+        self.max_tracked = max_tracked
+        self._jobs: "OrderedDict[str, RuleApplyJob]" = OrderedDict()
+        self._tasks: Set[asyncio.Task] = set()
+
+    def start(self, filters: TransactionFilterParams, overwrite: bool = False) -> RuleApplyJob:
+        job = RuleApplyJob(
+            id=uuid.uuid4().hex,
+            status=ImportJobStatus.queued,
+            created_at=datetime.now(timezone.utc),
+        )
+        self._jobs[job.id] = job
+        while len(self._jobs) > self.max_tracked:
+            self._jobs.popitem(last=False)
+        task = asyncio.create_task(self._run(job, filters, overwrite))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def get(self, job_id: str) -> Optional[RuleApplyJob]:
+        return self._jobs.get(job_id)
+
+    async def _run(self, job: RuleApplyJob, filters: TransactionFilterParams, overwrite: bool) -> None:
+        job.status = ImportJobStatus.running
+        try:
+            rule_set = await compile_rules(self.repository)
+            await reapply_rules(self.repository, rule_set, filters, overwrite, job)
+            job.status = ImportJobStatus.completed
+            logger.info(
+                "Re-applied %s rules: %s of %s transactions updated.",
+                len(rule_set), job.transactions_updated, job.transactions_scanned,
+            )
+        except asyncio.CancelledError:
+            job.status = ImportJobStatus.failed
+            job.error = "Interrupted by shutdown."
+            raise
+        except Exception as e:
+            logger.exception("Rule re-apply job %s failed: %s", job.id, e)
+            job.status = ImportJobStatus.failed
+            job.error = str(e)
+        finally:
+            job.finished_at = datetime.now(timezone.utc)
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+_rule_jobs: Optional[RuleApplyJobs] = None
+
+
+def get_rule_jobs(repository: Repository = Depends(get_repository)) -> RuleApplyJobs:
+    """FastAPI dependency returning the shared re-apply job runner for the repository in use.
+
+    Jobs already running against a previous repository are left to finish.
+    """
+    global _rule_jobs
+    if _rule_jobs is None or _rule_jobs.repository is not repository:
+        _rule_jobs = RuleApplyJobs(repository)
+    return _rule_jobs
+
+
+async def stop_rule_jobs() -> None:
+    global _rule_jobs
+    if _rule_jobs is not None:
+        await _rule_jobs.stop()
+        _rule_jobs = None
@@ -0,0 +1,90 @@
+import asyncio
+import hashlib
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import Depends
+
+from core.encoding import dumps
+from core.repository import Repository, get_repository
+
+# Seconds a loaded category list is served before it is re-read from Supabase
+CATEGORY_CACHE_TTL = float(os.environ.get("CATEGORY_CACHE_TTL", 300))
+
+# An unknown category_id triggers at most one early reload per this many seconds,
+# so a category added directly in Supabase becomes usable without waiting for the TTL
+UNKNOWN_ID_RELOAD_INTERVAL = 5.0
+
+
+class CategorySnapshot:
+    """One loaded copy of the categories table, with its pre-encoded response body."""
+
+    def __init__(self, rows: List[Dict[str, Any]], loaded_at: float):
+        self.rows = rows # Ordered by name, as list_categories returns them
+        self.by_id = {row['id']: row for row in rows}
+        self.body = dumps(rows)
+        self.etag = f'"{hashlib.sha1(self.body).hexdigest()}"'
+        self.loaded_at = loaded_at
+
+
+class CategoryCache:
+    """In-process cache of the categories table.
+
+    Entries expire after `ttl` seconds and can be dropped explicitly with `invalidate()`
+    (call it after writing to the categories table). Concurrent misses share one load.
+    """
+
+    def __init__(
+        self,
+        repository: Repository,
+        ttl: float = CATEGORY_CACHE_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.repository = repository
+        self.ttl = ttl
+        self._clock = clock
+        self._snapshot: Optional[CategorySnapshot] = None
+        self._lock = asyncio.Lock()
+
+    def _is_fresh(self, snapshot: Optional[CategorySnapshot]) -> bool:
+        return snapshot is not None and self._clock() - snapshot.loaded_at < self.ttl
+
+    async def get(self) -> CategorySnapshot:
+        """Returns the cached categories, loading them if missing or expired."""
+        snapshot = self._snapshot
+        if self._is_fresh(snapshot):
+            return snapshot
+        async with self._lock:
+            if not self._is_fresh(self._snapshot): # Another request may have loaded it meanwhile
+                await self._load()
+            return self._snapshot
+
+    async def _load(self) -> None:
+        rows = await self.repository.list_categories()
+        self._snapshot = CategorySnapshot(rows, self._clock())
+
+    def invalidate(self) -> None:
+        self._snapshot = None
+
+    async def exists(self, category_id: int) -> bool:
+        """Checks a category id against the cache, reloading once if it looks stale."""
+        snapshot = await self.get()
+        if category_id in snapshot.by_id:
+            return True
+        async with self._lock:
+            snapshot = self._snapshot # May have been invalidated or reloaded meanwhile
+            if snapshot is None or self._clock() - snapshot.loaded_at >= UNKNOWN_ID_RELOAD_INTERVAL:
+                await self._load()
+            return category_id in self._snapshot.by_id
+
+
+_category_cache: Optional[CategoryCache] = None
+
+
+def get_category_cache(repository: Repository = Depends(get_repository)) -> CategoryCache:
+    """FastAPI dependency returning the shared category cache for the repository in use."""
+    global _category_cache
+    if _category_cache is None or _category_cache.repository is not repository:
+        _category_cache = CategoryCache(repository)
+    return _category_cache
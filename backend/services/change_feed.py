@@ -0,0 +1,163 @@
+import asyncio
+import os
+import secrets
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, NamedTuple, Optional, Tuple
+
+from core.encoding import dumps, prepare_transaction_rows
+from core.events import TransactionEvents, transaction_events
+from models.financials import Transaction
+
+# Transaction rows kept for reconnecting clients to catch up on; older changes are
+# dropped and a client that missed them is told to reload
+CHANGE_FEED_MAX_ROWS = int(os.environ.get("CHANGE_FEED_MAX_ROWS", 50000))
+# Seconds between keep-alive comments on an idle stream (keeps proxies from closing it)
+CHANGE_FEED_HEARTBEAT = float(os.environ.get("CHANGE_FEED_HEARTBEAT", 15))
+# Milliseconds a browser's EventSource waits before reconnecting
+CHANGE_FEED_RETRY_MS = 3000
+
+# Fields sent for each changed transaction: the Transaction model's, without the import key
+CHANGE_FIELDS = tuple(field for field in Transaction.model_fields if field != 'fitid')
+
+
+class Change(NamedTuple):
+    seq: int
+    kind: str # "inserted" or "updated"
+    rows: List[Dict[str, Any]]
+
+
+class ChangeFeed:
+    """Numbered log of recent transaction writes, for GET /transactions/changes.
+
+    Subscribes to TransactionEvents, so it sees every insert and update made through
+    the repository: imports, edits, bulk updates and rule re-apply. Each write batch is
+    one change with the next sequence number. Event ids sent to clients are
+    `<epoch>-<seq>`, where the epoch is random per process, so a client reconnecting
+    after a restart (or to another worker) is told to reload instead of being given
+    unrelated changes.
+    """
+
+    def __init__(self, events: TransactionEvents = transaction_events, max_rows: int = CHANGE_FEED_MAX_ROWS):
+        self.epoch = secrets.token_hex(4)
+        self.max_rows = max_rows
+        self._changes: Deque[Change] = deque()
+        self._rows = 0
+        self._seq = 0
+        self._changed = asyncio.Event()
+        self._unsubscribe = events.subscribe(self._on_change)
+
+    def _on_change(self, kind: str, rows: List[Dict[str, Any]]) -> None:
+        compact = prepare_transaction_rows([{field: row.get(field) for field in CHANGE_FIELDS} for row in rows])
+        self._seq += 1
+        self._changes.append(Change(self._seq, kind, compact))
+        self._rows += len(compact)
+        while self._rows > self.max_rows and len(self._changes) > 1:
+            self._rows -= len(self._changes.popleft().rows)
+        # Wake every waiting stream; later waiters get a fresh event
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    def event_id(self, seq: int) -> str:
+        return f"{self.epoch}-{seq}"
+
+    def parse_event_id(self, event_id: str) -> Optional[int]:
+        """The sequence number in an event id from this feed, or None if it came from another epoch."""
+        epoch, _, seq = event_id.partition("-")
+        if epoch != self.epoch or not seq.isdigit() or int(seq) > self._seq:
+            return None
+        return int(seq)
+
+    def changes_after(self, seq: int) -> Tuple[bool, List[Change]]:
+        """Changes newer than `seq`; the flag is False if some of them were already dropped."""
+        if self._changes and self._changes[0].seq > seq + 1:
+            return False, list(self._changes)
+        if not self._changes and seq < self._seq:
+            return False, []
+        return True, [change for change in self._changes if change.seq > seq]
+
+    @property
+    def changed(self) -> asyncio.Event:
+        """Set by the next change. Take it before reading `changes_after`, then `wait` on it."""
+        return self._changed
+
+    async def wait(self, changed: asyncio.Event, timeout: float) -> bool:
+        """Waits for a change after `changed` was taken; returns False on timeout."""
+        try:
+            await asyncio.wait_for(changed.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def close(self) -> None:
+        self._unsubscribe()
+
+
+def _sse(event: str, data: Any, event_id: Optional[str] = None) -> bytes:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\n".encode() + b"data: " + dumps(data) + b"\n\n"
+
+
+async def stream_changes(
+    feed: ChangeFeed,
+    last_event_id: Optional[str] = None,
+    account_id: Optional[int] = None,
+    heartbeat: float = CHANGE_FEED_HEARTBEAT,
+) -> AsyncIterator[bytes]:
+    """Server-sent events for every change after `last_event_id` (or from now on).
+
+    Streams `inserted` and `updated` events whose data is `{"rows": [...]}`. A `reset`
+    event means changes were missed (the id is from before a restart, or too old) and
+    the client should reload before applying further events. The first event is
+    `ready`, carrying the id to resume from.
+    """
+    yield f"retry: {CHANGE_FEED_RETRY_MS}\n\n".encode()
+    seq = feed.parse_event_id(last_event_id) if last_event_id else None
+    if last_event_id and seq is None:
+        yield _sse("reset", {'reason': "unknown event id"}, feed.event_id(feed.last_seq))
+        seq = feed.last_seq
+    elif seq is None:
+        seq = feed.last_seq
+    else:
+        complete, _ = feed.changes_after(seq)
+        if not complete:
+            yield _sse("reset", {'reason': "changes since this event id are no longer available"}, feed.event_id(feed.last_seq))
+            seq = feed.last_seq
+    yield _sse("ready", {'last_event_id': feed.event_id(seq)}, feed.event_id(seq))
+
+    while True:
+        # Taken before reading, so a change made while the events below are sent still wakes us
+        changed = feed.changed
+        complete, changes = feed.changes_after(seq)
+        if not complete: # This client fell behind the buffer
+            seq = feed.last_seq
+            yield _sse("reset", {'reason': "changes arrived faster than they were read"}, feed.event_id(seq))
+            continue
+        for change in changes:
+            seq = change.seq
+            rows = change.rows if account_id is None else [row for row in change.rows if row['account_id'] == account_id]
+            if rows:
+                yield _sse(change.kind, {'rows': rows}, feed.event_id(change.seq))
+        if not await feed.wait(changed, heartbeat):
+            yield b": keep-alive\n\n"
+
+
+_feed: Optional[ChangeFeed] = None
+
+
+def get_change_feed() -> ChangeFeed:
+    """FastAPI dependency returning the shared change feed (started by the app's lifespan)."""
+    global _feed
+    if _feed is None:
+        _feed = ChangeFeed()
+    return _feed
+
+
+def stop_change_feed() -> None:
+    global _feed
+    if _feed is not None:
+        _feed.close()
+        _feed = None
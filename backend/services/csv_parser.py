@@ -0,0 +1,234 @@
+import csv
+import io
+import logging
+import os
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from models.imports import CsvColumnMapping, ImportOptions, ImportSummary
+from core.repository import Repository, get_repository
+from services.categorization import load_rule_set
+from services.persistence import BatchProgress
+from services.ingest import (
+    INSERT_BATCH_SIZE,
+    ImportPipeline,
+    ParsedChunk,
+    StatementAccount,
+    detect_encoding,
+    infer_date_format,
+    infer_decimal_comma,
+    ingest_chunks,
+    normalize_columns,
+    parse_amounts,
+)
+
+logger = logging.getLogger(__name__)
+
+# Data rows parsed per chunk. Peak memory is a chunk plus one write batch, whatever the file size.
+CSV_CHUNK_ROWS = int(os.environ.get("CSV_CHUNK_ROWS", 10000))
+
+# Bytes read up front to detect the encoding and dialect
+CSV_SAMPLE_BYTES = 64 * 1024
+
+# Header names (lower-case) recognised for each field when no mapping is given, in order of preference
+HEADER_ALIASES: Dict[str, List[str]] = {
+    'date': ['date', 'transaction date', 'posted date', 'posting date', 'booking date', 'processed date', 'value date'],
+    'amount': ['amount', 'transaction amount', 'value'],
+    'debit': ['debit', 'debit amount', 'withdrawal', 'withdrawals', 'money out', 'paid out'],
+    'credit': ['credit', 'credit amount', 'deposit', 'deposits', 'money in', 'paid in'],
+    'description': ['description', 'payee', 'details', 'transaction details', 'narrative', 'particulars', 'memo', 'name'],
+    'fitid': ['fitid', 'transaction id', 'unique id', 'reference number'],
+    'transaction_type': ['type', 'transaction type', 'tran type'],
+}
+
+
+class CsvLayout(NamedTuple):
+    """Column positions and value formats of one CSV file."""
+    date: int
+    amount: Optional[int]
+    debit: Optional[int]
+    credit: Optional[int]
+    description: List[int]
+    fitid: Optional[int]
+    transaction_type: Optional[int]
+
+
+def sniff_dialect(sample: str):
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=",;\t|")
+    except csv.Error:
+        return csv.excel
+
+
+def resolve_layout(header: Sequence[str], mapping: CsvColumnMapping) -> CsvLayout:
+    """Finds the mapped (or recognised) columns in the header row. Raises ValueError if one is missing."""
+    positions = {name.strip().lower(): i for i, name in reversed(list(enumerate(header)))}
+
+    def find(field: str, configured: Optional[str]) -> Optional[int]:
+        if configured is not None:
+            if configured.strip().lower() not in positions:
+                raise ValueError(f"Column '{configured}' (mapped to {field}) is not in the header.")
+            return positions[configured.strip().lower()]
+        return next((positions[alias] for alias in HEADER_ALIASES[field] if alias in positions), None)
+
+    date = find('date', mapping.date)
+    if date is None:
+        raise ValueError("No date column found; map one with `date`.")
+    if mapping.debit or mapping.credit:
+        amount = None
+        debit = find('debit', mapping.debit) if mapping.debit else None
+        credit = find('credit', mapping.credit) if mapping.credit else None
+    else:
+        amount = find('amount', mapping.amount)
+        # Exports without a signed amount split it into money out / money in columns
+        debit = find('debit', None) if amount is None else None
+        credit = find('credit', None) if amount is None else None
+    if amount is None and debit is None and credit is None:
+        raise ValueError("No amount column found; map `amount`, or `debit` and `credit`.")
+    if mapping.description:
+        description = [find('description', name) for name in mapping.description]
+    else:
+        found = find('description', None)
+        description = [found] if found is not None else []
+    return CsvLayout(
+        date=date,
+        amount=amount,
+        debit=debit,
+        credit=credit,
+        description=description,
+        fitid=find('fitid', mapping.fitid),
+        transaction_type=find('transaction_type', mapping.transaction_type),
+    )
+
+
+def _amount_column(columns: List[Sequence[str]], layout: CsvLayout, decimal_comma: bool):
+    """Signed cents and a validity mask, from an amount column or from debit/credit columns."""
+    if layout.amount is not None:
+        return parse_amounts(columns[layout.amount], decimal_comma)
+    size = len(columns[layout.date])
+    cents = np.zeros(size, dtype=np.int64)
+    valid = np.ones(size, dtype=bool)
+    present = np.zeros(size, dtype=bool)
+    for index, sign in ((layout.debit, -1), (layout.credit, 1)):
+        if index is None:
+            continue
+        values = columns[index]
+        side, ok = parse_amounts(values, decimal_comma)
+        empty = np.char.str_len(np.char.strip(np.asarray(values, dtype=str))) == 0
+        cents += np.where(ok, sign * np.abs(side), 0)
+        valid &= ok | empty
+        present |= ~empty
+    return cents, valid & present
+
+
+def _numbered_rows(reader) -> Iterator[Tuple[int, List[str]]]:
+    """Pairs each row with the 1-based line it starts on (quoted fields may span lines)."""
+    start = reader.line_num + 1
+    for row in reader:
+        yield start, row
+        start = reader.line_num + 1
+
+
+def iter_csv_chunks(
+    stream,
+    mapping: Optional[CsvColumnMapping] = None,
+    chunk_rows: int = CSV_CHUNK_ROWS,
+) -> Iterator[ParsedChunk]:
+    """Reads a CSV bank export from a seekable binary stream, one chunk of rows at a time.
+
+    The encoding and delimiter are inferred from the start of the file; the date format
+    and decimal separator from the first chunk, unless the mapping sets them. Bytes later
+    in the file that don't decode are replaced (U+FFFD) rather than failing the import.
+    Each chunk's dates and amounts are converted column-wise (see `services.ingest`).
+    """
+    mapping = mapping or CsvColumnMapping()
+    sample = stream.read(CSV_SAMPLE_BYTES)
+    stream.seek(0)
+    encoding = detect_encoding(sample)
+    text_sample = sample.decode(encoding, errors='ignore').splitlines()[mapping.skip_rows:]
+    # Leave out the last, possibly truncated, line
+    dialect = sniff_dialect("\n".join(text_sample[:-1] if len(text_sample) > 1 else text_sample))
+
+    reader = csv.reader(io.TextIOWrapper(stream, encoding=encoding, errors='replace', newline=''), dialect)
+    for _ in range(mapping.skip_rows):
+        next(reader, None)
+    header = next(reader, None)
+    if header is None:
+        return
+    layout = resolve_layout(header, mapping)
+    width = len(header)
+    date_format, decimal_comma = mapping.date_format, mapping.decimal_comma
+    numbered = _numbered_rows(reader)
+
+    while True:
+        block = list(islice(numbered, chunk_rows))
+        if not block:
+            break
+        if all(len(row) == width for _, row in block):
+            lines, rows = zip(*block)
+        else: # Blank lines and short rows
+            block = [(line, row if len(row) >= width else row + [''] * (width - len(row))) for line, row in block if any(row)]
+            if not block:
+                continue
+            lines, rows = zip(*block)
+        columns = list(zip(*rows))
+
+        if date_format is None:
+            date_format = infer_date_format(columns[layout.date])
+            if date_format is None:
+                raise ValueError("Could not recognise the date format; set `date_format` in the mapping.")
+        if decimal_comma is None:
+            amount_columns = [columns[i] for i in (layout.amount, layout.debit, layout.credit) if i is not None]
+            decimal_comma = infer_decimal_comma(value for column in amount_columns for value in column)
+
+        cents, amount_valid = _amount_column(columns, layout, decimal_comma)
+        if len(layout.description) == 1:
+            descriptions = columns[layout.description[0]]
+        elif layout.description:
+            descriptions = [
+                " - ".join(part.strip() for part in parts if part.strip())
+                for parts in zip(*(columns[i] for i in layout.description))
+            ]
+        else:
+            descriptions = [''] * len(rows)
+
+        normalized, invalid, errors = normalize_columns(
+            columns[layout.date],
+            date_format,
+            cents,
+            amount_valid,
+            descriptions,
+            fitids=columns[layout.fitid] if layout.fitid is not None else None,
+            transaction_types=columns[layout.transaction_type] if layout.transaction_type is not None else None,
+            lines=lines,
+        )
+        yield ParsedChunk(normalized, len(rows), invalid, errors)
+
+
+async def ingest_csv_file(
+    path: Path,
+    options: ImportOptions,
+    repository: Optional[Repository] = None,
+    on_progress: Optional[Callable[[BatchProgress], None]] = None,
+    batch_size: int = INSERT_BATCH_SIZE,
+) -> ImportSummary:
+    """Imports a spooled CSV export into the account named in `options`."""
+    if not options.account_name:
+        raise ValueError("CSV imports need an account name.")
+    repository = repository or get_repository()
+    rules = await load_rule_set(repository)
+    pipeline = ImportPipeline(repository, batch_size, on_progress=on_progress, rules=rules)
+    with open(path, 'rb') as f:
+        summary = await ingest_chunks(
+            pipeline,
+            iter_csv_chunks(f, options.csv),
+            StatementAccount(options.account_name, options.account_type),
+        )
+    logger.info(
+        "CSV import finished: %s inserted, %s invalid rows skipped.",
+        summary.transactions_inserted, summary.invalid_transactions,
+    )
+    return summary
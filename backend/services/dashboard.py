@@ -0,0 +1,129 @@
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from models.dashboard import (
+    AccountSummary,
+    CategorySpending,
+    DashboardSummary,
+    MonthTotals,
+    SpendingBreakdown,
+)
+
+# Months covered by GET /dashboard/spending when no range is given (including the current one)
+DEFAULT_SPENDING_MONTHS = 6
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _decimal(value: Any) -> Decimal:
+    # Supabase returns numerics as JSON numbers; go through str to avoid float artifacts
+    return value if isinstance(value, Decimal) else Decimal(str(value or 0))
+
+
+def _month(value: Any) -> date:
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+def _month_totals(month: date, income: Decimal, spending: Decimal, count: int) -> MonthTotals:
+    return MonthTotals(month=month, income=income, spending=spending, net=income - spending, transaction_count=count)
+
+
+def build_summary(rollups: Iterable[Dict[str, Any]], month: date) -> DashboardSummary:
+    """Account balances, unreconciled counts and one month's totals from rollup rows."""
+    month = month_start(month)
+    accounts: Dict[int, List] = {} # account_id -> [balance, count, unreconciled]
+    income = spending = Decimal(0)
+    month_count = 0
+
+    for row in rollups:
+        row_income, row_spending = _decimal(row['income']), _decimal(row['spending'])
+        totals = accounts.setdefault(row['account_id'], [Decimal(0), 0, 0])
+        totals[0] += row_income - row_spending
+        totals[1] += row['transaction_count']
+        totals[2] += row['unreconciled_count']
+        if _month(row['month']) == month:
+            income += row_income
+            spending += row_spending
+            month_count += row['transaction_count']
+
+    account_summaries = [
+        AccountSummary(account_id=account_id, balance=balance, transaction_count=count, unreconciled_count=unreconciled)
+        for account_id, (balance, count, unreconciled) in sorted(accounts.items())
+    ]
+    return DashboardSummary(
+        balance=sum((a.balance for a in account_summaries), Decimal(0)),
+        transaction_count=sum(a.transaction_count for a in account_summaries),
+        unreconciled_count=sum(a.unreconciled_count for a in account_summaries),
+        accounts=account_summaries,
+        month=_month_totals(month, income, spending, month_count),
+    )
+
+
+def build_spending(
+    rollups: Iterable[Dict[str, Any]],
+    start_month: date,
+    end_month: date,
+    category_names: Optional[Dict[int, str]] = None,
+) -> SpendingBreakdown:
+    """Spending and income per category and per month (cash flow) from rollup rows."""
+    category_names = category_names or {}
+    by_category: Dict[Optional[int], List] = {} # category_id -> [spending, income, count]
+    by_month: Dict[date, List] = {} # month -> [income, spending, count]
+
+    for row in rollups:
+        month = _month(row['month'])
+        if not start_month <= month <= end_month:
+            continue
+        row_income, row_spending = _decimal(row['income']), _decimal(row['spending'])
+        category = by_category.setdefault(row.get('category_id'), [Decimal(0), Decimal(0), 0])
+        category[0] += row_spending
+        category[1] += row_income
+        category[2] += row['transaction_count']
+        totals = by_month.setdefault(month, [Decimal(0), Decimal(0), 0])
+        totals[0] += row_income
+        totals[1] += row_spending
+        totals[2] += row['transaction_count']
+
+    categories = sorted(
+        (
+            CategorySpending(
+                category_id=category_id,
+                category_name=category_names.get(category_id),
+                spending=spending,
+                income=income,
+                transaction_count=count,
+            )
+            for category_id, (spending, income, count) in by_category.items()
+        ),
+        key=lambda c: (-c.spending, c.category_id is None, c.category_id or 0),
+    )
+    months: List[MonthTotals] = []
+    month = start_month
+    while month <= end_month: # Include empty months so charts have a continuous axis
+        income, spending, count = by_month.get(month, (Decimal(0), Decimal(0), 0))
+        months.append(_month_totals(month, income, spending, count))
+        month = add_months(month, 1)
+
+    return SpendingBreakdown(
+        start_month=start_month,
+        end_month=end_month,
+        total_spending=sum((c.spending for c in categories), Decimal(0)),
+        total_income=sum((c.income for c in categories), Decimal(0)),
+        by_category=categories,
+        by_month=months,
+    )
+
+
+def spending_range(start_date: Optional[date], end_date: Optional[date], today: date) -> Tuple[date, date]:
+    """Month range for GET /dashboard/spending, defaulting to the last DEFAULT_SPENDING_MONTHS months."""
+    end_month = month_start(end_date or today)
+    start_month = month_start(start_date) if start_date else add_months(end_month, 1 - DEFAULT_SPENDING_MONTHS)
+    return start_month, end_month
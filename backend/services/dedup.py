@@ -0,0 +1,145 @@
+import hashlib
+import re
+from collections import defaultdict, deque
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from difflib import SequenceMatcher
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from models.financials import SuspectedDuplicate
+
+# Default window for near-duplicates: transactions up to this many days apart are compared
+DUPLICATE_WINDOW_DAYS = 3
+# Default minimum description similarity (0-1) for a near-duplicate
+DUPLICATE_MIN_SIMILARITY = 0.8
+
+_NON_ALNUM_RE = re.compile(r"[\W_]+")
+
+
+def normalize_description(description: Optional[str]) -> str:
+    """Case-folded description with punctuation and runs of whitespace collapsed."""
+    if not description:
+        return ""
+    return _NON_ALNUM_RE.sub(" ", description.casefold()).strip()
+
+
+def amount_cents(amount: Any) -> int:
+    """Exact amount in cents, from a Decimal, a numeric string or a PostgREST number."""
+    return int((Decimal(str(amount)) * 100).to_integral_value())
+
+
+def fingerprint_base(account_id: int, day: Any, amount: Any, description: Optional[str]) -> str:
+    day = day.isoformat() if isinstance(day, date) else str(day)
+    return f"{account_id}|{day}|{amount_cents(amount)}|{normalize_description(description)}"
+
+
+def transaction_fingerprint(base: str, ordinal: int) -> str:
+    """Deterministic content key for a transaction without a FITID.
+
+    `base` is `fingerprint_base(...)`; `ordinal` numbers the transactions of one import
+    that share it (two identical coffees on the same day are 0 and 1), so genuine
+    repeats are kept while re-importing the same statement matches every row again.
+    """
+    return hashlib.blake2b(f"{base}|{ordinal}".encode(), digest_size=16).hexdigest()
+
+
+class FingerprintAssigner:
+    """Fills in `fingerprint` for rows without a fitid, tracking intra-day ordinals.
+
+    Use one assigner per import and feed it rows in statement order.
+    """
+
+    def __init__(self):
+        self._seen: Dict[str, int] = defaultdict(int)
+
+    def assign(self, row: Dict[str, Any]) -> None:
+        if row.get('fitid'):
+            row['fingerprint'] = None
+            return
+        base = fingerprint_base(row['account_id'], row['date'], row['amount'], row.get('description'))
+        row['fingerprint'] = transaction_fingerprint(base, self._seen[base])
+        self._seen[base] += 1
+
+
+def description_similarity(a: str, b: str, min_similarity: float = 0.0) -> float:
+    """Similarity (0-1) of two normalized descriptions; 0 when cheaply shown to be below `min_similarity`."""
+    if a == b:
+        return 1.0
+    matcher = SequenceMatcher(None, a, b, autojunk=False)
+    if matcher.real_quick_ratio() < min_similarity or matcher.quick_ratio() < min_similarity:
+        return 0.0
+    return matcher.ratio()
+
+
+class DuplicateScanner:
+    """Finds suspected duplicates in rows streamed newest first.
+
+    Rows must arrive in (date, id) descending order, as `iter_transaction_chunks` yields
+    them. Each row is compared with the rows of the same (account, amount) seen in the
+    last `window_days`; older rows are dropped as the scan moves back in time, so memory
+    follows the number of rows in one window rather than the size of the table.
+    """
+
+    def __init__(self, window_days: int = DUPLICATE_WINDOW_DAYS, min_similarity: float = DUPLICATE_MIN_SIMILARITY):
+        self.window_days = window_days
+        self.min_similarity = min_similarity
+        self._buckets: Dict[Tuple[int, int], Deque[Tuple[date, str, Dict[str, Any]]]] = {}
+        self._window: Deque[Tuple[date, Tuple[int, int]]] = deque() # Rows held, in arrival order
+        self._found: List[SuspectedDuplicate] = []
+
+    def add(self, rows: Iterable[Dict[str, Any]]) -> None:
+        for row in rows:
+            try:
+                key = (row['account_id'], amount_cents(row['amount']))
+            except (InvalidOperation, TypeError, ValueError):
+                continue
+            day = row['date'] if isinstance(row['date'], date) else date.fromisoformat(row['date'])
+            while self._window and (self._window[0][0] - day).days > self.window_days:
+                _, old_key = self._window.popleft()
+                bucket = self._buckets[old_key]
+                bucket.popleft()
+                if not bucket:
+                    del self._buckets[old_key]
+
+            description = normalize_description(row.get('description'))
+            bucket = self._buckets.setdefault(key, deque())
+            for later_day, later_description, later in bucket:
+                similarity = description_similarity(description, later_description, self.min_similarity)
+                if similarity < self.min_similarity:
+                    continue
+                self._found.append(SuspectedDuplicate(
+                    account_id=row['account_id'],
+                    amount=Decimal(str(row['amount'])),
+                    transaction_ids=[row['id'], later['id']],
+                    dates=[day, later_day],
+                    descriptions=[row.get('description'), later.get('description')],
+                    days_apart=(later_day - day).days,
+                    similarity=round(similarity, 3),
+                ))
+            bucket.append((day, description, row))
+            self._window.append((day, key))
+
+    def results(self) -> List[SuspectedDuplicate]:
+        """The pairs found so far, most suspicious first."""
+        return sorted(self._found, key=lambda pair: (-pair.similarity, pair.days_apart, pair.transaction_ids))
+
+
+def find_suspected_duplicates(
+    rows: Iterable[Dict[str, Any]],
+    window_days: int = DUPLICATE_WINDOW_DAYS,
+    min_similarity: float = DUPLICATE_MIN_SIMILARITY,
+) -> List[SuspectedDuplicate]:
+    """Finds pairs of transactions that look like one transaction imported twice.
+
+    A pair has the same account and amount, dates at most `window_days` apart and
+    descriptions at least `min_similarity` alike. Rows are sorted newest first and swept
+    with a DuplicateScanner, so only rows inside one window are ever compared: roughly
+    O(n log n) instead of comparing every pair. Results are ordered most suspicious first.
+    """
+    def newest_first(row: Dict[str, Any]) -> Tuple[str, int]:
+        day = row['date']
+        return (day.isoformat() if isinstance(day, date) else day, row['id'])
+
+    scanner = DuplicateScanner(window_days, min_similarity)
+    scanner.add(sorted(rows, key=newest_first, reverse=True))
+    return scanner.results()
@@ -0,0 +1,182 @@
+import csv
+import io
+from datetime import date
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from core.encoding import dumps
+from core.repository import Repository
+from models.financials import Transaction, TransactionFilterParams
+
+# pyarrow is optional and slow to import, so it is loaded by the first Parquet export
+pa = None
+pq = None
+
+# Rows fetched per round trip while exporting (Supabase caps a response at 1000 rows by default)
+EXPORT_CHUNK_SIZE = 1000
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Column order used for CSV/Parquet when no projection is requested
+DEFAULT_EXPORT_COLUMNS = list(Transaction.model_fields)
+
+
+async def iter_transaction_chunks(
+    repository: Repository,
+    filters: TransactionFilterParams,
+    columns: Optional[List[str]] = None,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Yields every matching transaction, one cursor-paginated chunk at a time."""
+    cursor = None
+    while True:
+        rows = await repository.list_transactions(filters, limit=chunk_size, cursor=cursor, columns=columns)
+        if rows:
+            yield rows
+        if len(rows) < chunk_size:
+            return
+        last = rows[-1]
+        last_date = last['date'] if isinstance(last['date'], date) else date.fromisoformat(last['date'])
+        cursor = (last_date, last['id'])
+
+
+# --- Encoders: each turns a stream of row chunks into a stream of bytes ---
+
+async def encode_ndjson(chunks: AsyncIterator[List[Dict[str, Any]]], columns: List[str]) -> AsyncIterator[bytes]:
+    async for rows in chunks:
+        yield b"".join(dumps(row) + b"\n" for row in rows)
+
+
+async def encode_csv(chunks: AsyncIterator[List[Dict[str, Any]]], columns: List[str]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    async for rows in chunks:
+        for row in rows:
+            writer.writerow([_csv_value(row.get(column)) for column in columns])
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return ";".join(str(v) for v in value) # tags
+    return value
+
+
+# Arrow types for Transaction columns; amounts stay exact as decimals
+_PARQUET_TYPES = {
+    'id': 'int64',
+    'account_id': 'int64',
+    'category_id': 'int64',
+    'date': 'date32',
+    'amount': 'decimal',
+    'reconciled': 'bool',
+    'tags': 'list',
+}
+
+
+def _parquet_schema(columns: List[str]):
+    types = {
+        'int64': pa.int64(),
+        'date32': pa.date32(),
+        'decimal': pa.decimal128(12, 2),
+        'bool': pa.bool_(),
+        'list': pa.list_(pa.string()),
+    }
+    return pa.schema([(column, types.get(_PARQUET_TYPES.get(column), pa.string())) for column in columns])
+
+
+class _DrainableSink:
+    """Write-only file object that hands back what was written since the last drain.
+
+    `tell()` keeps counting across drains so Parquet footer offsets stay correct.
+    """
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def writable(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data, self._parts = b"".join(self._parts), []
+        return data
+
+
+def _rows_to_arrow(rows: List[Dict[str, Any]], schema):
+    arrays = []
+    for field in schema:
+        values = [row.get(field.name) for row in rows]
+        if pa.types.is_decimal(field.type):
+            # Supabase returns numerics as JSON numbers; go through str to avoid float artifacts
+            values = pa.array([None if v is None else str(v) for v in values]).cast(field.type)
+        elif pa.types.is_date(field.type):
+            values = pa.array(values, type=pa.string()).cast(pa.date32())
+        else:
+            values = pa.array(values, type=field.type)
+        arrays.append(values)
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+async def encode_parquet(chunks: AsyncIterator[List[Dict[str, Any]]], columns: List[str]) -> AsyncIterator[bytes]:
+    """Writes one Parquet row group per fetched chunk, streaming bytes as each group is finished."""
+    if not parquet_available():
+        raise RuntimeError("Parquet export requires the optional 'pyarrow' package.")
+    schema = _parquet_schema(columns)
+    sink = _DrainableSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        async for rows in chunks:
+            writer.write_table(_rows_to_arrow(rows, schema))
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+EXPORT_ENCODERS = {
+    "ndjson": encode_ndjson,
+    "csv": encode_csv,
+    "parquet": encode_parquet,
+}
+
+
+def parquet_available() -> bool:
+    """Whether Parquet export is possible, importing pyarrow on the first call."""
+    global pa, pq
+    if pq is None:
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError: # Parquet export is optional
+            return False
+        pa, pq = pyarrow, pyarrow.parquet
+    return True
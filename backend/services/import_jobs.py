@@ -0,0 +1,424 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import sys
+import threading
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, List, Optional, Sequence, Tuple
+
+from models.imports import ImportFormat, ImportJob, ImportJobStatus, ImportOptions, ImportSummary
+from services.persistence import BatchProgress
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Where the job database and spooled uploads live (must survive restarts)
+IMPORT_DATA_DIR = Path(os.environ.get("IMPORT_DATA_DIR", BACKEND_DIR / "data"))
+# Number of imports processed concurrently by this worker
+IMPORT_WORKERS = int(os.environ.get("IMPORT_WORKERS", 2))
+# Maximum number of jobs waiting for a worker; further uploads are rejected
+IMPORT_QUEUE_SIZE = int(os.environ.get("IMPORT_QUEUE_SIZE", 20))
+
+# Chunk size used when copying an upload to disk
+SPOOL_CHUNK_SIZE = 1024 * 1024
+
+# Most statement files accepted in one batch, counting the members of zip archives.
+# Batch limits live here rather than in services.batch_import so the upload routes can
+# check them without loading the parsers, which are imported when a job first runs.
+MAX_BATCH_FILES = int(os.environ.get("MAX_BATCH_FILES", 500))
+STATEMENT_EXTENSIONS = ('.ofx', '.qfx')
+BATCH_UPLOAD_EXTENSIONS = STATEMENT_EXTENSIONS + ('.zip',)
+
+# Runs the import for a spooled file (or batch directory), reporting batch progress
+ImportRunner = Callable[[Path, Callable[[BatchProgress], None], ImportOptions], Awaitable[ImportSummary]]
+
+
+class QueueFullError(Exception):
+    """Raised when an upload arrives while the import queue is at capacity."""
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class ImportJobStore:
+    """SQLite-backed record of import jobs, so status survives a restart."""
+
+    def __init__(self, db_path: Path):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS import_jobs (
+                    id TEXT PRIMARY KEY,
+                    filename TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    started_at TEXT,
+                    finished_at TEXT,
+                    transactions_parsed INTEGER NOT NULL DEFAULT 0,
+                    duplicates_skipped INTEGER NOT NULL DEFAULT 0,
+                    transactions_inserted INTEGER NOT NULL DEFAULT 0,
+                    invalid_transactions INTEGER NOT NULL DEFAULT 0,
+                    transactions_failed INTEGER NOT NULL DEFAULT 0,
+                    errors TEXT NOT NULL DEFAULT '[]'
+                )
+            """)
+            # Columns added after the first release; older job databases get them here
+            columns = {row['name'] for row in self._conn.execute("PRAGMA table_info(import_jobs)")}
+            for column in ('files_processed', 'files_failed'):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE import_jobs ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+            if 'options' not in columns:
+                self._conn.execute("ALTER TABLE import_jobs ADD COLUMN options TEXT NOT NULL DEFAULT '{}'")
+            for column in ('transactions_already_imported', 'already_imported', 'rows_sent', 'rows_inserted'):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE import_jobs ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _write(self, sql: str, params: tuple) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(sql, params)
+
+    def create(self, job_id: str, filename: str, path: Path, options: Optional[ImportOptions] = None) -> ImportJob:
+        self._write(
+            "INSERT INTO import_jobs (id, filename, path, status, created_at, options) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                job_id,
+                filename,
+                str(path),
+                ImportJobStatus.queued.value,
+                _now().isoformat(),
+                (options or ImportOptions()).model_dump_json(exclude_none=True),
+            ),
+        )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[ImportJob]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM import_jobs WHERE id = ?", (job_id,)).fetchone()
+        return _row_to_job(row) if row else None
+
+    def get_path(self, job_id: str) -> Optional[Path]:
+        with self._lock:
+            row = self._conn.execute("SELECT path FROM import_jobs WHERE id = ?", (job_id,)).fetchone()
+        return Path(row['path']) if row else None
+
+    def get_options(self, job_id: str) -> ImportOptions:
+        with self._lock:
+            row = self._conn.execute("SELECT options FROM import_jobs WHERE id = ?", (job_id,)).fetchone()
+        return ImportOptions.model_validate_json(row['options']) if row else ImportOptions()
+
+    def mark_running(self, job_id: str) -> None:
+        self._write(
+            "UPDATE import_jobs SET status = ?, started_at = ? WHERE id = ?",
+            (ImportJobStatus.running.value, _now().isoformat(), job_id),
+        )
+
+    def update_progress(self, job_id: str, progress: BatchProgress) -> None:
+        """Records the writer's running totals; the parse counts only arrive with the summary."""
+        self._write(
+            """UPDATE import_jobs SET rows_sent = ?, rows_inserted = ?, duplicates_skipped = ?,
+                   transactions_failed = ? WHERE id = ?""",
+            (
+                progress.rows_sent,
+                progress.rows_inserted,
+                progress.rows_duplicate,
+                progress.rows_failed,
+                job_id,
+            ),
+        )
+
+    def mark_completed(self, job_id: str, summary: ImportSummary) -> None:
+        self._write(
+            """UPDATE import_jobs SET status = ?, finished_at = ?, transactions_parsed = ?,
+                   duplicates_skipped = ?, transactions_inserted = ?, invalid_transactions = ?,
+                   transactions_failed = ?, files_processed = ?, files_failed = ?,
+                   transactions_already_imported = ?, already_imported = ?, errors = ? WHERE id = ?""",
+            (
+                ImportJobStatus.completed.value,
+                _now().isoformat(),
+                summary.transactions_parsed,
+                summary.duplicates_skipped,
+                summary.transactions_inserted,
+                summary.invalid_transactions,
+                summary.transactions_failed,
+                summary.files_processed,
+                summary.files_failed,
+                summary.transactions_already_imported,
+                int(summary.already_imported),
+                json.dumps(summary.errors),
+                job_id,
+            ),
+        )
+
+    def mark_failed(self, job_id: str, error: str) -> None:
+        self._write(
+            "UPDATE import_jobs SET status = ?, finished_at = ?, errors = ? WHERE id = ?",
+            (ImportJobStatus.failed.value, _now().isoformat(), json.dumps([error]), job_id),
+        )
+
+    def requeue(self, job_id: str) -> None:
+        self._write(
+            "UPDATE import_jobs SET status = ?, started_at = NULL WHERE id = ?",
+            (ImportJobStatus.queued.value, job_id),
+        )
+
+    def unfinished(self) -> List[Tuple[str, Path]]:
+        """Jobs that were queued or running when the process last stopped, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, path FROM import_jobs WHERE status IN (?, ?) ORDER BY created_at",
+                (ImportJobStatus.queued.value, ImportJobStatus.running.value),
+            ).fetchall()
+        return [(row['id'], Path(row['path'])) for row in rows]
+
+
+def _row_to_job(row: sqlite3.Row) -> ImportJob:
+    started_at = datetime.fromisoformat(row['started_at']) if row['started_at'] else None
+    finished_at = datetime.fromisoformat(row['finished_at']) if row['finished_at'] else None
+    rows_per_second = files_per_second = None
+    if started_at:
+        elapsed = ((finished_at or _now()) - started_at).total_seconds()
+        if elapsed > 0:
+            # Rows parsed once the job finished; rows written so far while it runs
+            rows = row['transactions_parsed'] if finished_at else row['rows_sent']
+            rows_per_second = round(rows / elapsed, 1)
+            if finished_at:
+                files_per_second = round(row['files_processed'] / elapsed, 2)
+    return ImportJob(
+        id=row['id'],
+        filename=row['filename'],
+        status=ImportJobStatus(row['status']),
+        created_at=datetime.fromisoformat(row['created_at']),
+        started_at=started_at,
+        finished_at=finished_at,
+        transactions_parsed=row['transactions_parsed'],
+        duplicates_skipped=row['duplicates_skipped'],
+        transactions_inserted=row['transactions_inserted'],
+        invalid_transactions=row['invalid_transactions'],
+        transactions_failed=row['transactions_failed'],
+        files_processed=row['files_processed'],
+        files_failed=row['files_failed'],
+        rows_sent=row['rows_sent'],
+        rows_inserted=row['rows_inserted'],
+        rows_per_second=rows_per_second,
+        files_per_second=files_per_second,
+        transactions_already_imported=row['transactions_already_imported'],
+        already_imported=bool(row['already_imported']),
+        errors=json.loads(row['errors']),
+    )
+
+
+async def _import_file(path: Path, on_progress: Callable[[BatchProgress], None], options: ImportOptions, repository) -> ImportSummary:
+    if options.format == ImportFormat.csv:
+        from services.csv_parser import ingest_csv_file
+        return await ingest_csv_file(path, options, repository, on_progress=on_progress)
+    if options.format == ImportFormat.qif:
+        from services.qif_parser import ingest_qif_file
+        return await ingest_qif_file(path, options, repository, on_progress=on_progress)
+    from services.ofx_parser import ingest_ofx_file
+    return await ingest_ofx_file(path, repository, on_progress=on_progress, skip_imported=not options.force)
+
+
+async def run_import(path: Path, on_progress: Callable[[BatchProgress], None], options: ImportOptions) -> ImportSummary:
+    """Default job runner: streams a spooled file into the database with the parser for its format.
+
+    A file whose content hash is in the import ledger is not read again (nor are OFX
+    statement periods imported before) unless `options.force` is set. A directory is a
+    batch upload (see `ImportJobQueue.submit_batch`) and is handed to the parallel batch
+    importer instead, which checks and records the ledger for each of its files.
+    """
+    if path.is_dir():
+        from services.batch_import import run_batch_import
+        return await run_batch_import(path, on_progress, skip_imported=not options.force)
+
+    from core.repository import get_repository
+    from services.import_ledger import ImportLedger
+    repository = get_repository()
+    ledger = ImportLedger(repository)
+    sha256 = options.content_sha256
+    if sha256 and not options.force and await ledger.is_imported(sha256):
+        logger.info("File %s (%s) was already imported; skipping.", path.name, sha256[:12])
+        return ImportSummary(files_processed=1, already_imported=True)
+
+    summary = await _import_file(path, on_progress, options, repository)
+    summary.files_processed = 1
+    if sha256 and not summary.batches_failed:
+        await ledger.record_file(sha256, options.format.value, summary.transactions_parsed)
+    return summary
+
+
+async def _spool(upload, path: Path) -> str:
+    """Copies an upload to `path`, returning the SHA-256 of its content."""
+    digest = hashlib.sha256()
+    with open(path, 'wb') as f:
+        while True:
+            chunk = await upload.read(SPOOL_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            await asyncio.to_thread(f.write, chunk)
+    return digest.hexdigest()
+
+
+class ImportJobQueue:
+    """Bounded in-process queue of import jobs served by a pool of worker tasks.
+
+    Uploads are spooled to disk and recorded in the job store before being queued;
+    on startup, jobs left queued or running by a previous process are picked up again
+    (re-running an import is safe because writes are idempotent upserts).
+    """
+
+    def __init__(
+        self,
+        store: ImportJobStore,
+        spool_dir: Path,
+        workers: int = IMPORT_WORKERS,
+        max_queued: int = IMPORT_QUEUE_SIZE,
+        runner: ImportRunner = run_import,
+    ):
+        self.store = store
+        self.spool_dir = spool_dir
+        self.workers = workers
+        self.max_queued = max_queued
+        self.runner = runner
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._spooling = 0 # Uploads being written to disk that already hold a queue slot
+        self._tasks: List[asyncio.Task] = []
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+
+    async def start(self) -> None:
+        """Re-queues unfinished jobs from a previous run and starts the workers."""
+        for job_id, path in self.store.unfinished():
+            if path.exists():
+                self.store.requeue(job_id)
+                self._queue.put_nowait(job_id)
+            else:
+                self.store.mark_failed(job_id, "Uploaded file was lost before the import could run.")
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, upload, options: Optional[ImportOptions] = None) -> ImportJob:
+        """Spools an upload to disk and queues it. Raises QueueFullError if at capacity.
+
+        `options` say how to read the file (OFX unless given) and are kept with the job,
+        along with the hash of the file's content for the import ledger.
+        """
+        if self._queue.qsize() + self._spooling >= self.max_queued:
+            raise QueueFullError(f"Import queue is full ({self.max_queued} jobs waiting).")
+
+        self._spooling += 1
+        job_id = uuid.uuid4().hex
+        path = self.spool_dir / f"{job_id}.upload"
+        try:
+            sha256 = await _spool(upload, path)
+            options = (options or ImportOptions()).model_copy(update={'content_sha256': sha256})
+            job = self.store.create(job_id, upload.filename, path, options)
+        except BaseException:
+            path.unlink(missing_ok=True)
+            raise
+        finally:
+            self._spooling -= 1
+        self._queue.put_nowait(job_id)
+        return job
+
+    async def submit_batch(self, uploads: Sequence) -> ImportJob:
+        """Spools several uploads into one directory and queues them as a single job."""
+        if self._queue.qsize() + self._spooling >= self.max_queued:
+            raise QueueFullError(f"Import queue is full ({self.max_queued} jobs waiting).")
+
+        self._spooling += 1
+        try:
+            job_id = uuid.uuid4().hex
+            batch_dir = self.spool_dir / f"{job_id}.batch"
+            batch_dir.mkdir()
+            for index, upload in enumerate(uploads):
+                # Prefix with the position so equal names from different folders don't collide
+                await _spool(upload, batch_dir / f"{index:04d}-{Path(upload.filename).name}")
+            filename = uploads[0].filename if len(uploads) == 1 else f"{uploads[0].filename} and {len(uploads) - 1} more"
+            job = self.store.create(job_id, filename, batch_dir)
+        except BaseException:
+            shutil.rmtree(self.spool_dir / f"{job_id}.batch", ignore_errors=True)
+            raise
+        finally:
+            self._spooling -= 1
+        self._queue.put_nowait(job_id)
+        return job
+
+    def get(self, job_id: str) -> Optional[ImportJob]:
+        return self.store.get(job_id)
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        path = self.store.get_path(job_id)
+        self.store.mark_running(job_id)
+        try:
+            summary = await self.runner(
+                path,
+                lambda progress: self.store.update_progress(job_id, progress),
+                self.store.get_options(job_id),
+            )
+            self.store.mark_completed(job_id, summary)
+        except asyncio.CancelledError:
+            # Shutting down: leave the job as running so it is resumed on the next start
+            raise
+        except Exception as e:
+            logger.exception("Import job %s failed: %s", job_id, e)
+            self.store.mark_failed(job_id, str(e))
+        if path.is_dir():
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            path.unlink(missing_ok=True)
+
+
+_queue: Optional[ImportJobQueue] = None
+
+
+def get_import_queue() -> ImportJobQueue:
+    """FastAPI dependency returning the shared import queue (created on first use)."""
+    global _queue
+    if _queue is None:
+        store = ImportJobStore(IMPORT_DATA_DIR / "import_jobs.sqlite3")
+        _queue = ImportJobQueue(store, IMPORT_DATA_DIR / "uploads")
+    return _queue
+
+
+async def start_import_queue() -> None:
+    await get_import_queue().start()
+
+
+async def stop_import_queue() -> None:
+    global _queue
+    if _queue is not None:
+        await _queue.stop()
+        _queue.store.close()
+        _queue = None
+    batch_import = sys.modules.get("services.batch_import") # Only loaded if a batch was imported
+    if batch_import is not None:
+        batch_import.stop_parse_executor()
@@ -0,0 +1,103 @@
+import bisect
+import logging
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from core.metrics import span
+from core.repository import Repository
+
+logger = logging.getLogger(__name__)
+
+# Half-open date range [start, end)
+DateRange = Tuple[date, date]
+
+
+def _as_date(value: Any) -> date:
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+class CoveredDates:
+    """Union of the statement periods already imported for one account."""
+
+    def __init__(self, ranges: Iterable[DateRange] = ()):
+        merged: List[List[date]] = []
+        for start, end in sorted(ranges):
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        self._starts = [start for start, _ in merged]
+        self._ends = [end for _, end in merged]
+
+    def __bool__(self) -> bool:
+        return bool(self._starts)
+
+    def __contains__(self, day: date) -> bool:
+        i = bisect.bisect_right(self._starts, day) - 1
+        return i >= 0 and day < self._ends[i]
+
+    def covers(self, start: date, end: date) -> bool:
+        """True if all of [start, end) has been imported."""
+        i = bisect.bisect_right(self._starts, start) - 1
+        return i >= 0 and end <= self._ends[i]
+
+
+def statement_range(start: Optional[date], end: Optional[date]) -> Optional[DateRange]:
+    """The period a statement vouches for, or None if it has no usable dates.
+
+    DTEND's own day is left out (see migrations/0005_import_ledger.sql), so a statement
+    ending on the 31st covers up to and including the 30th.
+    """
+    if start is None or end is None or end <= start:
+        return None
+    return start, end
+
+
+class ImportLedger:
+    """What has already been imported: whole files by content hash, and OFX statement periods.
+
+    Ledger lookups never fail an import: if the ledger can't be read, the file is simply
+    imported in full (writes are idempotent anyway).
+    """
+
+    def __init__(self, repository: Repository):
+        self.repository = repository
+
+    async def is_imported(self, sha256: str) -> bool:
+        try:
+            with span("dedup_query", table="imported_files"):
+                return await self.repository.get_imported_file(sha256) is not None
+        except Exception as e:
+            logger.warning("Could not read the import ledger, importing in full: %s", e)
+            return False
+
+    async def covered_dates(self, account_ids: List[int]) -> Dict[int, CoveredDates]:
+        try:
+            with span("dedup_query", table="imported_statement_ranges") as query_span:
+                rows = await self.repository.list_statement_ranges(account_ids)
+                query_span.rows = len(rows)
+        except Exception as e:
+            logger.warning("Could not read imported statement ranges, importing in full: %s", e)
+            return {}
+        ranges: Dict[int, List[DateRange]] = {}
+        for row in rows:
+            ranges.setdefault(row['account_id'], []).append((_as_date(row['start_date']), _as_date(row['end_date'])))
+        return {account_id: CoveredDates(account_ranges) for account_id, account_ranges in ranges.items()}
+
+    async def record_file(self, sha256: str, format: str, transaction_count: int) -> None:
+        try:
+            await self.repository.record_imported_file(
+                {'sha256': sha256, 'format': format, 'transaction_count': transaction_count}
+            )
+        except Exception as e:
+            logger.warning("Could not record imported file %s in the ledger: %s", sha256[:12], e)
+
+    async def record_ranges(self, ranges: Iterable[Tuple[int, DateRange]]) -> None:
+        rows = [
+            {'account_id': account_id, 'start_date': start.isoformat(), 'end_date': end.isoformat()}
+            for account_id, (start, end) in ranges
+        ]
+        try:
+            await self.repository.add_statement_ranges(rows)
+        except Exception as e:
+            logger.warning("Could not record imported statement ranges: %s", e)
@@ -0,0 +1,373 @@
+import asyncio
+import codecs
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from models.financials import Account, AccountCreate, TransactionCreate
+from models.imports import ImportSummary
+from core.metrics import span
+from core.repository import Repository
+from services.persistence import BatchProgress, TransactionBatchWriter, DEFAULT_BATCH_SIZE
+from services.rules import RuleSet
+
+logger = logging.getLogger(__name__)
+
+# Number of validated transactions held in memory before they are written.
+# Together with each parser's read chunk size this bounds peak memory for an import.
+INSERT_BATCH_SIZE = DEFAULT_BATCH_SIZE
+
+# Cap on the number of per-row error messages reported back in an ImportSummary
+MAX_REPORTED_ERRORS = 20
+
+VALID_ACCOUNT_TYPES = {'checking', 'savings', 'credit'}
+
+# Date formats tried, in order, when a file doesn't say which one it uses.
+# Day-first comes before month-first; files where every day is <= 12 are read day-first.
+DATE_FORMATS = [
+    '%Y-%m-%d', '%Y/%m/%d', '%Y%m%d',
+    '%d/%m/%Y', '%d/%m/%y', '%d-%m-%Y', '%d.%m.%Y', '%d.%m.%y',
+    '%m/%d/%Y', '%m/%d/%y', '%m-%d-%Y',
+    '%d %b %Y', '%d-%b-%Y', '%d %b %y', '%d-%b-%y', '%b %d, %Y', '%Y-%m-%dT%H:%M:%S',
+]
+
+# Largest amount a DECIMAL(10,2) column holds, in cents
+MAX_AMOUNT_CENTS = 10 ** 10 - 1
+
+
+class StatementAccount(NamedTuple):
+    """The account an imported transaction belongs to, as named in the `accounts` table."""
+    name: str
+    account_type: Optional[str] = None
+
+
+class ParsedChunk(NamedTuple):
+    """A block of normalized rows from a tabular front-end (CSV, QIF)."""
+    rows: List[Dict[str, Any]]
+    parsed: int
+    invalid: int
+    errors: List[str]
+    account: Optional[StatementAccount] = None # None: the account chosen for the upload
+
+
+class ImportPipeline:
+    """Format-independent part of an import: account cache, rules, batch writer and counts.
+
+    Front-ends (OFX, CSV, QIF) turn their input into transactions and hand them over with
+    `add_transaction` (validated models) or `add_rows` (rows already normalized in bulk).
+    Either way they share the same account resolution, categorization, in-batch dedup
+    and batched, retried writes.
+    """
+
+    def __init__(
+        self,
+        repository: Repository,
+        batch_size: int = INSERT_BATCH_SIZE,
+        collect: Optional[List[TransactionCreate]] = None,
+        on_progress: Optional[Callable[[BatchProgress], None]] = None,
+        rules: Optional[RuleSet] = None,
+    ):
+        self.repository = repository
+        self.collect = collect
+        self.rules = rules
+        self.summary = ImportSummary()
+        self.created_accounts: List[Account] = []
+        # Account name -> id (None if the account could not be created)
+        self.account_ids: Dict[str, Optional[int]] = {}
+        self.writer = TransactionBatchWriter(repository, batch_size=batch_size, on_progress=on_progress)
+
+    async def resolve_account(self, account: StatementAccount) -> Optional[int]:
+        """Looks up or creates an account (once per account per import)."""
+        if account.name in self.account_ids:
+            return self.account_ids[account.name]
+
+        logger.debug("Processing account: %s", account.name)
+        self.summary.accounts_processed += 1
+
+        # Check if account already exists in Supabase by name
+        with span("account_resolution", rows=1):
+            account_id = await self.repository.get_account_id_by_name(account.name)
+        if account_id is not None:
+            logger.debug("Account '%s' already exists with ID: %s", account.name, account_id)
+        else:
+            # Validate account type before creating
+            raw_account_type = account.account_type.lower().strip() if account.account_type else None
+            final_account_type = raw_account_type if raw_account_type in VALID_ACCOUNT_TYPES else None
+
+            account_to_create = AccountCreate(name=account.name, type=final_account_type)
+            logger.info("Creating new account: %s", account_to_create)
+            created_account = await self.repository.create_account(account_to_create.model_dump())
+
+            if created_account:
+                account_id = created_account['id']
+                logger.info("Successfully created account '%s' with ID: %s", account.name, account_id)
+                self.created_accounts.append(Account(**created_account))
+                self.summary.accounts_created += 1
+            else:
+                logger.error("Error creating account: %s. Skipping its transactions.", account.name)
+                self.add_error(f"Could not create account '{account.name}'")
+
+        self.account_ids[account.name] = account_id
+        return account_id
+
+    async def add_transaction(self, transaction: TransactionCreate) -> None:
+        """Categorizes a validated transaction and hands it to the batch writer."""
+        if self.rules:
+            transaction.category_id = self.rules.match(transaction.description, transaction.amount, transaction.account_id)
+            if transaction.category_id is not None:
+                self.summary.transactions_categorized += 1
+
+        if self.collect is not None:
+            self.collect.append(transaction)
+        await self.writer.add(transaction)
+
+    async def add_rows(self, account_id: int, rows: Iterable[Dict[str, Any]]) -> None:
+        """Categorizes and writes rows normalized by a bulk parser (see `normalize_columns`)."""
+        for row in rows:
+            row['account_id'] = account_id
+            if self.rules:
+                row['category_id'] = self.rules.match(row['description'], row['amount'], account_id)
+                if row['category_id'] is not None:
+                    self.summary.transactions_categorized += 1
+            await self.writer.add_row(row)
+
+    def add_invalid(self, message: str) -> None:
+        self.summary.invalid_transactions += 1
+        self.add_error(message)
+
+    def add_error(self, message: str) -> None:
+        if len(self.summary.errors) < MAX_REPORTED_ERRORS:
+            self.summary.errors.append(message)
+
+    async def finish(self) -> ImportSummary:
+        """Writes the last partial batch and folds the writer's progress into the summary."""
+        await self.writer.flush()
+        progress = self.writer.progress
+        self.summary.transactions_inserted = progress.rows_inserted
+        self.summary.duplicates_skipped = progress.rows_duplicate
+        self.summary.transactions_failed = progress.rows_failed
+        self.summary.batches_written = progress.batches_written
+        self.summary.batches_failed = progress.batches_failed
+        if progress.last_error:
+            self.add_error(f"{progress.batches_failed} batch(es) failed to write: {progress.last_error}")
+        return self.summary
+
+
+# --- Bulk normalization of tabular statement data ---
+
+def infer_date_format(samples: Iterable[str], formats: Sequence[str] = DATE_FORMATS) -> Optional[str]:
+    """Returns the format that parses the most distinct non-empty samples (the earliest on a tie).
+
+    Counting rather than requiring every sample to parse lets a stray footer or a
+    malformed row be reported as invalid instead of failing the whole file.
+    """
+    values = {value.strip() for value in samples if value and value.strip()}
+    best, best_count = None, 0
+    for fmt in formats:
+        count = 0
+        for value in values:
+            try:
+                datetime.strptime(value, fmt)
+                count += 1
+            except ValueError:
+                pass
+        if count > best_count:
+            best, best_count = fmt, count
+            if count == len(values):
+                break
+    return best
+
+
+def parse_dates(values: Sequence[str], fmt: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Parses a column of dates into ISO strings, returning (dates, valid mask).
+
+    A statement has few distinct dates, so each distinct value is parsed once and the
+    results are broadcast back over the column.
+    """
+    unique, inverse = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+    parsed = np.empty(len(unique), dtype=object)
+    ok = np.zeros(len(unique), dtype=bool)
+    for i, value in enumerate(unique.tolist()):
+        try:
+            parsed[i] = datetime.strptime(value.strip(), fmt).date().isoformat()
+            ok[i] = True
+        except ValueError:
+            parsed[i] = None
+    return parsed[inverse], ok[inverse]
+
+
+def infer_decimal_comma(samples: Iterable[str]) -> bool:
+    """True if amounts look like '1.234,56' / '12,5' rather than '1,234.56'."""
+    for value in samples:
+        value = value.strip()
+        dot, comma = value.rfind('.'), value.rfind(',')
+        if comma > dot and len(value) - comma - 1 in (1, 2):
+            return True
+        if dot > comma and (comma != -1 or len(value) - dot - 1 in (1, 2)):
+            return False
+    return False
+
+
+# Separator used to join a column into one string for bulk str.translate/replace
+_FIELD_SEPARATOR = '\x1f'
+
+# Characters dropped from amounts: currency symbols, spaces and explicit plus signs
+_AMOUNT_NOISE = str.maketrans('', '', "$€£¥ \u00a0+'")
+
+
+def parse_amounts(values: Sequence[str], decimal_comma: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """Parses a column of amounts into integer cents, returning (cents, valid mask).
+
+    Handles thousands separators, currency symbols, '(12.50)' and '12.50-' negatives and
+    'CR'/'DR' suffixes. Clean-up runs once over the whole column joined into a single
+    string; the less common notations are only handled when the column contains them.
+    """
+    joined = _FIELD_SEPARATOR.join(values).translate(_AMOUNT_NOISE).upper()
+    if decimal_comma:
+        joined = joined.replace('.', '').replace(',', '.')
+    else:
+        joined = joined.replace(',', '')
+    text = np.array(joined.split(_FIELD_SEPARATOR), dtype=str)
+
+    negative = np.zeros(len(text), dtype=bool)
+    if '(' in joined:
+        negative = np.char.startswith(text, '(') & np.char.endswith(text, ')')
+        text = np.where(negative, np.char.strip(text, '()'), text)
+    for suffix, sign in (('-', True), ('DR', True), ('CR', False)):
+        if suffix + _FIELD_SEPARATOR in joined + _FIELD_SEPARATOR:
+            has = np.char.endswith(text, suffix)
+            text = np.where(has, np.char.rstrip(text, suffix), text)
+            negative |= has & sign
+    if '-' in joined:
+        leading = np.char.startswith(text, '-')
+        negative ^= leading
+        text = np.where(leading, np.char.lstrip(text, '-'), text)
+
+    # Valid: digits with at most one '.', and no more than two decimal places
+    point = np.char.find(text, '.')
+    decimals = np.where(point >= 0, np.char.str_len(text) - point - 1, 0)
+    valid = np.char.isdigit(np.char.replace(text, '.', '', count=1)) & (decimals <= 2)
+
+    cents = np.zeros(len(text), dtype=np.int64)
+    if valid.all():
+        # At most two decimals, so float cents round back to the exact value
+        cents = np.rint(text.astype(np.float64) * 100).astype(np.int64)
+    elif valid.any():
+        cents[valid] = np.rint(text[valid].astype(np.float64) * 100).astype(np.int64)
+    cents = np.where(negative, -cents, cents)
+    valid &= np.abs(cents) <= MAX_AMOUNT_CENTS
+    return cents, valid
+
+
+def format_cents(cents: np.ndarray) -> List[str]:
+    """Formats integer cents as decimal strings ('-12.05'), column at a time."""
+    magnitude = np.abs(cents)
+    text = np.char.add(
+        np.char.add((magnitude // 100).astype(str), '.'),
+        np.char.zfill((magnitude % 100).astype(str), 2),
+    )
+    return np.where(cents < 0, np.char.add('-', text), text).tolist()
+
+
+def normalize_columns(
+    dates: Sequence[str],
+    date_format: str,
+    cents: np.ndarray,
+    amount_valid: np.ndarray,
+    descriptions: Sequence[Optional[str]],
+    fitids: Optional[Sequence[Optional[str]]] = None,
+    transaction_types: Optional[Sequence[Optional[str]]] = None,
+    first_line: int = 1,
+    lines: Optional[Sequence[int]] = None,
+) -> Tuple[List[Dict[str, Any]], int, List[str]]:
+    """Turns one chunk of columns into insert-ready rows (the shape of `transaction_to_row`).
+
+    `cents` and `amount_valid` come from `parse_amounts`. Returns the rows, the number
+    of rejected rows and messages for the first few of them, with row i on line
+    `first_line + i` unless `lines` gives each row's line.
+    """
+    iso_dates, date_valid = parse_dates(dates, date_format)
+    valid = date_valid & amount_valid
+    messages = []
+    rejected = np.flatnonzero(~valid)
+    for i in rejected[:MAX_REPORTED_ERRORS].tolist():
+        problem = f"invalid date '{dates[i]}'" if not date_valid[i] else "invalid amount"
+        messages.append(f"Skipped line {lines[i] if lines else first_line + i}: {problem}")
+
+    keep = np.flatnonzero(valid).tolist() if len(rejected) else None
+
+    def column(values):
+        values = values if isinstance(values, list) else list(values)
+        return values if keep is None else [values[i] for i in keep]
+
+    size = len(dates) - len(rejected)
+    rows = [
+        {
+            'date': day,
+            'description': description.strip() or "N/A" if description else "N/A",
+            'amount': amount,
+            'transaction_type': transaction_type.strip().lower() or None if transaction_type else None,
+            'fitid': fitid.strip() or None if fitid else None,
+            'category_id': None,
+            'reconciled': False,
+            'tags': None,
+            'notes': None,
+        }
+        for day, description, amount, transaction_type, fitid in zip(
+            column(iso_dates.tolist()),
+            column(descriptions),
+            column(format_cents(cents)),
+            column(transaction_types) if transaction_types is not None else [None] * size,
+            column(fitids) if fitids is not None else [None] * size,
+        )
+    ]
+    return rows, len(rejected), messages
+
+
+def detect_encoding(sample: bytes) -> str:
+    """Guesses the text encoding of a file from its first bytes.
+
+    A byte order mark wins; otherwise UTF-8 if the sample decodes as UTF-8, else
+    Windows-1252, which is what most bank exports that aren't UTF-8 use.
+    """
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
+    try:
+        # Not final: the sample may end part-way through a multi-byte character
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'cp1252'
+
+
+async def ingest_chunks(
+    pipeline: ImportPipeline,
+    chunks: Iterator[ParsedChunk],
+    account: Optional[StatementAccount],
+) -> ImportSummary:
+    """Feeds a tabular front-end's chunks through the pipeline.
+
+    Chunks are produced in a worker thread, so parsing the next chunk overlaps with
+    the event loop writing the previous one.
+    """
+    while True:
+        with span("parse") as parse_span:
+            chunk = await asyncio.to_thread(next, chunks, None)
+            parse_span.rows = chunk.parsed if chunk is not None else 0
+        if chunk is None:
+            break
+        chunk_account = chunk.account or account
+        if chunk_account is None:
+            raise ValueError("The file does not name its account; choose one for the upload.")
+        pipeline.summary.transactions_parsed += chunk.parsed
+        pipeline.summary.invalid_transactions += chunk.invalid
+        for message in chunk.errors:
+            pipeline.add_error(message)
+        account_id = await pipeline.resolve_account(chunk_account)
+        if account_id is not None:
+            await pipeline.add_rows(account_id, chunk.rows)
+    return await pipeline.finish()
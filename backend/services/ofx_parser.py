@@ -1,152 +1,247 @@
+import asyncio
 import io
-from typing import List, Tuple, Dict, Any
-from ofxparse import OfxParser
-from datetime import datetime, date
-from decimal import Decimal
-
-from models.financials import Account, AccountCreate, TransactionCreate
-from core.supabase_client import get_supabase_client
-from supabase import Client
-
-async def parse_ofx(file_content: bytes, supabase_client: Client = None) -> Tuple[List[Account], List[TransactionCreate]]:
-    """Parses OFX file content and returns lists of created Account objects and collected TransactionCreate objects."""
-    # Use provided client or get default
-    supabase = supabase_client or get_supabase_client()
-    
-    accounts_data = []
-    transactions_data = []
-    account_name_to_id_map = {}
+import logging
+import mmap
+from pathlib import Path
+from typing import Dict, List, Tuple, Any, Optional, AsyncIterator, Callable
+
+from models.financials import Account, TransactionCreate
+from models.imports import ImportSummary
+from core.metrics import span
+from core.repository import Repository, get_repository
+from services.persistence import BatchProgress
+from services.categorization import load_rule_set
+from services.ingest import INSERT_BATCH_SIZE, ImportPipeline, StatementAccount
+from services.import_ledger import CoveredDates, DateRange, ImportLedger, statement_range
+from services.ofx_stream import (
+    OfxAccountInfo,
+    OfxStatementInfo,
+    OfxTransactionRecord,
+    aiter_ofx_records,
+    iter_ofx_records,
+    parse_ofx_amount,
+    parse_ofx_date,
+    scan_ofx_statements,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def build_account_name(account: OfxAccountInfo) -> str:
+    """Builds the display name used to identify an OFX account in the `accounts` table."""
+    # Construct account name robustly, handling missing institution details
+    org_name = "Unknown Institution"
+    if account.organization:
+        org_name = account.organization
+    elif account.fid:
+        org_name = f"Institution FID: {account.fid}" # Use FID if org name is missing
+    return f"{org_name} - {account.account_id} ({account.account_type.upper()})"
+
+
+def record_to_transaction(record: OfxTransactionRecord, account_id: int) -> TransactionCreate:
+    """Validates a raw streamed <STMTTRN> into a TransactionCreate."""
+    fields = record.fields
+    if 'TRNAMT' not in fields:
+        raise ValueError("Missing transaction amount (TRNAMT)")
+    if 'DTPOSTED' not in fields:
+        raise ValueError("Missing transaction date (DTPOSTED)")
+
+    # Ensure description exists, use memo if payee is None
+    description = fields.get('NAME') or fields.get('MEMO') or "N/A"
+    trntype = fields.get('TRNTYPE')
+
+    return TransactionCreate(
+        account_id=account_id,
+        date=parse_ofx_date(fields['DTPOSTED']),
+        description=description,
+        amount=parse_ofx_amount(fields['TRNAMT']),
+        transaction_type=trntype.lower() if trntype else None,
+        fitid=fields.get('FITID'),
+    )
+
+
+def ofx_account(account: OfxAccountInfo) -> StatementAccount:
+    return StatementAccount(build_account_name(account), account.account_type)
+
+
+def _already_imported(record: OfxTransactionRecord, covered: Optional[CoveredDates]) -> bool:
+    if not covered or 'DTPOSTED' not in record.fields:
+        return False
+    try:
+        return parse_ofx_date(record.fields['DTPOSTED']) in covered
+    except ValueError:
+        return False # Left for validation to report
+
+
+async def _add_record(
+    pipeline: ImportPipeline,
+    record: OfxTransactionRecord,
+    covered: Optional[Dict[str, CoveredDates]] = None,
+) -> None:
+    """Validates a streamed record and hands it to the pipeline.
+
+    Records posted within a statement period already imported for their account
+    (`covered`, by account name) are counted and dropped before any other work.
+    """
+    if covered and _already_imported(record, covered.get(build_account_name(record.account))):
+        pipeline.summary.transactions_already_imported += 1
+        return
+    account_id = await pipeline.resolve_account(ofx_account(record.account))
+    if account_id is None:
+        return
+
+    pipeline.summary.transactions_parsed += 1
+    try:
+        transaction = record_to_transaction(record, account_id)
+    except ValueError as e:
+        pipeline.add_invalid(f"Skipped transaction {record.fields.get('FITID', '?')}: {e}")
+        return
+    await pipeline.add_transaction(transaction)
+
+
+async def _run_import(
+    records: AsyncIterator[Any],
+    pipeline: ImportPipeline,
+    covered: Optional[Dict[str, CoveredDates]] = None,
+) -> ImportSummary:
+    async for record in records:
+        if isinstance(record, OfxTransactionRecord):
+            await _add_record(pipeline, record, covered)
+    return await pipeline.finish()
+
+
+async def _aiter_sync(records) -> AsyncIterator[Any]:
+    for record in records:
+        yield record
+
+
+async def ingest_ofx_stream(
+    stream,
+    repository: Optional[Repository] = None,
+    batch_size: int = INSERT_BATCH_SIZE,
+    on_progress: Optional[Callable[[BatchProgress], None]] = None,
+) -> ImportSummary:
+    """Streams an OFX file (e.g. an `UploadFile`) into the database in bounded-size batches.
+
+    Transactions are validated and written as they are parsed; memory use depends on
+    `batch_size`, not on the size of the file. `on_progress` is called after every batch.
+    Transactions matching a categorization rule are imported with its category.
+    """
+    repository = repository or get_repository()
+    rules = await load_rule_set(repository)
+    pipeline = ImportPipeline(repository, batch_size, on_progress=on_progress, rules=rules)
+    try:
+        summary = await _run_import(aiter_ofx_records(stream), pipeline)
+        logger.info(
+            "OFX import finished: %s inserted, %s duplicates skipped.",
+            summary.transactions_inserted, summary.duplicates_skipped,
+        )
+        return summary
+    except Exception:
+        logger.exception("Error importing OFX stream")
+        raise
+
+
+def statement_dates(statement: OfxStatementInfo) -> Optional[DateRange]:
+    """The import ledger period of a statement's <BANKTRANLIST>, or None without usable dates."""
+    try:
+        return statement_range(
+            parse_ofx_date(statement.start_date) if statement.start_date else None,
+            parse_ofx_date(statement.end_date) if statement.end_date else None,
+        )
+    except ValueError:
+        return None
+
+
+def scan_ofx_file(path: Path) -> List[OfxStatementInfo]:
+    """Pre-scans a spooled OFX file for its statements (memory-mapped, transactions not parsed)."""
+    with open(path, 'rb') as f:
+        if not f.seek(0, io.SEEK_END):
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return scan_ofx_statements(data)
+
+
+class _ThreadedFileReader:
+    """Async `read()` over a regular file, so the OFX stream reader can consume it."""
+
+    def __init__(self, file):
+        self._file = file
+
+    async def read(self, size: int = -1) -> bytes:
+        return await asyncio.to_thread(self._file.read, size)
+
+
+async def ingest_ofx_file(
+    path: Path,
+    repository: Optional[Repository] = None,
+    batch_size: int = INSERT_BATCH_SIZE,
+    on_progress: Optional[Callable[[BatchProgress], None]] = None,
+    skip_imported: bool = True,
+) -> ImportSummary:
+    """Imports a spooled OFX file, skipping what the import ledger says is already in.
+
+    The file's statements and <BANKTRANLIST> periods are pre-scanned first. If every
+    statement lies within periods already imported for its account, nothing is parsed
+    or written (`already_imported`); otherwise the file is streamed as in
+    `ingest_ofx_stream`, dropping transactions posted in covered periods. The periods
+    of this file are recorded once all of its batches were written. With
+    `skip_imported=False` the whole file is imported regardless.
+    """
+    repository = repository or get_repository()
+    ledger = ImportLedger(repository)
+    with span("read", step="pre-scan") as scan_span:
+        statements = await asyncio.to_thread(scan_ofx_file, path)
+        scan_span.rows = len(statements)
+    periods = [(build_account_name(statement.account), statement_dates(statement)) for statement in statements]
+
+    names = sorted({name for name, _ in periods})
+    with span("account_resolution", rows=len(names)):
+        known_ids = await repository.get_account_ids_by_names(names) if names else {}
+    covered_by_id = await ledger.covered_dates(sorted(set(known_ids.values()))) if skip_imported else {}
+    covered = {name: covered_by_id[account_id] for name, account_id in known_ids.items() if account_id in covered_by_id}
+
+    if periods and all(period and name in covered and covered[name].covers(*period) for name, period in periods):
+        logger.info("OFX file %s covers only statement periods that were already imported; skipping.", path.name)
+        return ImportSummary(accounts_processed=len(names), already_imported=True)
+
+    rules = await load_rule_set(repository)
+    pipeline = ImportPipeline(repository, batch_size, on_progress=on_progress, rules=rules)
+    with open(path, 'rb') as f:
+        summary = await _run_import(aiter_ofx_records(_ThreadedFileReader(f)), pipeline, covered)
+    logger.info(
+        "OFX import finished: %s inserted, %s duplicates skipped, %s in already imported periods.",
+        summary.transactions_inserted, summary.duplicates_skipped, summary.transactions_already_imported,
+    )
+
+    if not summary.batches_failed:
+        ranges = []
+        for name, period in periods:
+            account_id = pipeline.account_ids.get(name, known_ids.get(name))
+            if period and account_id is not None:
+                ranges.append((account_id, period))
+        await ledger.record_ranges(ranges)
+    return summary
+
+
+async def parse_ofx(file_content: bytes, repository: Optional[Repository] = None) -> Tuple[List[Account], List[TransactionCreate]]:
+    """Parses OFX file content and returns lists of created Account objects and collected TransactionCreate objects.
+
+    Uses the same streaming pipeline as `ingest_ofx_stream`, but keeps every parsed
+    transaction for the caller; prefer `ingest_ofx_stream` for large uploads.
+    """
+    # Use provided repository or get default
+    repository = repository or get_repository()
+    transactions_data: List[TransactionCreate] = []
+    rules = await load_rule_set(repository)
+    pipeline = ImportPipeline(repository, INSERT_BATCH_SIZE, collect=transactions_data, rules=rules)
 
     try:
-        ofx = OfxParser.parse(io.BytesIO(file_content))
-
-        print(f"Parsed OFX file. Found {len(ofx.accounts)} accounts.")
-
-        for account in ofx.accounts:
-            # --- Account Handling ---
-            # Construct account name robustly, handling missing institution details
-            org_name = "Unknown Institution"
-            if account.institution and account.institution.organization:
-                org_name = account.institution.organization
-            elif account.institution and account.institution.fid:
-                org_name = f"Institution FID: {account.institution.fid}" # Use FID if org name is missing
-
-            account_name = f"{org_name} - {account.account_id} ({account.account_type.upper()})"
-            print(f"Processing account: {account_name}")
-
-            # Check if account already exists in Supabase by name
-            # Note: supabase-py v2 .execute() is not awaited directly
-            existing_account_response = supabase.table("accounts").select("id").eq("name", account_name).execute()
-            
-            account_id = None
-            if existing_account_response.data:
-                account_id = existing_account_response.data[0]['id']
-                print(f"Account '{account_name}' already exists with ID: {account_id}")
-            else:
-                # Create Account in Supabase if not exists
-                # Validate account type before creating
-                raw_account_type = account.account_type.lower().strip() if account.account_type else None
-                valid_account_types = {'checking', 'savings', 'credit'}
-                final_account_type = raw_account_type if raw_account_type in valid_account_types else None # Default to None if invalid/empty
-                
-                account_to_create = AccountCreate(name=account_name, type=final_account_type)
-                print(f"Creating new account: {account_to_create}")
-                # Note: supabase-py v2 .execute() is not awaited directly
-                created_account_response = supabase.table("accounts").insert(account_to_create.model_dump()).execute()
-                
-                if created_account_response.data:
-                    account_id = created_account_response.data[0]['id']
-                    print(f"Successfully created account '{account_name}' with ID: {account_id}")
-                    accounts_data.append(Account(**created_account_response.data[0])) # Add to return list
-                else:
-                    print(f"Error creating account: {account_name}. Response: {created_account_response.error}")
-                    # Optionally raise an error or handle differently
-                    continue # Skip transactions for this account if creation failed
-            
-            if account_id:
-                account_name_to_id_map[account_name] = account_id
-
-                # --- Transaction Handling --- 
-                statement = account.statement
-                if statement and statement.transactions:
-                    print(f"Processing {len(statement.transactions)} transactions for account ID: {account_id}")
-                    for transaction in statement.transactions:
-                        # Ensure description exists, use memo if payee is None
-                        description = transaction.payee if transaction.payee else transaction.memo
-                        if not description:
-                            description = "N/A" # Provide a default if both are missing
-
-                        transaction_to_add = TransactionCreate(
-                            account_id=account_id,
-                            date=transaction.date.date(), # Get date part only
-                            description=description,
-                            amount=Decimal(str(transaction.amount)), # Convert amount to Decimal
-                            transaction_type=transaction.type,
-                            fitid=transaction.id,
-                            # Initialize other fields as needed, e.g., category_id=None
-                        )
-                        transactions_data.append(transaction_to_add)
-                else:
-                    print(f"No transactions found for account ID: {account_id}")
-            else:
-                print(f"Skipping transactions for account {account_name} due to missing account ID.")
-
-        # --- Persist Transactions --- 
-        if transactions_data:
-            print(f"Collected {len(transactions_data)} transactions. Checking for existing fitids...")
-
-            # Get all existing fitids for the accounts processed in this file
-            account_ids_in_file = list(account_name_to_id_map.values())
-            existing_fitids = set()
-            if account_ids_in_file:
-                fitid_check_response = supabase.table("transactions").select("fitid, account_id").in_("account_id", account_ids_in_file).execute()
-                if fitid_check_response.data:
-                    for row in fitid_check_response.data:
-                        # Create a unique identifier tuple (account_id, fitid)
-                        existing_fitids.add((row['account_id'], row['fitid']))
-                # Remove the check for .error, as exceptions handle errors
-                # elif fitid_check_response.error:
-                #    print(f"Warning: Could not check existing fitids - {fitid_check_response.error}")
-            
-            print(f"Found {len(existing_fitids)} existing transaction fitids for these accounts.")
-
-            # Filter out transactions that already exist
-            transactions_to_insert_models = [
-                t for t in transactions_data 
-                if (t.account_id, t.fitid) not in existing_fitids
-            ]
-
-            if not transactions_to_insert_models:
-                print("No new transactions to insert after checking for duplicates.")
-                # Ensure we return the original collected transactions, even if none are inserted
-                return accounts_data, transactions_data 
-
-            print(f"Attempting to insert {len(transactions_to_insert_models)} new transactions...")
-            
-            # Convert Pydantic models to dictionaries for insertion
-            transactions_to_insert_dicts = [t.model_dump() for t in transactions_to_insert_models]
-            
-            # Convert Decimal and date for JSON serialization 
-            for t_dict in transactions_to_insert_dicts:
-                t_dict['amount'] = str(t_dict['amount']) 
-                if isinstance(t_dict.get('date'), date):
-                     t_dict['date'] = t_dict['date'].isoformat()
-
-            # Perform the batch insert for new transactions only
-            insert_response = supabase.table("transactions").insert(transactions_to_insert_dicts).execute()
-            
-            if insert_response.data:
-                print(f"Successfully inserted {len(insert_response.data)} transactions.")
-            else:
-                print(f"Error inserting transactions: {insert_response.error}")
-                # Optionally raise an error
-
-        # Return original collected data, regardless of insertion success/filtering
-        return accounts_data, transactions_data 
-
-    except Exception as e:
-        print(f"Error parsing OFX file: {e}")
-        # Log the exception traceback for debugging
-        import traceback
-        traceback.print_exc()
-        raise # Re-raise the exception to be handled by the caller 
\ No newline at end of file
+        await _run_import(_aiter_sync(iter_ofx_records(io.BytesIO(file_content))), pipeline)
+        logger.info("Parsed OFX file. Found %s accounts.", pipeline.summary.accounts_processed)
+        # Return created accounts and all collected transactions, regardless of dedup filtering
+        return pipeline.created_accounts, transactions_data
+
+    except Exception:
+        logger.exception("Error parsing OFX file")
+        raise # Re-raise the exception to be handled by the caller
@@ -0,0 +1,366 @@
+import codecs
+import html
+import re
+import time
+from datetime import datetime, date, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import Any, AsyncIterator, Dict, Iterator, List, NamedTuple, Optional
+
+from core.metrics import observe_stage
+
+# Size of each read from the underlying file/stream. Peak memory of the parser is
+# bounded by this plus the size of the largest single tag/value, not the file size.
+OFX_READ_CHUNK_SIZE = 64 * 1024
+
+# How many bytes we are willing to buffer while looking for the end of the OFX header.
+_MAX_HEADER_BYTES = 16 * 1024
+
+_CHARSET_RE = re.compile(rb"CHARSET:\s*([A-Za-z0-9_-]+)")
+_ENCODING_RE = re.compile(rb"ENCODING:\s*([A-Za-z0-9_-]+)")
+_XML_ENCODING_RE = re.compile(rb"<\?xml[^>]*encoding=[\"']([A-Za-z0-9_-]+)[\"']", re.IGNORECASE)
+
+# Statement aggregates that carry transactions, mapped to the account kind they describe
+_STATEMENT_TAGS = {'STMTRS': 'bank', 'CCSTMTRS': 'credit'}
+
+# Leaf tags we keep while inside a statement (outside of <STMTTRN>)
+_STATEMENT_FIELDS = {'ACCTID', 'BANKID', 'BRANCHID', 'ACCTTYPE', 'CURDEF', 'DTSTART', 'DTEND'}
+
+
+class OfxAccountInfo(NamedTuple):
+    """Identifies the account a streamed statement/transaction belongs to."""
+    organization: Optional[str]
+    fid: Optional[str]
+    account_id: str
+    account_type: str  # Raw <ACCTTYPE> value ('' for credit card statements)
+    kind: str  # 'bank' or 'credit'
+
+
+class OfxTransactionRecord(NamedTuple):
+    """A single <STMTTRN> as raw OFX field values (upper-cased tag -> text)."""
+    account: OfxAccountInfo
+    fields: Dict[str, str]
+
+
+class OfxStatementInfo(NamedTuple):
+    """Emitted when a statement aggregate closes (summary of its <BANKTRANLIST>)."""
+    account: OfxAccountInfo
+    start_date: Optional[str]
+    end_date: Optional[str]
+
+
+class OfxStreamParser:
+    """Incremental (push) tokenizer for OFX files.
+
+    Handles both SGML (OFX 1.x, unclosed leaf elements) and XML (OFX 2.x) files.
+    Bytes are fed in arbitrary chunks via `feed()`; each call returns the records
+    completed by that chunk, so a caller never holds more than the unparsed tail
+    of the stream plus the transaction currently being assembled.
+    """
+
+    def __init__(self):
+        self._decoder = None
+        self._header = b""
+        self._buf = ""
+        # Institution details from <SONRS><FI>, applied to every account in the file
+        self._organization: Optional[str] = None
+        self._fid: Optional[str] = None
+        self._in_fi = False
+        # Current statement context
+        self._statement_kind: Optional[str] = None
+        self._statement: Dict[str, str] = {}
+        self._account: Optional[OfxAccountInfo] = None
+        # Current transaction being assembled
+        self._txn: Optional[Dict[str, str]] = None
+        # Last opened tag still waiting for its text value
+        self._pending_tag: Optional[str] = None
+
+    # --- Public API ---
+
+    def feed(self, data: bytes) -> List[Any]:
+        """Feeds a chunk of raw bytes, returning any completed records."""
+        if self._decoder is None:
+            # Buffer the header until we know the encoding
+            self._header += data
+            if b"<OFX" not in self._header.upper() and len(self._header) < _MAX_HEADER_BYTES:
+                return []
+            self._decoder = codecs.getincrementaldecoder(_detect_encoding(self._header))(errors="replace")
+            data, self._header = self._header, b""
+        self._buf += self._decoder.decode(data)
+        return self._drain()
+
+    def close(self) -> List[Any]:
+        """Flushes the parser at end of stream, returning any remaining records."""
+        if self._decoder is None:
+            if not self._header:
+                return []
+            self._decoder = codecs.getincrementaldecoder(_detect_encoding(self._header))(errors="replace")
+            self._buf += self._decoder.decode(self._header)
+            self._header = b""
+        self._buf += self._decoder.decode(b"", final=True)
+        records = self._drain()
+        # Trailing text after the last tag (e.g. unterminated SGML leaf)
+        self._handle_text(self._buf)
+        self._buf = ""
+        if self._txn is not None:
+            records.extend(self._finish_transaction())
+        return records
+
+    # --- Tokenizer ---
+
+    def _drain(self) -> List[Any]:
+        records: List[Any] = []
+        buf = self._buf
+        pos = 0
+        while True:
+            lt = buf.find("<", pos)
+            if lt == -1:
+                break
+            if buf.startswith("<!--", lt):
+                end = buf.find("-->", lt + 4)
+                if end == -1:
+                    break
+                self._handle_text(buf[pos:lt])
+                pos = end + 3
+                continue
+            gt = buf.find(">", lt + 1)
+            if gt == -1:
+                break
+            self._handle_text(buf[pos:lt])
+            records.extend(self._handle_tag(buf[lt + 1:gt]))
+            pos = gt + 1
+        self._buf = buf[pos:]
+        return records
+
+    def _handle_text(self, text: str) -> None:
+        if self._pending_tag is None:
+            return
+        value = text.strip()
+        if not value:
+            return
+        tag, self._pending_tag = self._pending_tag, None
+        value = html.unescape(value)
+        if self._txn is not None:
+            # Keep the first occurrence (e.g. <NAME> before a nested <PAYEE><NAME>)
+            self._txn.setdefault(tag, value)
+        elif self._in_fi:
+            if tag == 'ORG':
+                self._organization = value
+            elif tag == 'FID':
+                self._fid = value
+        elif self._statement_kind is not None and tag in _STATEMENT_FIELDS:
+            self._statement.setdefault(tag, value)
+
+    def _handle_tag(self, raw: str) -> List[Any]:
+        raw = raw.strip()
+        if not raw or raw[0] in "?!":
+            return []  # XML declaration / OFX processing instruction / doctype
+        if raw[0] == "/":
+            self._pending_tag = None
+            return self._close_tag(raw[1:].strip().upper())
+        self_closing = raw.endswith("/")
+        name = raw.rstrip("/").split(None, 1)[0].upper()
+        records = self._open_tag(name)
+        self._pending_tag = None if self_closing else name
+        return records
+
+    def _open_tag(self, name: str) -> List[Any]:
+        records: List[Any] = []
+        if name == 'STMTTRN':
+            if self._txn is not None:
+                # Tolerate SGML files that omit </STMTTRN>
+                records.extend(self._finish_transaction())
+            self._txn = {}
+        elif name in _STATEMENT_TAGS:
+            self._statement_kind = _STATEMENT_TAGS[name]
+            self._statement = {}
+            self._account = None
+        elif name == 'FI':
+            self._in_fi = True
+        return records
+
+    def _close_tag(self, name: str) -> List[Any]:
+        if name == 'STMTTRN' or (name == 'BANKTRANLIST' and self._txn is not None):
+            return self._finish_transaction()
+        if name in _STATEMENT_TAGS and self._statement_kind is not None:
+            records: List[Any] = []
+            if self._txn is not None:
+                records.extend(self._finish_transaction())
+            account = self._current_account()
+            if account is not None:
+                records.append(OfxStatementInfo(
+                    account=account,
+                    start_date=self._statement.get('DTSTART'),
+                    end_date=self._statement.get('DTEND'),
+                ))
+            self._statement_kind = None
+            self._statement = {}
+            self._account = None
+            return records
+        if name == 'FI':
+            self._in_fi = False
+        return []
+
+    def _current_account(self) -> Optional[OfxAccountInfo]:
+        if self._account is None and self._statement_kind is not None and 'ACCTID' in self._statement:
+            self._account = OfxAccountInfo(
+                organization=self._organization,
+                fid=self._fid,
+                account_id=self._statement['ACCTID'],
+                account_type=self._statement.get('ACCTTYPE', ''),
+                kind=self._statement_kind,
+            )
+        return self._account
+
+    def _finish_transaction(self) -> List[Any]:
+        txn, self._txn = self._txn, None
+        account = self._current_account()
+        if not txn or account is None:
+            return []
+        return [OfxTransactionRecord(account=account, fields=txn)]
+
+
+def _detect_encoding(header: bytes) -> str:
+    """Picks a text codec from the OFX 1.x header or the XML declaration."""
+    match = _XML_ENCODING_RE.search(header)
+    if match:
+        return _lookup_codec(match.group(1).decode("ascii"), "utf-8")
+    match = _CHARSET_RE.search(header)
+    if match and match.group(1).isdigit():
+        return _lookup_codec(f"cp{match.group(1).decode('ascii')}", "cp1252")
+    match = _ENCODING_RE.search(header)
+    if match and match.group(1).upper().replace(b"-", b"") == b"UTF8":
+        return "utf-8"
+    return "cp1252" if header.lstrip().upper().startswith(b"OFXHEADER") else "utf-8"
+
+
+def _lookup_codec(name: str, default: str) -> str:
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return default
+
+
+# --- Iteration helpers ---
+
+def iter_ofx_records(stream, chunk_size: int = OFX_READ_CHUNK_SIZE) -> Iterator[Any]:
+    """Yields OFX records from a synchronous binary file-like object."""
+    parser = OfxStreamParser()
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+async def aiter_ofx_records(stream, chunk_size: int = OFX_READ_CHUNK_SIZE) -> AsyncIterator[Any]:
+    """Yields OFX records from an async stream such as FastAPI's `UploadFile`.
+
+    Time spent reading and parsing is summed over the whole stream and reported once
+    as the `read` and `parse` import stages.
+    """
+    parser = OfxStreamParser()
+    read_seconds = parse_seconds = 0.0
+    size = records = 0
+    try:
+        while True:
+            started = time.perf_counter()
+            chunk = await stream.read(chunk_size)
+            read_seconds += time.perf_counter() - started
+            if not chunk:
+                break
+            size += len(chunk)
+            started = time.perf_counter()
+            parsed = parser.feed(chunk)
+            parse_seconds += time.perf_counter() - started
+            records += len(parsed)
+            for record in parsed:
+                yield record
+        started = time.perf_counter()
+        parsed = parser.close()
+        parse_seconds += time.perf_counter() - started
+        records += len(parsed)
+        for record in parsed:
+            yield record
+    finally:
+        observe_stage("read", read_seconds, bytes=size)
+        observe_stage("parse", parse_seconds, rows=records)
+
+
+# --- Statement pre-scan ---
+
+# Tags needed to identify each statement and its date range. FITID is not FID: the
+# closing '>' must follow the name.
+_SCAN_RE = re.compile(rb"<(/?)(ORG|FID|ACCTID|ACCTTYPE|DTSTART|DTEND|STMTRS|CCSTMTRS)>([^<]*)", re.IGNORECASE)
+
+
+def scan_ofx_statements(data: bytes) -> List[OfxStatementInfo]:
+    """Lists the statements in an OFX file without parsing its transactions.
+
+    A single regular expression pass over the raw bytes picks out the institution,
+    account and <BANKTRANLIST> dates of every statement; values are decoded the same
+    way `OfxStreamParser` decodes them, so the accounts compare equal to the streamed
+    ones. `data` may be a `mmap`.
+    """
+    encoding = _detect_encoding(bytes(data[:_MAX_HEADER_BYTES]))
+    organization = fid = None
+    kind: Optional[str] = None
+    fields: Dict[str, str] = {}
+    statements: List[OfxStatementInfo] = []
+    for match in _SCAN_RE.finditer(data):
+        closing, tag = match.group(1), match.group(2).upper().decode('ascii')
+        if tag in _STATEMENT_TAGS:
+            if not closing:
+                kind, fields = _STATEMENT_TAGS[tag], {}
+            elif kind is not None:
+                if 'ACCTID' in fields:
+                    account = OfxAccountInfo(organization, fid, fields['ACCTID'], fields.get('ACCTTYPE', ''), kind)
+                    statements.append(OfxStatementInfo(account, fields.get('DTSTART'), fields.get('DTEND')))
+                kind = None
+            continue
+        if closing:
+            continue
+        value = html.unescape(match.group(3).decode(encoding, errors='replace').strip())
+        if not value:
+            continue
+        if kind is not None:
+            fields.setdefault(tag, value)
+        elif tag == 'ORG' and organization is None:
+            organization = value
+        elif tag == 'FID' and fid is None:
+            fid = value
+    return statements
+
+
+# --- Field conversion (mirrors ofxparse semantics) ---
+
+_TZ_RE = re.compile(r"\[(?P<tz>[-+]?\d+\.?\d*)\:?\w*\]$")
+
+
+def parse_ofx_date(value: str) -> date:
+    """Converts an OFX date/datetime (e.g. '20101106160000.00[-5:EST]') to a UTC date."""
+    value = value.strip()
+    match = _TZ_RE.search(value)
+    offset = timedelta(hours=float(match.group('tz'))) if match else timedelta(0)
+    digits = value[:14]
+    if len(digits) == 14 and digits.isdigit():
+        return (datetime.strptime(digits, '%Y%m%d%H%M%S') - offset).date()
+    return (datetime.strptime(value[:8], '%Y%m%d') - offset).date()
+
+
+def parse_ofx_amount(value: str) -> Decimal:
+    """Converts an OFX amount to Decimal, handling '1,000.50' and '1.000,50' styles."""
+    value = value.strip()
+    if value in ('null', '-null'):
+        return Decimal(0)  # Some banks use null transactions for rate-change notices
+    if re.search(r'.*\..*,', value):
+        value = value.replace('.', '')
+    if re.search(r'.*,.*\.', value):
+        value = value.replace(',', '')
+    if '.' not in value and ',' in value:
+        value = value.replace(',', '.')
+    value = value.replace(' ', '').replace('+', '')
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f"Invalid transaction amount: '{value}'")
@@ -0,0 +1,135 @@
+import asyncio
+import logging
+import os
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from models.financials import TransactionCreate
+from core.metrics import span
+from core.repository import Repository
+from services.dedup import FingerprintAssigner
+
+logger = logging.getLogger(__name__)
+
+# Default number of rows sent per upsert request (override with IMPORT_BATCH_SIZE)
+DEFAULT_BATCH_SIZE = int(os.environ.get("IMPORT_BATCH_SIZE", 500))
+# Retries per batch after the first attempt fails (network blips, statement timeouts, ...)
+DEFAULT_MAX_RETRIES = 3
+# Base delay in seconds for exponential backoff between retries
+DEFAULT_RETRY_DELAY = 0.5
+
+
+class BatchProgress(BaseModel):
+    """Running totals reported by TransactionBatchWriter after every batch."""
+    batches_written: int = 0
+    batches_failed: int = 0
+    rows_sent: int = 0
+    rows_inserted: int = 0
+    rows_duplicate: int = 0
+    rows_failed: int = 0
+    retries: int = 0
+    last_error: Optional[str] = None
+
+
+def transaction_to_row(transaction: TransactionCreate) -> Dict[str, Any]:
+    """Converts a TransactionCreate into a JSON-serializable dict for insertion."""
+    row = transaction.model_dump()
+    row['amount'] = str(row['amount'])
+    if isinstance(row.get('date'), date):
+        row['date'] = row['date'].isoformat()
+    return row
+
+
+class TransactionBatchWriter:
+    """Buffers transactions and writes them in fixed-size upsert batches.
+
+    Duplicates are resolved by the database via `ON CONFLICT (account_id, fitid) DO NOTHING`,
+    so no existing fitids are fetched and the cost of an import depends only on the rows
+    being written. Rows without a fitid get a content fingerprint (see `services.dedup`)
+    and are deduplicated on `(account_id, fingerprint)` instead; use one writer per import
+    so repeated identical transactions are numbered consistently.
+
+    Each batch is retried independently; a batch that keeps failing is recorded in the
+    progress report without aborting the rest of the import.
+    """
+
+    def __init__(
+        self,
+        repository: Repository,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        retry_delay: float = DEFAULT_RETRY_DELAY,
+        on_progress: Optional[Callable[[BatchProgress], None]] = None,
+    ):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.repository = repository
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.on_progress = on_progress
+        self.progress = BatchProgress()
+        self._rows: List[Dict[str, Any]] = []
+        self._keys = set() # (account_id, 'fitid' or 'fingerprint', value) keys already in the pending batch
+        self._fingerprints = FingerprintAssigner()
+
+    async def add(self, transaction: TransactionCreate) -> None:
+        """Queues a transaction, writing the pending batch once it is full."""
+        await self.add_row(transaction_to_row(transaction))
+
+    async def add_row(self, row: Dict[str, Any]) -> None:
+        """Queues an already validated row (see `transaction_to_row`). Rows fingerprinted
+        by the caller (per statement, in a batch import) keep their fingerprint."""
+        if not row.get('fingerprint'):
+            self._fingerprints.assign(row)
+        key = (row['account_id'], 'fitid', row['fitid']) if row.get('fitid') else (row['account_id'], 'fingerprint', row['fingerprint'])
+        if key in self._keys:
+            # Same row twice in one batch; the database would ignore it anyway
+            self.progress.rows_duplicate += 1
+            return
+        self._keys.add(key)
+        self._rows.append(row)
+        if len(self._rows) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Writes any pending rows."""
+        rows, self._rows = self._rows, []
+        self._keys = set()
+        if not rows:
+            return
+
+        self.progress.rows_sent += len(rows)
+        attempt = 0
+        while True:
+            try:
+                with span("insert_batch", attempt=attempt) as batch_span:
+                    inserted = len(await self.repository.upsert_transactions(rows))
+                    batch_span.rows = len(rows)
+                break
+            except Exception as e:
+                if attempt >= self.max_retries:
+                    logger.error(
+                        "Giving up on batch of %s transactions after %s attempts: %s", len(rows), attempt + 1, e,
+                    )
+                    self.progress.batches_failed += 1
+                    self.progress.rows_failed += len(rows)
+                    self.progress.last_error = str(e)
+                    self._report()
+                    return
+                attempt += 1
+                self.progress.retries += 1
+                logger.warning("Batch insert failed (%s); retry %s/%s", e, attempt, self.max_retries)
+                await asyncio.sleep(self.retry_delay * (2 ** (attempt - 1)))
+
+        # Only newly inserted rows come back; the rest were duplicates
+        self.progress.batches_written += 1
+        self.progress.rows_inserted += inserted
+        self.progress.rows_duplicate += len(rows) - inserted
+        self._report()
+
+    def _report(self) -> None:
+        if self.on_progress:
+            self.on_progress(self.progress.model_copy())
@@ -0,0 +1,173 @@
+import io
+import logging
+import os
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional
+
+import numpy as np
+
+from models.imports import ImportOptions, ImportSummary
+from core.repository import Repository, get_repository
+from services.categorization import load_rule_set
+from services.persistence import BatchProgress
+from services.ingest import (
+    DATE_FORMATS,
+    INSERT_BATCH_SIZE,
+    ImportPipeline,
+    ParsedChunk,
+    StatementAccount,
+    detect_encoding,
+    infer_date_format,
+    infer_decimal_comma,
+    ingest_chunks,
+    normalize_columns,
+    parse_amounts,
+)
+
+logger = logging.getLogger(__name__)
+
+# Transactions parsed per chunk
+QIF_CHUNK_ROWS = int(os.environ.get("QIF_CHUNK_ROWS", 10000))
+
+# Bytes read up front to detect the encoding
+QIF_SAMPLE_BYTES = 64 * 1024
+
+# Quicken writes US dates, so month-first is tried before day-first
+QIF_DATE_FORMATS = ['%m/%d/%Y', '%m/%d/%y', '%d/%m/%Y', '%d/%m/%y'] + [
+    fmt for fmt in DATE_FORMATS if fmt not in ('%m/%d/%Y', '%m/%d/%y', '%d/%m/%Y', '%d/%m/%y')
+]
+
+# `!Type:` sections that hold bank-style transactions
+TRANSACTION_SECTIONS = {'bank', 'cash', 'ccard', 'oth a', 'oth l'}
+
+# `!Account` types (T field) mapped to account types
+ACCOUNT_TYPES = {'bank': 'checking', 'ccard': 'credit', 'cash': None}
+
+
+def normalize_qif_dates(values: List[str]) -> np.ndarray:
+    """Rewrites Quicken's "1/ 5'98" style dates as "1/5/98"."""
+    text = np.asarray(values, dtype=str)
+    return np.char.replace(np.char.replace(text, "'", "/"), " ", "")
+
+
+def iter_qif_chunks(
+    stream,
+    date_format: Optional[str] = None,
+    chunk_rows: int = QIF_CHUNK_ROWS,
+) -> Iterator[ParsedChunk]:
+    """Reads a QIF file from a seekable binary stream in chunks of transactions.
+
+    Only bank, cash, credit card and other asset/liability sections are imported;
+    investment, category, class and memorized sections are skipped. When the file has
+    `!Account` blocks, each chunk carries the account its transactions belong to.
+    The encoding is guessed from the start of the file; bytes further on that don't
+    decode are replaced (U+FFFD) rather than failing the import.
+    """
+    sample = stream.read(QIF_SAMPLE_BYTES)
+    stream.seek(0)
+    text = io.TextIOWrapper(stream, encoding=detect_encoding(sample), errors='replace', newline=None)
+
+    account: Optional[StatementAccount] = None
+    section: Optional[str] = None
+    in_account_block = False
+    pending_account = {}
+    decimal_comma: Optional[bool] = None
+    dates: List[str] = []
+    amounts: List[str] = []
+    descriptions: List[str] = []
+    lines: List[int] = []
+    record = {}
+    record_line = 1
+
+    def flush() -> Optional[ParsedChunk]:
+        nonlocal date_format, decimal_comma
+        if not dates:
+            return None
+        if date_format is None:
+            date_format = infer_date_format(normalize_qif_dates(dates).tolist(), QIF_DATE_FORMATS)
+            if date_format is None:
+                raise ValueError("Could not recognise the date format; choose one for the upload.")
+        if decimal_comma is None:
+            decimal_comma = infer_decimal_comma(amounts)
+        cents, valid = parse_amounts(amounts, decimal_comma)
+        rows, invalid, errors = normalize_columns(
+            normalize_qif_dates(dates).tolist(), date_format, cents, valid, descriptions, lines=lines,
+        )
+        chunk = ParsedChunk(rows, len(dates), invalid, errors, account)
+        dates.clear()
+        amounts.clear()
+        descriptions.clear()
+        lines.clear()
+        return chunk
+
+    for line_number, raw in enumerate(text, 1):
+        line = raw.rstrip('\r\n')
+        if not line.strip():
+            continue
+        if line.startswith('!'):
+            header = line[1:].strip().lower()
+            chunk = flush()
+            if chunk:
+                yield chunk
+            record = {}
+            if header == 'account':
+                in_account_block, pending_account, section = True, {}, None
+            elif header.startswith('type:'):
+                in_account_block = False
+                section = header[5:].strip()
+            # !Option / !Clear lines don't change the section
+            continue
+
+        code, value = line[0], line[1:].strip()
+        if code == '^':
+            if in_account_block:
+                if pending_account.get('N'):
+                    account_type = ACCOUNT_TYPES.get(pending_account.get('T', '').lower())
+                    account = StatementAccount(pending_account['N'], account_type)
+                pending_account = {}
+            elif section in TRANSACTION_SECTIONS and record:
+                lines.append(record_line)
+                dates.append(record.get('D', ''))
+                amounts.append(record.get('T') or record.get('U') or '')
+                descriptions.append(record.get('P') or record.get('M') or '')
+                if len(dates) >= chunk_rows:
+                    yield flush()
+            record = {}
+            continue
+
+        if in_account_block:
+            pending_account.setdefault(code, value)
+        elif section in TRANSACTION_SECTIONS:
+            if not record:
+                record_line = line_number
+            # Split lines (S, E, $) repeat per split; the first value of a code is the transaction's own
+            record.setdefault(code, value)
+
+    chunk = flush()
+    if chunk:
+        yield chunk
+
+
+async def ingest_qif_file(
+    path: Path,
+    options: ImportOptions,
+    repository: Optional[Repository] = None,
+    on_progress: Optional[Callable[[BatchProgress], None]] = None,
+    batch_size: int = INSERT_BATCH_SIZE,
+) -> ImportSummary:
+    """Imports a spooled QIF file.
+
+    Transactions go to the accounts named by the file's `!Account` blocks, or to the
+    account named in `options` when the file has none.
+    """
+    repository = repository or get_repository()
+    rules = await load_rule_set(repository)
+    pipeline = ImportPipeline(repository, batch_size, on_progress=on_progress, rules=rules)
+    account = StatementAccount(options.account_name, options.account_type) if options.account_name else None
+    with open(path, 'rb') as f:
+        summary = await ingest_chunks(pipeline, iter_qif_chunks(f, options.date_format), account)
+    logger.info(
+        "QIF import finished: %s inserted, %s invalid transactions skipped.",
+        summary.transactions_inserted, summary.invalid_transactions,
+    )
+    return summary
@@ -0,0 +1,198 @@
+import bisect
+import hashlib
+import os
+import sys
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from fastapi import Depends
+
+from core.events import TransactionEvents
+from core.metrics import registry
+from core.repository import Repository, get_repository
+from models.financials import TransactionFilterParams
+
+# Most GET /transactions responses kept, and most bytes of encoded bodies they may hold
+TRANSACTION_CACHE_MAX_ENTRIES = int(os.environ.get("TRANSACTION_CACHE_MAX_ENTRIES", 1024))
+TRANSACTION_CACHE_MAX_BYTES = int(os.environ.get("TRANSACTION_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+# Seconds an entry is served; bounds staleness from writes this process does not see
+# (other workers, edits made directly in Supabase)
+TRANSACTION_CACHE_TTL = float(os.environ.get("TRANSACTION_CACHE_TTL", 60))
+
+CACHE_REQUESTS = registry.counter(
+    "transaction_cache_requests_total", "GET /transactions lookups in the result cache.", ("result",),
+)
+CACHE_EVICTIONS = registry.counter(
+    "transaction_cache_evictions_total", "Entries dropped from the result cache (size, expired, invalidated).", ("reason",),
+)
+CACHE_ENTRIES = registry.gauge("transaction_cache_entries", "Responses held in the result cache.")
+CACHE_BYTES = registry.gauge("transaction_cache_bytes", "Approximate memory held by the result cache.")
+
+CacheKey = Tuple[Any, ...]
+
+
+class CachedPage(NamedTuple):
+    body: bytes
+    headers: Dict[str, str]
+    etag: str
+    account_id: Optional[int]
+    first_date: Optional[date] # Writes dated from first_date to last_date (None: unbounded)
+    last_date: Optional[date] # can change this response
+    stored_at: float
+    size: int
+
+
+def cache_key(
+    filters: TransactionFilterParams,
+    query: Optional[str],
+    limit: int,
+    offset: int,
+    cursor: Optional[Tuple[date, int]],
+    columns: Optional[List[str]],
+) -> CacheKey:
+    """Normalized identity of one GET /transactions page."""
+    return (
+        filters.start_date, filters.end_date, filters.account_id, filters.category_id, filters.reconciled,
+        tuple(sorted(set(filters.tags))) if filters.tags else None,
+        " ".join(query.casefold().split()) if query is not None else None,
+        limit, offset, cursor, tuple(columns) if columns else None,
+    )
+
+
+class TransactionQueryCache:
+    """LRU cache of encoded GET /transactions responses, invalidated by writes.
+
+    Every insert or update published on the repository's TransactionEvents drops the
+    entries it could change: those for the row's account (or all accounts) whose date
+    range covers the row's date. Transactions never change account or date, so this is
+    exact for edits; for a cursor page the range ends at the cursor, since newer rows
+    do not shift it. Entries also expire after `ttl` seconds.
+    """
+
+    def __init__(
+        self,
+        repository: Repository,
+        max_entries: int = TRANSACTION_CACHE_MAX_ENTRIES,
+        max_bytes: int = TRANSACTION_CACHE_MAX_BYTES,
+        ttl: float = TRANSACTION_CACHE_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.repository = repository
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[CacheKey, CachedPage]" = OrderedDict()
+        self._bytes = 0
+        self.writes = 0 # Changes seen; a page read while this moved is not stored
+        events: TransactionEvents = repository.events
+        self._unsubscribe = events.subscribe(self._on_change)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def _drop(self, key: CacheKey, reason: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        CACHE_EVICTIONS.inc(reason=reason)
+
+    def _update_gauges(self) -> None:
+        CACHE_ENTRIES.set(len(self._entries))
+        CACHE_BYTES.set(self._bytes)
+
+    def get(self, key: CacheKey) -> Optional[CachedPage]:
+        entry = self._entries.get(key)
+        if entry is not None and self._clock() - entry.stored_at >= self.ttl:
+            self._drop(key, "expired")
+            self._update_gauges()
+            entry = None
+        CACHE_REQUESTS.inc(result="hit" if entry is not None else "miss")
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(
+        self,
+        key: CacheKey,
+        body: bytes,
+        headers: Dict[str, str],
+        filters: TransactionFilterParams,
+        cursor: Optional[Tuple[date, int]],
+        writes: int,
+    ) -> CachedPage:
+        """Stores a response read when `self.writes` was `writes`, and returns it with its ETag."""
+        last_date = filters.end_date
+        if cursor is not None and (last_date is None or cursor[0] < last_date):
+            last_date = cursor[0]
+        size = len(body) + sys.getsizeof(key) + 200 # Rough per-entry overhead
+        entry = CachedPage(
+            body=body,
+            headers=headers,
+            etag=f'"{hashlib.sha1(body).hexdigest()}"',
+            account_id=filters.account_id,
+            first_date=filters.start_date,
+            last_date=last_date,
+            stored_at=self._clock(),
+            size=size,
+        )
+        if writes != self.writes or size > self.max_bytes:
+            return entry # Possibly stale already, or too big to keep
+        if key in self._entries:
+            self._drop(key, "replaced")
+        self._entries[key] = entry
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._drop(next(iter(self._entries)), "size")
+        self._update_gauges()
+        return entry
+
+    def _on_change(self, kind: str, rows: List[Dict[str, Any]]) -> None:
+        self.writes += 1
+        if not self._entries:
+            return
+        changed: Dict[Optional[int], List[date]] = {} # account_id -> sorted dates written
+        for row in rows:
+            day = row.get('date')
+            if day is not None:
+                changed.setdefault(row.get('account_id'), []).append(day if isinstance(day, date) else date.fromisoformat(day[:10]))
+        for days in changed.values():
+            days.sort()
+        stale = [
+            key for key, entry in self._entries.items()
+            if any(
+                self._overlaps(entry, days)
+                for account_id, days in changed.items()
+                if entry.account_id is None or entry.account_id == account_id
+            )
+        ]
+        for key in stale:
+            self._drop(key, "invalidated")
+        self._update_gauges()
+
+    @staticmethod
+    def _overlaps(entry: CachedPage, days: List[date]) -> bool:
+        """Whether any of the sorted `days` falls in the entry's date range."""
+        index = bisect.bisect_left(days, entry.first_date) if entry.first_date is not None else 0
+        return index < len(days) and (entry.last_date is None or days[index] <= entry.last_date)
+
+    def close(self) -> None:
+        self._unsubscribe()
+
+
+_cache: Optional[TransactionQueryCache] = None
+
+
+def get_transaction_cache(repository: Repository = Depends(get_repository)) -> TransactionQueryCache:
+    """FastAPI dependency returning the result cache for the repository in use."""
+    global _cache
+    if _cache is None or _cache.repository is not repository:
+        if _cache is not None:
+            _cache.close()
+        _cache = TransactionQueryCache(repository)
+    return _cache
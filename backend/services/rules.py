@@ -0,0 +1,178 @@
+import re
+from decimal import Decimal
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from models.rules import CategorizationRule, RuleMatchType
+
+try:
+    from re import _parser as sre_parse # Python 3.11+
+except ImportError:
+    import sre_parse
+
+try:
+    import ahocorasick
+except ImportError: # Fall back to the pure-Python automaton below
+    ahocorasick = None
+
+# Distinct descriptions whose text matches are memoized per compiled rule set.
+# Bank descriptions repeat heavily (the same merchants every month).
+TEXT_MATCH_CACHE_SIZE = 65536
+
+# Shortest literal worth using as a prefilter for a regex rule
+MIN_REGEX_LITERAL_LENGTH = 3
+
+
+class _PyAutomaton:
+    """Pure-Python Aho-Corasick automaton mapping keywords to values.
+
+    Finds every keyword occurring in a text in one pass over the text, however many
+    keywords there are.
+    """
+
+    def __init__(self, keywords: Dict[str, Tuple[int, ...]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._out: List[Tuple[int, ...]] = [()]
+        for word, values in keywords.items():
+            node = 0
+            for char in word:
+                child = self._goto[node].get(char)
+                if child is None:
+                    child = len(self._goto)
+                    self._goto[node][char] = child
+                    self._goto.append({})
+                    self._out.append(())
+                node = child
+            self._out[node] += values
+        self._fail = [0] * len(self._goto)
+
+        # Breadth-first, so a node's failure target is complete before the node itself
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                target = self._fail[node]
+                while target and char not in self._goto[target]:
+                    target = self._fail[target]
+                self._fail[child] = self._goto[target].get(char, 0)
+                self._out[child] += self._out[self._fail[child]]
+
+    def values(self, text: str) -> Iterator[int]:
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if out[node]:
+                yield from out[node]
+
+
+class _CAutomaton:
+    """The same interface backed by the optional `pyahocorasick` C extension."""
+
+    def __init__(self, keywords: Dict[str, Tuple[int, ...]]):
+        self._automaton = ahocorasick.Automaton()
+        for word, values in keywords.items():
+            self._automaton.add_word(word, values)
+        if keywords:
+            self._automaton.make_automaton()
+        self._empty = not keywords
+
+    def values(self, text: str) -> Iterator[int]:
+        if self._empty:
+            return
+        for _, values in self._automaton.iter(text):
+            yield from values
+
+
+def build_automaton(keywords: Dict[str, Tuple[int, ...]]):
+    return _CAutomaton(keywords) if ahocorasick is not None else _PyAutomaton(keywords)
+
+
+def required_literal(pattern: str) -> Optional[str]:
+    """Returns the longest literal that any match of `pattern` must contain, if there is one.
+
+    Only top-level literal runs count (anything under a repeat or alternation may be
+    skipped), so the result is safe to use as a prefilter.
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except re.error:
+        return None
+    best, run = "", []
+    for op, value in parsed:
+        if op is sre_parse.LITERAL:
+            run.append(chr(value))
+            continue
+        best = max(best, "".join(run), key=len)
+        run = []
+    best = max(best, "".join(run), key=len)
+    # Lowercasing non-ASCII text doesn't always agree with re.IGNORECASE, so skip those
+    if len(best) < MIN_REGEX_LITERAL_LENGTH or not best.isascii():
+        return None
+    return best.lower()
+
+
+class RuleSet:
+    """All enabled categorization rules compiled into one matcher.
+
+    Substring patterns, plus a required literal from each regex, go into a single
+    Aho-Corasick automaton, so a description is scanned once no matter how many rules
+    exist. Only the regexes whose literal was found (or that have none) are then run,
+    and amount/account conditions are checked on the few candidates left.
+    """
+
+    def __init__(self, rules: Iterable[CategorizationRule]):
+        # Candidate indices are positions in this list, so lower index = higher precedence
+        self.rules: List[CategorizationRule] = sorted(
+            (rule for rule in rules if rule.enabled), key=lambda rule: (-rule.priority, rule.id)
+        )
+        keywords: Dict[str, List[int]] = {}
+        self._regexes: Dict[int, re.Pattern] = {}
+        always: List[int] = [] # Rules whose text condition can't be prefiltered
+
+        for index, rule in enumerate(self.rules):
+            if not rule.pattern:
+                always.append(index)
+            elif rule.match_type == RuleMatchType.substring:
+                keywords.setdefault(rule.pattern.lower(), []).append(index)
+            else:
+                self._regexes[index] = re.compile(rule.pattern, re.IGNORECASE)
+                literal = required_literal(rule.pattern)
+                if literal:
+                    keywords.setdefault(literal, []).append(index)
+                else:
+                    always.append(index)
+
+        self._always = tuple(always)
+        self._automaton = build_automaton({word: tuple(values) for word, values in keywords.items()})
+        self._text_matches = lru_cache(maxsize=TEXT_MATCH_CACHE_SIZE)(self._match_text)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def _match_text(self, description: str) -> Tuple[int, ...]:
+        """Indices of the rules whose pattern matches `description`, in precedence order."""
+        hits = set(self._automaton.values(description.lower()))
+        hits.update(self._always)
+        return tuple(
+            index for index in sorted(hits)
+            if index not in self._regexes or self._regexes[index].search(description)
+        )
+
+    def match(self, description: Optional[str], amount, account_id: Optional[int] = None) -> Optional[int]:
+        """Returns the category id of the highest-precedence matching rule, or None."""
+        for index in self._text_matches(description or ""):
+            rule = self.rules[index]
+            if rule.account_id is not None and rule.account_id != account_id:
+                continue
+            if rule.min_amount is not None or rule.max_amount is not None:
+                if not isinstance(amount, Decimal):
+                    amount = Decimal(str(amount)) # Supabase returns numerics as JSON numbers
+                if rule.min_amount is not None and amount < rule.min_amount:
+                    continue
+                if rule.max_amount is not None and amount > rule.max_amount:
+                    continue
+            return rule.category_id
+        return None
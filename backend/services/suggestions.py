@@ -0,0 +1,218 @@
+import asyncio
+import logging
+import os
+import zlib
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+from fastapi import Depends
+
+from core.events import TransactionEvents, transaction_events
+from core.repository import Repository, get_repository
+from models.financials import TransactionFilterParams
+from services.dedup import normalize_description
+from services.export import iter_transaction_chunks
+
+logger = logging.getLogger(__name__)
+
+# Features are hashed into 2**bits buckets; the model holds one float32 per bucket and category
+SUGGESTION_FEATURE_BITS = int(os.environ.get("SUGGESTION_FEATURE_BITS", 16))
+# Default minimum probability (0-1) for a category to be suggested
+SUGGESTION_MIN_CONFIDENCE = float(os.environ.get("SUGGESTION_MIN_CONFIDENCE", 0.6))
+# Additive (Laplace) smoothing of feature counts
+SUGGESTION_SMOOTHING = 0.1
+
+# Columns read to train the model
+TRAINING_COLUMNS = ["id", "description", "category_id"]
+
+
+class Suggestion(NamedTuple):
+    category_id: int
+    confidence: float # Probability of the category given the description
+
+
+@lru_cache(maxsize=65536)
+def description_features(description: str, bits: int = SUGGESTION_FEATURE_BITS) -> np.ndarray:
+    """Hashed n-gram features of a description: words, word pairs and letter trigrams.
+
+    The description is normalized and numbers (store numbers, references) are dropped.
+    Letter trigrams let "WAL-MART" and "WALMART 5403" share most of their features.
+    """
+    words = [word for word in normalize_description(description).split() if not word.isdigit()]
+    grams = [f"w:{word}" for word in words]
+    grams += [f"b:{a} {b}" for a, b in zip(words, words[1:])]
+    for word in words:
+        padded = f"^{word}$"
+        grams += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+    mask = (1 << bits) - 1
+    return np.fromiter((zlib.crc32(gram.encode()) & mask for gram in grams), np.int64, len(grams))
+
+
+class CategoryModel:
+    """Multinomial naive Bayes over hashed description features.
+
+    Training is counting, so the model learns and unlearns one transaction at a time.
+    It keeps the category it learned for each transaction id, so a transaction moved to
+    another category is moved in the counts too.
+    """
+
+    def __init__(self, bits: int = SUGGESTION_FEATURE_BITS, smoothing: float = SUGGESTION_SMOOTHING):
+        self.bits = bits
+        self.smoothing = smoothing
+        self.category_ids: List[int] = []
+        self._index: Dict[int, int] = {} # category_id -> row of the count matrices
+        self._counts = np.zeros((0, 1 << bits), np.float32) # Feature counts per category
+        self._totals = np.zeros(0, np.float64) # Feature count per category
+        self._documents = np.zeros(0, np.float64) # Transactions per category
+        self._labels: Dict[int, int] = {} # transaction id -> category_id learned
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def _category_row(self, category_id: int) -> int:
+        row = self._index.get(category_id)
+        if row is None:
+            row = self._index[category_id] = len(self.category_ids)
+            self.category_ids.append(category_id)
+            self._counts = np.vstack([self._counts, np.zeros((1, 1 << self.bits), np.float32)])
+            self._totals = np.append(self._totals, 0.0)
+            self._documents = np.append(self._documents, 0.0)
+        return row
+
+    def _add(self, descriptions: Sequence[Optional[str]], rows: Sequence[int], sign: float) -> None:
+        features = [description_features(description or "", self.bits) for description in descriptions]
+        lengths = np.array([len(f) for f in features], np.int64)
+        category_rows = np.asarray(rows, np.int64)
+        if lengths.sum():
+            np.add.at(self._counts, (np.repeat(category_rows, lengths), np.concatenate(features)), sign)
+        np.add.at(self._totals, category_rows, sign * lengths)
+        np.add.at(self._documents, category_rows, sign)
+
+    def learn(self, rows: Sequence[Dict[str, Any]]) -> None:
+        """Applies the current category of each row, replacing what was learned for its id before.
+
+        Rows without a category are forgotten.
+        """
+        forget_descriptions, forget_rows, learn_descriptions, learn_rows = [], [], [], []
+        for row in rows:
+            transaction_id, category_id = row.get('id'), row.get('category_id')
+            if transaction_id is None or 'category_id' not in row:
+                continue
+            previous = self._labels.get(transaction_id)
+            if previous == category_id:
+                continue
+            if previous is not None:
+                forget_descriptions.append(row.get('description'))
+                forget_rows.append(self._index[previous])
+                del self._labels[transaction_id]
+            if category_id is not None:
+                learn_descriptions.append(row.get('description'))
+                learn_rows.append(self._category_row(category_id))
+                self._labels[transaction_id] = category_id
+        if forget_rows:
+            self._add(forget_descriptions, forget_rows, -1.0)
+        if learn_rows:
+            self._add(learn_descriptions, learn_rows, 1.0)
+
+    def predict(self, descriptions: Sequence[Optional[str]]) -> np.ndarray:
+        """Probability of each category (columns, in `category_ids` order) for each description (rows).
+
+        Descriptions with no features get a row of NaN.
+        """
+        result = np.full((len(descriptions), len(self.category_ids)), np.nan)
+        if not self.category_ids or not descriptions:
+            return result
+        features = [description_features(description or "", self.bits) for description in descriptions]
+        ends = np.cumsum([len(f) for f in features])
+        starts = ends - np.array([len(f) for f in features])
+        flat = np.concatenate(features)
+        # log P(feature | category) for every feature occurrence in the batch: (categories, occurrences)
+        log_likelihood = (
+            np.log(self._counts[:, flat].astype(np.float64) + self.smoothing)
+            - np.log(self._totals + self.smoothing * (1 << self.bits))[:, None]
+        )
+        # Sum each description's occurrences with one cumulative sum
+        cumulative = np.concatenate([np.zeros((len(self.category_ids), 1)), np.cumsum(log_likelihood, axis=1)], axis=1)
+        scores = (cumulative[:, ends] - cumulative[:, starts]).T
+        scores += np.log(self._documents + 1) - np.log(self._documents.sum() + len(self.category_ids))
+        scores -= scores.max(axis=1, keepdims=True)
+        probabilities = np.exp(scores)
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+        has_features = ends > starts
+        result[has_features] = probabilities[has_features]
+        return result
+
+    def suggest(self, descriptions: Sequence[Optional[str]], min_confidence: float = SUGGESTION_MIN_CONFIDENCE) -> List[Optional[Suggestion]]:
+        """The most likely category for each description, or None when it is below `min_confidence`."""
+        probabilities = self.predict(descriptions)
+        if not self.category_ids:
+            return [None] * len(descriptions)
+        best = np.argmax(np.nan_to_num(probabilities, nan=-1.0), axis=1)
+        confidence = probabilities[np.arange(len(descriptions)), best]
+        return [
+            Suggestion(self.category_ids[index], float(value)) if value >= min_confidence else None
+            for index, value in zip(best.tolist(), confidence.tolist())
+        ]
+
+
+class SuggestionEngine:
+    """Category model trained on the categorized transactions, kept current incrementally.
+
+    Trained on first use. After that, rows inserted or updated through the repository
+    (category edits, bulk updates, rule re-apply, imports categorized by rules) are
+    picked up from TransactionEvents and learned before the next suggestion.
+    """
+
+    def __init__(self, repository: Repository, events: TransactionEvents = transaction_events):
+        self.repository = repository
+        self.model = CategoryModel()
+        self._pending: List[Dict[str, Any]] = []
+        self._loaded = False
+        self._loading = False
+        self._lock = asyncio.Lock()
+        self._unsubscribe = events.subscribe(self._on_change)
+
+    def _on_change(self, kind: str, rows: List[Dict[str, Any]]) -> None:
+        if self._loaded or self._loading: # Before loading, the load itself will see these rows
+            self._pending.extend(rows)
+
+    async def _load(self) -> None:
+        self._loading = True
+        try:
+            async for rows in iter_transaction_chunks(self.repository, TransactionFilterParams(), columns=TRAINING_COLUMNS):
+                self.model.learn([row for row in rows if row.get('category_id') is not None])
+            self._loaded = True
+            logger.info(
+                "Trained category suggestions on %s transactions in %s categories.",
+                len(self.model), len(self.model.category_ids),
+            )
+        finally:
+            self._loading = False
+
+    async def ready(self) -> CategoryModel:
+        """Returns the model, trained and up to date."""
+        if not self._loaded:
+            async with self._lock:
+                if not self._loaded:
+                    await self._load()
+        if self._pending:
+            pending, self._pending = self._pending, []
+            self.model.learn(pending)
+        return self.model
+
+    def close(self) -> None:
+        self._unsubscribe()
+
+
+_engine: Optional[SuggestionEngine] = None
+
+
+def get_suggestion_engine(repository: Repository = Depends(get_repository)) -> SuggestionEngine:
+    """FastAPI dependency returning the shared suggestion engine for the repository in use."""
+    global _engine
+    if _engine is None or _engine.repository is not repository:
+        if _engine is not None:
+            _engine.close()
+        _engine = SuggestionEngine(repository, repository.events)
+    return _engine
@@ -0,0 +1,137 @@
+import os
+import sys
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+import pytest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+from core.events import TransactionEvents
+from services.analytics import (
+    AnalyticsStore,
+    TransactionColumns,
+    UNCATEGORIZED,
+    category_percentiles,
+    get_analytics_store,
+    daily_spending,
+    day_number,
+    group_totals,
+    month_date,
+    rolling_sum,
+    unusual_transactions,
+)
+
+
+def row(row_id, day, amount, category_id=None, account_id=1):
+    return {'id': row_id, 'account_id': account_id, 'date': day, 'amount': amount, 'category_id': category_id}
+
+
+ROWS = [
+    row(3, "2025-04-02", -12.5, 1),
+    row(1, "2025-03-31", 2500.0),
+    row(2, "2025-04-01", -0.1, 1),
+    row(4, "2025-04-07", -80, 2),
+]
+
+
+def test_from_rows_builds_sorted_integer_columns():
+    columns = TransactionColumns.from_rows(ROWS + [row(2, "2025-04-01", -0.2, 1)]) # Later duplicate wins
+
+    assert columns.ids.tolist() == [1, 2, 3, 4]
+    assert columns.amounts.tolist() == [250000, -20, -1250, -8000]
+    assert columns.categories.tolist() == [UNCATEGORIZED, 1, 1, 2]
+    assert columns.days[0] == day_number(date(2025, 3, 31))
+
+
+def test_merge_updates_existing_and_adds_new_rows():
+    columns = TransactionColumns.from_rows(ROWS)
+
+    merged = columns.merge([row(3, "2025-04-02", -12.5, 7), row(0, "2025-01-01", -1), row(9, "2025-05-01", -2)])
+
+    assert merged.ids.tolist() == [0, 1, 2, 3, 4, 9]
+    assert merged.categories.tolist() == [UNCATEGORIZED, UNCATEGORIZED, 1, 7, 2, UNCATEGORIZED]
+
+
+def test_group_totals():
+    columns = TransactionColumns.from_rows(ROWS)
+
+    by_category = {g['key']: (g['spending_cents'], g['count']) for g in group_totals(columns, "category")}
+    assert by_category == {UNCATEGORIZED: (0, 1), 1: (1260, 2), 2: (8000, 1)}
+
+    by_month = group_totals(columns, "month")
+    assert [(month_date(g['key']), g['income_cents'], g['spending_cents']) for g in by_month] == [
+        (date(2025, 3, 1), 250000, 0), (date(2025, 4, 1), 0, 9260),
+    ]
+    # 2025-03-31 was a Monday, 2025-04-07 too
+    assert {g['key']: g['count'] for g in group_totals(columns, "weekday")} == {0: 2, 1: 1, 2: 1}
+
+
+def test_daily_spending_and_rolling_sum():
+    columns = TransactionColumns.from_rows(ROWS)
+    start = day_number(date(2025, 4, 1))
+
+    series = daily_spending(columns, start, start + 6)
+
+    assert series.tolist() == [10, 1250, 0, 0, 0, 0, 8000]
+    assert rolling_sum(series, 2).tolist() == [10, 1260, 1250, 0, 0, 0, 8000]
+
+
+def test_percentiles_match_numpy_per_category():
+    rng = np.random.default_rng(1)
+    rows = [row(i, "2025-04-01", -float(rng.integers(1, 10000)) / 100, int(rng.integers(1, 4))) for i in range(500)]
+    columns = TransactionColumns.from_rows(rows)
+
+    stats = category_percentiles(columns, [50, 90])
+
+    for category in (1, 2, 3):
+        spend = [-r['amount'] * 100 for r in rows if r['category_id'] == category]
+        assert stats[category]['count'] == len(spend)
+        assert stats[category]['percentiles'] == pytest.approx(np.percentile(spend, [50, 90]).tolist())
+
+
+def test_unusual_transactions_flags_outliers():
+    rows = [row(i, "2025-04-01", -10, 1) for i in range(20)] + [row(99, "2025-04-02", -500, 1)]
+
+    unusual = unusual_transactions(TransactionColumns.from_rows(rows), min_count=10)
+
+    assert [item['id'] for item in unusual] == [99]
+
+
+@pytest.mark.asyncio
+async def test_store_follows_repository_writes():
+    repository = MagicMock()
+    repository.list_transactions = AsyncMock(return_value=ROWS)
+    events = TransactionEvents()
+    store = AnalyticsStore(repository, events=events)
+
+    assert len(await store.columns()) == 4
+    events.publish("inserted", [row(5, "2025-04-08", -3, account_id=2)])
+    events.publish("updated", [row(4, "2025-04-07", -80, 5)])
+
+    account_2 = await store.columns(2)
+    assert account_2.ids.tolist() == [5]
+    assert (await store.columns()).categories.tolist()[3] == 5
+    repository.list_transactions.assert_awaited_once() # Changes were merged, not re-read
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_shared_store_follows_the_injected_repository_and_its_events():
+    repository = MagicMock()
+    repository.list_transactions = AsyncMock(return_value=ROWS)
+    repository.events = TransactionEvents()
+    store = get_analytics_store(repository)
+
+    assert len(await store.columns()) == 4
+    repository.events.publish("inserted", [row(5, "2025-04-08", -3)])
+    assert len(await store.columns()) == 5
+    assert get_analytics_store(repository) is store
+
+    other = MagicMock()
+    other.events = TransactionEvents()
+    assert get_analytics_store(other).repository is other
+    get_analytics_store(other).close()
@@ -0,0 +1,169 @@
+import os
+import re
+import shutil
+import sys
+import zipfile
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+from core.events import TransactionEvents
+from core.memory_repository import InMemoryRepository
+import services.batch_import as batch_import
+from services.batch_import import BatchSource, list_batch_sources, parse_statement_file, run_batch_import
+
+TEST_FILES_DIR = os.path.dirname(__file__)
+
+
+class InlineExecutor(Executor):
+    """Runs parse jobs in the calling thread, so tests need no worker processes."""
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+def make_repository(existing=None):
+    repository = MagicMock()
+    repository.get_account_ids_by_names = AsyncMock(return_value=dict(existing or {}))
+    repository.create_accounts = AsyncMock(
+        side_effect=lambda rows: [{'id': 100 + i, **row} for i, row in enumerate(rows)]
+    )
+    repository.upsert_transactions = AsyncMock(side_effect=lambda rows: rows)
+    repository.list_rules = AsyncMock(return_value=[])
+    return repository
+
+
+def make_batch(tmp_path):
+    """A batch with two plain statements and a zip holding a third (same account as the first)."""
+    batch_dir = tmp_path / "job.batch"
+    batch_dir.mkdir()
+    shutil.copy(os.path.join(TEST_FILES_DIR, "test1.ofx"), batch_dir / "0000-test1.ofx")
+    shutil.copy(os.path.join(TEST_FILES_DIR, "test2.ofx"), batch_dir / "0001-test2.qfx")
+    with zipfile.ZipFile(batch_dir / "0002-more.zip", "w") as archive:
+        archive.write(os.path.join(TEST_FILES_DIR, "test3.ofx"), "statements/test3.ofx")
+        archive.writestr("statements/readme.txt", "not a statement")
+    return batch_dir
+
+
+def test_list_batch_sources_expands_zip_members(tmp_path):
+    batch_dir = make_batch(tmp_path)
+    sources = list_batch_sources(batch_dir)
+    assert [source.name for source in sources] == ["0000-test1.ofx", "0001-test2.qfx", "0002-more.zip:statements/test3.ofx"]
+
+    with pytest.raises(ValueError):
+        list_batch_sources(batch_dir, max_files=2)
+
+
+def test_corrupt_zip_is_rejected(tmp_path):
+    (tmp_path / "broken.zip").write_bytes(b"not a zip")
+    with pytest.raises(ValueError):
+        list_batch_sources(tmp_path)
+
+
+def test_parse_statement_file_in_worker_process():
+    # Results cross a process boundary, so they must pickle
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        parsed = executor.submit(parse_statement_file, BatchSource(os.path.join(TEST_FILES_DIR, "test2.ofx"))).result()
+    assert parsed.parsed == 15
+    [(account, rows)] = parsed.accounts
+    assert account.account_id == "XXXXXXXXXXXX0523"
+    assert len(rows) == 15 and 'account_id' not in rows[0]
+
+
+@pytest.mark.asyncio
+async def test_batch_resolves_accounts_once_and_writes_each_account(tmp_path):
+    batch_dir = make_batch(tmp_path)
+    repository = make_repository()
+    reports = []
+
+    summary = await run_batch_import(batch_dir, reports.append, repository=repository, executor=InlineExecutor())
+
+    # Both accounts looked up in one query and created in one insert
+    repository.get_account_ids_by_names.assert_awaited_once()
+    repository.create_accounts.assert_awaited_once()
+    assert len(repository.create_accounts.await_args.args[0]) == 2
+
+    assert summary.files_processed == 3
+    assert summary.files_failed == 0
+    assert summary.accounts_processed == 2
+    assert summary.accounts_created == 2
+    assert summary.transactions_parsed == 4 + 15 + 23
+    # test1 and test3 share FITIDs for the same account; repeats within a batch are dropped
+    assert summary.transactions_inserted + summary.duplicates_skipped == summary.transactions_parsed
+    written = [row for call in repository.upsert_transactions.await_args_list for row in call.args[0]]
+    assert {row['account_id'] for row in written} == {100, 101}
+    assert reports and reports[-1].rows_inserted == summary.transactions_inserted
+
+
+@pytest.mark.asyncio
+async def test_batch_uses_existing_accounts_and_reports_failed_files(tmp_path, monkeypatch):
+    batch_dir = make_batch(tmp_path)
+    name = "Unknown Institution - XXXXXXXXXXXX0523 ()" # Credit card statements have no ACCTTYPE
+    repository = make_repository(existing={name: 7})
+    real_parse = batch_import.parse_statement_file
+
+    def flaky_parse(source):
+        if source.member:
+            raise ValueError("truncated archive member")
+        return real_parse(source)
+
+    monkeypatch.setattr(batch_import, "parse_statement_file", flaky_parse)
+    summary = await run_batch_import(batch_dir, lambda progress: None, repository=repository, executor=InlineExecutor())
+
+    assert summary.files_processed == 2
+    assert summary.files_failed == 1
+    assert any("truncated archive member" in error for error in summary.errors)
+    written = [row for call in repository.upsert_transactions.await_args_list for row in call.args[0]]
+    assert {row['account_id'] for row in written} == {7, 100}
+
+
+@pytest.mark.asyncio
+async def test_overlapping_statements_without_fitids_are_inserted_once(tmp_path):
+    with open(os.path.join(TEST_FILES_DIR, "test1.ofx"), "rb") as f:
+        statement = re.sub(rb"<FITID>[^\r\n<]*\r?\n?", b"", f.read())
+    batch_dir = tmp_path / "job.batch"
+    batch_dir.mkdir()
+    (batch_dir / "0000-april.ofx").write_bytes(statement)
+    (batch_dir / "0001-april-again.ofx").write_bytes(statement)
+    repository = InMemoryRepository(events=TransactionEvents())
+
+    summary = await run_batch_import(batch_dir, lambda progress: None, repository=repository, executor=InlineExecutor())
+
+    assert summary.transactions_parsed == 8
+    assert summary.transactions_inserted == 4 and summary.duplicates_skipped == 4
+    assert all(row['fingerprint'] for row in repository.transactions.values())
+
+
+@pytest.mark.asyncio
+async def test_batch_checks_and_records_the_import_ledger(tmp_path):
+    for name in ("first", "again", "forced"):
+        (tmp_path / name).mkdir()
+    repository = InMemoryRepository(events=TransactionEvents())
+    first = await run_batch_import(make_batch(tmp_path / "first"), lambda progress: None, repository=repository, executor=InlineExecutor())
+    again = await run_batch_import(make_batch(tmp_path / "again"), lambda progress: None, repository=repository, executor=InlineExecutor())
+
+    # The same April statement, renamed and without its first transaction, is covered by the ledger's ranges
+    with open(os.path.join(TEST_FILES_DIR, "test1.ofx"), "rb") as f:
+        statement = re.sub(rb"<STMTTRN>.*?</STMTTRN>", b"", f.read(), count=1, flags=re.S)
+    batch_dir = tmp_path / "trimmed.batch"
+    batch_dir.mkdir()
+    (batch_dir / "0000-april.ofx").write_bytes(statement)
+    trimmed = await run_batch_import(batch_dir, lambda progress: None, repository=repository, executor=InlineExecutor())
+    forced = await run_batch_import(
+        make_batch(tmp_path / "forced"), lambda progress: None, repository=repository, executor=InlineExecutor(), skip_imported=False,
+    )
+
+    assert first.transactions_inserted > 0 and not first.already_imported
+    assert again.already_imported and again.files_processed == 3 and again.transactions_parsed == 0
+    assert trimmed.transactions_already_imported == 3 and trimmed.transactions_inserted == 0
+    assert forced.transactions_parsed == first.transactions_parsed and forced.transactions_inserted == 0
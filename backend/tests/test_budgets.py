@@ -0,0 +1,200 @@
+import asyncio
+import os
+import sys
+from datetime import date
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+from main import app
+from core.events import TransactionEvents
+from core.memory_repository import InMemoryRepository
+from core.repository import get_repository
+from services.budgets import BudgetEngine, budget_period, build_goal_progress, get_budget_engine
+from services.category_cache import CategoryCache, get_category_cache
+
+DINING, GROCERIES = 5, 6
+TODAY = date(2025, 4, 15)
+
+
+def make_row(fitid, day, amount, category_id=DINING, account_id=1):
+    return {'account_id': account_id, 'date': day, 'amount': amount, 'description': "Cafe", 'fitid': fitid, 'category_id': category_id}
+
+
+async def seeded(events):
+    repository = InMemoryRepository(
+        categories=[{'id': DINING, 'name': "Dining", 'is_custom': False}, {'id': GROCERIES, 'name': "Groceries", 'is_custom': False}],
+        events=events,
+    )
+    await repository.upsert_transactions([
+        make_row("A", "2025-04-02", "-50.00"),
+        make_row("B", "2025-04-03", "-30.00"),
+        make_row("C", "2025-04-04", "10.00"), # Refund
+        make_row("D", "2025-03-20", "-200.00"),
+        make_row("E", "2024-12-31", "-999.00"), # Last year
+        make_row("F", "2025-04-05", "-40.00", category_id=GROCERIES),
+    ])
+    await repository.create_budget({'category_id': DINING, 'amount': "100.00", 'period': "monthly"})
+    await repository.create_budget({'category_id': DINING, 'amount': "1000.00", 'period': "yearly"})
+    return repository
+
+
+def test_budget_period():
+    assert budget_period("monthly", date(2024, 2, 10)) == (date(2024, 2, 1), date(2024, 2, 29))
+    assert budget_period("yearly", date(2024, 2, 10)) == (date(2024, 1, 1), date(2024, 12, 31))
+
+
+@pytest.mark.asyncio
+async def test_engine_totals_net_spending_per_period():
+    events = TransactionEvents()
+    engine = BudgetEngine(await seeded(events), events, today=lambda: TODAY)
+
+    budgets = await engine.budgets()
+
+    assert len(budgets) == 2
+    assert engine.spent(DINING, date(2025, 4, 1), date(2025, 4, 30)) == 7000
+    assert engine.spent(DINING, date(2025, 1, 1), date(2025, 12, 31)) == 27000
+    assert engine.spent(GROCERIES, date(2025, 4, 1), date(2025, 4, 30)) == 4000
+    engine.close()
+
+
+@pytest.mark.asyncio
+async def test_engine_follows_imports_and_recategorization_with_alerts():
+    events = TransactionEvents()
+    repository = await seeded(events)
+    engine = BudgetEngine(repository, events, today=lambda: TODAY)
+    await engine.budgets()
+    received = []
+    engine.subscribe(received.append)
+
+    # 70 -> 85 crosses 80% of the monthly budget
+    [new] = await repository.upsert_transactions([make_row("G", "2025-04-10", "-15.00")])
+    assert [(a.threshold, a.spent) for a in received] == [(0.8, Decimal("85.00"))]
+
+    # Moving the groceries row into Dining: 85 -> 125 crosses 100%
+    await repository.update_transaction(6, {'category_id': DINING}) # Row F
+    assert [a.threshold for a in received] == [0.8, 1.0]
+    assert engine.spent(GROCERIES, date(2025, 4, 1), date(2025, 4, 30)) == 0
+
+    # Moving a row out goes back under without alerting; updates that do not touch amounts are ignored
+    await repository.update_transaction(new['id'], {'category_id': None})
+    await repository.update_transaction(1, {'reconciled': True})
+    assert engine.spent(DINING, date(2025, 4, 1), date(2025, 4, 30)) == 11000
+    assert len(received) == 2
+    assert [a.threshold for a in engine.recent_alerts()] == [1.0, 0.8]
+    engine.close()
+
+
+@pytest.mark.asyncio
+async def test_engine_alerts_on_imports_before_any_dashboard_read():
+    events = TransactionEvents()
+    repository = await seeded(events)
+    engine = BudgetEngine(repository, events, today=lambda: TODAY)
+    received = []
+    engine.subscribe(received.append)
+
+    # 70 -> 85 crosses 80% of the monthly budget, with nothing loaded yet
+    await repository.upsert_transactions([make_row("G", "2025-04-10", "-15.00")])
+    await engine._catch_up_task
+    assert [(a.threshold, a.spent) for a in received] == [(0.8, Decimal("85.00"))]
+
+    # A budget added afterwards is alerted on too
+    await repository.create_budget({'category_id': GROCERIES, 'amount': "55.00", 'period': "monthly"})
+    await engine.reload_budgets()
+    await repository.upsert_transactions([make_row("H", "2025-04-11", "-5.00", category_id=GROCERIES)])
+    assert [(a.category_id, a.threshold) for a in received] == [(DINING, 0.8), (GROCERIES, 0.8)]
+    engine.close()
+
+
+@pytest.mark.asyncio
+async def test_shared_engine_follows_the_injected_repository_and_its_events():
+    repository = await seeded(TransactionEvents())
+    engine = get_budget_engine(repository)
+    await engine.budgets()
+
+    today = date.today() # The shared engine's clock
+    await repository.upsert_transactions([make_row("G", today.isoformat(), "-15.00")])
+
+    assert engine.spent(DINING, *budget_period("monthly", today)) == 1500
+    assert get_budget_engine(repository) is engine
+    other = InMemoryRepository(events=TransactionEvents())
+    assert get_budget_engine(other).repository is other
+    get_budget_engine(other).close()
+
+
+def test_goal_progress_uses_account_balance_and_deadline():
+    goal = {'id': 1, 'name': "Emergency fund", 'target_amount': 5000, 'current_amount': 100, 'deadline': "2025-12-31", 'account_id': 2}
+
+    progress = build_goal_progress(goal, {2: Decimal("1000")}, TODAY)
+
+    assert progress.saved == Decimal("1000")
+    assert progress.remaining == Decimal("4000")
+    assert progress.fraction_saved == pytest.approx(0.2)
+    assert progress.monthly_needed == Decimal("444.44") # 9 months, April to December
+    manual = build_goal_progress({**goal, 'account_id': None, 'deadline': None}, {}, TODAY)
+    assert manual.saved == Decimal("100") and manual.monthly_needed is None
+
+
+@pytest.fixture
+def client():
+    events = TransactionEvents()
+    repository = asyncio.run(seeded(events))
+    engine = BudgetEngine(repository, events, today=lambda: TODAY)
+    app.dependency_overrides[get_repository] = lambda: repository
+    app.dependency_overrides[get_category_cache] = lambda: CategoryCache(repository)
+    app.dependency_overrides[get_budget_engine] = lambda: engine
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    engine.close()
+
+
+def test_budget_crud_and_dashboard(client):
+    assert client.post("/budgets/", json={'category_id': 99, 'amount': "10"}).status_code == 400
+    assert client.post("/budgets/", json={'category_id': DINING, 'amount': "10"}).status_code == 409
+    created = client.post("/budgets/", json={'category_id': GROCERIES, 'amount': "50"})
+    assert created.status_code == 201
+
+    overview = client.get("/dashboard/budgets").json()
+    assert [(b['category_name'], b['period'], b['spent']) for b in overview['budgets']] == [
+        ("Groceries", "monthly", "40.00"), ("Dining", "monthly", "70.00"), ("Dining", "yearly", "270.00"),
+    ]
+    assert client.put(f"/budgets/{created.json()['id']}", json={'amount': "400"}).status_code == 200
+    assert client.get("/dashboard/budgets").json()['budgets'][-1]['fraction_spent'] == pytest.approx(0.1)
+    assert client.delete("/budgets/99").status_code == 404
+
+
+def test_budget_period_change_keeps_one_budget_per_category_and_period(client):
+    dining = {b['period']: b['id'] for b in client.get("/budgets/").json() if b['category_id'] == DINING}
+
+    response = client.put(f"/budgets/{dining['monthly']}", json={'period': "yearly"})
+
+    assert response.status_code == 409
+    assert client.put(f"/budgets/{dining['yearly']}", json={'period': "yearly", 'amount': "300"}).status_code == 200
+
+
+def test_delete_errors_are_reported():
+    repository = MagicMock()
+    repository.delete_budget = AsyncMock(side_effect=RuntimeError("connection lost"))
+    repository.delete_goal = AsyncMock(side_effect=RuntimeError("connection lost"))
+    app.dependency_overrides[get_repository] = lambda: repository
+    app.dependency_overrides[get_budget_engine] = lambda: MagicMock()
+    try:
+        client = TestClient(app)
+        budget, goal = client.delete("/budgets/1"), client.delete("/goals/1")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert budget.status_code == goal.status_code == 500
+    assert "connection lost" in budget.json()['detail']
+
+
+def test_goal_dashboard(client):
+    client.post("/goals/", json={'name': "Holiday", 'target_amount': "1000", 'current_amount': "250"})
+    [goal] = client.get("/dashboard/goals").json()
+    assert goal['saved'] == "250" and goal['fraction_saved'] == 0.25
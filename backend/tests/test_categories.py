@@ -0,0 +1,122 @@
+import os
+import sys
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+from main import app
+from core.repository import get_repository
+from services.category_cache import CategoryCache, get_category_cache
+
+CATEGORIES = [
+    {'id': 2, 'name': "Dining", 'is_custom': False},
+    {'id': 1, 'name': "Groceries", 'is_custom': False},
+]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def repository():
+    repo = MagicMock()
+    repo.list_categories = AsyncMock(return_value=list(CATEGORIES))
+    return repo
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(repository, clock):
+    return CategoryCache(repository, ttl=60, clock=clock)
+
+
+@pytest.fixture
+def client(cache):
+    app.dependency_overrides[get_category_cache] = lambda: cache
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_cache_reloads_after_ttl(cache, repository, clock):
+    await cache.get()
+    await cache.get()
+    assert repository.list_categories.await_count == 1
+
+    clock.now += 61
+    await cache.get()
+    assert repository.list_categories.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_invalidate_forces_reload(cache, repository):
+    await cache.get()
+    cache.invalidate()
+    await cache.get()
+    assert repository.list_categories.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_unknown_id_reloads_at_most_once_per_interval(cache, repository, clock):
+    assert await cache.exists(1)
+    assert not await cache.exists(5) # Too soon after the load to reload
+    assert repository.list_categories.await_count == 1
+
+    clock.now += 10
+    repository.list_categories.return_value = CATEGORIES + [{'id': 5, 'name': "Pets", 'is_custom': True}]
+    assert await cache.exists(5)
+    assert repository.list_categories.await_count == 2
+
+
+def test_get_categories_returns_list_with_etag(client):
+    response = client.get("/categories/")
+
+    assert response.status_code == 200
+    assert response.json() == CATEGORIES
+    assert response.headers["ETag"]
+
+
+def test_matching_etag_returns_304(client, repository):
+    etag = client.get("/categories/").headers["ETag"]
+
+    response = client.get("/categories/", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    repository.list_categories.assert_awaited_once()
+
+
+def test_etag_changes_with_content(client, cache, repository):
+    etag = client.get("/categories/").headers["ETag"]
+    repository.list_categories.return_value = CATEGORIES[:1]
+    cache.invalidate()
+
+    response = client.get("/categories/", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_shared_cache_follows_the_repository_override(repository):
+    app.dependency_overrides[get_repository] = lambda: repository
+    try:
+        response = TestClient(app).get("/categories/")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.json() == CATEGORIES
+    repository.list_categories.assert_awaited_once()
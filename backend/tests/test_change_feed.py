@@ -0,0 +1,150 @@
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+from core.events import TransactionEvents
+from services.change_feed import ChangeFeed, stream_changes
+
+
+def row(row_id, account_id=1, amount=-10.5, **fields):
+    return {'id': row_id, 'account_id': account_id, 'date': "2025-04-01", 'amount': amount,
+            'description': f"Row {row_id}", 'fitid': f"F{row_id}", **fields}
+
+
+def parse(chunk: bytes) -> dict:
+    fields = dict(line.split(": ", 1) for line in chunk.decode().strip().splitlines())
+    fields['data'] = json.loads(fields['data'])
+    return fields
+
+
+def test_feed_numbers_changes_and_keeps_compact_rows():
+    events = TransactionEvents()
+    feed = ChangeFeed(events)
+
+    events.publish("inserted", [row(1), row(2)])
+    events.publish("updated", [row(1, notes="checked")])
+
+    assert feed.last_seq == 2
+    complete, changes = feed.changes_after(1)
+    assert complete
+    assert [(change.seq, change.kind) for change in changes] == [(2, "updated")]
+    assert changes[0].rows[0]['notes'] == "checked"
+    assert changes[0].rows[0]['amount'] == "-10.5"
+    assert 'fitid' not in changes[0].rows[0]
+
+    feed.close()
+    events.publish("inserted", [row(3)])
+    assert feed.last_seq == 2
+
+
+def test_feed_drops_oldest_changes_past_max_rows():
+    events = TransactionEvents()
+    feed = ChangeFeed(events, max_rows=3)
+
+    events.publish("inserted", [row(1), row(2)])
+    events.publish("inserted", [row(3), row(4)])
+
+    assert feed.changes_after(0) == (False, list(feed._changes))
+    assert [change.seq for change in feed.changes_after(1)[1]] == [2]
+
+
+def test_parse_event_id_rejects_other_epochs_and_future_ids():
+    feed = ChangeFeed(TransactionEvents())
+
+    assert feed.parse_event_id(feed.event_id(0)) == 0
+    assert feed.parse_event_id(feed.event_id(5)) is None
+    assert feed.parse_event_id("deadbeef-0") is None
+    assert feed.parse_event_id("garbage") is None
+
+
+@pytest.mark.asyncio
+async def test_stream_sends_ready_then_live_changes():
+    events = TransactionEvents()
+    feed = ChangeFeed(events)
+    stream = stream_changes(feed, account_id=2, heartbeat=5)
+
+    assert (await anext(stream)).startswith(b"retry: ")
+    ready = parse(await anext(stream))
+    assert ready['event'] == "ready" and ready['id'] == feed.event_id(0)
+
+    pending = asyncio.ensure_future(anext(stream))
+    await asyncio.sleep(0)
+    events.publish("inserted", [row(1, account_id=1)]) # Filtered out
+    events.publish("inserted", [row(2, account_id=2)])
+    change = parse(await asyncio.wait_for(pending, 1))
+
+    assert change['event'] == "inserted"
+    assert change['id'] == feed.event_id(2)
+    assert [r['id'] for r in change['data']['rows']] == [2]
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stream_sends_changes_made_while_it_was_sending():
+    events = TransactionEvents()
+    feed = ChangeFeed(events)
+    stream = stream_changes(feed, heartbeat=5)
+    await anext(stream) # retry
+    await anext(stream) # ready
+
+    pending = asyncio.ensure_future(anext(stream))
+    await asyncio.sleep(0)
+    events.publish("inserted", [row(1)])
+    assert parse(await asyncio.wait_for(pending, 1))['id'] == feed.event_id(1)
+    # Published while the stream is suspended on the event above, before it waits again
+    events.publish("inserted", [row(2)])
+    change = parse(await asyncio.wait_for(anext(stream), 1))
+
+    assert change['id'] == feed.event_id(2)
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stream_replays_changes_after_last_event_id():
+    events = TransactionEvents()
+    feed = ChangeFeed(events)
+    events.publish("inserted", [row(1)])
+    events.publish("updated", [row(1, reconciled=True)])
+
+    stream = stream_changes(feed, feed.event_id(1))
+    await anext(stream) # retry
+    assert parse(await anext(stream))['event'] == "ready"
+    replayed = parse(await anext(stream))
+
+    assert replayed['event'] == "updated" and replayed['id'] == feed.event_id(2)
+    assert replayed['data']['rows'][0]['reconciled'] is True
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stream_resets_unknown_or_expired_ids():
+    events = TransactionEvents()
+    feed = ChangeFeed(events, max_rows=1)
+    events.publish("inserted", [row(1)])
+    events.publish("inserted", [row(2)])
+
+    for last_event_id in ("otherepoch-1", feed.event_id(0)):
+        stream = stream_changes(feed, last_event_id)
+        await anext(stream)
+        reset = parse(await anext(stream))
+        assert reset['event'] == "reset" and reset['id'] == feed.event_id(2)
+        assert parse(await anext(stream))['event'] == "ready"
+        await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stream_sends_keep_alive_when_idle():
+    feed = ChangeFeed(TransactionEvents())
+    stream = stream_changes(feed, heartbeat=0.01)
+    await anext(stream)
+    await anext(stream)
+
+    assert await anext(stream) == b": keep-alive\n\n"
+    await stream.aclose()
@@ -0,0 +1,133 @@
+import io
+import os
+import sys
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+import pytest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+from models.imports import CsvColumnMapping, ImportFormat, ImportOptions
+from services.csv_parser import ingest_csv_file, iter_csv_chunks
+from services.ingest import format_cents, infer_date_format, parse_amounts
+
+
+def read_all(data: bytes, mapping=None, chunk_rows=1000):
+    return list(iter_csv_chunks(io.BytesIO(data), mapping, chunk_rows=chunk_rows))
+
+
+def test_parse_amounts_handles_bank_notations():
+    cents, valid = parse_amounts(["1,234.56", "(12.50)", "12.50-", "5.00 DR", "7.10 CR", "$-0.05", "1.234", "abc", ""])
+    assert cents[valid].tolist() == [123456, -1250, -1250, -500, 710, -5]
+    assert valid.tolist() == [True] * 6 + [False] * 3
+
+    cents, valid = parse_amounts(["1.234,56", "-4,5"], decimal_comma=True)
+    assert cents.tolist() == [123456, -450] and valid.all()
+    assert format_cents(np.array([123456, -5, 0])) == ["1234.56", "-0.05", "0.00"]
+
+
+def test_infer_date_format_prefers_day_first_and_tolerates_stray_values():
+    assert infer_date_format(["13/01/2025", "02/01/2025", "Closing balance"]) == "%d/%m/%Y"
+    assert infer_date_format(["01/13/2025"]) == "%m/%d/%Y"
+    assert infer_date_format(["2025-01-13"]) == "%Y-%m-%d"
+    assert infer_date_format(["nonsense"]) is None
+
+
+def test_guesses_columns_from_header():
+    data = b"Date,Description,Amount,Balance\n13/01/2025,Coffee,-4.50,100.00\n14/01/2025,Salary,\"1,000.00\",1100.00\n"
+    [chunk] = read_all(data)
+    assert chunk.parsed == 2 and chunk.invalid == 0
+    assert [(row['date'], row['description'], row['amount']) for row in chunk.rows] == [
+        ("2025-01-13", "Coffee", "-4.50"),
+        ("2025-01-14", "Salary", "1000.00"),
+    ]
+    assert chunk.rows[0]['fitid'] is None
+
+
+def test_mapping_with_debit_credit_semicolons_and_cp1252():
+    data = (
+        "Account 12-3456\n"
+        "Booked;Payee;Memo;Out;In;Ref\n"
+        "13.01.2025;Café;card;4,50;;R1\n"
+        "14.01.2025;Salary;;;1.234,56;R2\n"
+        "15.01.2025;Nothing;;;;R3\n"
+    ).encode("cp1252")
+    mapping = CsvColumnMapping(date="Booked", debit="Out", credit="In", description=["Payee", "Memo"], fitid="Ref", skip_rows=1)
+    [chunk] = read_all(data, mapping)
+    assert [(row['description'], row['amount'], row['fitid']) for row in chunk.rows] == [
+        ("Café - card", "-4.50", "R1"),
+        ("Salary", "1234.56", "R2"),
+    ]
+    # A row with neither a debit nor a credit is reported, not imported
+    assert chunk.invalid == 1
+    assert chunk.errors == ["Skipped line 5: invalid amount"]
+
+
+def test_reads_in_chunks_and_reports_bad_lines():
+    lines = [f"2025-01-{day:02d},Shop {day},-{day}.00" for day in range(1, 26)]
+    lines[3] = "not a date,Shop,-1.00"
+    data = ("Date,Payee,Amount\n" + "\n".join(lines) + "\n").encode()
+    chunks = read_all(data, chunk_rows=10)
+    assert [chunk.parsed for chunk in chunks] == [10, 10, 5]
+    assert sum(len(chunk.rows) for chunk in chunks) == 24
+    assert chunks[0].errors == ["Skipped line 5: invalid date 'not a date'"]
+
+
+def test_errors_report_file_lines_past_blank_and_multiline_rows():
+    data = (
+        b"Date,Payee,Amount\n"
+        b"\n"
+        b"2025-01-01,\"Two\nline payee\",-1.00\n"
+        b"\n"
+        b"not a date,Shop,-2.00\n"
+        b"2025-01-03,Shop,oops\n"
+    )
+    chunks = read_all(data, chunk_rows=2)
+    assert [error for chunk in chunks for error in chunk.errors] == [
+        "Skipped line 6: invalid date 'not a date'",
+        "Skipped line 7: invalid amount",
+    ]
+
+
+def test_undecodable_bytes_past_the_sample_are_replaced():
+    padding = "".join(f"2025-01-01,Shop {i},-1.00\n" for i in range(4000)).encode()
+    data = b"Date,Payee,Amount\n" + padding + "2025-01-02,Caf\xe9,-4.50\n".encode("cp1252")
+    assert len(padding) > 64 * 1024
+    chunks = read_all(data)
+    assert chunks[-1].rows[-1]['description'] == "Caf\ufffd"
+    assert sum(chunk.parsed for chunk in chunks) == 4001
+
+
+def test_missing_columns_raise():
+    with pytest.raises(ValueError):
+        read_all(b"When,What\n2025-01-01,x\n")
+    with pytest.raises(ValueError):
+        read_all(b"Date,Amount\n2025-01-01,1\n", CsvColumnMapping(description=["Payee"]))
+
+
+@pytest.mark.asyncio
+async def test_ingest_csv_file_uses_the_shared_pipeline(tmp_path):
+    path = tmp_path / "export.csv"
+    path.write_bytes(b"Date,Description,Amount,Transaction ID\n2025-01-13,Coffee,-4.50,T1\n2025-01-13,Coffee,-4.50,T1\n")
+    repository = MagicMock()
+    repository.list_rules = AsyncMock(return_value=[])
+    repository.get_account_id_by_name = AsyncMock(return_value=None)
+    repository.create_account = AsyncMock(return_value={'id': 3, 'name': 'Everyday', 'type': 'checking'})
+    repository.upsert_transactions = AsyncMock(side_effect=lambda rows: rows)
+
+    options = ImportOptions(format=ImportFormat.csv, account_name="Everyday", account_type="checking")
+    summary = await ingest_csv_file(path, options, repository=repository)
+
+    repository.create_account.assert_awaited_once_with({'name': 'Everyday', 'type': 'checking'})
+    [rows] = [call.args[0] for call in repository.upsert_transactions.await_args_list]
+    assert rows == [{
+        'date': '2025-01-13', 'description': 'Coffee', 'amount': '-4.50', 'transaction_type': None, 'fitid': 'T1',
+        'category_id': None, 'reconciled': False, 'tags': None, 'notes': None, 'account_id': 3, 'fingerprint': None,
+    }]
+    assert summary.accounts_created == 1
+    assert summary.transactions_parsed == 2
+    assert summary.transactions_inserted == 1
+    assert summary.duplicates_skipped == 1
@@ -0,0 +1,122 @@
+import os
+import sys
+from datetime import date
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+from main import app
+from core.repository import get_repository
+from services.category_cache import CategoryCache, get_category_cache
+from core.events import TransactionEvents
+from services.analytics import AnalyticsStore, get_analytics_store
+from services.dashboard import add_months, build_spending, build_summary, spending_range
+
+ROLLUPS = [
+    {'account_id': 1, 'category_id': None, 'month': "2025-03-01", 'income': 3000.0, 'spending': 0,
+     'transaction_count': 1, 'unreconciled_count': 0},
+    {'account_id': 1, 'category_id': 4, 'month': "2025-03-01", 'income': 0, 'spending': 120.1,
+     'transaction_count': 3, 'unreconciled_count': 1},
+    {'account_id': 1, 'category_id': 4, 'month': "2025-04-01", 'income': 0, 'spending': 80.2,
+     'transaction_count': 2, 'unreconciled_count': 2},
+    {'account_id': 2, 'category_id': 5, 'month': "2025-04-01", 'income': 10, 'spending': 900,
+     'transaction_count': 4, 'unreconciled_count': 4},
+]
+
+
+def test_summary_totals_accounts_and_month():
+    summary = build_summary(ROLLUPS, date(2025, 4, 17))
+
+    assert summary.balance == Decimal("1909.70")
+    assert summary.transaction_count == 10
+    assert summary.unreconciled_count == 7
+    assert [(a.account_id, a.balance) for a in summary.accounts] == [(1, Decimal("2799.70")), (2, Decimal("-890"))]
+    assert (summary.month.income, summary.month.spending, summary.month.net) == (Decimal(10), Decimal("980.2"), Decimal("-970.2"))
+
+
+def test_spending_by_category_and_month():
+    breakdown = build_spending(ROLLUPS, date(2025, 2, 1), date(2025, 4, 1), {4: "Groceries"})
+
+    assert [(c.category_id, c.category_name, c.spending) for c in breakdown.by_category] == [
+        (5, None, Decimal(900)), (4, "Groceries", Decimal("200.3")), (None, None, Decimal(0)),
+    ]
+    assert [(m.month, m.net) for m in breakdown.by_month] == [
+        (date(2025, 2, 1), Decimal(0)), (date(2025, 3, 1), Decimal("2879.9")), (date(2025, 4, 1), Decimal("-970.2")),
+    ]
+    assert breakdown.total_income == Decimal(3010)
+
+
+def test_month_arithmetic():
+    assert add_months(date(2025, 1, 1), -1) == date(2024, 12, 1)
+    assert add_months(date(2025, 11, 1), 14) == date(2027, 1, 1)
+    assert spending_range(None, None, date(2025, 4, 17)) == (date(2024, 11, 1), date(2025, 4, 1))
+
+
+@pytest.fixture
+def client():
+    repo = MagicMock()
+    repo.list_rollups = AsyncMock(return_value=ROLLUPS)
+    repo.list_categories = AsyncMock(return_value=[{'id': 4, 'name': "Groceries", 'is_custom': False}])
+    repo.list_transactions = AsyncMock(return_value=[
+        {'id': i, 'account_id': 1, 'date': f"2025-04-{i:02d}", 'amount': -10.0 * i, 'category_id': 4}
+        for i in range(1, 11)
+    ])
+    store = AnalyticsStore(repo, events=TransactionEvents())
+    app.dependency_overrides[get_repository] = lambda: repo
+    app.dependency_overrides[get_analytics_store] = lambda: store
+    app.dependency_overrides[get_category_cache] = lambda: CategoryCache(repo)
+    yield TestClient(app), repo
+    app.dependency_overrides.clear()
+
+
+def test_spending_endpoint_reads_only_the_rollups_in_range(client):
+    client, repo = client
+
+    response = client.get("/dashboard/spending", params={'start_date': "2025-03-15", 'end_date': "2025-04-02"})
+
+    assert response.status_code == 200
+    assert response.json()['by_category'][1]['category_name'] == "Groceries"
+    assert repo.list_rollups.await_args.kwargs == {
+        'account_id': None, 'start_month': date(2025, 3, 1), 'end_month': date(2025, 4, 1),
+    }
+
+
+def test_spending_endpoint_rejects_reversed_range(client):
+    client, _ = client
+    response = client.get("/dashboard/spending", params={'start_date': "2025-05-01", 'end_date': "2025-04-01"})
+    assert response.status_code == 400
+
+
+def test_summary_endpoint(client):
+    client, _ = client
+    response = client.get("/dashboard/summary", params={'month': "2025-03-01"})
+    assert response.json()['month']['income'] == "3000.0"
+
+
+def test_trends_endpoint_returns_rolling_average(client):
+    client, _ = client
+
+    response = client.get("/dashboard/trends", params={'days': 3, 'window_days': 2, 'end_date': "2025-04-10"})
+
+    points = response.json()['points']
+    assert [p['date'] for p in points] == ["2025-04-08", "2025-04-09", "2025-04-10"]
+    assert [p['spending'] for p in points] == ["80.00", "90.00", "100.00"]
+    assert points[-1]['rolling_average'] == "95.00"
+
+
+def test_insights_endpoint(client):
+    client, _ = client
+
+    body = client.get("/dashboard/insights").json()
+
+    assert body['categories'] == [{
+        'category_id': 4, 'category_name': "Groceries", 'transaction_count': 10,
+        'median': "55.00", 'p90': "91.00", 'p99': "99.10",
+    }]
+    assert body['unusual'][0]['id'] == 10
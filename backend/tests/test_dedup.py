@@ -0,0 +1,140 @@
+import os
+import sys
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+from main import app
+from core.repository import get_repository
+from services.dedup import DuplicateScanner, FingerprintAssigner, find_suspected_duplicates, normalize_description
+from services.persistence import TransactionBatchWriter
+
+
+def make_row(row_id, day, amount="-4.50", description="Coffee Shop", account_id=1):
+    return {'id': row_id, 'account_id': account_id, 'date': day, 'amount': amount, 'description': description}
+
+
+def test_fingerprints_are_stable_and_number_identical_transactions():
+    def fingerprints(rows):
+        assigner = FingerprintAssigner()
+        for row in rows:
+            assigner.assign(row)
+        return [row['fingerprint'] for row in rows]
+
+    def statement():
+        return [
+            {'account_id': 1, 'date': "2025-04-10", 'amount': "-4.50", 'description': "COFFEE  shop", 'fitid': None},
+            {'account_id': 1, 'date': "2025-04-10", 'amount': "-4.5", 'description': "Coffee Shop.", 'fitid': None},
+            {'account_id': 1, 'date': "2025-04-10", 'amount': "-4.50", 'description': "Coffee", 'fitid': "F1"},
+        ]
+
+    first = fingerprints(statement())
+    # Two genuine identical coffees are both kept; the row with a fitid needs no fingerprint
+    assert first[0] != first[1] and first[2] is None
+    # Re-importing the same statement produces the same keys, so the database skips them
+    assert fingerprints(statement()) == first
+    assert normalize_description(" Café -- AUCKLAND ") == "café auckland"
+
+
+@pytest.mark.asyncio
+async def test_writer_fingerprints_rows_without_fitid():
+    repository = MagicMock()
+    repository.upsert_transactions = AsyncMock(side_effect=lambda rows: rows)
+    writer = TransactionBatchWriter(repository, batch_size=10)
+
+    for fitid in (None, None, "F1"):
+        await writer.add_row({'account_id': 1, 'date': "2025-04-10", 'amount': "-4.50", 'description': "Coffee", 'fitid': fitid})
+    await writer.flush()
+
+    rows = repository.upsert_transactions.await_args.args[0]
+    assert [row['fingerprint'] is not None for row in rows] == [True, True, False]
+    assert writer.progress.rows_inserted == 3
+
+
+def test_finds_near_duplicates_within_window():
+    rows = [
+        make_row(1, "2025-04-10", description="EFTPOS COFFEE SHOP AUCKLAND"),
+        make_row(2, "2025-04-12", description="Eftpos Coffee Shop Auckland NZ"), # Re-import, 2 days later
+        make_row(3, "2025-04-20", description="EFTPOS COFFEE SHOP AUCKLAND"), # Outside the window
+        make_row(4, "2025-04-11", description="Bookshop"), # Same amount, different payee
+        make_row(5, "2025-04-10", amount="-4.60", description="EFTPOS COFFEE SHOP AUCKLAND"),
+        make_row(6, "2025-04-10", description="EFTPOS COFFEE SHOP AUCKLAND", account_id=2),
+    ]
+
+    pairs = find_suspected_duplicates(rows, window_days=3, min_similarity=0.8)
+
+    assert [pair.transaction_ids for pair in pairs] == [[1, 2]]
+    assert pairs[0].days_apart == 2
+    assert pairs[0].amount == Decimal("-4.50")
+    assert pairs[0].dates == [date(2025, 4, 10), date(2025, 4, 12)]
+    assert 0.8 <= pairs[0].similarity < 1
+
+
+def test_exact_matches_rank_first():
+    rows = [
+        make_row(1, "2025-04-10", description="Rent"),
+        make_row(2, "2025-04-10", description="Rent"),
+        make_row(3, "2025-05-01", amount="-9.99", description="Streaming Co"),
+        make_row(4, "2025-05-03", amount="-9.99", description="Streaming Co."),
+    ]
+
+    pairs = find_suspected_duplicates(rows)
+
+    assert [pair.transaction_ids for pair in pairs] == [[1, 2], [3, 4]]
+    assert [pair.similarity for pair in pairs] == [1.0, 1.0]
+
+
+def test_monthly_repeats_are_not_compared():
+    start = date(2024, 1, 1)
+    rows = [make_row(i, (start + timedelta(days=30 * i)).isoformat(), description="Gym") for i in range(24)]
+    assert find_suspected_duplicates(rows) == []
+
+
+def test_scanner_holds_only_one_window_of_rows():
+    start = date(2025, 1, 1)
+    scanner = DuplicateScanner(window_days=3)
+    held = []
+    for i in range(365, 0, -1): # Newest first, two accounts and a spread of amounts
+        day = (start + timedelta(days=i)).isoformat()
+        scanner.add([make_row(2 * i, day, amount=f"-{i % 7}.50"), make_row(2 * i + 1, day, description="Coffee Shop NZ", account_id=2)])
+        held.append(len(scanner._window))
+
+    assert max(held) <= 2 * 4 # Two rows a day, for the day itself and the three before it
+    rows = [make_row(1, "2025-04-12"), make_row(3, "2025-04-10"), make_row(2, "2025-04-10")]
+    scanner = DuplicateScanner()
+    scanner.add(rows)
+    assert [pair.transaction_ids for pair in scanner.results()] == [[2, 3], [2, 1], [3, 1]]
+    assert scanner.results() == find_suspected_duplicates(reversed(rows))
+
+
+def test_duplicates_endpoint():
+    repository = MagicMock()
+    repository.list_transactions = AsyncMock(return_value=[ # Newest first, as repositories page them
+        make_row(2, "2025-04-11"),
+        make_row(1, "2025-04-10"),
+    ])
+    app.dependency_overrides[get_repository] = lambda: repository
+    try:
+        response = TestClient(app).get("/transactions/duplicates", params={"account_id": 1, "days": 2})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.json() == [{
+        'account_id': 1,
+        'amount': "-4.50",
+        'transaction_ids': [1, 2],
+        'dates': ["2025-04-10", "2025-04-11"],
+        'descriptions': ["Coffee Shop", "Coffee Shop"],
+        'days_apart': 1,
+        'similarity': 1.0,
+    }]
+    filters = repository.list_transactions.await_args.args[0]
+    assert filters.account_id == 1
@@ -0,0 +1,39 @@
+import os
+import sys
+from datetime import date, datetime
+from decimal import Decimal
+from typing import List
+
+from pydantic import TypeAdapter
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+from core import encoding
+from core.encoding import dumps, prepare_transaction_rows
+from models.financials import Transaction
+
+
+def test_dumps_keeps_decimals_exact():
+    assert dumps({'amount': Decimal("-12.30"), 'date': date(2025, 4, 10)}) == b'{"amount":"-12.30","date":"2025-04-10"}'
+
+
+def test_dumps_stdlib_fallback(monkeypatch):
+    monkeypatch.setattr(encoding, "orjson", None)
+    assert dumps({'at': datetime(2025, 4, 10, 8, 30), 'n': 1}) == b'{"at":"2025-04-10T08:30:00","n":1}'
+
+
+def test_fast_path_matches_validated_output():
+    rows = [
+        {'id': 1, 'account_id': 2, 'date': "2025-04-10", 'description': "Coffee", 'amount': -4.5,
+         'transaction_type': "debit", 'fitid': "F1", 'fingerprint': None, 'category_id': 3, 'reconciled': True,
+         'tags': ["food"], 'notes': None},
+        {'id': 2, 'account_id': 2, 'date': "2025-04-09", 'description': "Pay", 'amount': 1200,
+         'transaction_type': "credit", 'fitid': "F2", 'fingerprint': None, 'category_id': None, 'reconciled': False,
+         'tags': None, 'notes': "April"},
+    ]
+    adapter = TypeAdapter(List[Transaction])
+    validated = adapter.dump_python(adapter.validate_python(rows), mode="json")
+
+    assert prepare_transaction_rows([dict(row) for row in rows]) == validated
@@ -0,0 +1,197 @@
+import asyncio
+import hashlib
+import io
+import os
+import sys
+
+import pytest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+from models.imports import CsvColumnMapping, ImportFormat, ImportJobStatus, ImportOptions, ImportSummary
+from services.import_jobs import ImportJobQueue, ImportJobStore, QueueFullError
+from services.persistence import BatchProgress
+
+
+class FakeUpload:
+    """Minimal stand-in for FastAPI's UploadFile."""
+
+    def __init__(self, filename, data):
+        self.filename = filename
+        self._io = io.BytesIO(data)
+
+    async def read(self, size=-1):
+        return self._io.read(size)
+
+
+def create_queue(tmp_path, runner, **kwargs):
+    store = ImportJobStore(tmp_path / "jobs.sqlite3")
+    return ImportJobQueue(store, tmp_path / "uploads", runner=runner, **kwargs)
+
+
+async def wait_for_status(queue, job_id, wanted):
+    for _ in range(200):
+        job = queue.get(job_id)
+        if job.status == wanted:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} never reached {wanted}")
+
+
+@pytest.mark.asyncio
+async def test_job_runs_in_background_and_reports_counts(tmp_path):
+    seen = []
+
+    async def runner(path, on_progress, options):
+        seen.append(path.read_bytes())
+        on_progress(BatchProgress(rows_sent=3, rows_inserted=2, rows_duplicate=1))
+        return ImportSummary(transactions_parsed=3, transactions_inserted=2, duplicates_skipped=1)
+
+    queue = create_queue(tmp_path, runner, workers=2)
+    await queue.start()
+    job = await queue.submit(FakeUpload("march.ofx", b"<OFX>data</OFX>"))
+    assert job.status == ImportJobStatus.queued
+
+    job = await wait_for_status(queue, job.id, ImportJobStatus.completed)
+    await queue.stop()
+
+    assert seen == [b"<OFX>data</OFX>"]
+    assert job.transactions_parsed == 3
+    assert job.transactions_inserted == 2
+    assert job.duplicates_skipped == 1
+    assert job.rows_sent == 3 and job.rows_inserted == 2
+    assert job.rows_per_second is not None
+    # Spooled file is removed once imported
+    assert list((tmp_path / "uploads").iterdir()) == []
+
+
+def test_progress_is_reported_under_its_own_names(tmp_path):
+    store = ImportJobStore(tmp_path / "jobs.sqlite3")
+    store.create("job", "march.ofx", tmp_path / "march.ofx")
+    store.mark_running("job")
+    store.update_progress("job", BatchProgress(rows_sent=1000, rows_inserted=900, rows_duplicate=100))
+
+    job = store.get("job")
+    assert (job.rows_sent, job.rows_inserted, job.duplicates_skipped) == (1000, 900, 100)
+    # Parse counts come from the summary once the job completes
+    assert job.transactions_parsed == 0 and job.transactions_inserted == 0
+    assert job.rows_per_second > 0
+
+
+@pytest.mark.asyncio
+async def test_failed_job_records_error(tmp_path):
+    async def runner(path, on_progress, options):
+        raise ValueError("corrupt file")
+
+    queue = create_queue(tmp_path, runner, workers=1)
+    await queue.start()
+    job = await queue.submit(FakeUpload("bad.ofx", b"junk"))
+    job = await wait_for_status(queue, job.id, ImportJobStatus.failed)
+    await queue.stop()
+
+    assert job.errors == ["corrupt file"]
+
+
+@pytest.mark.asyncio
+async def test_rejects_uploads_when_queue_is_full(tmp_path):
+    async def runner(path, on_progress, options):
+        return ImportSummary()
+
+    # Workers not started, so nothing drains the queue
+    queue = create_queue(tmp_path, runner, max_queued=2)
+    await queue.submit(FakeUpload("a.ofx", b"a"))
+    await queue.submit(FakeUpload("b.ofx", b"b"))
+    with pytest.raises(QueueFullError):
+        await queue.submit(FakeUpload("c.ofx", b"c"))
+
+
+@pytest.mark.asyncio
+async def test_failed_upload_leaves_no_partial_spool_file(tmp_path):
+    class BrokenUpload(FakeUpload):
+        async def read(self, size=-1):
+            if self._io.tell():
+                raise ConnectionResetError("client went away")
+            return await super().read(4)
+
+    async def runner(path, on_progress, options):
+        return ImportSummary()
+
+    queue = create_queue(tmp_path, runner)
+    with pytest.raises(ConnectionResetError):
+        await queue.submit(BrokenUpload("march.ofx", b"<OFX>data</OFX>"))
+
+    assert list((tmp_path / "uploads").iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_unfinished_jobs_resume_after_restart(tmp_path):
+    async def never_runs(path, on_progress, options):
+        raise AssertionError("first process should not run jobs")
+
+    first = create_queue(tmp_path, never_runs)
+    job = await first.submit(FakeUpload("pending.ofx", b"pending"))
+    first.store.close()
+
+    async def runner(path, on_progress, options):
+        assert path.read_bytes() == b"pending"
+        return ImportSummary(transactions_parsed=1, transactions_inserted=1)
+
+    # A new process with the same data directory picks the job up
+    second = create_queue(tmp_path, runner, workers=1)
+    await second.start()
+    resumed = await wait_for_status(second, job.id, ImportJobStatus.completed)
+    await second.stop()
+
+    assert resumed.transactions_inserted == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_job_spools_files_into_one_directory(tmp_path):
+    seen = []
+
+    async def runner(path, on_progress, options):
+        seen.append(sorted((p.name, p.read_bytes()) for p in path.iterdir()))
+        return ImportSummary(files_processed=2, transactions_parsed=4)
+
+    queue = create_queue(tmp_path, runner, workers=1)
+    await queue.start()
+    job = await queue.submit_batch([FakeUpload("jan.ofx", b"jan"), FakeUpload("feb.ofx", b"feb")])
+    assert job.filename == "jan.ofx and 1 more"
+
+    job = await wait_for_status(queue, job.id, ImportJobStatus.completed)
+    await queue.stop()
+
+    assert seen == [[("0000-jan.ofx", b"jan"), ("0001-feb.ofx", b"feb")]]
+    assert job.files_processed == 2
+    assert job.files_per_second is not None
+    # The batch directory is removed once imported
+    assert list((tmp_path / "uploads").iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_import_options_are_kept_with_the_job(tmp_path):
+    async def never_runs(path, on_progress, options):
+        raise AssertionError("first process should not run jobs")
+
+    first = create_queue(tmp_path, never_runs)
+    options = ImportOptions(format=ImportFormat.csv, account_name="Everyday", csv=CsvColumnMapping(date="Booked"))
+    job = await first.submit(FakeUpload("export.csv", b"Booked,Amount"), options)
+    first.store.close()
+
+    seen = []
+
+    async def runner(path, on_progress, options):
+        seen.append(options)
+        return ImportSummary()
+
+    # Options survive a restart, so a resumed job parses the file the same way
+    second = create_queue(tmp_path, runner, workers=1)
+    await second.start()
+    await wait_for_status(second, job.id, ImportJobStatus.completed)
+    await second.stop()
+
+    # The content hash for the import ledger is taken while spooling
+    sha256 = hashlib.sha256(b"Booked,Amount").hexdigest()
+    assert seen == [options.model_copy(update={'content_sha256': sha256})]
@@ -0,0 +1,142 @@
+import os
+import sys
+from datetime import date
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+from models.imports import ImportFormat, ImportOptions
+from services.import_jobs import run_import
+from services.import_ledger import CoveredDates, ImportLedger
+from services.ofx_parser import build_account_name, ingest_ofx_file
+from services.ofx_stream import OfxStatementInfo, iter_ofx_records, scan_ofx_statements
+
+TEST_FILES_DIR = Path(__file__).resolve().parent
+TEST1 = TEST_FILES_DIR / "test1.ofx"
+
+
+def mock_repository(ranges=(), account_id=1):
+    repository = MagicMock()
+    repository.get_account_ids_by_names = AsyncMock(
+        side_effect=lambda names: {name: account_id for name in names}
+    )
+    repository.get_account_id_by_name = AsyncMock(return_value=account_id)
+    repository.list_statement_ranges = AsyncMock(return_value=[
+        {'account_id': account_id, 'start_date': start, 'end_date': end} for start, end in ranges
+    ])
+    repository.add_statement_ranges = AsyncMock()
+    repository.get_imported_file = AsyncMock(return_value=None)
+    repository.record_imported_file = AsyncMock()
+    repository.list_rules = AsyncMock(return_value=[])
+    repository.upsert_transactions = AsyncMock(side_effect=lambda rows: [{'id': i} for i, _ in enumerate(rows)])
+    return repository
+
+
+def test_covered_dates_merges_half_open_ranges():
+    covered = CoveredDates([
+        (date(2025, 3, 1), date(2025, 3, 31)),
+        (date(2025, 3, 31), date(2025, 4, 30)), # Touches the first range
+        (date(2025, 6, 1), date(2025, 6, 30)),
+    ])
+
+    assert covered.covers(date(2025, 3, 1), date(2025, 4, 30))
+    assert covered.covers(date(2025, 3, 15), date(2025, 4, 2))
+    assert not covered.covers(date(2025, 4, 15), date(2025, 5, 2))
+    assert not covered.covers(date(2025, 2, 28), date(2025, 3, 10))
+    assert date(2025, 4, 29) in covered
+    assert date(2025, 4, 30) not in covered # End dates are exclusive
+    assert date(2025, 5, 15) not in covered
+    assert not CoveredDates()
+
+
+@pytest.mark.parametrize("name", ["test1.ofx", "test2.ofx", "test3.ofx"])
+def test_scan_finds_the_same_statements_as_the_stream(name):
+    data = (TEST_FILES_DIR / name).read_bytes()
+    with open(TEST_FILES_DIR / name, 'rb') as f:
+        streamed = [record for record in iter_ofx_records(f) if isinstance(record, OfxStatementInfo)]
+
+    assert scan_ofx_statements(data) == streamed
+
+
+@pytest.mark.asyncio
+async def test_statement_already_covered_is_not_parsed():
+    repository = mock_repository(ranges=[("2025-04-01", "2025-04-20")])
+
+    summary = await ingest_ofx_file(TEST1, repository)
+
+    assert summary.already_imported
+    assert summary.transactions_parsed == 0
+    repository.list_rules.assert_not_awaited()
+    repository.upsert_transactions.assert_not_awaited()
+    repository.add_statement_ranges.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_partial_overlap_imports_only_uncovered_days():
+    # test1.ofx runs 2025-04-10 to 2025-04-13: three transactions on the 11th, one on the 12th
+    repository = mock_repository(ranges=[("2025-04-01", "2025-04-12")])
+
+    summary = await ingest_ofx_file(TEST1, repository)
+
+    assert not summary.already_imported
+    assert summary.transactions_already_imported == 3
+    assert summary.transactions_parsed == 1
+    rows = repository.upsert_transactions.await_args.args[0]
+    assert [row['date'] for row in rows] == ["2025-04-12"]
+    (statement,) = scan_ofx_statements(TEST1.read_bytes())
+    repository.get_account_ids_by_names.assert_awaited_once_with([build_account_name(statement.account)])
+    repository.add_statement_ranges.assert_awaited_once_with(
+        [{'account_id': 1, 'start_date': "2025-04-10", 'end_date': "2025-04-13"}]
+    )
+
+
+@pytest.mark.asyncio
+async def test_unreadable_ledger_imports_in_full():
+    repository = mock_repository()
+    repository.list_statement_ranges = AsyncMock(side_effect=RuntimeError("relation does not exist"))
+
+    summary = await ingest_ofx_file(TEST1, repository)
+
+    assert summary.transactions_parsed == 4
+    assert summary.transactions_already_imported == 0
+
+
+@pytest.mark.asyncio
+async def test_ledger_reports_known_file():
+    repository = mock_repository()
+    repository.get_imported_file = AsyncMock(return_value={'sha256': "abc"})
+
+    assert await ImportLedger(repository).is_imported("abc")
+
+
+@pytest.mark.asyncio
+async def test_run_import_skips_a_known_file_and_records_new_ones(monkeypatch):
+    repository = mock_repository()
+    monkeypatch.setattr("core.repository.get_repository", lambda: repository)
+    options = ImportOptions(format=ImportFormat.ofx, content_sha256="f" * 64)
+
+    summary = await run_import(TEST1, lambda progress: None, options)
+    assert summary.transactions_parsed == 4
+    repository.record_imported_file.assert_awaited_once_with(
+        {'sha256': "f" * 64, 'format': "ofx", 'transaction_count': 4}
+    )
+
+    repository.get_imported_file = AsyncMock(return_value={'sha256': "f" * 64})
+    repository.upsert_transactions.reset_mock()
+    summary = await run_import(TEST1, lambda progress: None, options)
+    assert summary.already_imported
+    assert summary.files_processed == 1
+    repository.upsert_transactions.assert_not_awaited()
+
+    # force re-imports the file, ignoring both the file hash and the statement ranges
+    repository.list_statement_ranges = AsyncMock(return_value=[
+        {'account_id': 1, 'start_date': "2025-04-01", 'end_date': "2025-04-20"}
+    ])
+    summary = await run_import(TEST1, lambda progress: None, options.model_copy(update={'force': True}))
+    assert summary.transactions_parsed == 4
+    repository.upsert_transactions.assert_awaited()
@@ -1,9 +1,32 @@
+import os
+import subprocess
+import sys
+
 from fastapi.testclient import TestClient
 from main import app
 
 client = TestClient(app)
 
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
 def test_read_root():
     response = client.get("/")
     assert response.status_code == 200
-    assert response.json() == {"message": "Welcome to Reckless Spender API"} 
\ No newline at end of file
+    assert response.json() == {"message": "Welcome to Reckless Spender API"}
+
+def test_starts_without_credentials_or_heavy_imports(tmp_path):
+    # A fresh interpreter, as a new worker would start: no Supabase settings, and the
+    # database client and optional libraries only load when a request needs them
+    probe = (
+        "import sys, main\n"
+        "from fastapi.testclient import TestClient\n"
+        "with TestClient(main.app) as client:\n"
+        "    assert client.get('/').status_code == 200\n"
+        "print(sorted(name for name in ('supabase', 'postgrest', 'pyarrow', 'services.ofx_parser') if name in sys.modules))\n"
+    )
+    env = {key: value for key, value in os.environ.items() if key not in ("SUPABASE_URL", "SUPABASE_KEY")}
+    env["IMPORT_DATA_DIR"] = str(tmp_path)
+    result = subprocess.run([sys.executable, "-c", probe], cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "[]"
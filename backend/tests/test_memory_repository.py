@@ -0,0 +1,126 @@
+import asyncio
+import os
+import sys
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+from main import app
+from core.events import TransactionEvents
+from core.memory_repository import InMemoryRepository
+from core.repository import get_repository
+from models.financials import TransactionFilterParams
+from services.import_ledger import ImportLedger
+
+
+def make_row(day, fitid=None, fingerprint=None, account_id=1, amount="-4.50"):
+    return {'account_id': account_id, 'date': day, 'amount': amount, 'description': "Coffee", 'fitid': fitid, 'fingerprint': fingerprint}
+
+
+@pytest.mark.asyncio
+async def test_upsert_deduplicates_on_fitid_and_fingerprint():
+    events = TransactionEvents()
+    published = []
+    events.subscribe(lambda kind, rows: published.append((kind, len(rows))))
+    repository = InMemoryRepository(events=events)
+
+    first = await repository.upsert_transactions([
+        make_row("2025-04-10", fitid="F1"),
+        make_row("2025-04-10", fingerprint="abc"),
+        make_row("2025-04-10", fitid="F1", account_id=2), # Same fitid, other account
+    ])
+    again = await repository.upsert_transactions([
+        make_row("2025-04-10", fitid="F1"),
+        make_row("2025-04-11", fingerprint="abc"),
+        make_row("2025-04-11", fingerprint="def"),
+    ])
+
+    assert [row['id'] for row in first] == [1, 2, 3]
+    assert [row['fingerprint'] for row in again] == ["def"]
+    assert first[0]['amount'] == -4.5 and first[0]['reconciled'] is False
+    assert published == [("inserted", 3), ("inserted", 1)]
+
+
+@pytest.mark.asyncio
+async def test_list_transactions_filters_and_pages_like_the_database():
+    repository = InMemoryRepository(events=TransactionEvents())
+    await repository.upsert_transactions([
+        make_row(f"2025-04-{day:02d}", fitid=f"F{day}", account_id=1 + day % 2) for day in range(1, 11)
+    ])
+
+    everything = TransactionFilterParams()
+    first = await repository.list_transactions(everything, limit=4)
+    cursor = (date.fromisoformat(first[-1]['date']), first[-1]['id'])
+    second = await repository.list_transactions(everything, limit=4, cursor=cursor)
+
+    assert [row['date'][-2:] for row in first + second] == ["10", "09", "08", "07", "06", "05", "04", "03"]
+    assert second == await repository.list_transactions(everything, limit=4, offset=4)
+    filtered = await repository.list_transactions(
+        TransactionFilterParams(account_id=1, start_date=date(2025, 4, 3)), limit=10, columns=['id', 'date'],
+    )
+    assert filtered == [{'id': 10, 'date': "2025-04-10"}, {'id': 8, 'date': "2025-04-08"},
+                        {'id': 6, 'date': "2025-04-06"}, {'id': 4, 'date': "2025-04-04"}]
+
+    updated = await repository.update_matching_transactions(TransactionFilterParams(account_id=2), {'category_id': 7})
+    assert len(updated) == 5
+    rollups = await repository.list_rollups(account_id=2)
+    assert rollups == [{
+        'account_id': 2, 'category_id': 7, 'month': "2025-04-01", 'income': 0.0, 'spending': 22.5,
+        'transaction_count': 5, 'unreconciled_count': 5,
+    }]
+
+
+@pytest.mark.asyncio
+async def test_search_ranks_whole_words_and_follows_updates():
+    repository = InMemoryRepository(events=TransactionEvents())
+    rows = await repository.upsert_transactions([
+        {**make_row("2025-04-01", fitid="F1"), 'description': "UBER TRIP HELP.UBER.COM"},
+        {**make_row("2025-04-02", fitid="F2"), 'description': "UBEREATS AUCKLAND"},
+        {**make_row("2025-04-03", fitid="F3"), 'description': "Countdown", 'tags': ["groceries"]},
+    ])
+    everything = TransactionFilterParams()
+
+    assert [row['id'] for row in await repository.search_transactions("uber", everything, limit=10)] == [1, 2]
+    assert await repository.search_transactions("uber countdown", everything, limit=10) == []
+
+    await repository.update_transaction(rows[2]['id'], {'notes': "uber to the supermarket"})
+    found = await repository.search_transactions("uber", TransactionFilterParams(tags=["groceries"]), limit=10)
+    assert [row['id'] for row in found] == [3]
+    await repository.update_transaction(rows[2]['id'], {'notes': None})
+    assert await repository.search_transactions("supermarket", everything, limit=10) == []
+
+
+@pytest.mark.asyncio
+async def test_import_ledger_round_trip():
+    repository = InMemoryRepository(events=TransactionEvents())
+    [account] = await repository.create_accounts([{'name': "Everyday", 'type': 'checking'}])
+    ledger = ImportLedger(repository)
+
+    await ledger.record_file("0" * 64, "ofx", 12)
+    await ledger.record_ranges([(account['id'], (date(2025, 1, 1), date(2025, 2, 1)))])
+
+    assert await ledger.is_imported("0" * 64)
+    assert not await ledger.is_imported("1" * 64)
+    covered = await ledger.covered_dates([account['id']])
+    assert date(2025, 1, 31) in covered[account['id']]
+    assert await repository.get_account_ids_by_names(["Everyday", "Other"]) == {"Everyday": account['id']}
+
+
+def test_serves_the_transactions_endpoint():
+    repository = InMemoryRepository(events=TransactionEvents())
+    app.dependency_overrides[get_repository] = lambda: repository
+    try:
+        asyncio.run(repository.upsert_transactions([make_row(f"2025-04-0{day}", fitid=f"F{day}") for day in range(1, 4)]))
+        client = TestClient(app)
+        response = client.get("/transactions/", params={'limit': 2})
+        following = client.get("/transactions/", params={'limit': 2, 'cursor': response.headers["X-Next-Cursor"]})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert [row['id'] for row in response.json()] == [3, 2]
+    assert [row['id'] for row in following.json()] == [1]
@@ -0,0 +1,85 @@
+import json
+import logging
+import os
+import sys
+
+from fastapi.testclient import TestClient
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+from main import app
+from core.logs import JsonFormatter, KeyValueFormatter
+from core.metrics import IMPORT_STAGE_ROWS, IMPORT_STAGE_SECONDS, MetricsRegistry, span
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    hits = registry.counter("hits_total", "Hits.")
+    latency.observe(0.05, route="/a")
+    latency.observe(0.5, route="/a")
+    latency.observe(5, route="/a")
+    hits.inc()
+
+    assert registry.render().splitlines() == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/a",le="0.1"} 1',
+        'latency_seconds_bucket{route="/a",le="1"} 2',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 3',
+        'latency_seconds_sum{route="/a"} 5.55',
+        'latency_seconds_count{route="/a"} 3',
+        "# HELP hits_total Hits.",
+        "# TYPE hits_total counter",
+        "hits_total 1",
+    ]
+
+
+def test_gauge_renders_current_value():
+    registry = MetricsRegistry()
+    entries = registry.gauge("cache_entries", "Entries.")
+    entries.set(5)
+    entries.set(3)
+
+    assert registry.render().splitlines()[-2:] == ["# TYPE cache_entries gauge", "cache_entries 3"]
+
+
+def test_span_records_duration_and_rows(caplog):
+    before_count = IMPORT_STAGE_SECONDS.count(stage="insert_batch")
+    before_rows = IMPORT_STAGE_ROWS.value(stage="insert_batch")
+
+    with caplog.at_level(logging.DEBUG, logger="core.metrics"):
+        with span("insert_batch", attempt=0) as batch_span:
+            batch_span.rows = 250
+
+    assert IMPORT_STAGE_SECONDS.count(stage="insert_batch") == before_count + 1
+    assert IMPORT_STAGE_ROWS.value(stage="insert_batch") == before_rows + 250
+    record = caplog.records[-1]
+    assert (record.stage, record.rows, record.attempt) == ("insert_batch", 250, 0)
+    assert batch_span.duration >= 0
+
+
+def test_formatters_include_extra_fields():
+    record = logging.LogRecord("services.ingest", logging.INFO, __file__, 1, "imported %s rows", (3,), None)
+    record.stage = "parse"
+
+    entry = json.loads(JsonFormatter().format(record))
+    assert (entry['message'], entry['level'], entry['stage']) == ("imported 3 rows", "INFO", "parse")
+    assert KeyValueFormatter().format(record).endswith("services.ingest: imported 3 rows stage=parse")
+
+
+def test_metrics_endpoint_reports_route_templates():
+    client = TestClient(app)
+    client.get("/upload/jobs/does-not-exist")
+    client.get("/no/such/route")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert 'http_request_duration_seconds_count{method="GET",route="/upload/jobs/{job_id}",status="404"}' in body
+    assert 'route="unmatched",status="404"' in body
+    assert "# TYPE import_stage_duration_seconds histogram" in body
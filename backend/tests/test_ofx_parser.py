@@ -21,14 +21,6 @@ TEST_OFX_FILES = [
     os.path.join(TEST_FILES_DIR, "test2.ofx"),
 ]
 
-# Helper function to create a mock Supabase response object
-def create_mock_response(data=None, error=None, count=None):
-    mock = MagicMock()
-    mock.data = data
-    mock.error = error
-    mock.count = count
-    return mock
-
 @pytest.mark.asyncio
 @pytest.mark.parametrize("ofx_file_path", TEST_OFX_FILES)
 async def test_parse_ofx_success(ofx_file_path):
@@ -41,50 +33,29 @@ async def test_parse_ofx_success(ofx_file_path):
     with open(ofx_file_path, 'rb') as f:
         ofx_content = f.read()
 
-    # --- Set up Mocks for Supabase Interaction ---
-    # Mock the client instance returned by get_supabase_client
-    mock_supabase_client = MagicMock() # Use MagicMock for the client itself if its methods aren't directly awaited
-
-    # Mock the chainable methods
-    mock_table_method = MagicMock()
-    mock_select_method = MagicMock()
-    mock_eq_method = MagicMock()
-    mock_insert_method = MagicMock()
-
-    # Configure the synchronous chain: client.table().select().eq()
-    mock_supabase_client.table.return_value = mock_table_method
-    mock_table_method.select.return_value = mock_select_method
-    mock_select_method.eq.return_value = mock_eq_method
-
-    # Configure the insert chain: client.table().insert()
-    mock_table_method.insert.return_value = mock_insert_method
-
-    # Configure the final .execute() calls to be SYNCHRONOUS mocks
-    # because the code in parse_ofx calls them synchronously now
-    mock_eq_method.execute = MagicMock(return_value=create_mock_response(data=[]))
-    mock_insert_method.execute = MagicMock(
-        side_effect=[
-            # Response for creating the first (and possibly only) account
-            create_mock_response(data=[{'id': 1, 'name': 'Mock Account 1 from OFX', 'type': 'checking'}]),
-            # Response for inserting the batch of transactions
-            create_mock_response(data=[{'id': 101}, {'id': 102}])
-        ]
+    # --- Set up Mocks for the async repository ---
+    mock_repository = MagicMock()
+    # No existing account, so one gets created
+    mock_repository.get_account_id_by_name = AsyncMock(return_value=None)
+    mock_repository.create_account = AsyncMock(
+        return_value={'id': 1, 'name': 'Mock Account 1 from OFX', 'type': 'checking'}
     )
+    # Upsert returns only the rows actually inserted
+    mock_repository.upsert_transactions = AsyncMock(return_value=[{'id': 101}, {'id': 102}])
+    mock_repository.list_rules = AsyncMock(return_value=[]) # No categorization rules
 
     # --- Execute Test --- 
-    # Pass the mock client directly into the function, no patch needed
+    # Pass the mock repository directly into the function, no patch needed
     parsed_accounts, parsed_transactions = await parse_ofx(
         ofx_content,
-        supabase_client=mock_supabase_client
+        repository=mock_repository
     )
 
     # --- Assertions ---
-    # Verify that Supabase methods were called as expected
-    # Check that we looked up accounts and inserted into accounts/transactions
-    mock_supabase_client.table.assert_any_call("accounts")
-    mock_supabase_client.table.assert_any_call("transactions")
-    mock_eq_method.execute.assert_called() # Check account lookup happened
-    mock_insert_method.execute.assert_called() # Check insert happened
+    # Check that we looked up accounts and upserted transactions (deduplicated server-side)
+    mock_repository.get_account_id_by_name.assert_awaited()
+    mock_repository.create_account.assert_awaited()
+    mock_repository.upsert_transactions.assert_awaited()
 
     # --- Basic Validation of Parsed Data ---
     # Print results for inspection (useful for debugging)
@@ -116,5 +87,32 @@ async def test_parse_ofx_success(ofx_file_path):
         assert parsed_transactions[0].account_id == 1
         print(f"First Collected Transaction: {parsed_transactions[0].model_dump()}")
 
+@pytest.mark.asyncio
+async def test_parse_ofx_applies_categorization_rules():
+    """Transactions matching a rule are imported with the rule's category."""
+    with open(TEST_OFX_FILES[0], 'rb') as f:
+        ofx_content = f.read()
+
+    mock_repository = MagicMock()
+    mock_repository.get_account_id_by_name = AsyncMock(return_value=1)
+    mock_repository.upsert_transactions = AsyncMock(return_value=[])
+    mock_repository.list_rules = AsyncMock(return_value=[
+        {'id': 1, 'match_type': "substring", 'pattern': "cafe", 'category_id': 7},
+        {'id': 2, 'match_type': "regex", 'pattern': r"bakery\s*auckland", 'category_id': 8},
+        {'id': 3, 'match_type': "substring", 'pattern': None, 'max_amount': "-100", 'category_id': 9},
+    ])
+
+    _, transactions = await parse_ofx(ofx_content, repository=mock_repository)
+
+    categories = {t.description: t.category_id for t in transactions}
+    assert categories == {
+        "AG and SF Wri": 9, # -500.00 is within max_amount
+        "2Bees CafeAuckland": 7,
+        "Sky Horse Takeaways Auckland": None,
+        "UNION BAKERYAUCKLAND": 8,
+    }
+    rows = mock_repository.upsert_transactions.await_args.args[0]
+    assert [row['category_id'] for row in rows] == [9, 7, None, 8]
+
 # TODO: Add tests for error handling (e.g., corrupted file, Supabase errors)
-# TODO: Add tests where account already exists (mock_eq_method.execute returns data)
\ No newline at end of file
+# TODO: Add tests where account already exists (get_account_id_by_name returns an id)
\ No newline at end of file
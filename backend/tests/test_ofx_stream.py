@@ -0,0 +1,115 @@
+import io
+import os
+import sys
+from decimal import Decimal
+from datetime import date
+
+import pytest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+from ofxparse import OfxParser
+from services.ofx_stream import (
+    OfxStreamParser,
+    OfxStatementInfo,
+    OfxTransactionRecord,
+    aiter_ofx_records,
+    iter_ofx_records,
+    parse_ofx_amount,
+    parse_ofx_date,
+)
+
+TEST_FILES_DIR = os.path.dirname(__file__)
+TEST_OFX_FILES = [
+    os.path.join(TEST_FILES_DIR, name) for name in ("test1.ofx", "test2.ofx", "test3.ofx")
+]
+
+XML_OFX = b"""<?xml version="1.0" encoding="UTF-8" standalone="no"?>
+<?OFX OFXHEADER="200" VERSION="211" SECURITY="NONE" OLDFILEUID="NONE" NEWFILEUID="NONE"?>
+<OFX>
+  <SIGNONMSGSRSV1><SONRS>
+    <STATUS><CODE>0</CODE><SEVERITY>INFO</SEVERITY></STATUS>
+    <DTSERVER>20250101120000</DTSERVER><LANGUAGE>ENG</LANGUAGE>
+    <FI><ORG>Kiwi Bank</ORG><FID>1234</FID></FI>
+  </SONRS></SIGNONMSGSRSV1>
+  <BANKMSGSRSV1><STMTTRNRS><TRNUID>1</TRNUID>
+    <STMTRS>
+      <CURDEF>NZD</CURDEF>
+      <BANKACCTFROM><BANKID>38</BANKID><ACCTID>9000-01</ACCTID><ACCTTYPE>SAVINGS</ACCTTYPE></BANKACCTFROM>
+      <BANKTRANLIST>
+        <DTSTART>20250101</DTSTART><DTEND>20250131</DTEND>
+        <STMTTRN>
+          <TRNTYPE>DEBIT</TRNTYPE><DTPOSTED>20250105120000[+13:NZDT]</DTPOSTED>
+          <TRNAMT>-12.50</TRNAMT><FITID>X1</FITID><NAME>Fish &amp; Chips</NAME>
+        </STMTTRN>
+        <STMTTRN>
+          <TRNTYPE>CREDIT</TRNTYPE><DTPOSTED>20250110</DTPOSTED>
+          <TRNAMT>1,000.00</TRNAMT><FITID>X2</FITID><MEMO>Salary</MEMO>
+        </STMTTRN>
+      </BANKTRANLIST>
+    </STMTRS>
+  </STMTTRNRS></BANKMSGSRSV1>
+</OFX>
+"""
+
+
+def _transactions(records):
+    return [r for r in records if isinstance(r, OfxTransactionRecord)]
+
+
+@pytest.mark.parametrize("ofx_file_path", TEST_OFX_FILES)
+def test_stream_matches_ofxparse(ofx_file_path):
+    """The streaming tokenizer yields the same transactions as ofxparse's full parse."""
+    with open(ofx_file_path, 'rb') as f:
+        content = f.read()
+
+    expected = []
+    for account in OfxParser.parse(io.BytesIO(content)).accounts:
+        for trx in account.statement.transactions:
+            expected.append((account.account_id, trx.id, trx.date.date(), Decimal(str(trx.amount)), trx.payee))
+
+    # Feed in tiny chunks so tags and values are split across reads
+    records = _transactions(iter_ofx_records(io.BytesIO(content), chunk_size=7))
+    actual = [
+        (r.account.account_id, r.fields['FITID'], parse_ofx_date(r.fields['DTPOSTED']),
+         parse_ofx_amount(r.fields['TRNAMT']), r.fields.get('NAME', ''))
+        for r in records
+    ]
+    assert actual == expected
+
+
+def test_stream_parses_xml_ofx():
+    parser = OfxStreamParser()
+    records = []
+    for i in range(0, len(XML_OFX), 16):
+        records.extend(parser.feed(XML_OFX[i:i + 16]))
+    records.extend(parser.close())
+
+    transactions = _transactions(records)
+    assert len(transactions) == 2
+    first, second = transactions
+    assert first.account.organization == "Kiwi Bank"
+    assert first.account.account_type == "SAVINGS"
+    assert first.fields['NAME'] == "Fish & Chips"
+    # Timezone offsets are applied like ofxparse does (12:00 NZDT is still the 4th in UTC)
+    assert parse_ofx_date(first.fields['DTPOSTED']) == date(2025, 1, 4)
+    assert parse_ofx_amount(second.fields['TRNAMT']) == Decimal("1000.00")
+
+    statements = [r for r in records if isinstance(r, OfxStatementInfo)]
+    assert statements[0].start_date == "20250101"
+    assert statements[0].end_date == "20250131"
+
+
+@pytest.mark.asyncio
+async def test_aiter_reads_async_stream():
+    class AsyncStream:
+        def __init__(self, data):
+            self._io = io.BytesIO(data)
+
+        async def read(self, size=-1):
+            return self._io.read(size)
+
+    records = [r async for r in aiter_ofx_records(AsyncStream(XML_OFX), chunk_size=32)]
+    assert [r.fields['FITID'] for r in _transactions(records)] == ["X1", "X2"]
@@ -0,0 +1,95 @@
+import os
+import sys
+from datetime import date
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+from models.financials import TransactionCreate
+from services.persistence import TransactionBatchWriter
+
+
+def make_transaction(fitid, account_id=1):
+    return TransactionCreate(
+        account_id=account_id,
+        date=date(2025, 4, 10),
+        description="Test",
+        amount=Decimal("-5.46"),
+        fitid=fitid,
+    )
+
+
+def create_mock_repository(upsert):
+    """Mock repository whose upsert_transactions() uses the given side effect."""
+    repository = MagicMock()
+    repository.upsert_transactions = AsyncMock(side_effect=upsert)
+    return repository
+
+
+@pytest.mark.asyncio
+async def test_writes_in_batches_with_server_side_dedup():
+    # The database reports 1 of each 2-row batch as a duplicate
+    repository = create_mock_repository(lambda rows: [{'id': 1}])
+    progress_reports = []
+    writer = TransactionBatchWriter(repository, batch_size=2, on_progress=progress_reports.append)
+
+    for i in range(5):
+        await writer.add(make_transaction(f"F{i}"))
+    await writer.flush()
+
+    upsert_calls = repository.upsert_transactions.await_args_list
+    assert [len(call.args[0]) for call in upsert_calls] == [2, 2, 1]
+    # Rows are JSON-ready
+    assert upsert_calls[0].args[0][0]['amount'] == "-5.46"
+    assert upsert_calls[0].args[0][0]['date'] == "2025-04-10"
+
+    assert writer.progress.batches_written == 3
+    assert writer.progress.rows_inserted == 3
+    assert writer.progress.rows_duplicate == 2
+    assert len(progress_reports) == 3
+
+
+@pytest.mark.asyncio
+async def test_retries_then_records_failed_batch():
+    attempts = []
+
+    def flaky_upsert(rows):
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ConnectionError("reset by peer")
+        if len(attempts) <= 3:
+            return [{'id': 1}, {'id': 2}]
+        raise ConnectionError("still down")
+
+    repository = create_mock_repository(flaky_upsert)
+    writer = TransactionBatchWriter(repository, batch_size=2, max_retries=1, retry_delay=0)
+
+    for i in range(6):
+        await writer.add(make_transaction(f"F{i}"))
+    await writer.flush()
+
+    # First batch succeeds on retry, second succeeds, third fails twice and is reported
+    assert writer.progress.retries == 2
+    assert writer.progress.batches_written == 2
+    assert writer.progress.batches_failed == 1
+    assert writer.progress.rows_failed == 2
+    assert writer.progress.last_error == "still down"
+
+
+@pytest.mark.asyncio
+async def test_repeated_fitid_within_batch_is_sent_once():
+    repository = create_mock_repository(lambda rows: [{'id': 1}])
+    writer = TransactionBatchWriter(repository, batch_size=10)
+
+    await writer.add(make_transaction("SAME"))
+    await writer.add(make_transaction("SAME"))
+    await writer.flush()
+
+    rows = repository.upsert_transactions.await_args.args[0]
+    assert len(rows) == 1
+    assert writer.progress.rows_duplicate == 1
@@ -0,0 +1,110 @@
+import io
+import os
+import sys
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+from models.imports import ImportFormat, ImportOptions
+from services.ingest import StatementAccount
+from services.qif_parser import ingest_qif_file, iter_qif_chunks
+
+SINGLE_ACCOUNT = b"""!Type:Bank
+D1/ 5'98
+T-1,234.50
+PCheck 1005
+MRent
+N1005
+^
+D12/31'04
+U100.00
+T100.00
+MPayroll
+SIncome
+$60.00
+SBonus
+$40.00
+^
+!Type:Cat
+NFood
+D Food
+^
+"""
+
+MULTI_ACCOUNT = b"""!Account
+NEveryday
+TBank
+^
+!Type:Bank
+D03/04/2021
+T-5.00
+PShop
+^
+!Account
+NMy Visa
+TCCard
+^
+!Type:CCard
+D03/05/2021
+T-20.00
+PFuel
+^
+"""
+
+
+def test_reads_transactions_and_skips_other_sections():
+    [chunk] = list(iter_qif_chunks(io.BytesIO(SINGLE_ACCOUNT)))
+    assert chunk.account is None
+    assert chunk.parsed == 2 and chunk.invalid == 0
+    assert [(row['date'], row['description'], row['amount']) for row in chunk.rows] == [
+        ("1998-01-05", "Check 1005", "-1234.50"),
+        ("2004-12-31", "Payroll", "100.00"), # Split lines don't replace the transaction's own fields
+    ]
+
+
+def test_account_blocks_name_the_account_of_each_chunk():
+    chunks = list(iter_qif_chunks(io.BytesIO(MULTI_ACCOUNT)))
+    assert [chunk.account for chunk in chunks] == [
+        StatementAccount("Everyday", "checking"),
+        StatementAccount("My Visa", "credit"),
+    ]
+    assert [row['amount'] for chunk in chunks for row in chunk.rows] == ["-5.00", "-20.00"]
+
+
+def test_explicit_date_format_and_invalid_transactions():
+    data = b"!Type:Bank\nD13/01/2025\nT-1.00\n^\nD14/01/2025\nTten\n^\n"
+    [chunk] = list(iter_qif_chunks(io.BytesIO(data), date_format="%d/%m/%Y"))
+    assert [row['date'] for row in chunk.rows] == ["2025-01-13"]
+    assert chunk.invalid == 1
+    assert chunk.errors == ["Skipped line 5: invalid amount"]
+
+
+def test_undecodable_bytes_past_the_sample_are_replaced():
+    padding = b"".join(b"D01/01/2025\nT-1.00\nPShop %d\n^\n" % i for i in range(3000))
+    data = b"!Type:Bank\n" + padding + "D02/01/2025\nT-4.50\nPCaf\xe9\n^\n".encode("cp1252")
+    assert len(padding) > 64 * 1024
+    chunks = list(iter_qif_chunks(io.BytesIO(data)))
+    assert chunks[-1].rows[-1]['description'] == "Caf\ufffd"
+    assert sum(chunk.parsed for chunk in chunks) == 3001
+
+
+@pytest.mark.asyncio
+async def test_ingest_qif_without_account_needs_one(tmp_path):
+    path = tmp_path / "export.qif"
+    path.write_bytes(SINGLE_ACCOUNT)
+    repository = MagicMock()
+    repository.list_rules = AsyncMock(return_value=[])
+    repository.get_account_id_by_name = AsyncMock(return_value=9)
+    repository.upsert_transactions = AsyncMock(side_effect=lambda rows: rows)
+
+    with pytest.raises(ValueError):
+        await ingest_qif_file(path, ImportOptions(format=ImportFormat.qif), repository=repository)
+
+    summary = await ingest_qif_file(path, ImportOptions(format=ImportFormat.qif, account_name="Cheque"), repository=repository)
+    repository.get_account_id_by_name.assert_awaited_with("Cheque")
+    assert summary.transactions_inserted == 2
+    assert {row['account_id'] for call in repository.upsert_transactions.await_args_list for row in call.args[0]} == {9}
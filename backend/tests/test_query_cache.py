@@ -0,0 +1,133 @@
+import asyncio
+import os
+import sys
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+from main import app
+from core.events import TransactionEvents
+from core.memory_repository import InMemoryRepository
+from core.repository import get_repository
+from models.financials import TransactionFilterParams
+from services.query_cache import CACHE_REQUESTS, TransactionQueryCache, cache_key
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_cache(**kwargs):
+    repository = InMemoryRepository(events=TransactionEvents())
+    return repository, TransactionQueryCache(repository, **kwargs)
+
+
+def store(cache, account_id=None, start=None, end=None, cursor=None, body=b"[]"):
+    filters = TransactionFilterParams(account_id=account_id, start_date=start, end_date=end)
+    key = cache_key(filters, None, 100, 0, cursor, None)
+    cache.put(key, body, {}, filters, cursor, cache.writes)
+    return key
+
+
+def test_key_normalizes_tags_and_query():
+    filters = TransactionFilterParams(tags=["b", "a", "b"])
+    assert cache_key(filters, "  Uber  Eats", 10, 0, None, None) == cache_key(TransactionFilterParams(tags=["a", "b"]), "uber eats", 10, 0, None, None)
+    assert cache_key(filters, None, 10, 0, None, None) != cache_key(filters, None, 10, 10, None, None)
+
+
+def test_writes_invalidate_by_account_and_date_range():
+    repository, cache = make_cache()
+    everything = store(cache)
+    other_account = store(cache, account_id=2)
+    april = store(cache, account_id=1, start=date(2025, 4, 1), end=date(2025, 4, 30))
+    march = store(cache, account_id=1, start=date(2025, 3, 1), end=date(2025, 3, 31))
+    before_cursor = store(cache, account_id=1, cursor=(date(2025, 2, 1), 7)) # Rows on or before Feb 1
+
+    repository.events.publish("updated", [
+        {'id': 1, 'account_id': 1, 'date': "2025-04-10"},
+        {'id': 2, 'account_id': 1, 'date': "2025-01-05"},
+    ])
+
+    assert set(cache._entries) == {other_account, march}
+    assert everything not in cache._entries and april not in cache._entries and before_cursor not in cache._entries
+    assert cache.writes == 1
+
+
+def test_page_read_during_a_write_is_not_stored():
+    repository, cache = make_cache()
+    filters = TransactionFilterParams()
+    key = cache_key(filters, None, 100, 0, None, None)
+    writes = cache.writes
+    repository.events.publish("inserted", [{'id': 1, 'account_id': 1, 'date': "2025-04-10"}])
+
+    page = cache.put(key, b"[1]", {}, filters, None, writes)
+
+    assert page.etag.startswith('"') and len(cache) == 0
+
+
+def test_lru_bounds_and_ttl():
+    clock = FakeClock()
+    _, cache = make_cache(max_entries=2, ttl=10, clock=clock)
+    first, second = store(cache, account_id=1), store(cache, account_id=2)
+    assert cache.get(first) is not None # Now most recently used
+    third = store(cache, account_id=3)
+
+    assert set(cache._entries) == {first, third}
+    assert cache.get(second) is None
+    clock.now = 10
+    assert cache.get(first) is None and len(cache) == 1
+
+    _, small = make_cache(max_bytes=1000)
+    store(small, account_id=1, body=b"x" * 400)
+    store(small, account_id=2, body=b"x" * 400)
+    assert len(small) == 1 and small.size_bytes <= 1000
+
+
+@pytest.fixture
+def repository():
+    events = TransactionEvents()
+    repository = InMemoryRepository(events=events)
+    asyncio.run(repository.upsert_transactions([
+        {'account_id': 1, 'date': f"2025-04-{day:02d}", 'amount': "-5.00", 'description': "Coffee", 'fitid': f"F{day}"}
+        for day in range(1, 6)
+    ]))
+    app.dependency_overrides[get_repository] = lambda: repository
+    yield repository
+    app.dependency_overrides.clear()
+
+
+def test_route_serves_hits_with_etag_and_304(repository):
+    client = TestClient(app)
+    params = {'account_id': 1, 'limit': 2}
+
+    first = client.get("/transactions/", params=params)
+    requests = repository.requests
+    hits = CACHE_REQUESTS.value(result="hit")
+    second = client.get("/transactions/", params=params)
+    not_modified = client.get("/transactions/", params=params, headers={'If-None-Match': first.headers['ETag']})
+
+    assert second.content == first.content and second.headers['X-Next-Cursor'] == first.headers['X-Next-Cursor']
+    assert repository.requests == requests
+    assert CACHE_REQUESTS.value(result="hit") == hits + 2
+    assert not_modified.status_code == 304 and not_modified.content == b""
+    assert first.headers['Cache-Control'] == "private, no-cache"
+
+
+def test_route_sees_updates_after_invalidation(repository):
+    client = TestClient(app)
+    first = client.get("/transactions/", params={'account_id': 1})
+
+    asyncio.run(repository.update_transaction(3, {'notes': "checked"}))
+    after = client.get("/transactions/", params={'account_id': 1}, headers={'If-None-Match': first.headers['ETag']})
+
+    assert after.status_code == 200
+    assert [row['notes'] for row in after.json() if row['id'] == 3] == ["checked"]
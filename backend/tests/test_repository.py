@@ -0,0 +1,233 @@
+import json
+import os
+import sys
+from datetime import date
+
+import httpx
+import pytest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+from postgrest import AsyncPostgrestClient
+from core.repository import SupabaseRepository
+from models.financials import TransactionFilterParams
+
+
+def create_repository(handler):
+    """Repository whose HTTP session is served by `handler` instead of a real Supabase."""
+    client = AsyncPostgrestClient("http://supabase.test/rest/v1")
+    client.session = httpx.AsyncClient(
+        base_url="http://supabase.test/rest/v1",
+        transport=httpx.MockTransport(handler),
+    )
+    return SupabaseRepository(client, max_concurrency=2)
+
+
+@pytest.mark.asyncio
+async def test_upsert_transactions_ignores_conflicts_on_account_and_fitid():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(201, json=[{'id': 7}])
+
+    repository = create_repository(handler)
+    inserted = await repository.upsert_transactions([{'account_id': 1, 'fitid': 'A', 'amount': '1.00'}])
+
+    assert inserted == [{'id': 7}]
+    request = requests[0]
+    assert request.method == "POST"
+    assert request.url.path == "/rest/v1/transactions"
+    assert request.url.params['on_conflict'] == "account_id,fitid"
+    assert "resolution=ignore-duplicates" in request.headers['prefer']
+    assert json.loads(request.content) == [{'account_id': 1, 'fitid': 'A', 'amount': '1.00'}]
+    await repository.aclose()
+
+
+@pytest.mark.asyncio
+async def test_upsert_transactions_without_fitid_conflict_on_fingerprint():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(201, json=[{'id': len(requests)}])
+
+    repository = create_repository(handler)
+    inserted = await repository.upsert_transactions([
+        {'account_id': 1, 'fitid': 'A', 'fingerprint': None},
+        {'account_id': 1, 'fitid': None, 'fingerprint': 'f1'},
+    ])
+
+    assert inserted == [{'id': 1}, {'id': 2}]
+    assert [request.url.params['on_conflict'] for request in requests] == ["account_id,fitid", "account_id,fingerprint"]
+    assert json.loads(requests[1].content) == [{'account_id': 1, 'fitid': None, 'fingerprint': 'f1'}]
+    await repository.aclose()
+
+
+@pytest.mark.asyncio
+async def test_list_transactions_applies_filters_and_paging():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json=[])
+
+    repository = create_repository(handler)
+    filters = TransactionFilterParams(start_date=date(2025, 1, 1), account_id=3, reconciled=False)
+    await repository.list_transactions(filters, limit=50, offset=100)
+
+    request = requests[0]
+    assert request.url.params.get_list('date') == ["gte.2025-01-01"]
+    assert request.url.params['account_id'] == "eq.3"
+    assert request.url.params['reconciled'] == "eq.False"
+    assert request.url.params['order'] == "date.desc,id.desc"
+    assert request.url.params['offset'] == "100"
+    assert request.url.params['limit'] == "50"
+    await repository.aclose()
+
+
+@pytest.mark.asyncio
+async def test_update_transaction_returns_none_when_missing():
+    repository = create_repository(lambda request: httpx.Response(200, json=[]))
+    assert await repository.update_transaction(99, {'reconciled': True}) is None
+    await repository.aclose()
+
+
+@pytest.mark.asyncio
+async def test_list_transactions_with_cursor_uses_keyset_filter():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json=[])
+
+    repository = create_repository(handler)
+    await repository.list_transactions(
+        TransactionFilterParams(), limit=100, cursor=(date(2025, 4, 9), 42), columns=["id", "date", "amount"]
+    )
+
+    params = requests[0].url.params
+    assert params['date'] == "lte.2025-04-09"
+    assert params['or'] == "(date.lt.2025-04-09,and(date.eq.2025-04-09,id.lt.42))"
+    assert params['limit'] == "100"
+    assert 'offset' not in params
+    assert params['select'] == "id,date,amount"
+    await repository.aclose()
+
+
+@pytest.mark.asyncio
+async def test_update_transactions_uses_one_statement_for_many_ids():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json=[{'id': 1}, {'id': 2}])
+
+    repository = create_repository(handler)
+    rows = await repository.update_transactions([1, 2, 3], {'reconciled': True})
+
+    assert rows == [{'id': 1}, {'id': 2}]
+    request = requests[0]
+    assert request.method == "PATCH"
+    assert request.url.params['id'] == "in.(1,2,3)"
+    assert json.loads(request.content) == {'reconciled': True}
+    await repository.aclose()
+
+
+@pytest.mark.asyncio
+async def test_update_matching_transactions_applies_filters():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json=[])
+
+    repository = create_repository(handler)
+    filters = TransactionFilterParams(start_date=date(2025, 4, 1), end_date=date(2025, 4, 30), account_id=3)
+    await repository.update_matching_transactions(filters, {'reconciled': True})
+
+    params = requests[0].url.params
+    assert params.get_list('date') == ["gte.2025-04-01", "lte.2025-04-30"]
+    assert params['account_id'] == "eq.3"
+    await repository.aclose()
+
+
+@pytest.mark.asyncio
+async def test_list_rollups_pages_past_the_response_cap(monkeypatch):
+    import core.repository
+    monkeypatch.setattr(core.repository, "ROLLUP_PAGE_SIZE", 2)
+    requests = []
+    pages = [[{'id': 1}, {'id': 2}], [{'id': 3}]]
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json=pages[len(requests) - 1])
+
+    repository = create_repository(handler)
+    rows = await repository.list_rollups(start_month=date(2025, 1, 1))
+
+    assert rows == [{'id': 1}, {'id': 2}, {'id': 3}]
+    assert [r.url.params['offset'] for r in requests] == ["0", "2"]
+    assert requests[1].url.params['month'] == "gte.2025-01-01"
+    await repository.aclose()
+
+
+@pytest.mark.asyncio
+async def test_get_account_ids_by_names_chunks_the_lookup(monkeypatch):
+    monkeypatch.setattr("core.repository.ACCOUNT_LOOKUP_CHUNK_SIZE", 2)
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        names = request.url.params['name'][len("in.("):-1].split(",")
+        # Account "C" does not exist
+        return httpx.Response(200, json=[{'id': i, 'name': name} for i, name in enumerate(names) if name != "C"])
+
+    repository = create_repository(handler)
+    ids = await repository.get_account_ids_by_names(["A", "B", "C"])
+
+    assert len(requests) == 2
+    assert ids == {'A': 0, 'B': 1}
+    await repository.aclose()
+
+
+@pytest.mark.asyncio
+async def test_search_transactions_calls_rpc_with_filters():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json=[{'id': 1}])
+
+    repository = create_repository(handler)
+    filters = TransactionFilterParams(account_id=3, start_date=date(2025, 1, 1), tags=["travel"])
+    rows = await repository.search_transactions("uber eats", filters, limit=20, offset=40, columns=["id", "date"])
+
+    assert rows == [{'id': 1}]
+    request = requests[0]
+    assert request.method == "POST"
+    assert request.url.path == "/rest/v1/rpc/search_transactions"
+    assert request.url.params['select'] == "id,date"
+    assert json.loads(request.content) == {
+        'search_query': "uber eats", 'filter_start_date': "2025-01-01", 'filter_end_date': None,
+        'filter_account_id': 3, 'filter_category_id': None, 'filter_reconciled': None,
+        'filter_tags': ["travel"], 'result_limit': 20, 'result_offset': 40,
+    }
+    await repository.aclose()
+
+
+@pytest.mark.asyncio
+async def test_tag_filter_quotes_array_elements():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json=[])
+
+    repository = create_repository(handler)
+    await repository.list_transactions(TransactionFilterParams(tags=["work", "a,b"]), limit=10)
+
+    assert requests[0].url.params['tags'] == 'cs.{"work","a,b"}'
+    await repository.aclose()
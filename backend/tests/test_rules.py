@@ -0,0 +1,161 @@
+import asyncio
+import os
+import sys
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+from models.financials import TransactionFilterParams
+from models.rules import CategorizationRule, RuleApplyJob
+from services import rules as rules_module
+from services.categorization import get_rule_jobs, reapply_rules, stop_rule_jobs
+from services.rules import RuleSet, required_literal
+
+
+def make_rule(rule_id, pattern, category_id, **kwargs):
+    return CategorizationRule(id=rule_id, pattern=pattern, category_id=category_id, **kwargs)
+
+
+@pytest.fixture(params=["c", "python"])
+def automaton(request, monkeypatch):
+    """Runs each test against both the pyahocorasick and the pure-Python automaton."""
+    if request.param == "c":
+        pytest.importorskip("ahocorasick")
+    else:
+        monkeypatch.setattr(rules_module, "ahocorasick", None)
+    return request.param
+
+
+def test_substring_rules_match_case_insensitively(automaton):
+    rule_set = RuleSet([make_rule(1, "Amazon", 5), make_rule(2, "uber eats", 6)])
+
+    assert rule_set.match("AMAZON MKTPLACE PMTS", Decimal("-20")) == 5
+    assert rule_set.match("Uber Eats Auckland", Decimal("-35")) == 6
+    assert rule_set.match("UBER TRIP", Decimal("-12")) is None
+
+
+def test_overlapping_keywords_are_all_found(automaton):
+    # "she" ends inside "ushers"; the automaton must follow failure links to find "he" and "hers"
+    rule_set = RuleSet([make_rule(1, "hers", 1), make_rule(2, "she", 2, min_amount=Decimal("0"))])
+    assert rule_set.match("ushers", Decimal("-1")) == 1
+    assert rule_set.match("ushers", Decimal("1")) == 1 # Rule 1 is older, so it wins the tie
+    assert RuleSet([make_rule(2, "she", 2)]).match("ushers", 1) == 2
+
+
+def test_priority_then_age_decides_between_matches(automaton):
+    rule_set = RuleSet([
+        make_rule(1, "coffee", 1),
+        make_rule(2, "coffee", 2, priority=10),
+        make_rule(3, "coffee", 3, priority=10),
+    ])
+    assert rule_set.match("COFFEE CLUB", -5) == 2
+
+
+def test_amount_and_account_conditions(automaton):
+    rule_set = RuleSet([
+        make_rule(1, "transfer", 1, account_id=2),
+        make_rule(2, "transfer", 2, min_amount=Decimal("1000")),
+        make_rule(3, None, 3, max_amount=Decimal("-500")), # Any large debit
+    ])
+    assert rule_set.match("TRANSFER IN", 50, account_id=2) == 1
+    assert rule_set.match("TRANSFER IN", 1500.0, account_id=1) == 2
+    assert rule_set.match("RENT", Decimal("-900"), account_id=1) == 3
+    assert rule_set.match("TRANSFER OUT", -50, account_id=1) is None
+
+
+def test_regex_rules_use_literal_prefilter(automaton):
+    rule_set = RuleSet([
+        make_rule(1, r"netflix\.com \d+", 4, match_type="regex"),
+        make_rule(2, r"^(spotify|tidal)", 5, match_type="regex"), # No required literal
+    ])
+    assert rule_set.match("NETFLIX.COM 866579", -15) == 4
+    assert rule_set.match("NETFLIX.COM BILL", -15) is None
+    assert rule_set.match("TIDAL MUSIC", -10) == 5
+
+
+def test_disabled_rules_are_ignored(automaton):
+    assert RuleSet([make_rule(1, "gym", 1, enabled=False)]).match("GYM", -40) is None
+
+
+@pytest.mark.parametrize("pattern, literal", [
+    (r"netflix\.com \d+", "netflix.com "),
+    (r"ab*cdef", "cdef"),
+    (r"^(spotify|tidal)", None),
+    (r"pay(ment)?", "pay"),
+    (r"[", None),
+])
+def test_required_literal(pattern, literal):
+    assert required_literal(pattern) == literal
+
+
+@pytest.mark.asyncio
+async def test_reapply_groups_updates_by_category():
+    repository = MagicMock()
+    repository.list_transactions = AsyncMock(return_value=[
+        {'id': 1, 'account_id': 1, 'description': "AMAZON", 'amount': -20, 'category_id': None},
+        {'id': 2, 'account_id': 1, 'description': "Amazon Prime", 'amount': -9, 'category_id': None},
+        {'id': 3, 'account_id': 1, 'description': "AMAZON", 'amount': -5, 'category_id': 2}, # Already categorized
+        {'id': 4, 'account_id': 1, 'description': "COUNTDOWN", 'amount': -80, 'category_id': None},
+    ])
+    repository.update_transactions = AsyncMock(side_effect=lambda ids, values: [{'id': i} for i in ids])
+    progress = RuleApplyJob(id="job", status="running", created_at="2025-04-10T00:00:00Z")
+
+    rule_set = RuleSet([make_rule(1, "amazon", 5), make_rule(2, "countdown", 6)])
+    await reapply_rules(repository, rule_set, TransactionFilterParams(), overwrite=False, progress=progress)
+
+    calls = {c.args[1]['category_id']: c.args[0] for c in repository.update_transactions.await_args_list}
+    assert calls == {5: [1, 2], 6: [4]}
+    assert (progress.transactions_scanned, progress.transactions_matched, progress.transactions_updated) == (4, 3, 3)
+
+
+@pytest.mark.asyncio
+async def test_shared_job_runner_uses_the_injected_repository():
+    repository = MagicMock()
+    repository.list_rules = AsyncMock(return_value=[])
+    repository.list_transactions = AsyncMock(return_value=[])
+    jobs = get_rule_jobs(repository)
+
+    job = jobs.start(TransactionFilterParams())
+    await asyncio.gather(*jobs._tasks)
+
+    assert job.status == "completed"
+    repository.list_rules.assert_awaited_once()
+    assert get_rule_jobs(repository) is jobs
+    assert get_rule_jobs(MagicMock()) is not jobs
+    await stop_rule_jobs()
+
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+    from main import app
+    from core.repository import get_repository
+    from services.category_cache import CategoryCache, get_category_cache
+
+    repo = MagicMock()
+    repo.list_categories = AsyncMock(return_value=[{'id': 5, 'name': "Shopping", 'is_custom': False}])
+    repo.create_rule = AsyncMock(side_effect=lambda rule: {'id': 1, **rule})
+    app.dependency_overrides[get_repository] = lambda: repo
+    app.dependency_overrides[get_category_cache] = lambda: CategoryCache(repo)
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def test_create_rule(client):
+    response = client.post("/rules/", json={'pattern': "amazon", 'category_id': 5, 'max_amount': "-1.50"})
+    assert response.status_code == 201
+    assert response.json()['max_amount'] == "-1.50"
+
+
+@pytest.mark.parametrize("body", [
+    {'pattern': "amazon(", 'match_type': "regex", 'category_id': 5},
+    {'pattern': "amazon", 'category_id': 99},
+    {'pattern': "amazon", 'category_id': 5, 'min_amount': 10, 'max_amount': 1},
+])
+def test_create_rule_rejects_invalid_rules(client, body):
+    assert client.post("/rules/", json=body).status_code == 400
@@ -0,0 +1,189 @@
+import asyncio
+import os
+import sys
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+from main import app
+from core.events import TransactionEvents
+from core.repository import create_repository, get_repository
+from core.sqlite_repository import DEFAULT_CATEGORIES, SQLiteRepository
+from models.financials import TransactionFilterParams
+from services.import_ledger import ImportLedger
+
+
+def make_row(day, fitid=None, fingerprint=None, account_id=1, amount="-4.50"):
+    return {'account_id': account_id, 'date': day, 'amount': amount, 'description': "Coffee", 'fitid': fitid, 'fingerprint': fingerprint}
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "reckless.sqlite3"
+
+
+@pytest.mark.asyncio
+async def test_upsert_deduplicates_on_fitid_and_fingerprint(path):
+    events = TransactionEvents()
+    published = []
+    events.subscribe(lambda kind, rows: published.append((kind, len(rows))))
+    repository = SQLiteRepository(path, events=events)
+
+    first = await repository.upsert_transactions([
+        make_row("2025-04-10", fitid="F1"),
+        make_row("2025-04-10", fingerprint="abc"),
+        make_row("2025-04-10", fitid="F1", account_id=2), # Same fitid, other account
+    ])
+    again = await repository.upsert_transactions([
+        make_row("2025-04-10", fitid="F1"),
+        make_row("2025-04-11", fingerprint="abc"),
+        make_row("2025-04-11", fingerprint="def"),
+    ])
+    await repository.aclose()
+
+    assert [row['id'] for row in first] == [1, 2, 3]
+    assert [row['fingerprint'] for row in again] == ["def"]
+    assert first[0]['amount'] == -4.5 and first[0]['reconciled'] is False and first[0]['tags'] is None
+    assert published == [("inserted", 3), ("inserted", 1)]
+
+
+@pytest.mark.asyncio
+async def test_list_transactions_filters_pages_and_rolls_up(path):
+    repository = SQLiteRepository(path, events=TransactionEvents())
+    await repository.upsert_transactions([
+        make_row(f"2025-04-{day:02d}", fitid=f"F{day}", account_id=1 + day % 2) for day in range(1, 11)
+    ])
+
+    everything = TransactionFilterParams()
+    first = await repository.list_transactions(everything, limit=4)
+    cursor = (date.fromisoformat(first[-1]['date']), first[-1]['id'])
+    second = await repository.list_transactions(everything, limit=4, cursor=cursor)
+    assert [row['date'][-2:] for row in first + second] == ["10", "09", "08", "07", "06", "05", "04", "03"]
+    assert second == await repository.list_transactions(everything, limit=4, offset=4)
+    filtered = await repository.list_transactions(
+        TransactionFilterParams(account_id=1, start_date=date(2025, 4, 3)), limit=10, columns=['id', 'date'],
+    )
+    assert filtered == [{'id': 10, 'date': "2025-04-10"}, {'id': 8, 'date': "2025-04-08"},
+                        {'id': 6, 'date': "2025-04-06"}, {'id': 4, 'date': "2025-04-04"}]
+
+    await repository.update_transactions([2, 4], {'tags': ["work", "travel"]})
+    tagged = await repository.list_transactions(TransactionFilterParams(tags=["travel"]), limit=10, columns=['id', 'tags'])
+    assert tagged == [{'id': 4, 'tags': ["work", "travel"]}, {'id': 2, 'tags': ["work", "travel"]}]
+
+    updated = await repository.update_matching_transactions(TransactionFilterParams(account_id=2), {'category_id': 7})
+    assert len(updated) == 5
+    await repository.update_transaction(1, {'reconciled': True})
+    assert await repository.list_rollups(account_id=2) == [{
+        'account_id': 2, 'category_id': 7, 'month': "2025-04-01", 'income': 0.0, 'spending': 22.5,
+        'transaction_count': 5, 'unreconciled_count': 4,
+    }]
+    assert [row['category_id'] for row in await repository.list_rollups(start_month=date(2025, 4, 1))] == [None, 7]
+    await repository.aclose()
+
+
+@pytest.mark.asyncio
+async def test_paging_queries_use_the_indexes(path):
+    repository = SQLiteRepository(path, events=TransactionEvents())
+
+    def plan(sql, *params):
+        return " ".join(row['detail'] for row in repository._conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+
+    by_account = plan(
+        "SELECT * FROM transactions WHERE account_id = ? AND (date, id) < (?, ?) ORDER BY date DESC, id DESC LIMIT 100",
+        1, "2025-04-01", 9,
+    )
+    dedup = plan("SELECT id FROM transactions WHERE account_id = ? AND fitid = ?", 1, "F1")
+    await repository.aclose()
+
+    assert "transactions_account_date_id_idx" in by_account and "TEMP B-TREE" not in by_account
+    assert "transactions_account_id_fitid_key" in dedup
+
+
+@pytest.mark.asyncio
+async def test_search_ranks_whole_words_and_follows_updates(path):
+    repository = SQLiteRepository(path, events=TransactionEvents())
+    rows = await repository.upsert_transactions([
+        {**make_row("2025-04-01", fitid="F1"), 'description': "UBER TRIP HELP.UBER.COM"},
+        {**make_row("2025-04-02", fitid="F2"), 'description': "UBEREATS AUCKLAND"},
+        {**make_row("2025-04-03", fitid="F3"), 'description': "Countdown", 'tags': ["groceries"]},
+    ])
+    everything = TransactionFilterParams()
+
+    assert [row['id'] for row in await repository.search_transactions("uber", everything, limit=10)] == [1, 2]
+    assert await repository.search_transactions("uber countdown", everything, limit=10) == []
+
+    await repository.update_transaction(rows[2]['id'], {'notes': "uber to the supermarket"})
+    found = await repository.search_transactions("uber", TransactionFilterParams(tags=["groceries"]), limit=10, columns=['id'])
+    assert found == [{'id': 3}]
+    await repository.update_transaction(rows[2]['id'], {'notes': None})
+    assert await repository.search_transactions("supermarket", everything, limit=10) == []
+    await repository.aclose()
+
+
+@pytest.mark.asyncio
+async def test_data_survives_reopening(path):
+    repository = SQLiteRepository(path, events=TransactionEvents(), categories=[{'id': 3, 'name': "Groceries"}])
+    [account] = await repository.create_accounts([{'name': "Everyday", 'type': 'checking'}])
+    ledger = ImportLedger(repository)
+    await ledger.record_file("0" * 64, "ofx", 12)
+    await ledger.record_ranges([(account['id'], (date(2025, 1, 1), date(2025, 2, 1)))])
+    budget = await repository.create_budget({'category_id': 3, 'amount': "100.00", 'period': "monthly"})
+    await repository.aclose()
+
+    reopened = SQLiteRepository(path, events=TransactionEvents())
+    ledger = ImportLedger(reopened)
+
+    assert await ledger.is_imported("0" * 64)
+    assert date(2025, 1, 31) in (await ledger.covered_dates([account['id']]))[account['id']]
+    assert await reopened.get_account_ids_by_names(["Everyday", "Other"]) == {"Everyday": account['id']}
+    assert await reopened.list_categories() == [{'id': 3, 'name': "Groceries", 'is_custom': False}]
+    assert await reopened.update_budget(budget['id'], {'amount': "150"}) == {**budget, 'amount': 150.0}
+    assert await reopened.delete_budget(budget['id']) and not await reopened.delete_budget(budget['id'])
+    await reopened.aclose()
+
+
+@pytest.mark.asyncio
+async def test_new_database_has_default_categories_and_exact_money(path):
+    repository = SQLiteRepository(path, events=TransactionEvents())
+    await repository.upsert_transactions([
+        make_row("2025-04-01", fitid="F1", amount="0.10"),
+        make_row("2025-04-02", fitid="F2", amount="0.20"),
+        make_row("2025-04-03", fitid="F3", amount="1234567.89"),
+    ])
+    budget = await repository.create_budget({'category_id': 1, 'amount': "19.99", 'period': "monthly"})
+
+    names = [category['name'] for category in await repository.list_categories()]
+    [rollup] = await repository.list_rollups()
+    stored = repository._conn.execute("SELECT typeof(amount), amount FROM transactions WHERE fitid = 'F3'").fetchone()
+    await repository.aclose()
+
+    assert "Groceries" in names and len(names) == len(DEFAULT_CATEGORIES)
+    assert rollup['income'] == 1234568.19
+    assert tuple(stored) == ("integer", 123456789)
+    assert budget['amount'] == 19.99
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="STORAGE_BACKEND"):
+        create_repository("duckdb")
+
+
+def test_serves_the_transactions_endpoint(path):
+    repository = SQLiteRepository(path, events=TransactionEvents())
+    app.dependency_overrides[get_repository] = lambda: repository
+    try:
+        asyncio.run(repository.upsert_transactions([make_row(f"2025-04-0{day}", fitid=f"F{day}") for day in range(1, 4)]))
+        client = TestClient(app)
+        response = client.get("/transactions/", params={'limit': 2})
+        following = client.get("/transactions/", params={'limit': 2, 'cursor': response.headers["X-Next-Cursor"]})
+    finally:
+        app.dependency_overrides.clear()
+        asyncio.run(repository.aclose())
+
+    assert [row['id'] for row in response.json()] == [3, 2]
+    assert [row['id'] for row in following.json()] == [1]
@@ -0,0 +1,140 @@
+import asyncio
+import os
+import sys
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+from main import app
+from core.events import TransactionEvents
+from core.memory_repository import InMemoryRepository
+from core.repository import get_repository
+from services.suggestions import CategoryModel, SuggestionEngine, description_features, get_suggestion_engine
+
+GROCERIES, FUEL, DINING = 3, 4, 5
+
+TRAINING = [
+    (1, "WALMART SUPERCENTER 5403", GROCERIES),
+    (2, "COUNTDOWN 123 AUCKLAND", GROCERIES),
+    (3, "COUNTDOWN 77 WELLINGTON", GROCERIES),
+    (4, "Z ENERGY 12 NEWMARKET", FUEL),
+    (5, "BP CONNECT 9 TAKAPUNA", FUEL),
+    (6, "Z ENERGY 88 PONSONBY", FUEL),
+    (7, "EFTPOS CAFE 1 & CO", DINING),
+    (8, "BURGER FUEL PONSONBY", DINING),
+]
+
+
+def rows(examples):
+    return [{'id': row_id, 'description': description, 'category_id': category_id} for row_id, description, category_id in examples]
+
+
+def test_features_ignore_numbers_case_and_punctuation():
+    assert np.array_equal(description_features("WAL-MART #5403"), description_features("wal mart 17"))
+    assert len(description_features("")) == 0
+    assert description_features("Walmart", 8).max() < 256
+
+
+def test_model_suggests_categories_for_a_batch():
+    model = CategoryModel()
+    model.learn(rows(TRAINING))
+
+    suggestions = model.suggest(["WAL-MART #1234", "Z ENERGY 40 AUCKLAND", "COUNTDOWN 5 NELSON", "", "1234"], min_confidence=0.5)
+
+    assert [s.category_id if s else None for s in suggestions] == [GROCERIES, FUEL, GROCERIES, None, None]
+    assert all(0.5 <= s.confidence <= 1 for s in suggestions[:3])
+    probabilities = model.predict(["Z ENERGY"])
+    assert probabilities.shape == (1, 3) and probabilities.sum() == pytest.approx(1)
+
+
+def test_model_moves_recategorized_transactions():
+    model = CategoryModel()
+    model.learn(rows(TRAINING))
+    before = model.predict(["BURGER FUEL"])[0][model.category_ids.index(DINING)]
+
+    model.learn(rows([(8, "BURGER FUEL PONSONBY", FUEL)]))
+    moved = model.predict(["BURGER FUEL"])[0][model.category_ids.index(DINING)]
+    model.learn(rows([(8, "BURGER FUEL PONSONBY", DINING)]))
+
+    assert moved < before
+    assert model.predict(["BURGER FUEL"])[0][model.category_ids.index(DINING)] == pytest.approx(before)
+    model.learn(rows([(8, "BURGER FUEL PONSONBY", None)]))
+    assert len(model) == len(TRAINING) - 1
+
+
+def test_empty_model_suggests_nothing():
+    assert CategoryModel().suggest(["WALMART"]) == [None]
+
+
+async def seeded_repository(events):
+    repository = InMemoryRepository(events=events)
+    await repository.upsert_transactions([
+        {'account_id': 1, 'date': f"2025-04-{row_id:02d}", 'amount': "-10.00", 'description': description,
+         'fitid': f"F{row_id}", 'category_id': category_id, 'reconciled': True}
+        for row_id, description, category_id in TRAINING
+    ])
+    return repository
+
+
+@pytest.mark.asyncio
+async def test_engine_trains_on_first_use_then_learns_from_updates():
+    events = TransactionEvents()
+    repository = await seeded_repository(events)
+    engine = SuggestionEngine(repository, events)
+
+    model = await engine.ready()
+    assert len(model) == len(TRAINING)
+
+    [new] = await repository.upsert_transactions([
+        {'account_id': 1, 'date': "2025-04-20", 'amount': "-30.00", 'description': "PAK N SAVE ALBANY", 'fitid': "F20"},
+    ])
+    assert (await engine.ready()).suggest(["PAK N SAVE"], 0.9) == [None]
+    await repository.update_transaction(new['id'], {'category_id': GROCERIES})
+
+    assert (await engine.ready()).suggest(["PAK N SAVE MT ALBERT"])[0].category_id == GROCERIES
+    engine.close()
+
+
+@pytest.mark.asyncio
+async def test_shared_engine_follows_the_injected_repository_and_its_events():
+    repository = await seeded_repository(TransactionEvents())
+    engine = get_suggestion_engine(repository)
+    await engine.ready()
+
+    await repository.upsert_transactions([
+        {'account_id': 1, 'date': "2025-04-20", 'amount': "-30.00", 'description': "PAK N SAVE ALBANY", 'fitid': "F20", 'category_id': GROCERIES},
+    ])
+
+    assert len(await engine.ready()) == len(TRAINING) + 1
+    assert get_suggestion_engine(repository) is engine
+    other = InMemoryRepository(events=TransactionEvents())
+    assert get_suggestion_engine(other).repository is other
+    get_suggestion_engine(other).close()
+
+
+def test_suggestions_route_scores_unreconciled_uncategorized_rows():
+    events = TransactionEvents()
+    repository = asyncio.run(seeded_repository(events))
+    asyncio.run(repository.upsert_transactions([
+        {'account_id': 1, 'date': "2025-05-01", 'amount': "-50.00", 'description': "Z ENERGY 3 ALBANY", 'fitid': "N1"},
+        {'account_id': 1, 'date': "2025-05-02", 'amount': "-9.00", 'description': "QWERTY", 'fitid': "N2"},
+        {'account_id': 1, 'date': "2025-05-03", 'amount': "-5.00", 'description': "Z ENERGY 4", 'fitid': "N3", 'category_id': DINING},
+    ]))
+    engine = SuggestionEngine(repository, events)
+    app.dependency_overrides[get_repository] = lambda: repository
+    app.dependency_overrides[get_suggestion_engine] = lambda: engine
+    try:
+        response = TestClient(app).get("/transactions/suggestions")
+    finally:
+        app.dependency_overrides.clear()
+        engine.close()
+
+    assert response.status_code == 200
+    [suggestion] = response.json()
+    assert suggestion['description'] == "Z ENERGY 3 ALBANY"
+    assert suggestion['category_id'] == FUEL
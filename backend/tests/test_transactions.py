@@ -0,0 +1,271 @@
+import os
+import sys
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+from main import app
+from core.repository import get_repository
+from core.pagination import decode_cursor, encode_cursor
+from services.category_cache import CategoryCache, get_category_cache
+
+
+def make_row(row_id, row_date="2025-04-10"):
+    return {
+        'id': row_id, 'account_id': 1, 'date': row_date, 'description': "Coffee",
+        'amount': -4.5, 'transaction_type': "debit", 'fitid': f"F{row_id}",
+        'category_id': None, 'reconciled': False, 'tags': None, 'notes': "long note",
+    }
+
+
+@pytest.fixture
+def repository():
+    repo = MagicMock()
+    repo.list_transactions = AsyncMock(return_value=[])
+    repo.list_categories = AsyncMock(return_value=[{'id': 3, 'name': "Groceries", 'is_custom': False}])
+    cache = CategoryCache(repo)
+    app.dependency_overrides[get_repository] = lambda: repo
+    app.dependency_overrides[get_category_cache] = lambda: cache
+    yield repo
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def test_full_page_returns_next_cursor(client, repository):
+    repository.list_transactions.return_value = [make_row(3), make_row(2, "2025-04-09")]
+
+    response = client.get("/transactions/", params={"limit": 2})
+
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    assert decode_cursor(response.headers["X-Next-Cursor"]) == (date(2025, 4, 9), 2)
+
+
+def test_short_page_has_no_cursor(client, repository):
+    repository.list_transactions.return_value = [make_row(1)]
+    response = client.get("/transactions/", params={"limit": 2})
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_cursor_is_passed_to_repository(client, repository):
+    cursor = encode_cursor({'date': "2025-04-09", 'id': 2})
+    client.get("/transactions/", params={"cursor": cursor, "account_id": 1})
+
+    kwargs = repository.list_transactions.await_args.kwargs
+    assert kwargs['cursor'] == (date(2025, 4, 9), 2)
+    assert repository.list_transactions.await_args.args[0].account_id == 1
+
+
+def test_invalid_cursor_is_rejected(client, repository):
+    response = client.get("/transactions/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+def test_cursor_and_offset_are_exclusive(client, repository):
+    cursor = encode_cursor({'date': "2025-04-09", 'id': 2})
+    response = client.get("/transactions/", params={"cursor": cursor, "offset": 10})
+    assert response.status_code == 400
+
+
+def test_fields_projection(client, repository):
+    repository.list_transactions.return_value = [
+        {'id': 1, 'date': "2025-04-10", 'amount': -4.5, 'description': "Coffee"}
+    ]
+
+    response = client.get("/transactions/", params={"fields": "amount,description"})
+
+    assert response.status_code == 200
+    assert response.json() == [{'id': 1, 'date': "2025-04-10", 'amount': "-4.5", 'description': "Coffee"}]
+    assert repository.list_transactions.await_args.kwargs['columns'] == ["id", "date", "amount", "description"]
+
+
+def test_unknown_field_is_rejected(client, repository):
+    response = client.get("/transactions/", params={"fields": "amount,password"})
+    assert response.status_code == 400
+    assert "password" in response.json()['detail']
+
+
+def test_import_fingerprint_is_not_exposed(client, repository):
+    repository.list_transactions.return_value = [{**make_row(1), 'fitid': None, 'fingerprint': "abc123"}]
+
+    response = client.get("/transactions/")
+    projected = client.get("/transactions/", params={"fields": "amount,fingerprint"})
+    exported = client.get("/transactions/export", params={"format": "csv"})
+
+    assert 'fingerprint' not in response.json()[0]
+    assert projected.status_code == 400
+    assert "fingerprint" not in exported.text.splitlines()[0]
+
+
+def test_search_is_ranked_and_paged_by_offset(client, repository):
+    repository.search_transactions = AsyncMock(return_value=[make_row(5), make_row(9)])
+
+    response = client.get("/transactions/", params={"q": "uber", "tags": ["travel", "work"], "limit": 2, "offset": 2})
+
+    assert response.status_code == 200
+    assert [row['id'] for row in response.json()] == [5, 9]
+    assert "X-Next-Cursor" not in response.headers
+    query, filters = repository.search_transactions.await_args.args
+    assert query == "uber" and filters.tags == ["travel", "work"]
+    assert repository.search_transactions.await_args.kwargs['offset'] == 2
+    repository.list_transactions.assert_not_awaited()
+
+
+def test_search_rejects_cursor(client, repository):
+    cursor = encode_cursor({'id': 1, 'date': "2025-04-10"})
+    response = client.get("/transactions/", params={"q": "uber", "cursor": cursor})
+    assert response.status_code == 400
+
+
+def test_export_streams_all_pages_as_ndjson(client, repository):
+    # Two chunks: a full one (triggers another fetch) and a final short one
+    full_chunk = [make_row(i) for i in range(1000, 0, -1)]
+    repository.list_transactions.side_effect = [full_chunk, [make_row(0, "2025-04-01")]]
+
+    response = client.get("/transactions/export", params={"format": "ndjson", "account_id": 1})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = response.text.splitlines()
+    assert len(lines) == 1001
+    # Second fetch continues from the last row of the first chunk
+    assert repository.list_transactions.await_args_list[1].kwargs['cursor'] == (date(2025, 4, 10), 1)
+
+
+def test_export_csv_with_projection(client, repository):
+    repository.list_transactions.return_value = [
+        {'id': 1, 'date': "2025-04-10", 'amount': -4.5, 'tags': ["food", "cafe"]}
+    ]
+
+    response = client.get("/transactions/export", params={"format": "csv", "fields": "amount,tags"})
+
+    assert response.text.splitlines() == ["id,date,amount,tags", "1,2025-04-10,-4.5,food;cafe"]
+
+
+def test_export_rejects_unknown_format(client, repository):
+    response = client.get("/transactions/export", params={"format": "xlsx"})
+    assert response.status_code == 400
+
+
+def test_export_parquet_round_trips(client, repository):
+    pq = pytest.importorskip("pyarrow.parquet")
+    import io
+    from decimal import Decimal
+    repository.list_transactions.return_value = [make_row(2), make_row(1)]
+
+    response = client.get("/transactions/export", params={"format": "parquet"})
+
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.num_rows == 2
+    assert table.column("amount").to_pylist() == [Decimal("-4.50"), Decimal("-4.50")]
+    assert table.column("date").to_pylist() == [date(2025, 4, 10), date(2025, 4, 10)]
+
+
+def test_full_rows_match_model_wire_format(client, repository):
+    repository.list_transactions.return_value = [make_row(1)]
+
+    response = client.get("/transactions/")
+
+    row = response.json()[0]
+    assert row['amount'] == "-4.5" # Decimal-as-string, as the Transaction model serializes it
+    assert row['date'] == "2025-04-10"
+
+
+def test_update_returns_stored_row(client, repository):
+    repository.update_transaction = AsyncMock(return_value=make_row(7))
+
+    response = client.put("/transactions/7", json={'reconciled': True})
+
+    assert response.status_code == 200
+    assert response.json()['amount'] == "-4.5"
+    repository.update_transaction.assert_awaited_once_with(7, {'reconciled': True})
+
+
+def test_update_validates_input(client, repository):
+    repository.update_transaction = AsyncMock()
+    response = client.put("/transactions/7", json={'category_id': "not-a-number"})
+    assert response.status_code == 422
+    repository.update_transaction.assert_not_awaited()
+
+
+def test_update_rejects_unknown_category(client, repository):
+    repository.update_transaction = AsyncMock()
+
+    response = client.put("/transactions/7", json={'category_id': 99})
+
+    assert response.status_code == 400
+    repository.update_transaction.assert_not_awaited()
+
+
+def test_update_checks_category_against_cache(client, repository):
+    repository.update_transaction = AsyncMock(return_value=make_row(7))
+
+    for _ in range(3):
+        assert client.put("/transactions/7", json={'category_id': 3}).status_code == 200
+
+    repository.list_categories.assert_awaited_once()
+
+
+def test_bulk_update_groups_identical_changes(client, repository):
+    repository.update_transactions = AsyncMock(side_effect=lambda ids, values: [{'id': i} for i in ids if i != 4])
+    items = [{'id': i, 'reconciled': True} for i in range(1, 5)] + [{'id': 5, 'category_id': 3}]
+
+    response = client.patch("/transactions/bulk", json={'items': items})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body['updated'] == 4
+    assert [r['status'] for r in body['results']] == ["updated", "updated", "updated", "not_found", "updated"]
+    calls = sorted(repository.update_transactions.await_args_list, key=lambda c: len(c.args[0]))
+    assert [c.args for c in calls] == [([5], {'category_id': 3}), ([1, 2, 3, 4], {'reconciled': True})]
+
+
+def test_bulk_update_reports_invalid_and_failed_items(client, repository):
+    async def update(ids, values):
+        if 'notes' in values:
+            raise RuntimeError("boom")
+        return [{'id': i} for i in ids]
+    repository.update_transactions = AsyncMock(side_effect=update)
+    items = [{'id': 1, 'category_id': 99}, {'id': 2}, {'id': 3, 'notes': "x"}, {'id': 4, 'reconciled': False}]
+
+    response = client.patch("/transactions/bulk", json={'items': items})
+
+    results = {r['id']: r['status'] for r in response.json()['results']}
+    assert results == {1: "invalid", 2: "invalid", 3: "failed", 4: "updated"}
+
+
+def test_bulk_update_by_filter(client, repository):
+    repository.update_matching_transactions = AsyncMock(return_value=[{'id': 8}, {'id': 9}])
+
+    response = client.patch("/transactions/bulk", json={
+        'filter': {'start_date': "2025-04-01", 'end_date': "2025-04-30", 'account_id': 1},
+        'update': {'reconciled': True},
+    })
+
+    assert response.json()['updated'] == 2
+    filters, values = repository.update_matching_transactions.await_args.args
+    assert filters.end_date == date(2025, 4, 30)
+    assert values == {'reconciled': True}
+
+
+@pytest.mark.parametrize("payload", [
+    {},
+    {'items': [{'id': 1, 'reconciled': True}], 'filter': {'account_id': 1}, 'update': {'reconciled': True}},
+    {'filter': {}, 'update': {'reconciled': True}},
+    {'filter': {'tags': []}, 'update': {'reconciled': True}},
+    {'filter': {'account_id': 1}},
+])
+def test_bulk_update_rejects_ambiguous_or_unscoped_requests(client, repository, payload):
+    repository.update_matching_transactions = AsyncMock()
+    assert client.patch("/transactions/bulk", json=payload).status_code == 400
+    repository.update_matching_transactions.assert_not_awaited()
@@ -1,6 +1,21 @@
 import React, { useState, useCallback } from 'react';
 import { useDropzone } from 'react-dropzone';
 
+// Polls GET /upload/jobs/{id} until the import job completes or fails
+async function waitForImportJob(jobId: string, intervalMs = 1000): Promise<any> {
+    while (true) {
+        const response = await fetch(`http://localhost:8000/upload/jobs/${jobId}`);
+        const job = await response.json();
+        if (!response.ok) {
+            throw new Error(job.detail || `HTTP error! status: ${response.status}`);
+        }
+        if (job.status === 'completed' || job.status === 'failed') {
+            return job;
+        }
+        await new Promise(resolve => setTimeout(resolve, intervalMs));
+    }
+}
+
 function FileUpload() {
     const [uploadedFile, setUploadedFile] = useState<File | null>(null);
     const [isLoading, setIsLoading] = useState<boolean>(false);
@@ -60,8 +75,14 @@ function FileUpload() {
                 throw new Error(result.detail || `HTTP error! status: ${response.status}`);
             }
 
-            setMessage(`Upload successful: ${result.message || 'File processed.'} (${result.accounts_processed} accounts, ${result.transactions_collected} transactions)`);
+            // The server imports in the background; poll the job until it finishes
+            setMessage(`${result.message || 'File queued.'} Importing...`);
             setUploadedFile(null); // Clear selection after successful upload
+            const job = await waitForImportJob(result.job_id);
+            if (job.status === 'failed') {
+                throw new Error(job.errors?.[0] || 'Import failed');
+            }
+            setMessage(`Import complete: ${job.transactions_inserted} new transactions, ${job.duplicates_skipped} duplicates skipped.`);
         } catch (err: any) {
             console.error("Upload error:", err);
             setError(`Upload failed: ${err.message || 'Unknown error'}`);
@@ -0,0 +1,143 @@
+"""Benchmark: vectorized analytics on the columnar snapshot vs looping over row dicts.
+
+Generates transaction rows shaped like repository results, then times the queries
+behind /dashboard/trends and /dashboard/insights (group-bys, a rolling window and
+per-category percentiles) both ways, plus building the snapshot and merging an
+import batch into it.
+
+Usage: python scripts/bench_analytics.py [--rows 1000000]
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+# --- Path Setup ---
+SCRIPT_DIR = Path(__file__).resolve().parent
+BACKEND_DIR = SCRIPT_DIR.parent / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from services.analytics import (
+    TransactionColumns,
+    category_percentiles,
+    daily_spending,
+    day_number,
+    group_totals,
+    rolling_sum,
+)
+
+WINDOW = 30
+
+
+def make_rows(count: int, rng):
+    start = date(2015, 1, 1)
+    return [
+        {
+            'id': i, 'account_id': rng.randint(1, 5), 'date': (start + timedelta(days=rng.randint(0, 3650))).isoformat(),
+            'amount': round(rng.uniform(-300, 100), 2), 'category_id': rng.choice([None] + list(range(1, 40))),
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+# --- Naive baseline: the dict-and-Decimal loops this replaces ---
+
+def naive_group_by_category(rows):
+    totals = defaultdict(lambda: [Decimal(0), Decimal(0), 0])
+    for row in rows:
+        amount = Decimal(str(row['amount']))
+        entry = totals[row['category_id']]
+        if amount > 0:
+            entry[0] += amount
+        else:
+            entry[1] -= amount
+        entry[2] += 1
+    return totals
+
+
+def naive_group_by_month(rows):
+    totals = defaultdict(lambda: [Decimal(0), Decimal(0)])
+    for row in rows:
+        amount = Decimal(str(row['amount']))
+        month = date.fromisoformat(row['date']).replace(day=1)
+        totals[month][0 if amount > 0 else 1] += abs(amount)
+    return totals
+
+
+def naive_rolling(rows, start: date, end: date):
+    daily = defaultdict(Decimal)
+    for row in rows:
+        day = date.fromisoformat(row['date'])
+        amount = Decimal(str(row['amount']))
+        if start <= day <= end and amount < 0:
+            daily[day] -= amount
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    return [sum((daily[d - timedelta(days=k)] for k in range(WINDOW)), Decimal(0)) / WINDOW for d in days]
+
+
+def naive_percentiles(rows):
+    spend = defaultdict(list)
+    for row in rows:
+        amount = Decimal(str(row['amount']))
+        if amount < 0:
+            spend[row['category_id']].append(-amount)
+    result = {}
+    for category, values in spend.items():
+        values.sort()
+        result[category] = [values[int(q * (len(values) - 1))] for q in (0.5, 0.9, 0.99)]
+    return result
+
+
+def time_ms(fn, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    print(f"Generating {args.rows:,} rows...")
+    rows = make_rows(args.rows, rng)
+    end = date(2024, 12, 31)
+    start = end - timedelta(days=364)
+
+    build_ms = time_ms(lambda: TransactionColumns.from_rows(rows), 1)
+    columns = TransactionColumns.from_rows(rows)
+    batch = make_rows(500, rng)
+    for i, row in enumerate(batch):
+        row['id'] = args.rows + i + 1
+    merge_full_ms = time_ms(lambda: columns.merge(batch[:0] + [dict(rows[0], category_id=3)]), args.repeats)
+
+    first, last = day_number(start), day_number(end)
+    queries = [
+        ("group by category", lambda: naive_group_by_category(rows), lambda: group_totals(columns, "category")),
+        ("group by month", lambda: naive_group_by_month(rows), lambda: group_totals(columns, "month")),
+        (f"{WINDOW}-day rolling, 1y", lambda: naive_rolling(rows, start, end),
+         lambda: rolling_sum(daily_spending(columns, first - WINDOW + 1, last), WINDOW)[WINDOW - 1:] / WINDOW),
+        ("category percentiles", lambda: naive_percentiles(rows), lambda: category_percentiles(columns, [50, 90, 99])),
+    ]
+
+    print(f"Snapshot build: {build_ms:,.0f} ms (once per process); merging a row update: {merge_full_ms:.2f} ms")
+    print(f"{'query':<24} {'naive (ms)':>11} {'vectorized (ms)':>16} {'speedup':>8}")
+    for name, naive, vectorized in queries:
+        naive_ms = time_ms(naive, 1)
+        fast_ms = time_ms(vectorized, args.repeats)
+        print(f"{name:<24} {naive_ms:>11,.1f} {fast_ms:>16,.2f} {naive_ms / fast_ms:>7,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
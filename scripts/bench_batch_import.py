@@ -0,0 +1,140 @@
+"""Benchmark: importing many OFX files one by one vs the parallel batch importer.
+
+Generates synthetic statements (several accounts, many files) and imports them against
+an in-process fake repository that adds a fixed round-trip latency to every call:
+  sequential - each file streamed through `ingest_ofx_stream`, one after another, with a
+               lookup per account per file
+  batch      - `run_batch_import`: files parsed in a process pool, one account lookup
+               for the whole batch, per-account writers running concurrently
+
+Usage: python scripts/bench_batch_import.py [--files 40] [--rows 2000] [--accounts 4] [--latency 0.02]
+"""
+import argparse
+import asyncio
+import io
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+
+# --- Path Setup ---
+SCRIPT_DIR = Path(__file__).resolve().parent
+BACKEND_DIR = SCRIPT_DIR.parent / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from services.batch_import import IMPORT_PARSE_PROCESSES, run_batch_import
+from services.ofx_parser import ingest_ofx_stream
+
+
+class LatencyRepository:
+    """Just enough of SupabaseRepository for an import, with a delay per request."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.requests = 0
+        self._accounts = {}
+
+    async def _call(self):
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+
+    async def list_rules(self):
+        await self._call()
+        return []
+
+    async def get_account_id_by_name(self, name):
+        await self._call()
+        return self._accounts.get(name)
+
+    async def create_account(self, account):
+        await self._call()
+        self._accounts[account['name']] = len(self._accounts) + 1
+        return {'id': self._accounts[account['name']], **account}
+
+    async def get_account_ids_by_names(self, names):
+        await self._call()
+        return {name: self._accounts[name] for name in names if name in self._accounts}
+
+    async def create_accounts(self, accounts):
+        await self._call()
+        return [await self.create_account(account) for account in accounts]
+
+    async def upsert_transactions(self, rows):
+        await self._call()
+        return rows
+
+
+def make_statement(file_index: int, account: str, rows: int) -> bytes:
+    rng = random.Random(file_index)
+    start = date(2024, 1, 1) + timedelta(days=30 * file_index)
+    lines = [
+        "OFXHEADER:100\nDATA:OFXSGML\nVERSION:102\nENCODING:USASCII\nCHARSET:1252\n\n<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS>",
+        f"<CURDEF>NZD<BANKACCTFROM><BANKID>12<ACCTID>{account}<ACCTTYPE>CHECKING</BANKACCTFROM><BANKTRANLIST>",
+    ]
+    for i in range(rows):
+        day = (start + timedelta(days=i % 30)).strftime("%Y%m%d")
+        lines.append(
+            f"<STMTTRN><TRNTYPE>POS<DTPOSTED>{day}<TRNAMT>{rng.uniform(-300, 300):.2f}"
+            f"<FITID>{file_index}-{i}<NAME>MERCHANT {rng.randint(1, 5000)}<MEMO>EFTPOS</STMTTRN>"
+        )
+    lines.append("</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>")
+    return "\n".join(lines).encode()
+
+
+class BytesUpload:
+    def __init__(self, data: bytes):
+        self._io = io.BytesIO(data)
+
+    async def read(self, size: int = -1) -> bytes:
+        return self._io.read(size)
+
+
+async def run_sequential(statements, latency):
+    repository = LatencyRepository(latency)
+    started = time.perf_counter()
+    for data in statements:
+        await ingest_ofx_stream(BytesUpload(data), repository=repository)
+    return time.perf_counter() - started, repository.requests
+
+
+async def run_batch(batch_dir, latency, executor):
+    repository = LatencyRepository(latency)
+    started = time.perf_counter()
+    await run_batch_import(batch_dir, lambda progress: None, repository=repository, executor=executor)
+    return time.perf_counter() - started, repository.requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=40)
+    parser.add_argument("--rows", type=int, default=2000, help="Transactions per file")
+    parser.add_argument("--accounts", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds added to every repository call")
+    args = parser.parse_args()
+
+    statements = [make_statement(i, f"ACCT-{i % args.accounts}", args.rows) for i in range(args.files)]
+    total_rows = args.files * args.rows
+
+    with tempfile.TemporaryDirectory() as tmp:
+        batch_dir = Path(tmp)
+        for i, data in enumerate(statements):
+            (batch_dir / f"{i:04d}.ofx").write_bytes(data)
+
+        sequential, sequential_requests = asyncio.run(run_sequential(statements, args.latency))
+        with ProcessPoolExecutor(max_workers=IMPORT_PARSE_PROCESSES) as executor:
+            batch, batch_requests = asyncio.run(run_batch(batch_dir, args.latency, executor))
+
+    print(f"{args.files} files x {args.rows} rows, {args.accounts} accounts, "
+          f"{args.latency * 1000:.0f} ms per request, {IMPORT_PARSE_PROCESSES} parse processes")
+    for label, elapsed, requests in (("sequential", sequential, sequential_requests), ("batch", batch, batch_requests)):
+        print(f"{label:>10}: {elapsed:7.2f}s  {args.files / elapsed:7.1f} files/s  "
+              f"{total_rows / elapsed:9.0f} rows/s  {requests} requests")
+    print(f"speedup: {sequential / batch:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
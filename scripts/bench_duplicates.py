@@ -0,0 +1,99 @@
+"""Benchmark: all-pairs near-duplicate search vs bucketing by (account, amount).
+
+Generates a few years of transactions with some re-imported rows mixed in, then finds
+near-duplicates (same account and amount, dates within a window, similar payee) both ways:
+  all pairs - every pair of transactions compared (what a straightforward scan does)
+  bucketed  - `find_suspected_duplicates`: rows grouped by (account, amount) and each
+              group swept in date order, so only rows inside one window are compared
+The all-pairs scan is timed on a sample and extrapolated, as it grows quadratically.
+
+Usage: python scripts/bench_duplicates.py [--rows 50000] [--sample 3000]
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+# --- Path Setup ---
+SCRIPT_DIR = Path(__file__).resolve().parent
+BACKEND_DIR = SCRIPT_DIR.parent / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from services.dedup import (
+    DUPLICATE_MIN_SIMILARITY,
+    DUPLICATE_WINDOW_DAYS,
+    amount_cents,
+    description_similarity,
+    find_suspected_duplicates,
+    normalize_description,
+)
+
+
+def make_rows(count: int):
+    rng = random.Random(7)
+    start = date(2022, 1, 1)
+    merchants = [f"EFTPOS MERCHANT {i} AUCKLAND" for i in range(800)]
+    rows = []
+    for i in range(count):
+        if rows and rng.random() < 0.01: # Re-imported with a new FITID and a reworded payee
+            original = rng.choice(rows)
+            day = date.fromisoformat(original['date']) + timedelta(days=rng.randint(0, 2))
+            rows.append({**original, 'id': i, 'date': day.isoformat(), 'description': original['description'].title()})
+            continue
+        rows.append({
+            'id': i,
+            'account_id': rng.randint(1, 4),
+            'date': (start + timedelta(days=rng.randint(0, 1000))).isoformat(),
+            'amount': f"{-rng.randint(100, 20000) / 100:.2f}",
+            'description': rng.choice(merchants),
+        })
+    return rows
+
+
+def all_pairs(rows):
+    prepared = [
+        (row['account_id'], amount_cents(row['amount']), date.fromisoformat(row['date']), normalize_description(row['description']))
+        for row in rows
+    ]
+    found = 0
+    for i, (account, cents, day, description) in enumerate(prepared):
+        for other_account, other_cents, other_day, other_description in prepared[:i]:
+            if account != other_account or cents != other_cents:
+                continue
+            if abs((day - other_day).days) > DUPLICATE_WINDOW_DAYS:
+                continue
+            if description_similarity(description, other_description, DUPLICATE_MIN_SIMILARITY) >= DUPLICATE_MIN_SIMILARITY:
+                found += 1
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--sample", type=int, default=3000, help="Rows used to time the all-pairs scan")
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    sample = rows[:args.sample]
+
+    started = time.perf_counter()
+    sample_found = all_pairs(sample)
+    sample_elapsed = time.perf_counter() - started
+    assert sample_found == len(find_suspected_duplicates(sample)), "both approaches must agree"
+    naive = sample_elapsed * (args.rows / args.sample) ** 2
+
+    started = time.perf_counter()
+    found = find_suspected_duplicates(rows)
+    bucketed = time.perf_counter() - started
+
+    print(f"{args.rows} transactions, {len(found)} suspected duplicate pairs")
+    print(f"all pairs: {naive:8.2f}s (extrapolated from {args.sample} rows: {sample_elapsed:.2f}s)")
+    print(f" bucketed: {bucketed:8.2f}s")
+    print(f"speedup: {naive / bucketed:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""Benchmark: re-uploading a statement that was already imported, with and without the import ledger.
+
+Generates one large OFX statement, imports it once (which records it in the ledger),
+then times re-uploads against an in-process fake repository that adds a fixed
+round-trip latency to every call:
+  no ledger      - `ingest_ofx_stream`: the whole file is parsed and every batch upserted,
+                   only for the database to report all rows as duplicates
+  same file      - `run_import` with the file's content hash already in the ledger
+  same period    - `run_import` of a re-export (different bytes, same <BANKTRANLIST>
+                   period): pre-scanned and skipped without parsing transactions
+  half overlap   - a statement running on past the imported period: only the
+                   transactions outside it are parsed and written
+
+Usage: python scripts/bench_import_ledger.py [--rows 50000] [--latency 0.02]
+"""
+import argparse
+import asyncio
+import hashlib
+import io
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+# --- Path Setup ---
+SCRIPT_DIR = Path(__file__).resolve().parent
+BACKEND_DIR = SCRIPT_DIR.parent / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from models.imports import ImportFormat, ImportOptions
+from services.import_jobs import run_import
+from services.ofx_parser import ingest_ofx_stream
+
+
+class LedgerRepository:
+    """Just enough of SupabaseRepository for an import and the ledger, with a delay per request."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.requests = 0
+        self._accounts = {}
+        self._fitids = set()
+        self._files = {}
+        self._ranges = []
+
+    async def _call(self):
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+
+    async def list_rules(self):
+        await self._call()
+        return []
+
+    async def get_account_id_by_name(self, name):
+        await self._call()
+        return self._accounts.get(name)
+
+    async def get_account_ids_by_names(self, names):
+        await self._call()
+        return {name: self._accounts[name] for name in names if name in self._accounts}
+
+    async def create_account(self, account):
+        await self._call()
+        self._accounts[account['name']] = len(self._accounts) + 1
+        return {'id': self._accounts[account['name']], **account}
+
+    async def upsert_transactions(self, rows):
+        await self._call()
+        inserted = [row for row in rows if (row['account_id'], row['fitid']) not in self._fitids]
+        self._fitids.update((row['account_id'], row['fitid']) for row in inserted)
+        return inserted
+
+    async def get_imported_file(self, sha256):
+        await self._call()
+        return self._files.get(sha256)
+
+    async def record_imported_file(self, row):
+        await self._call()
+        self._files.setdefault(row['sha256'], row)
+
+    async def list_statement_ranges(self, account_ids):
+        await self._call()
+        return [row for row in self._ranges if row['account_id'] in account_ids]
+
+    async def add_statement_ranges(self, ranges):
+        await self._call()
+        self._ranges.extend(ranges)
+
+
+def make_statement(rows: int, start: date, days: int, org: str = "BENCH BANK") -> bytes:
+    rng = random.Random(rows)
+    end = start + timedelta(days=days)
+    lines = [
+        "OFXHEADER:100\nDATA:OFXSGML\nVERSION:102\nENCODING:USASCII\nCHARSET:1252\n\n<OFX>",
+        f"<SIGNONMSGSRSV1><SONRS><FI><ORG>{org}<FID>1</FI></SONRS></SIGNONMSGSRSV1>",
+        "<BANKMSGSRSV1><STMTTRNRS><STMTRS><CURDEF>NZD",
+        "<BANKACCTFROM><BANKID>12<ACCTID>0001<ACCTTYPE>CHECKING</BANKACCTFROM>",
+        f"<BANKTRANLIST><DTSTART>{start:%Y%m%d}<DTEND>{end:%Y%m%d}",
+    ]
+    for i in range(rows):
+        day = start + timedelta(days=i * days // rows)
+        lines.append(
+            f"<STMTTRN><TRNTYPE>POS<DTPOSTED>{day:%Y%m%d}<TRNAMT>{rng.uniform(-300, 300):.2f}"
+            f"<FITID>{day:%Y%m%d}-{i}<NAME>MERCHANT {rng.randint(1, 5000)}<MEMO>EFTPOS</STMTTRN>"
+        )
+    lines.append("</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>")
+    return "\n".join(lines).encode()
+
+
+class BytesUpload:
+    def __init__(self, data: bytes):
+        self._io = io.BytesIO(data)
+
+    async def read(self, size: int = -1) -> bytes:
+        return self._io.read(size)
+
+
+async def timed(repository, coroutine):
+    requests = repository.requests
+    started = time.perf_counter()
+    summary = await coroutine
+    return time.perf_counter() - started, repository.requests - requests, summary
+
+
+async def run(args, tmp: Path):
+    repository = LedgerRepository(args.latency)
+    original = make_statement(args.rows, date(2025, 1, 1), 90)
+    reexport = original.replace(b"<FID>1</FI>", b"<FID>1\n</FI>", 1) # Same statement, other bytes
+    longer = make_statement(args.rows, date(2025, 1, 1), 180)
+    results = []
+
+    def options(data):
+        return ImportOptions(format=ImportFormat.ofx, content_sha256=hashlib.sha256(data).hexdigest())
+
+    async def upload(label, data):
+        path = tmp / f"{label}.ofx"
+        path.write_bytes(data)
+        results.append((label, *await timed(repository, run_import(path, lambda progress: None, options(data)))))
+
+    with patch("core.repository.get_repository", lambda: repository):
+        await upload("first import", original)
+        results.append(("no ledger", *await timed(
+            repository, ingest_ofx_stream(BytesUpload(original), repository=repository)
+        )))
+        await upload("same file", original)
+        await upload("same period", reexport)
+        await upload("half overlap", longer)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50000, help="Transactions per statement")
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds added to every repository call")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = asyncio.run(run(args, Path(tmp)))
+
+    print(f"{args.rows} rows per statement, {args.latency * 1000:.0f} ms per request")
+    for label, elapsed, requests, summary in results:
+        print(f"{label:>12}: {elapsed * 1000:9.1f} ms  {requests:4d} requests  "
+              f"{summary.transactions_parsed:6d} parsed  {summary.transactions_inserted:6d} inserted  "
+              f"{summary.transactions_already_imported:6d} in imported periods")
+
+
+if __name__ == "__main__":
+    main()
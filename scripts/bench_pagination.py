@@ -0,0 +1,113 @@
+"""Benchmark: OFFSET pagination vs keyset (cursor) pagination for GET /transactions.
+
+Builds an in-memory SQLite table shaped like `transactions` with the same
+(date DESC, id DESC) index as migrations/0002, then times fetching page 1 and a deep
+page using both the old `range(offset, ...)` query shape and the cursor query shape
+that SupabaseRepository.list_transactions now sends.
+
+Usage: python scripts/bench_pagination.py [--rows 1000000] [--page-size 100] [--deep-page 10000]
+"""
+import argparse
+import random
+import sqlite3
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+# --- Path Setup ---
+SCRIPT_DIR = Path(__file__).resolve().parent
+BACKEND_DIR = SCRIPT_DIR.parent / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from core.pagination import decode_cursor, encode_cursor
+
+COLUMNS = "id, account_id, date, description, amount"
+ORDER = "ORDER BY date DESC, id DESC"
+
+
+def build_table(rows: int) -> sqlite3.Connection:
+    conn = sqlite3.connect(":memory:")
+    conn.execute("""
+        CREATE TABLE transactions (
+            id INTEGER PRIMARY KEY, account_id INTEGER, date TEXT,
+            description TEXT, amount TEXT, notes TEXT
+        )
+    """)
+    rng = random.Random(42)
+    start = date(2010, 1, 1)
+    conn.executemany(
+        "INSERT INTO transactions VALUES (?, ?, ?, ?, ?, ?)",
+        (
+            (i, rng.randint(1, 5), (start + timedelta(days=i // 200)).isoformat(),
+             f"MERCHANT {rng.randint(1, 5000)}", f"{rng.uniform(-500, 500):.2f}", None)
+            for i in range(1, rows + 1)
+        ),
+    )
+    conn.execute("CREATE INDEX transactions_date_id_idx ON transactions (date DESC, id DESC)")
+    conn.commit()
+    return conn
+
+
+def fetch_offset_page(conn, page: int, page_size: int):
+    return conn.execute(
+        f"SELECT {COLUMNS} FROM transactions {ORDER} LIMIT ? OFFSET ?",
+        (page_size, (page - 1) * page_size),
+    ).fetchall()
+
+
+def fetch_keyset_page(conn, cursor, page_size: int):
+    if cursor is None:
+        return conn.execute(f"SELECT {COLUMNS} FROM transactions {ORDER} LIMIT ?", (page_size,)).fetchall()
+    cursor_date, cursor_id = decode_cursor(cursor)
+    return conn.execute(
+        f"SELECT {COLUMNS} FROM transactions WHERE date <= ? AND (date < ? OR (date = ? AND id < ?)) {ORDER} LIMIT ?",
+        (cursor_date.isoformat(), cursor_date.isoformat(), cursor_date.isoformat(), cursor_id, page_size),
+    ).fetchall()
+
+
+def cursor_before_page(conn, page: int, page_size: int):
+    """Cursor a client would hold after reading page-1 pages (the last row of the previous page)."""
+    if page == 1:
+        return None
+    row = fetch_offset_page(conn, page - 1, page_size)[-1]
+    return encode_cursor({'id': row[0], 'date': row[2]})
+
+
+def time_ms(fn, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--deep-page", type=int, default=10_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.deep_page * args.page_size > args.rows:
+        parser.error("--deep-page * --page-size must not exceed --rows")
+
+    print(f"Building {args.rows:,} rows...")
+    conn = build_table(args.rows)
+
+    print(f"{'page':>8} {'offset (ms)':>12} {'cursor (ms)':>12}")
+    for page in (1, args.deep_page):
+        cursor = cursor_before_page(conn, page, args.page_size)
+        # Both strategies must return the same rows
+        assert fetch_offset_page(conn, page, args.page_size) == fetch_keyset_page(conn, cursor, args.page_size)
+        offset_ms = time_ms(lambda: fetch_offset_page(conn, page, args.page_size), args.repeats)
+        cursor_ms = time_ms(lambda: fetch_keyset_page(conn, cursor, args.page_size), args.repeats)
+        print(f"{page:>8} {offset_ms:>12.3f} {cursor_ms:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Benchmark: combined rule matcher vs checking every rule per transaction.
+
+Generates categorization rules (mostly substrings, some regexes, some amount and
+account conditions) and transaction descriptions drawn from a pool of merchants, then
+times RuleSet.match over every transaction. The naive loop (each rule tried in
+precedence order against each row) is timed on a sample and extrapolated.
+
+Usage: python scripts/bench_rules.py [--rules 10000] [--transactions 1000000] [--pure-python]
+"""
+import argparse
+import random
+import re
+import string
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+# --- Path Setup ---
+SCRIPT_DIR = Path(__file__).resolve().parent
+BACKEND_DIR = SCRIPT_DIR.parent / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from models.rules import CategorizationRule, RuleMatchType
+from services import rules as rules_module
+from services.rules import RuleSet
+
+
+def random_word(rng, low=4, high=10):
+    return "".join(rng.choices(string.ascii_uppercase, k=rng.randint(low, high)))
+
+
+def make_rules(count: int, rng):
+    rules = []
+    for rule_id in range(1, count + 1):
+        kind = rng.random()
+        fields = {'id': rule_id, 'category_id': rng.randint(1, 40), 'priority': rng.randint(0, 3)}
+        if kind < 0.9:
+            fields.update(pattern=f"{random_word(rng)} {random_word(rng, 3, 6)}")
+        else:
+            fields.update(match_type=RuleMatchType.regex, pattern=rf"{random_word(rng)}\s+STORE\s+\d{{3}}")
+        if rng.random() < 0.05:
+            fields.update(min_amount=Decimal(-rng.randint(50, 500)), max_amount=Decimal(0))
+        if rng.random() < 0.02:
+            fields.update(account_id=rng.randint(1, 5))
+        rules.append(CategorizationRule(**fields))
+    return rules
+
+
+def make_transactions(count: int, rules, rng, merchants: int = 50_000):
+    # A third of the merchants are ones the rules know about
+    known = [rule.pattern for rule in rules if rule.match_type == RuleMatchType.substring]
+    known += [f"{rule.pattern.split(chr(92))[0]} STORE {rng.randint(100, 999)}"
+              for rule in rules if rule.match_type == RuleMatchType.regex]
+    pool = [rng.choice(known) if rng.random() < 0.33 else f"{random_word(rng)} {random_word(rng)}"
+            for _ in range(merchants)]
+    return [
+        (f"POS {rng.choice(pool)} AUCKLAND {rng.randint(1, 99):02d}",
+         Decimal(rng.randint(-50_000, 20_000)) / 100, rng.randint(1, 5))
+        for _ in range(count)
+    ]
+
+
+def naive_match(rules, compiled, description, amount, account_id):
+    lowered = description.lower()
+    for rule in rules:
+        if rule.pattern:
+            if rule.match_type == RuleMatchType.regex:
+                if not compiled[rule.id].search(description):
+                    continue
+            elif rule.pattern.lower() not in lowered:
+                continue
+        if rule.account_id is not None and rule.account_id != account_id:
+            continue
+        if rule.min_amount is not None and amount < rule.min_amount:
+            continue
+        if rule.max_amount is not None and amount > rule.max_amount:
+            continue
+        return rule.category_id
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rules", type=int, default=10_000)
+    parser.add_argument("--transactions", type=int, default=1_000_000)
+    parser.add_argument("--naive-sample", type=int, default=2_000)
+    parser.add_argument("--pure-python", action="store_true", help="Use the pure-Python automaton")
+    args = parser.parse_args()
+
+    if args.pure_python:
+        rules_module.ahocorasick = None
+    rng = random.Random(42)
+    rules = make_rules(args.rules, rng)
+    print(f"Generating {args.transactions:,} transactions...")
+    transactions = make_transactions(args.transactions, rules, rng)
+
+    started = time.perf_counter()
+    rule_set = RuleSet(rules)
+    compile_s = time.perf_counter() - started
+    automaton = "pure Python" if rules_module.ahocorasick is None else "pyahocorasick"
+    print(f"Compiled {len(rule_set):,} rules in {compile_s * 1000:.0f} ms ({automaton} automaton)")
+
+    started = time.perf_counter()
+    results = [rule_set.match(*transaction) for transaction in transactions]
+    combined_s = time.perf_counter() - started
+    matched = sum(1 for category_id in results if category_id is not None)
+
+    ordered = sorted(rules, key=lambda rule: (-rule.priority, rule.id))
+    compiled = {rule.id: re.compile(rule.pattern, re.IGNORECASE)
+                for rule in rules if rule.match_type == RuleMatchType.regex}
+    sample = transactions[:args.naive_sample]
+    started = time.perf_counter()
+    naive_results = [naive_match(ordered, compiled, *transaction) for transaction in sample]
+    naive_s = (time.perf_counter() - started) * len(transactions) / len(sample)
+    assert naive_results == results[:len(sample)], "combined matcher disagrees with the naive loop"
+
+    print(f"{len(transactions):,} transactions, {matched:,} categorized")
+    print(f"{'matcher':>10} {'total (s)':>10} {'rows/s':>12}")
+    print(f"{'combined':>10} {combined_s:>10.2f} {len(transactions) / combined_s:>12,.0f}")
+    print(f"{'naive':>10} {naive_s:>10.2f} {len(transactions) / naive_s:>12,.0f}  (extrapolated from {len(sample):,} rows)")
+
+
+if __name__ == "__main__":
+    main()
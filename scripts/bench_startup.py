@@ -0,0 +1,101 @@
+"""Benchmark: cold start of the API, as paid by every new or autoscaled worker.
+
+Each sample is a fresh interpreter that imports `main`, runs the lifespan startup and
+serves one `GET /`, timing the import and the time to that first response. Supabase
+credentials are removed from the environment: startup must not need them. The modules
+from HEAVY_MODULES loaded by then are listed, since each should wait for the first
+request that needs it.
+
+Pass --revision to time another commit side by side (checked out in a temporary git
+worktree), and --budget-ms to exit with status 1 when the median time to the first
+response exceeds it.
+
+Usage: python scripts/bench_startup.py [--samples 10] [--revision HEAD~1] [--budget-ms 1500]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+REPO_DIR = SCRIPT_DIR.parent
+
+# httpx is left out: the probe's TestClient needs it
+HEAVY_MODULES = ("supabase", "postgrest", "pyarrow", "numpy", "ofxparse", "services.ofx_parser")
+
+# Runs in the child interpreter, from the backend directory
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(main.app) as client:
+    assert client.get("/").status_code == 200
+    responded = time.perf_counter()
+    loaded = [name for name in %r if name in sys.modules]
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'first_response_ms': (responded - started) * 1000,
+    'loaded': loaded,
+}))
+"""
+
+
+def sample(backend_dir: Path, data_dir: str) -> dict:
+    env = {key: value for key, value in os.environ.items() if key not in ("SUPABASE_URL", "SUPABASE_KEY")}
+    env.update(IMPORT_DATA_DIR=data_dir, LOG_LEVEL="WARNING")
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE % (HEAVY_MODULES,)],
+        cwd=backend_dir, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"startup failed in {backend_dir}:\n{result.stderr.strip()}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure(backend_dir: Path, samples: int) -> dict:
+    with tempfile.TemporaryDirectory() as data_dir:
+        sample(backend_dir, data_dir) # Warm-up: compiles bytecode and fills the OS file cache
+        runs = [sample(backend_dir, data_dir) for _ in range(samples)]
+    return {
+        'import_ms': statistics.median(run['import_ms'] for run in runs),
+        'first_response_ms': statistics.median(run['first_response_ms'] for run in runs),
+        'loaded': runs[-1]['loaded'],
+    }
+
+
+def report(label: str, result: dict) -> None:
+    print(f"{label:>12}: import {result['import_ms']:7.0f} ms, first response {result['first_response_ms']:7.0f} ms, "
+          f"loaded: {', '.join(result['loaded']) or '-'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=10)
+    parser.add_argument("--revision", help="Also time this git revision")
+    parser.add_argument("--budget-ms", type=float, help="Fail if the median time to first response exceeds this")
+    args = parser.parse_args()
+
+    current = measure(REPO_DIR / "backend", args.samples)
+    if args.revision:
+        with tempfile.TemporaryDirectory() as tmp:
+            worktree = Path(tmp) / "worktree"
+            subprocess.run(["git", "worktree", "add", "--detach", "-q", str(worktree), args.revision], cwd=REPO_DIR, check=True)
+            try:
+                report(args.revision, measure(worktree / "backend", args.samples))
+            finally:
+                subprocess.run(["git", "worktree", "remove", "--force", str(worktree)], cwd=REPO_DIR, check=True)
+    report("working tree", current)
+
+    if args.budget_ms is not None and current['first_response_ms'] > args.budget_ms:
+        print(f"Over budget: {current['first_response_ms']:.0f} ms > {args.budget_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
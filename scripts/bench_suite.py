@@ -0,0 +1,375 @@
+"""Reproducible benchmark suite: OFX parsing, import and GET /transactions paging.
+
+Runs without Supabase: statements come from `ofx_generator.py` and the database is
+`core.memory_repository.InMemoryRepository`, optionally with a simulated round-trip
+latency, or with --backend sqlite an embedded `core.sqlite_repository.SQLiteRepository`
+in a temporary file. Each scenario runs in a fresh process so its peak RSS is its own:
+  parse_sgml, parse_xml - the streaming parser over an in-memory file
+  ingest               - `ingest_ofx_file` into an empty database, then the same file
+                         again without the ledger so every row is a server-side duplicate
+  paging               - walking GET /transactions with the keyset cursor, the same
+                         pages fetched by offset (then again, from the result cache), and
+                         `q=` searches, through the FastAPI app
+  suggest              - category suggestions: training, accuracy on held-out synthetic
+                         descriptions, batch scoring latency and one incremental update
+
+Results (throughput, latency percentiles, peak RSS) are written as JSON. Pass a previous
+results file with --compare to flag metrics that regressed by more than --tolerance;
+the exit status is 1 if any did.
+
+Usage: python scripts/bench_suite.py [--accounts 4] [--transactions 25000] [--latency 0] [--backend memory]
+                                     [--output bench_results.json] [--compare baseline.json]
+"""
+import argparse
+import asyncio
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+# --- Path Setup ---
+SCRIPT_DIR = Path(__file__).resolve().parent
+BACKEND_DIR = SCRIPT_DIR.parent / "backend"
+for path in (BACKEND_DIR, SCRIPT_DIR):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from ofx_generator import generate_ofx
+
+os.environ.setdefault("LOG_LEVEL", "WARNING") # Keep import summaries out of the report
+
+SCENARIOS = ("parse_sgml", "parse_xml", "ingest", "paging", "suggest")
+
+# Searches timed by the paging scenario: a common word, two words, and a word prefix
+SEARCH_QUERIES = ("uber", "countdown auckland", "amaz")
+
+# Payees per category for the suggest scenario; {n} is a store or reference number
+CATEGORY_PAYEES = {
+    1: ["COUNTDOWN {n}", "PAK N SAVE {n}", "NEW WORLD {n}", "FRESH CHOICE {n}", "WALMART SUPERCENTER #{n}"],
+    2: ["Z ENERGY {n}", "BP CONNECT {n}", "MOBIL {n}", "CALTEX {n}", "GULL {n}"],
+    3: ["EFTPOS CAFE {n} & CO", "BURGER KING {n}", "MCDONALDS {n}", "SUSHI BAR {n}", "DOMINOS PIZZA {n}"],
+    4: ["UBER TRIP {n}", "AT HOP TOPUP {n}", "UBER *TRIP HELP.UBER.COM", "LIME*RIDE {n}", "SNAPPER {n}"],
+    5: ["SPOTIFY P{n}", "NETFLIX.COM {n}", "DISNEY PLUS {n}", "APPLE.COM/BILL {n}", "NEON {n}"],
+    6: ["AMAZON MKTPLACE <{n}>", "THE WAREHOUSE {n}", "KMART {n}", "NOEL LEEMING {n}", "MIGHTY APE {n}"],
+    7: ["MERCURY ENERGY {n}", "WATERCARE {n}", "SPARK NZ {n}", "ONE NZ {n}", "CONTACT ENERGY {n}"],
+    8: ["CHEMIST WAREHOUSE {n}", "UNICHEM {n}", "LIFE PHARMACY {n}", "DENTAL {n} CLINIC", "SOUTHERN CROSS {n}"],
+}
+TRAINING_CITIES = ["AUCKLAND", "WELLINGTON", "CHRISTCHURCH", "HAMILTON", "TAURANGA", "DUNEDIN"]
+HELD_OUT_CITIES = ["NAPIER", "NELSON", "ROTORUA", "WHANGAREI"]
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1024 # bytes on macOS, KiB on Linux
+
+
+def percentiles_ms(samples) -> dict:
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        'p50_ms': round(cuts[49] * 1000, 3),
+        'p95_ms': round(cuts[94] * 1000, 3),
+        'p99_ms': round(cuts[98] * 1000, 3),
+    }
+
+
+def make_repository(args, directory: Path, latency: float = 0.0):
+    """A fresh, empty database for a scenario, of the kind chosen with --backend."""
+    from core.events import TransactionEvents
+
+    if args.backend == "sqlite":
+        from core.sqlite_repository import SQLiteRepository
+        return SQLiteRepository(directory / "bench.sqlite3", events=TransactionEvents())
+    from core.memory_repository import InMemoryRepository
+    return InMemoryRepository(latency=latency, events=TransactionEvents())
+
+
+# --- Scenarios (each runs in its own process) ---
+
+def run_parse(args, format: str) -> dict:
+    from services.ofx_stream import OfxTransactionRecord, iter_ofx_records
+
+    data = generate_ofx(args.accounts, args.transactions, format)
+    timings = []
+    for _ in range(args.repeats):
+        started = time.perf_counter()
+        count = sum(1 for record in iter_ofx_records(io.BytesIO(data)) if isinstance(record, OfxTransactionRecord))
+        timings.append(time.perf_counter() - started)
+    seconds = statistics.median(timings)
+    return {
+        'transactions': count,
+        'seconds': round(seconds, 4),
+        'rows_per_s': round(count / seconds),
+        'mb_per_s': round(len(data) / 1e6 / seconds, 2),
+    }
+
+
+def run_ingest(args) -> dict:
+    from services.ofx_parser import ingest_ofx_file
+
+    async def scenario(path: Path):
+        repository = make_repository(args, path.parent, args.latency)
+        started = time.perf_counter()
+        summary = await ingest_ofx_file(path, repository=repository)
+        first = time.perf_counter() - started
+        requests = getattr(repository, "requests", None) # Only counted by the in-memory database
+        started = time.perf_counter()
+        again = await ingest_ofx_file(path, repository=repository, skip_imported=False)
+        second = time.perf_counter() - started
+        assert again.transactions_inserted == 0 and again.duplicates_skipped == summary.transactions_inserted
+        await repository.aclose()
+        return summary, first, requests, second
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "statement.ofx"
+        path.write_bytes(generate_ofx(args.accounts, args.transactions, "sgml"))
+        summary, first, requests, second = asyncio.run(scenario(path))
+    return {
+        'transactions': summary.transactions_inserted,
+        'seconds': round(first, 4),
+        'rows_per_s': round(summary.transactions_inserted / first),
+        'db_requests': requests,
+        'reimport_seconds': round(second, 4),
+        'reimport_rows_per_s': round(summary.transactions_inserted / second),
+    }
+
+
+def run_paging(args) -> dict:
+    from fastapi.testclient import TestClient
+
+    from main import app
+    from core.repository import get_repository
+    from services.ofx_parser import ingest_ofx_stream
+
+    class BytesUpload:
+        def __init__(self, data: bytes):
+            self._io = io.BytesIO(data)
+
+        async def read(self, size: int = -1) -> bytes:
+            return self._io.read(size)
+
+    directory = tempfile.TemporaryDirectory()
+    repository = make_repository(args, Path(directory.name))
+    asyncio.run(ingest_ofx_stream(BytesUpload(generate_ofx(args.accounts, args.transactions, "sgml")), repository=repository))
+    if args.backend == "memory":
+        repository.latency = args.latency
+    app.dependency_overrides[get_repository] = lambda: repository
+    client = TestClient(app)
+
+    def fetch(params):
+        started = time.perf_counter()
+        response = client.get("/transactions/", params=params)
+        elapsed = time.perf_counter() - started
+        response.raise_for_status()
+        return response, elapsed
+
+    try:
+        cursor_samples, cursor = [], None
+        for _ in range(args.pages):
+            response, elapsed = fetch({'limit': args.page_size, **({'cursor': cursor} if cursor else {})})
+            cursor_samples.append(elapsed)
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+        offset_samples = [
+            fetch({'limit': args.page_size, 'offset': page * args.page_size})[1]
+            for page in range(len(cursor_samples))
+        ]
+        # The same offset pages again, now answered from the result cache
+        cached_samples = [
+            fetch({'limit': args.page_size, 'offset': page * args.page_size})[1]
+            for page in range(len(cursor_samples))
+        ]
+        search_samples = [
+            fetch({'limit': args.page_size, 'q': query})[1]
+            for _ in range(max(len(cursor_samples) // len(SEARCH_QUERIES), 1)) for query in SEARCH_QUERIES
+        ]
+    finally:
+        app.dependency_overrides.clear()
+        asyncio.run(repository.aclose())
+        directory.cleanup()
+
+    return {
+        'pages': len(cursor_samples),
+        'pages_per_s': round(len(cursor_samples) / sum(cursor_samples), 1),
+        **percentiles_ms(cursor_samples),
+        **{f"offset_{key}": value for key, value in percentiles_ms(offset_samples).items()},
+        **{f"cached_{key}": value for key, value in percentiles_ms(cached_samples).items()},
+        **{f"search_{key}": value for key, value in percentiles_ms(search_samples).items()},
+    }
+
+
+def labeled_descriptions(rng, count: int, held_out: bool) -> list:
+    """(description, category_id) pairs in the style of bank statement payees.
+
+    Training data leaves out the last payee of each category and a few cities, and 3%
+    of its labels are wrong, as with hand-categorized history; held-out data uses them
+    all, so some of it is genuinely new to the model.
+    """
+    cities = TRAINING_CITIES + HELD_OUT_CITIES if held_out else TRAINING_CITIES
+    examples = []
+    for _ in range(count):
+        category_id = rng.choice(list(CATEGORY_PAYEES))
+        payees = CATEGORY_PAYEES[category_id] if held_out else CATEGORY_PAYEES[category_id][:-1]
+        description = rng.choice(payees).format(n=rng.randint(1, 9999))
+        if rng.random() < 0.5:
+            description += " " + rng.choice(cities)
+        if rng.random() < 0.2:
+            description = "POS W/D " + description
+        if not held_out and rng.random() < 0.03:
+            category_id = rng.choice(list(CATEGORY_PAYEES))
+        examples.append((description[:32], category_id)) # OFX NAME is at most 32 characters
+    return examples
+
+
+def run_suggest(args) -> dict:
+    import random
+    from services.suggestions import CategoryModel, SUGGESTION_MIN_CONFIDENCE
+
+    rng = random.Random(1)
+    training = labeled_descriptions(rng, args.accounts * args.transactions, held_out=False)
+    held_out = labeled_descriptions(rng, 10_000, held_out=True)
+    rows = [{'id': i, 'description': description, 'category_id': category_id} for i, (description, category_id) in enumerate(training)]
+
+    model = CategoryModel()
+    started = time.perf_counter()
+    for start in range(0, len(rows), 1000):
+        model.learn(rows[start:start + 1000])
+    train_seconds = time.perf_counter() - started
+
+    descriptions = [description for description, _ in held_out]
+    started = time.perf_counter()
+    probabilities = model.predict(descriptions)
+    predict_seconds = time.perf_counter() - started
+    predicted = [model.category_ids[index] for index in probabilities.argmax(axis=1).tolist()]
+    suggestions = model.suggest(descriptions)
+    suggested = [(s.category_id, category_id) for s, (_, category_id) in zip(suggestions, held_out) if s is not None]
+
+    batch_samples = []
+    for start in range(0, len(descriptions), args.page_size):
+        started = time.perf_counter()
+        model.suggest(descriptions[start:start + args.page_size])
+        batch_samples.append(time.perf_counter() - started)
+    update_samples = []
+    for row in rows[:1000]: # Recategorize one transaction at a time, as edits do
+        started = time.perf_counter()
+        model.learn([{**row, 'category_id': (row['category_id'] % len(CATEGORY_PAYEES)) + 1}])
+        update_samples.append(time.perf_counter() - started)
+
+    return {
+        'transactions': len(rows),
+        'train_rows_per_s': round(len(rows) / train_seconds),
+        'predict_rows_per_s': round(len(descriptions) / predict_seconds),
+        'accuracy': round(sum(p == c for p, (_, c) in zip(predicted, held_out)) / len(held_out), 4),
+        f'precision_at_{SUGGESTION_MIN_CONFIDENCE:g}': round(sum(p == c for p, c in suggested) / max(len(suggested), 1), 4),
+        f'coverage_at_{SUGGESTION_MIN_CONFIDENCE:g}': round(len(suggested) / len(held_out), 4),
+        **{f"batch_{key}": value for key, value in percentiles_ms(batch_samples).items()},
+        **{f"update_{key}": value for key, value in percentiles_ms(update_samples).items()},
+    }
+
+
+def run_scenario(name: str, args) -> dict:
+    if name == "ingest":
+        result = run_ingest(args)
+    elif name == "paging":
+        result = run_paging(args)
+    elif name == "suggest":
+        result = run_suggest(args)
+    else:
+        result = run_parse(args, name.split("_", 1)[1])
+    result['peak_rss_mb'] = round(peak_rss_mb(), 1)
+    return result
+
+
+# --- Reporting ---
+
+def lower_is_better(metric: str) -> bool:
+    return metric.endswith(("_ms", "seconds", "_mb", "db_requests"))
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """(scenario, metric, baseline, current, change) for metrics worse than the baseline by more than `tolerance`."""
+    regressions = []
+    for scenario, metrics in results.items():
+        for metric, value in metrics.items():
+            before = baseline.get(scenario, {}).get(metric)
+            if not before or metric in ('transactions', 'pages'):
+                continue
+            change = (value - before) / before
+            if (change > tolerance) if lower_is_better(metric) else (change < -tolerance):
+                regressions.append((scenario, metric, before, value, change))
+    return regressions
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=SCRIPT_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--accounts", type=int, default=4)
+    parser.add_argument("--transactions", type=int, default=25_000, help="Transactions per account")
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated seconds per database request")
+    parser.add_argument("--backend", choices=("memory", "sqlite"), default="memory", help="Database used by ingest and paging")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs of each parse scenario (median is kept)")
+    parser.add_argument("--pages", type=int, default=200, help="Pages walked by the paging scenario")
+    parser.add_argument("--page-size", type=int, default=100, help="Rows per page, and per scored batch in the suggest scenario")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated subset of " + ", ".join(SCENARIOS))
+    parser.add_argument("--output", type=Path, default=Path("bench_results.json"))
+    parser.add_argument("--compare", type=Path, help="Previous results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative regression (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    results = {}
+    context = multiprocessing.get_context("spawn")
+    for name in names:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            results[name] = executor.submit(run_scenario, name, args).result()
+        print(f"{name:>11}: " + ", ".join(f"{metric}={value}" for metric, value in results[name].items()))
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'parameters': {key: value for key, value in vars(args).items() if key not in ('output', 'compare', 'tolerance')},
+        },
+        'results': results,
+    }
+    args.output.write_text(json.dumps(report, indent=2, default=str) + "\n")
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        if baseline['meta']['parameters'] != report['meta']['parameters']:
+            print("Warning: the baseline was recorded with different parameters.")
+        regressions = compare(results, baseline['results'], args.tolerance)
+        for scenario, metric, before, value, change in regressions:
+            print(f"REGRESSION {scenario}.{metric}: {before} -> {value} ({change:+.0%})")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.compare} ({baseline['meta']['revision']}).")
+
+
+if __name__ == "__main__":
+    main()
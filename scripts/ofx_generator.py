@@ -0,0 +1,121 @@
+"""Synthetic OFX statements for benchmarks and load tests.
+
+Produces one file holding `accounts` statements of `transactions` transactions each, as
+OFX 1.x SGML (unclosed leaf tags, the format most banks export) or OFX 2.x XML. Output
+is deterministic for a given seed. Every third account is a credit card statement, and
+payees include characters that need entity escaping.
+
+Usage: python scripts/ofx_generator.py OUTPUT [--accounts 4] [--transactions 10000] [--format sgml|xml] [--seed 1]
+"""
+import argparse
+import random
+from datetime import date, timedelta
+from html import escape
+from pathlib import Path
+from typing import Iterator
+
+FORMATS = ("sgml", "xml")
+
+SGML_HEADER = (
+    "OFXHEADER:100\nDATA:OFXSGML\nVERSION:102\nSECURITY:NONE\nENCODING:USASCII\n"
+    "CHARSET:1252\nCOMPRESSION:NONE\nOLDFILEUID:NONE\nNEWFILEUID:NONE\n\n"
+)
+XML_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="no"?>\n'
+    '<?OFX OFXHEADER="200" VERSION="220" SECURITY="NONE" OLDFILEUID="NONE" NEWFILEUID="NONE"?>\n'
+)
+
+PAYEES = [
+    "COUNTDOWN {n} AUCKLAND", "Z ENERGY {n}", "EFTPOS CAFE {n} & CO", "AMAZON MKTPLACE <{n}>",
+    "SPOTIFY P{n}", "UBER TRIP {n}", "SALARY ACME LTD", "TRANSFER TO SAVINGS {n}",
+]
+
+
+def _element(name: str, value, xml: bool) -> str:
+    text = escape(str(value), quote=False)
+    return f"<{name}>{text}</{name}>" if xml else f"<{name}>{text}"
+
+
+def _statement(rng: random.Random, index: int, transactions: int, start: date, xml: bool) -> Iterator[str]:
+    credit = index % 3 == 2
+    account_id = f"{12 + index:02d}-3456-{index:07d}-00"
+    end = start + timedelta(days=max(transactions // 20, 1))
+    span_days = (end - start).days
+
+    yield "<CREDITCARDMSGSRSV1>" if credit else "<BANKMSGSRSV1>"
+    yield "<CCSTMTTRNRS>" if credit else "<STMTTRNRS>"
+    yield _element("TRNUID", index + 1, xml)
+    yield "<STATUS>" + _element("CODE", 0, xml) + _element("SEVERITY", "INFO", xml) + "</STATUS>"
+    yield "<CCSTMTRS>" if credit else "<STMTRS>"
+    yield _element("CURDEF", "NZD", xml)
+    if credit:
+        yield "<CCACCTFROM>" + _element("ACCTID", account_id, xml) + "</CCACCTFROM>"
+    else:
+        yield (
+            "<BANKACCTFROM>" + _element("BANKID", "12", xml) + _element("ACCTID", account_id, xml)
+            + _element("ACCTTYPE", "SAVINGS" if index % 3 == 1 else "CHECKING", xml) + "</BANKACCTFROM>"
+        )
+    yield "<BANKTRANLIST>"
+    yield _element("DTSTART", start.strftime("%Y%m%d"), xml)
+    yield _element("DTEND", end.strftime("%Y%m%d"), xml)
+    for i in range(transactions):
+        posted = start + timedelta(days=rng.randrange(span_days))
+        amount = rng.uniform(1500, 4000) if rng.random() < 0.05 else -rng.uniform(1, 300)
+        payee = rng.choice(PAYEES).format(n=rng.randint(1, 500))
+        yield (
+            "<STMTTRN>"
+            + _element("TRNTYPE", "CREDIT" if amount > 0 else "DEBIT", xml)
+            + _element("DTPOSTED", posted.strftime("%Y%m%d") + "120000[+12:NZST]", xml)
+            + _element("TRNAMT", f"{amount:.2f}", xml)
+            + _element("FITID", f"{index}-{start:%Y%m%d}-{i}", xml)
+            + _element("NAME", payee[:32], xml)
+            + _element("MEMO", f"REF {rng.randint(100000, 999999)}", xml)
+            + "</STMTTRN>"
+        )
+    yield "</BANKTRANLIST>"
+    yield "<LEDGERBAL>" + _element("BALAMT", f"{rng.uniform(-1000, 20000):.2f}", xml) + _element("DTASOF", end.strftime("%Y%m%d"), xml) + "</LEDGERBAL>"
+    yield "</CCSTMTRS>" if credit else "</STMTRS>"
+    yield "</CCSTMTTRNRS>" if credit else "</STMTTRNRS>"
+    yield "</CREDITCARDMSGSRSV1>" if credit else "</BANKMSGSRSV1>"
+
+
+def generate_ofx(
+    accounts: int = 4,
+    transactions: int = 10_000,
+    format: str = "sgml",
+    seed: int = 1,
+    start: date = date(2024, 1, 1),
+) -> bytes:
+    """Returns an OFX file with `accounts` statements of `transactions` transactions each."""
+    if format not in FORMATS:
+        raise ValueError(f"format must be one of {FORMATS}")
+    xml = format == "xml"
+    rng = random.Random(seed)
+    parts = [XML_HEADER if xml else SGML_HEADER, "<OFX>"]
+    parts.append(
+        "<SIGNONMSGSRSV1><SONRS><STATUS>" + _element("CODE", 0, xml) + _element("SEVERITY", "INFO", xml)
+        + "</STATUS>" + _element("DTSERVER", start.strftime("%Y%m%d"), xml) + _element("LANGUAGE", "ENG", xml)
+        + "<FI>" + _element("ORG", "SYNTHETIC BANK", xml) + _element("FID", "9999", xml) + "</FI></SONRS></SIGNONMSGSRSV1>"
+    )
+    for index in range(accounts):
+        parts.extend(_statement(rng, index, transactions, start, xml))
+    parts.append("</OFX>\n")
+    return "\n".join(parts).encode("utf-8" if xml else "ascii", errors="xmlcharrefreplace")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--accounts", type=int, default=4)
+    parser.add_argument("--transactions", type=int, default=10_000, help="Transactions per account")
+    parser.add_argument("--format", choices=FORMATS, default="sgml")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    data = generate_ofx(args.accounts, args.transactions, args.format, args.seed)
+    args.output.write_bytes(data)
+    print(f"Wrote {args.output} ({len(data) / 1e6:.1f} MB, {args.accounts * args.transactions:,} transactions)")
+
+
+if __name__ == "__main__":
+    main()